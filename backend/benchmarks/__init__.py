@@ -0,0 +1 @@
+"""Standalone performance benchmarks for the TuffWraps API (run from backend/)."""
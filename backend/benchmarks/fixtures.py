@@ -0,0 +1,206 @@
+"""
+Scaled fixture datasets for the benchmark suite.
+
+Copies a connectors/data tree (the real one by default) and multiplies its
+volume by a scale factor:
+- Daily series (Kendall historical metrics, GA4 daily traffic, GSC branded
+  trend) get scale x the history, extended back in time
+- Campaign-level data (Google/Meta daily campaign rows, Kendall ads reports
+  and adsets) get scale x the campaigns
+- Record stores (Amazon and Shopify orders, ShipStation shipments,
+  changelog, chat sessions, AI recommendations) get scale x the records
+
+The most recent window is left as it was, so every date-windowed code path
+still finds data. Columnar (Arrow) sidecars, generations and the shared
+cache aren't copied - the fixture is read from its JSON files.
+
+Usage (from backend/):
+    python -m benchmarks.fixtures 10 /tmp/tuffwraps-10x
+"""
+
+import argparse
+import copy
+import json
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+SOURCE_DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
+
+# Written to the fixture root: {"scale": ..., "as_of": "YYYY-MM-DDTHH:MM:SS"}
+MANIFEST_FILE = "fixture.json"
+
+SKIP_DIRS = {"cache", "generations", "scheduler"}
+
+DAILY_SERIES = {
+    "kendall/historical_metrics.json": "metrics",
+    "ga4/daily_traffic.json": None,
+    "gsc/daily_branded_trend.json": None,
+}
+CAMPAIGN_ROWS = ("google_ads/campaigns_last_30d.json", "meta_ads/campaigns_last_30d.json")
+KENDALL_ADS_REPORTS = (
+    "kendall/google_ads_report.json", "kendall/google_ads_report_7d.json", "kendall/google_ads_report_30d.json",
+    "kendall/meta_ads_report.json", "kendall/meta_ads_report_7d.json", "kendall/meta_ads_report_30d.json",
+)
+KENDALL_ADSETS = ("kendall/meta_adsets_7d.json", "kendall/meta_adsets_30d.json")
+
+
+def _copy_id(value, k: int):
+    """Id for the k-th copy of a record (same type as the original)."""
+    if isinstance(value, int):
+        return value * 1000 + k
+    return f"{value}{k:03d}"
+
+
+def _copy_name(name: str, k: int) -> str:
+    return f"{name} #{k + 1}"
+
+
+def _extend_series(rows: list, scale: int) -> list:
+    """Add (scale - 1) earlier copies of a daily series, each shifted back by the series span."""
+    dated = [r for r in rows if r.get("date")]
+    if not dated:
+        return rows
+    dates = sorted(r["date"] for r in dated)
+    first = datetime.strptime(dates[0], "%Y-%m-%d")
+    span = (datetime.strptime(dates[-1], "%Y-%m-%d") - first).days + 1
+
+    history = []
+    for k in range(scale - 1, 0, -1):
+        for row in dated:
+            day = datetime.strptime(row["date"], "%Y-%m-%d") - timedelta(days=span * k)
+            history.append({**row, "date": day.strftime("%Y-%m-%d")})
+    return history + rows
+
+
+def _multiply_campaign_rows(rows: list, scale: int) -> list:
+    copies = list(rows)
+    for k in range(1, scale):
+        for row in rows:
+            copies.append({
+                **row,
+                "campaign_id": _copy_id(row["campaign_id"], k),
+                "campaign_name": _copy_name(row["campaign_name"], k),
+            })
+    return copies
+
+
+def _multiply_kendall_report(report: dict, scale: int) -> dict:
+    camps = report.get("camps")
+    if not isinstance(camps, dict):
+        return report
+    multiplied = dict(camps)
+    for k in range(1, scale):
+        for c_id, camp in camps.items():
+            new_id = _copy_id(c_id, k)
+            multiplied[new_id] = {**camp, "c_id": new_id, "c_name": _copy_name(camp.get("c_name", ""), k)}
+    return {**report, "camps": multiplied}
+
+
+def _multiply_adsets(report: dict, scale: int) -> dict:
+    adsets = (report.get("camps") or {}).get("adsets")
+    if not isinstance(adsets, list):
+        return report
+    multiplied = list(adsets)
+    for k in range(1, scale):
+        for adset in adsets:
+            multiplied.append({
+                **adset,
+                "campaign_id": _copy_id(adset["campaign_id"], k),
+                "campaign_name": _copy_name(adset.get("campaign_name", ""), k),
+                "adset_id": _copy_id(adset["adset_id"], k),
+            })
+    return {**report, "camps": {**report["camps"], "adsets": multiplied}}
+
+
+def _multiply_records(records: list, scale: int, id_field: str) -> list:
+    multiplied = list(records)
+    for k in range(1, scale):
+        for record in records:
+            record = copy.deepcopy(record)
+            if id_field in record:
+                record[id_field] = _copy_id(record[id_field], k)
+            multiplied.append(record)
+    return multiplied
+
+
+def _scale_file(relative: str, data, scale: int):
+    """Scale one dataset (unknown files are copied as-is)."""
+    if relative in DAILY_SERIES:
+        key = DAILY_SERIES[relative]
+        if key:
+            return {**data, key: _extend_series(data.get(key, []), scale)}
+        return _extend_series(data, scale)
+    if relative in CAMPAIGN_ROWS:
+        return _multiply_campaign_rows(data, scale)
+    if relative in KENDALL_ADS_REPORTS:
+        return _multiply_kendall_report(data, scale)
+    if relative in KENDALL_ADSETS:
+        return _multiply_adsets(data, scale)
+    if relative == "amazon/orders_last_30d.json":
+        return _multiply_records(data, scale, "AmazonOrderId")
+    if relative == "shopify/orders_last_30d.json":
+        return _multiply_records(data, scale, "id")
+    if relative == "shipstation/shipments_last_30d.json":
+        return _multiply_records(data, scale, "shipmentId")
+    if relative == "changelog.json":
+        records = _multiply_records(data, scale, "id")
+        for i, entry in enumerate(records, start=1):
+            entry["id"] = i
+        return records
+    if relative == "ai_recommendations.json":
+        return _multiply_records(data, scale, "id")
+    if relative == "chat_history.json":
+        return {**data, "sessions": _multiply_records(data.get("sessions", []), scale, "id")}
+    return data
+
+
+def fixture_as_of(data_dir: Path) -> Optional[datetime]:
+    """The fixture's "now": 09:00 the day after the last Kendall historical row."""
+    try:
+        metrics = json.loads((data_dir / "kendall" / "historical_metrics.json").read_text())["metrics"]
+        last = max(m["date"] for m in metrics if m.get("date"))
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+    return datetime.strptime(last, "%Y-%m-%d") + timedelta(days=1, hours=9)
+
+
+def build_scaled_fixture(scale: int, dest: Path, source: Path = SOURCE_DATA_DIR) -> Path:
+    """Write a copy of source scaled by `scale` to dest (replacing it)."""
+    dest = Path(dest)
+    if dest.exists():
+        shutil.rmtree(dest)
+
+    for path in sorted(source.rglob("*.json")):
+        relative = path.relative_to(source)
+        if relative.parts[0] in SKIP_DIRS:
+            continue
+        target = dest / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if scale == 1:
+            shutil.copyfile(path, target)
+            continue
+        data = json.loads(path.read_text(encoding="utf-8"))
+        target.write_text(json.dumps(_scale_file(relative.as_posix(), data, scale)), encoding="utf-8")
+
+    as_of = fixture_as_of(dest)
+    manifest = {"scale": scale, "source": str(source), "as_of": as_of.isoformat() if as_of else None}
+    (dest / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return dest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a scaled copy of the connectors data tree")
+    parser.add_argument("scale", type=int, help="Volume multiplier (1 = plain copy)")
+    parser.add_argument("dest", type=Path, help="Output directory (replaced)")
+    parser.add_argument("--source", type=Path, default=SOURCE_DATA_DIR, help="Data tree to scale")
+    args = parser.parse_args()
+
+    dest = build_scaled_fixture(args.scale, args.dest, args.source)
+    size = sum(p.stat().st_size for p in dest.rglob("*.json"))
+    print(f"Wrote {args.scale}x fixture to {dest} ({size / 1_000_000:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
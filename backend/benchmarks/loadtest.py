@@ -0,0 +1,171 @@
+"""
+HTTP load test for the full TuffWraps API.
+
+Generates a synthetic data tree (benchmarks/synthetic.py), starts the
+Anthropic and Amazon stand-ins (benchmarks/stand_ins.py), then for each
+uvicorn worker count starts the app on that data and runs every requested
+Locust mix (benchmarks/locustfile.py) headless. Reports throughput and tail
+latency per endpoint, mix and worker count, and writes them as JSON.
+
+Nothing leaves the machine: the AI endpoints and the Amazon refresher talk to
+the stand-ins, and all writes go to the generated data tree.
+
+Requires locust (pip install locust). Usage (from backend/):
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --workers 1,2,4 --mixes dashboard,ai --users 100 --duration 60
+    python -m benchmarks.loadtest --ttft 2 --tokens-per-second 40 --output loadtest.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.stand_ins import StandInConfig, start_stand_ins
+from benchmarks.synthetic import SyntheticConfig, generate
+
+LOCUSTFILE = Path(__file__).parent / "locustfile.py"
+DEFAULT_MIXES = "dashboard,analytics,ai,mixed"  # MIXES in locustfile.py (not imported: locust monkey-patches on import)
+STARTUP_TIMEOUT = 60  # Seconds to wait for uvicorn to answer /api/health
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(url: str, proc: subprocess.Popen) -> None:
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/api/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"uvicorn did not answer {url}/api/health within {STARTUP_TIMEOUT}s")
+
+
+def start_app(workers: int, env: dict) -> tuple[subprocess.Popen, str]:
+    """Start uvicorn with N workers on a free port; returns the process and base URL."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(url, proc)
+    except Exception:
+        proc.terminate()
+        raise
+    return proc, url
+
+
+def run_locust(url: str, mix: str, users: int, spawn_rate: float, duration: int, csv_prefix: Path) -> list[dict]:
+    """Run one headless Locust mix and return its per-endpoint stats rows."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "locust", "-f", str(LOCUSTFILE), "--headless", "--only-summary",
+         "--host", url, "-u", str(users), "-r", str(spawn_rate), "-t", f"{duration}s", "--csv", str(csv_prefix)],
+        cwd=BACKEND_DIR, env={**os.environ, "LOADTEST_MIX": mix}, capture_output=True, text=True,
+    )
+    stats_file = csv_prefix.with_name(csv_prefix.name + "_stats.csv")
+    if not stats_file.exists():
+        raise RuntimeError(f"Locust wrote no stats for mix {mix!r}:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    with open(stats_file, newline="") as f:
+        for row in csv.DictReader(f):
+            rows.append({
+                "endpoint": row["Name"] if row["Name"] == "Aggregated" else f"{row['Type']} {row['Name']}",
+                "requests": int(row["Request Count"]),
+                "failures": int(row["Failure Count"]),
+                "rps": round(float(row["Requests/s"]), 2),
+                "p50_ms": float(row["50%"]),
+                "p95_ms": float(row["95%"]),
+                "p99_ms": float(row["99%"]),
+                "max_ms": round(float(row["Max Response Time"]), 1),
+            })
+    return rows
+
+
+def print_results(workers: int, mix: str, rows: list[dict]) -> None:
+    print(f"\n{mix} @ {workers} worker(s)")
+    print(f"  {'endpoint':<52} {'reqs':>7} {'fail':>5} {'req/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>8}")
+    for r in rows:
+        print(f"  {r['endpoint'][:52]:<52} {r['requests']:>7} {r['failures']:>5} {r['rps']:>8.2f} "
+              f"{r['p50_ms']:>7.0f} {r['p95_ms']:>7.0f} {r['p99_ms']:>7.0f} {r['max_ms']:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against synthetic data and local API stand-ins")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated uvicorn worker counts")
+    parser.add_argument("--mixes", default=DEFAULT_MIXES, help=f"Comma-separated mixes ({DEFAULT_MIXES})")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent Locust users")
+    parser.add_argument("--spawn-rate", type=float, default=10, help="Users started per second")
+    parser.add_argument("--duration", type=int, default=60, help="Seconds per mix and worker count")
+    parser.add_argument("--days", type=int, default=180, help="Days of synthetic data")
+    parser.add_argument("--campaigns", type=int, default=SyntheticConfig.campaigns)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--ttft", type=float, default=StandInConfig.ttft, help="Stand-in Anthropic seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=StandInConfig.tokens_per_second)
+    parser.add_argument("--sp-api-latency", type=float, default=StandInConfig.sp_api_latency)
+    parser.add_argument("--throttle-rate", type=float, default=StandInConfig.throttle_rate, help="Share of SP-API calls answered 429")
+    parser.add_argument("--refresh-interval", type=int, default=30, help="AMAZON_REFRESH_INTERVAL for the app (seconds)")
+    parser.add_argument("--output", type=Path, help="Write all results to this JSON file")
+    args = parser.parse_args()
+
+    mixes = args.mixes.split(",")
+    stand_ins = start_stand_ins(StandInConfig(
+        ttft=args.ttft, tokens_per_second=args.tokens_per_second, sp_api_latency=args.sp_api_latency,
+        throttle_rate=args.throttle_rate, seed=args.seed,
+    ))
+    print(f"Stand-ins on {stand_ins.url}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="tuffwraps-loadtest-") as tmp:
+        data_dir = Path(tmp) / "data"
+        generate(data_dir, SyntheticConfig(days=args.days, campaigns=args.campaigns, seed=args.seed))
+        print(f"Generated {args.days} days x {args.campaigns} campaigns in {data_dir}")
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            env = {
+                **os.environ,
+                **stand_ins.env(),
+                "CONNECTORS_DATA_DIR": str(data_dir),
+                "AMAZON_REFRESH_INTERVAL": str(args.refresh_interval),
+                "PYTHONPATH": str(BACKEND_DIR),
+            }
+            proc, url = start_app(workers, env)
+            try:
+                for mix in mixes:
+                    print(f"Running {mix} @ {workers} worker(s) for {args.duration}s...")
+                    rows = run_locust(url, mix, args.users, args.spawn_rate, args.duration, Path(tmp) / f"{mix}-{workers}")
+                    print_results(workers, mix, rows)
+                    results.append({"workers": workers, "mix": mix, "users": args.users, "endpoints": rows})
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+    print(f"\nStand-in calls: {json.dumps(stand_ins.stats)}")
+    stand_ins.shutdown()
+    if args.output:
+        args.output.write_text(json.dumps({"stand_in_calls": stand_ins.stats, "runs": results}, indent=2) + "\n")
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Locust scenarios for the TuffWraps API.
+
+Each mix is a weighted set of requests modelled on how the dashboard and the
+AI pages use the API. Pick one with LOADTEST_MIX (default "mixed"). The AI
+endpoints are only safe to load-test against the stand-ins in
+benchmarks/stand_ins.py; benchmarks/loadtest.py wires everything up.
+
+Usage (from backend/, against a running server):
+    LOADTEST_MIX=dashboard locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000
+"""
+
+import os
+import random
+
+from locust import HttpUser, between, task
+
+TIMEFRAMES = (1, 3, 7, 14, 30)
+
+FIRST_PAINT = {"queries": [
+    {"id": "signals", "path": "/metrics/signals"},
+    {"id": "summary", "path": "/metrics/summary"},
+    {"id": "week", "path": "/metrics/timeframe/7", "params": {"fields": "date,sales,spend,orders"}},
+    {"id": "amazon", "path": "/metrics/amazon/status"},
+    {"id": "changes", "path": "/changelog/entries"},
+]}
+
+CHAT_QUESTIONS = (
+    "Based on the current data, what are the top 3 actions I should take today?",
+    "How are my TOF campaigns performing? Should I adjust the budget?",
+    "Is Meta spend driving branded search and Amazon sales?",
+)
+
+
+# =============================================================================
+# REQUESTS
+# =============================================================================
+
+def first_paint(client):
+    client.post("/api/batch", json=FIRST_PAINT, name="/api/batch (first paint)")
+
+
+def timeframe(client):
+    client.get(f"/api/metrics/timeframe/{random.choice(TIMEFRAMES)}", name="/api/metrics/timeframe/[days]")
+
+
+def timeframe_channel(client):
+    platform = random.choice(("google", "meta"))
+    client.get(f"/api/metrics/timeframe/{random.choice(TIMEFRAMES)}/{platform}", name="/api/metrics/timeframe/[days]/[platform]")
+
+
+def compare_timeframes(client):
+    client.get("/api/metrics/timeframes/compare")
+
+
+def summary(client):
+    client.get("/api/metrics/summary")
+
+
+def report(client):
+    client.get("/api/metrics/report")
+
+
+def halo_effect(client):
+    client.get("/api/metrics/halo-effect")
+
+
+def historical(client):
+    client.get("/api/metrics/historical", params={"fields": "date,sales,spend,orders"})
+
+
+def correlation(client):
+    client.get("/api/metrics/correlation")
+
+
+def spend_outcome(client):
+    client.get("/api/synthesis/correlation/spend-outcome", params={"days": random.choice((7, 14, 30))})
+
+
+def campaigns(client):
+    platform = random.choice(("google", "facebook"))
+    client.get(f"/api/synthesis/campaigns/{platform}", name="/api/synthesis/campaigns/[platform]")
+
+
+def funnel_impact(client):
+    client.get("/api/synthesis/funnel-impact")
+
+
+def changelog(client):
+    client.get("/api/changelog/entries")
+
+
+def chat(client):
+    question = random.choice(CHAT_QUESTIONS)
+    client.post("/api/ai/chat", json={"messages": [{"role": "user", "content": question}]})
+
+
+def analyze(client):
+    client.post("/api/synthesis/analyze", json={"days": 30, "analysis_type": "quick", "save_recommendations": False})
+
+
+MIXES = {
+    # Dashboard navigation: first paint, then timeframe switching
+    "dashboard": {
+        first_paint: 3, timeframe: 6, timeframe_channel: 3, compare_timeframes: 1, summary: 2,
+        report: 1, halo_effect: 1, changelog: 1,
+    },
+    # Analysis pages: the heavy computed endpoints
+    "analytics": {
+        spend_outcome: 3, campaigns: 3, funnel_impact: 2, correlation: 2, historical: 2, timeframe: 2,
+    },
+    # AI pages: LLM calls with their context building, plus what the page loads around them
+    "ai": {chat: 4, analyze: 1, summary: 2, timeframe: 2},
+    "mixed": {
+        first_paint: 3, timeframe: 6, timeframe_channel: 2, compare_timeframes: 1, summary: 2, report: 1,
+        halo_effect: 1, changelog: 1, spend_outcome: 2, campaigns: 2, funnel_impact: 1, correlation: 1,
+        historical: 1, chat: 1, analyze: 1,
+    },
+}
+
+MIX = os.environ.get("LOADTEST_MIX", "mixed")
+if MIX not in MIXES:
+    raise ValueError(f"Unknown LOADTEST_MIX {MIX!r}; choose from {', '.join(MIXES)}")
+
+
+class DashboardUser(HttpUser):
+    """A user clicking around the dashboard with a short think time."""
+
+    wait_time = between(0.5, 2.0)
+
+    @task
+    def request(self):
+        requests, weights = zip(*MIXES[MIX].items())
+        random.choices(requests, weights)[0](self.client)
@@ -0,0 +1,101 @@
+"""
+Serialization and compression benchmark for the largest API payloads.
+
+Compares, per endpoint, FastAPI's default path (jsonable_encoder + stdlib
+json via JSONResponse) against FastJSONResponse (orjson), and reports the
+payload size raw, gzipped and Brotli-compressed at the middleware settings.
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --repeat 50
+"""
+
+import argparse
+import asyncio
+import gzip
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from routers import metrics
+from services.responses import (
+    dumps, ORJSON_AVAILABLE, BROTLI_AVAILABLE, GZIP_LEVEL, BROTLI_QUALITY, brotli,
+)
+
+ENDPOINTS = {
+    "/attribution": metrics.get_attribution,
+    "/historical": metrics.get_historical,
+    "/timeframe/30": lambda: metrics.get_timeframe_metrics(30),
+    "/report": metrics.get_report,
+    "/google-ads": metrics.get_google_ads,
+    "/meta-ads": metrics.get_meta_ads,
+    "/summary": metrics.get_summary,
+    "/correlation": metrics.get_correlation,
+}
+
+
+def stdlib_render(payload) -> bytes:
+    """What FastAPI does by default for a plain dict result."""
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def time_per_call(func, payload, repeat: int) -> float:
+    """Best-of-3 average time per call in milliseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(payload)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def run(repeat: int) -> list[dict]:
+    results = []
+    for name, endpoint in ENDPOINTS.items():
+        try:
+            payload = asyncio.run(endpoint())
+        except Exception as e:
+            print(f"  {name}: skipped ({e})")
+            continue
+
+        body = dumps(payload)
+        results.append({
+            "endpoint": name,
+            "stdlib_ms": time_per_call(stdlib_render, payload, repeat),
+            "fast_ms": time_per_call(dumps, payload, repeat),
+            "raw_bytes": len(stdlib_render(payload)),
+            "fast_bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=GZIP_LEVEL)),
+            "br_bytes": len(brotli.compress(body, quality=BROTLI_QUALITY)) if BROTLI_AVAILABLE else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API payload serialization and compression")
+    parser.add_argument("--repeat", type=int, default=20, help="Serializations per timing run")
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if ORJSON_AVAILABLE else 'NO (stdlib fallback)'}  brotli: {'yes' if BROTLI_AVAILABLE else 'no'}")
+    results = run(args.repeat)
+
+    print()
+    print(f"{'Endpoint':<16}{'stdlib ms':>11}{'orjson ms':>11}{'speedup':>9}{'raw B':>10}{'orjson B':>10}{'gzip B':>9}{'br B':>9}")
+    print("-" * 85)
+    for r in results:
+        speedup = r["stdlib_ms"] / r["fast_ms"] if r["fast_ms"] else 0
+        br = f"{r['br_bytes']:,}" if r["br_bytes"] is not None else "-"
+        print(
+            f"{r['endpoint']:<16}{r['stdlib_ms']:>11.3f}{r['fast_ms']:>11.3f}{speedup:>8.1f}x"
+            f"{r['raw_bytes']:>10,}{r['fast_bytes']:>10,}{r['gzip_bytes']:>9,}{br:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Local stand-ins for the paid external APIs, for load tests.
+
+One threaded HTTP server answers both:
+- Anthropic Messages API (POST /v1/messages), with a configurable time to
+  first token and token rate, and SSE streaming when the request asks for it.
+  The SDK picks it up from ANTHROPIC_BASE_URL.
+- Amazon LWA token + SP-API Orders and Reports endpoints, including the
+  report document download (gzipped flat file), so the background refresher
+  runs its full pull. The connector picks it up from AMAZON_LWA_TOKEN_URL and
+  AMAZON_SP_API_BASE.
+
+Latencies are simulated with sleeps, so a handful of threads can hold many
+concurrent slow calls like the real services do. Orders are generated from a
+seed, so every run sees the same Amazon data.
+
+Usage (from backend/):
+    python -m benchmarks.stand_ins --port 8090 --ttft 0.8 --tokens-per-second 60
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8090 ANTHROPIC_API_KEY=stand-in \\
+    AMAZON_SP_API_BASE=http://127.0.0.1:8090 AMAZON_LWA_TOKEN_URL=http://127.0.0.1:8090/auth/o2/token \\
+    python -m uvicorn main:app
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+REPORTS_API = "/reports/2021-06-30"
+ORDERS_PAGE_SIZE = 100
+PRICES = (14.99, 19.99, 21.39, 24.99, 29.99, 34.99)
+SKUS = ("TW-WW-18", "TW-LS-BLK", "TW-KS-7MM", "TW-ES-M", "TW-LB-10")
+
+# Canned analysis: bold action lines so _extract_recommendations finds recommendations
+RESPONSE_TEXT = """## Summary
+Blended CAM per order is healthy and Meta TOF spend is lifting branded search and Amazon 1-3 days later.
+
+**SCALE: Meta TOF Prospecting - Lifting Straps (+15%)**
+Kendall ROAS is above target and the halo into branded search is holding.
+
+**HOLD: Google Shopping | Wrist Wraps | USA**
+Still in the cooling-off window from the last change; revisit in 3 days.
+
+**REDUCE: Meta Retention - Past Customers (-10%)**
+Platform ROAS is over-reporting against Kendall by more than 40%.
+
+**TEST: Google Search | Non-Brand | Knee Sleeves**
+Non-branded clicks are growing; test a 10% budget increase."""
+
+
+@dataclass
+class StandInConfig:
+    """Simulated latency and behaviour of the stand-in services."""
+    ttft: float = 0.8                  # Anthropic seconds to first token
+    tokens_per_second: float = 60.0    # Anthropic output token rate
+    output_tokens: int = 400           # Tokens per response (capped by max_tokens)
+    sp_api_latency: float = 0.25       # Seconds per SP-API call
+    report_seconds: float = 5.0        # Time a report stays IN_PROGRESS
+    amazon_orders_per_day: int = 40
+    throttle_rate: float = 0.0         # Share of SP-API calls answered 429 QuotaExceeded
+    seed: int = 42
+
+
+class _Reports:
+    """Created reports: reportId -> (created_at, dataStartTime, dataEndTime)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reports = {}
+
+    def create(self, start: str, end: str) -> str:
+        with self._lock:
+            report_id = str(50000 + len(self._reports))
+            self._reports[report_id] = (time.time(), start, end)
+        return report_id
+
+    def get(self, report_id: str) -> Optional[tuple]:
+        with self._lock:
+            return self._reports.get(report_id)
+
+
+def _day_orders(day: datetime, config: StandInConfig) -> list[dict]:
+    """Deterministic order items for one day: amazon-order-id, purchase-date, price, quantity, sku."""
+    rng = random.Random(f"{config.seed}:{day:%Y-%m-%d}")
+    count = max(0, round(rng.gauss(config.amazon_orders_per_day, config.amazon_orders_per_day ** 0.5)))
+    orders = []
+    for _ in range(count):
+        purchased = day + timedelta(seconds=rng.randrange(86400))
+        quantity = rng.choice((1, 1, 1, 2))
+        orders.append({
+            "id": f"11{rng.randrange(10)}-{rng.randrange(10**7):07d}-{rng.randrange(10**7):07d}",
+            "purchased": purchased, "price": rng.choice(PRICES), "quantity": quantity, "sku": rng.choice(SKUS),
+            "status": "Cancelled" if rng.random() < 0.02 else "Shipped",
+        })
+    return orders
+
+
+def _orders_between(start: datetime, end: datetime, config: StandInConfig) -> list[dict]:
+    orders = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day <= end:
+        orders.extend(o for o in _day_orders(day, config) if start <= o["purchased"] <= end)
+        day += timedelta(days=1)
+    return orders
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+
+
+def _orders_report(start: str, end: str, config: StandInConfig) -> bytes:
+    """Gzipped tab-separated flat-file orders report, one row per order item."""
+    columns = ("amazon-order-id", "purchase-date", "order-status", "sku", "quantity", "item-price", "item-tax",
+               "shipping-price", "shipping-tax", "gift-wrap-price", "gift-wrap-tax",
+               "item-promotion-discount", "ship-promotion-discount")
+    lines = ["\t".join(columns)]
+    for o in _orders_between(_parse_time(start), _parse_time(end), config):
+        price = o["price"] * o["quantity"]
+        lines.append("\t".join((
+            o["id"], o["purchased"].strftime("%Y-%m-%dT%H:%M:%S+00:00"), o["status"], o["sku"], str(o["quantity"]),
+            f"{price:.2f}", f"{price * 0.07:.2f}", "0.00", "0.00", "", "", "0.00", "0.00",
+        )))
+    return gzip.compress("\n".join(lines).encode("utf-8"))
+
+
+def _order_resource(o: dict) -> dict:
+    """An order in the Orders API getOrders shape (the fields the connector reads)."""
+    amount = o["price"] * o["quantity"]
+    return {
+        "AmazonOrderId": o["id"], "PurchaseDate": o["purchased"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "OrderStatus": o["status"], "FulfillmentChannel": "AFN", "SalesChannel": "Amazon.com",
+        "NumberOfItemsShipped": o["quantity"], "NumberOfItemsUnshipped": 0, "MarketplaceId": "ATVPDKIKX0DER",
+        "OrderTotal": {"CurrencyCode": "USD", "Amount": f"{amount:.2f}"},
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Anthropic or Amazon stand-in."""
+
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    # -------------------------------------------------------------------------
+    # Plumbing
+    # -------------------------------------------------------------------------
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload, content_type: str = "application/json") -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, name: str) -> None:
+        with self.server.stats_lock:
+            self.server.stats[name] = self.server.stats.get(name, 0) + 1
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        path, query = url.path, {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if method == "POST" and path == "/v1/messages":
+            return self._messages(json.loads(self._body() or b"{}"))
+        if method == "POST" and path == "/auth/o2/token":
+            self._body()
+            self._count("lwa_token")
+            return self._send(200, {"access_token": f"Atza|stand-in-{uuid.uuid4().hex}", "token_type": "bearer", "expires_in": 3600})
+        if path == "/_stats":
+            with self.server.stats_lock:
+                return self._send(200, dict(self.server.stats))
+        if path.startswith("/orders/") or path.startswith(REPORTS_API) or path.startswith("/_documents/"):
+            return self._sp_api(method, path, query)
+        self._send(404, {"error": f"No stand-in for {method} {path}"})
+
+    # -------------------------------------------------------------------------
+    # Anthropic Messages
+    # -------------------------------------------------------------------------
+
+    def _messages(self, request: dict) -> None:
+        config = self.server.config
+        self._count("anthropic_messages")
+        input_tokens = max(1, len(json.dumps(request.get("messages", []))) // 4 + len(str(request.get("system", ""))) // 4)
+        output_tokens = min(config.output_tokens, request.get("max_tokens", config.output_tokens))
+        words = RESPONSE_TEXT.split(" ")
+        # About one word per token; repeat the canned text for long outputs
+        tokens = [words[i % len(words)] + " " for i in range(output_tokens)]
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+            "model": request.get("model", "claude-stand-in"), "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": 0},
+        }
+
+        time.sleep(config.ttft)
+        if not request.get("stream"):
+            time.sleep(output_tokens / config.tokens_per_second)
+            message.update({
+                "content": [{"type": "text", "text": "".join(tokens).strip()}], "stop_reason": "end_turn",
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+            })
+            return self._send(200, message)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(name: str, data: dict) -> None:
+            self.wfile.write(f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event("message_start", {"message": {**message, "content": []}})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        chunk = max(1, round(config.tokens_per_second / 20))  # ~20 deltas per second
+        for i in range(0, len(tokens), chunk):
+            time.sleep(len(tokens[i:i + chunk]) / config.tokens_per_second)
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": "".join(tokens[i:i + chunk])}})
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": output_tokens}})
+        event("message_stop", {})
+
+    # -------------------------------------------------------------------------
+    # Amazon SP-API
+    # -------------------------------------------------------------------------
+
+    def _sp_api(self, method: str, path: str, query: dict) -> None:
+        config = self.server.config
+        body = self._body()
+        self._count("sp_api")
+        time.sleep(config.sp_api_latency)
+
+        if path.startswith("/_documents/"):
+            report = self.server.reports.get(path.rsplit("/", 1)[-1])
+            if not report:
+                return self._send(404, {"errors": [{"code": "NotFound"}]})
+            return self._send(200, _orders_report(report[1], report[2], config), "application/octet-stream")
+
+        if self.server.rng.random() < config.throttle_rate:
+            self._count("sp_api_throttled")
+            return self._send(429, {"errors": [{"code": "QuotaExceeded", "message": "You exceeded your quota"}]})
+
+        if path == "/orders/v0/orders":
+            start = int(query.get("NextToken") or 0)
+            orders = _orders_between(_parse_time(query["CreatedAfter"]), _parse_time(query["CreatedBefore"]), config)
+            if query.get("OrderStatuses"):
+                orders = [o for o in orders if o["status"] in query["OrderStatuses"].split(",")]
+            page = orders[start:start + ORDERS_PAGE_SIZE]
+            payload = {"Orders": [_order_resource(o) for o in page], "CreatedBefore": query["CreatedBefore"]}
+            if start + ORDERS_PAGE_SIZE < len(orders):
+                payload["NextToken"] = str(start + ORDERS_PAGE_SIZE)
+            return self._send(200, {"payload": payload})
+
+        if method == "POST" and path == f"{REPORTS_API}/reports":
+            request = json.loads(body or b"{}")
+            report_id = self.server.reports.create(request["dataStartTime"], request["dataEndTime"])
+            return self._send(202, {"reportId": report_id})
+
+        if path.startswith(f"{REPORTS_API}/reports/"):
+            report_id = path.rsplit("/", 1)[-1]
+            report = self.server.reports.get(report_id)
+            if not report:
+                return self._send(404, {"errors": [{"code": "NotFound"}]})
+            done = time.time() - report[0] >= config.report_seconds
+            status = {"reportId": report_id, "processingStatus": "DONE" if done else "IN_PROGRESS"}
+            if done:
+                status["reportDocumentId"] = f"amzn1.spdoc.{report_id}"
+            return self._send(200, status)
+
+        if path.startswith(f"{REPORTS_API}/documents/"):
+            report_id = path.rsplit(".", 1)[-1]
+            return self._send(200, {
+                "reportDocumentId": f"amzn1.spdoc.{report_id}", "compressionAlgorithm": "GZIP",
+                "url": f"http://{self.headers.get('Host')}/_documents/{report_id}",
+            })
+
+        self._send(404, {"errors": [{"code": "NotFound", "message": f"{method} {path}"}]})
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the stand-in config and state."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: StandInConfig):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.reports = _Reports()
+        self.rng = random.Random(config.seed)
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Environment pointing the backend at this server instead of the real APIs."""
+        return {
+            "ANTHROPIC_BASE_URL": self.url,
+            "ANTHROPIC_API_KEY": "stand-in",
+            "AMAZON_LWA_TOKEN_URL": f"{self.url}/auth/o2/token",
+            "AMAZON_SP_API_BASE": self.url,
+            "AMAZON_LWA_CLIENT_ID": "stand-in",
+            "AMAZON_LWA_CLIENT_SECRET": "stand-in",
+            "AMAZON_LWA_REFRESH_TOKEN": "stand-in",
+            "AMAZON_REPORT_POLL_INTERVAL": str(max(0.1, self.config.report_seconds / 5)),
+        }
+
+
+def start_stand_ins(config: Optional[StandInConfig] = None, host: str = "127.0.0.1", port: int = 0) -> StandInServer:
+    """Start the stand-in server on a daemon thread (port 0 picks a free port)."""
+    server = StandInServer((host, port), config or StandInConfig())
+    threading.Thread(target=server.serve_forever, name="stand-ins", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local Anthropic and Amazon SP-API stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--ttft", type=float, default=StandInConfig.ttft, help="Anthropic seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=StandInConfig.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=StandInConfig.output_tokens)
+    parser.add_argument("--sp-api-latency", type=float, default=StandInConfig.sp_api_latency)
+    parser.add_argument("--report-seconds", type=float, default=StandInConfig.report_seconds)
+    parser.add_argument("--amazon-orders-per-day", type=int, default=StandInConfig.amazon_orders_per_day)
+    parser.add_argument("--throttle-rate", type=float, default=StandInConfig.throttle_rate, help="Share of SP-API calls answered 429")
+    parser.add_argument("--seed", type=int, default=StandInConfig.seed)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        ttft=args.ttft, tokens_per_second=args.tokens_per_second, output_tokens=args.output_tokens,
+        sp_api_latency=args.sp_api_latency, report_seconds=args.report_seconds,
+        amazon_orders_per_day=args.amazon_orders_per_day, throttle_rate=args.throttle_rate, seed=args.seed,
+    )
+    server = StandInServer((args.host, args.port), config)
+    print(f"Stand-ins listening on {server.url}; backend environment:")
+    for key, value in server.env().items():
+        print(f"  {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
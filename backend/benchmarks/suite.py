@@ -0,0 +1,280 @@
+"""
+Backend service benchmark suite.
+
+Times the heavy service functions at several data volumes (1x, 10x and 100x
+the current connectors/data by default) against scaled fixture datasets
+(see benchmarks/fixtures.py), and compares the results with a stored
+baseline.
+
+Each scale runs in its own process with CONNECTORS_DATA_DIR pointed at the
+fixture, the shared cache off, and the clock frozen at the fixture's
+"as of" time, so runs are reproducible. Every timed call starts from a
+cleared cache - these are cold (first-request) costs.
+
+Usage (from backend/):
+    python -m benchmarks.suite                      # run and compare with baseline.json
+    python -m benchmarks.suite --save-baseline      # run and store as the new baseline
+    python -m benchmarks.suite --scales 1,10 --repeat 3 --only budget_recommendations
+    python -m benchmarks.suite --threshold 0.5      # allow +50% before failing
+    python -m benchmarks.suite --synthetic          # generated data (benchmarks/synthetic.py), own baseline
+
+Also measures the cold-start cost of `import main` with `python -X importtime`
+in fresh interpreters (benchmark "import_main").
+
+Exits with status 1 if any benchmark's median is slower than the baseline
+by more than the threshold (default BENCHMARK_THRESHOLD, 25%), or if
+`import main` takes longer than IMPORT_TIME_BUDGET_MS (default 1000 ms).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fixtures import MANIFEST_FILE, SOURCE_DATA_DIR, build_scaled_fixture
+from benchmarks.synthetic import SyntheticConfig, generate
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+SYNTHETIC_BASELINE_FILE = Path(__file__).parent / "baseline_synthetic.json"
+DEFAULT_SCALES = (1, 10, 100)
+BENCHMARK_THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", "0.25"))
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+
+# Modules whose datetime.now() follows the frozen clock
+CLOCK_MODULE_PREFIXES = ("services.", "routers.")
+
+
+def _benchmarks() -> dict:
+    """Benchmarks by name (imported here: only worker processes load the services)."""
+    from services import data_loader, multi_signal, funnel_impact, campaign_matcher, changelog, chat_history
+    from services.ai_synthesis import build_synthesis_context
+
+    def chat_store():
+        session = chat_history.create_session()
+        messages = [{"role": "user", "content": "How did Meta do this week?"}, {"role": "assistant", "content": "..."}]
+        chat_history.update_session(session["id"], messages)
+        chat_history.get_all_sessions()
+        chat_history.get_session(session["id"])
+
+    def changelog_store():
+        changelog.add_entry("spend_increase", "Benchmark entry", channel="Meta Ads", amount=10.0)
+        changelog.get_recent_entries(days=30)
+        changelog.get_entries_summary()
+
+    return {
+        "historical_metrics_30d": lambda: data_loader.get_historical_metrics_for_timeframe(30),
+        "spend_outcome_correlation": lambda: data_loader.get_spend_outcome_correlation(14),
+        "budget_recommendations": lambda: data_loader.get_budget_recommendations(7),
+        "multi_signal_view_meta": lambda: multi_signal.get_multi_signal_campaign_view("facebook", days=30),
+        "multi_signal_view_google": lambda: multi_signal.get_multi_signal_campaign_view("google", days=30),
+        "all_change_impacts": lambda: funnel_impact.get_all_change_impacts(30),
+        "build_synthesis_context": lambda: build_synthesis_context(30),
+        "search_campaigns": lambda: campaign_matcher.search_campaigns("retention past customers"),
+        "chat_store": chat_store,
+        "changelog_store": changelog_store,
+    }
+
+
+def freeze_clock(as_of: datetime) -> None:
+    """Make datetime.now() in the services return the fixture's as-of time."""
+    from services.data_loader import EST
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            frozen = as_of.replace(tzinfo=EST)
+            return frozen.astimezone(tz) if tz else frozen.replace(tzinfo=None)
+
+        @classmethod
+        def today(cls):
+            return cls.now()
+
+    for name, module in list(sys.modules.items()):
+        if name.startswith(CLOCK_MODULE_PREFIXES) and getattr(module, "datetime", None) is datetime:
+            module.datetime = FrozenDatetime
+
+
+def run_worker(data_dir: Path, repeat: int, only: list[str]) -> dict:
+    """Run the benchmarks in this process against data_dir (CONNECTORS_DATA_DIR must already point there)."""
+    from services.data_loader import clear_cache
+
+    manifest = json.loads((data_dir / MANIFEST_FILE).read_text())
+    benchmarks = _benchmarks()
+    if manifest.get("as_of"):
+        freeze_clock(datetime.fromisoformat(manifest["as_of"]))
+
+    results = {}
+    for name, func in benchmarks.items():
+        if only and name not in only:
+            continue
+        timings = []
+        try:
+            for _ in range(repeat):
+                clear_cache()
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "min_ms": round(min(timings), 3),
+            "runs": len(timings),
+        }
+    return results
+
+
+def run_scale(scale: int, repeat: int, only: list[str], source: Path, synthetic: Optional[SyntheticConfig] = None) -> dict:
+    """Build the fixture for a scale (scaled copy of source, or generated) and run the benchmarks on it in a fresh process."""
+    with tempfile.TemporaryDirectory(prefix=f"tuffwraps-bench-{scale}x-") as tmp:
+        data_dir = Path(tmp) / "data"
+        if synthetic:
+            generate(data_dir, synthetic.scaled(scale))
+        else:
+            build_scaled_fixture(scale, data_dir, source)
+        env = {
+            **os.environ,
+            "CONNECTORS_DATA_DIR": str(data_dir),
+            "SHARED_CACHE": "off",
+            "PERF_SAMPLE_RATE": "0",
+        }
+        cmd = [sys.executable, "-m", "benchmarks.suite", "--worker", str(data_dir), "--repeat", str(repeat)]
+        if only:
+            cmd += ["--only", ",".join(only)]
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{scale}x worker failed:\n{proc.stderr[-2000:]}")
+        # The services print progress lines; the results are the last line
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_import_time(repeat: int) -> dict:
+    """Time `import main` in fresh interpreters with -X importtime; also lists the heaviest top-level imports."""
+    timings, direct = [], {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+            env={**os.environ, "SHARED_CACHE": "off"},
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+        # Lines are "import time: self_us | cumulative_us | <indent>module"; main's direct imports have a two-space indent
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2][1:]
+            if name == "main":
+                timings.append(int(parts[1]) / 1000)
+            elif name.startswith("  ") and not name.startswith("   "):
+                direct[name.strip()] = int(parts[1]) / 1000
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "runs": len(timings),
+        "heaviest": dict(sorted(direct.items(), key=lambda kv: -kv[1])[:5]),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print results against the baseline; returns the regressed benchmark keys."""
+    regressions = []
+    print(f"{'Benchmark':<28}{'Scale':>6}{'median ms':>12}{'min ms':>10}{'baseline':>11}{'change':>9}")
+    print("-" * 76)
+    for scale, benchmarks in results.items():
+        for name, r in benchmarks.items():
+            key = f"{name}@{scale}x"
+            if "error" in r:
+                print(f"{name:<28}{scale + 'x':>6}  ERROR {r['error']}")
+                continue
+            base = baseline.get(key)
+            change = ""
+            if base:
+                ratio = r["median_ms"] / base - 1
+                change = f"{ratio:+.0%}"
+                if ratio > threshold:
+                    change += " !"
+                    regressions.append(key)
+            print(
+                f"{name:<28}{scale + 'x':>6}{r['median_ms']:>12.2f}{r['min_ms']:>10.2f}"
+                f"{(f'{base:.2f}' if base else '-'):>11}{change:>9}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend services at several data volumes")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="Comma-separated volume multipliers")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed cold calls per benchmark")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names")
+    parser.add_argument("--source", type=Path, default=SOURCE_DATA_DIR, help="Data tree to scale")
+    parser.add_argument("--synthetic", action="store_true", help="Benchmark generated data instead of scaling --source")
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed, help="Seed for --synthetic data")
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default baseline.json, or baseline_synthetic.json with --synthetic)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_THRESHOLD, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    only = [name for name in args.only.split(",") if name]
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeat, only)))
+        return
+
+    baseline_file = args.baseline or (SYNTHETIC_BASELINE_FILE if args.synthetic else BASELINE_FILE)
+    # Fixed end date so generated data and the frozen clock are the same on every run
+    synthetic = SyntheticConfig(seed=args.seed, end=datetime(2026, 1, 30).date()) if args.synthetic else None
+
+    results = {}
+    # --only import_main skips the data-volume runs
+    scales = [] if only == ["import_main"] else [int(s) for s in args.scales.split(",")]
+    for scale in scales:
+        print(f"Running {scale}x{' synthetic' if synthetic else ''}...")
+        results[str(scale)] = run_scale(scale, args.repeat, only, args.source, synthetic)
+
+    baseline = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    print()
+    regressions = compare(results, baseline, args.threshold)
+
+    import_time = {}
+    if not only or "import_main" in only:
+        import_time = measure_import_time(args.repeat)
+        if "error" in import_time:
+            print(f"\nimport main: ERROR {import_time['error']}")
+        else:
+            heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in import_time["heaviest"].items())
+            print(f"\nimport main: {import_time['median_ms']:.0f} ms median (budget {IMPORT_TIME_BUDGET_MS:.0f} ms); heaviest: {heaviest}")
+            base = baseline.get("import_main")
+            if base and import_time["median_ms"] / base - 1 > args.threshold:
+                regressions.append("import_main")
+            if import_time["median_ms"] > IMPORT_TIME_BUDGET_MS:
+                regressions.append("import_main (budget)")
+
+    if args.save_baseline:
+        for scale, benchmarks in results.items():
+            for name, r in benchmarks.items():
+                if "median_ms" in r:
+                    baseline[f"{name}@{scale}x"] = r["median_ms"]
+        if "median_ms" in import_time:
+            baseline["import_main"] = import_time["median_ms"]
+        baseline_file.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"\nSaved baseline to {baseline_file}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1084 @@
+"""
+Synthetic connectors/data generator.
+
+Writes a complete data tree in the same file schemas the connectors produce
+and the backend reads, at any size: Kendall historical metrics, attribution,
+ads reports and adsets; Google/Meta daily campaign rows; GSC daily trend and
+queries; GA4; Amazon orders and daily sales; Shopify orders, metrics and
+product costs; ShipStation shipments and costs; the aggregated CAM report;
+and the changelog, AI recommendations and chat history stores.
+
+Output is reproducible for a given seed and end date. Outcomes follow spend:
+- Each campaign has a budget that steps up/down over time (every step is
+  logged in the changelog, like Action Board changes)
+- Attributed sales are spend x a per-campaign true ROAS; platforms
+  over-report that by a per-campaign factor
+- Meta top-of-funnel spend lifts organic sales, branded search and Amazon
+  orders 1-3 days later (the halo the funnel analytics look for)
+- Weekday and yearly seasonality, plus noise, on everything
+
+Usage (from backend/):
+    python -m benchmarks.synthetic /tmp/synthetic-data --days 365 --campaigns 40 --seed 7
+    CONNECTORS_DATA_DIR=/tmp/synthetic-data python -m uvicorn main:app
+"""
+
+import argparse
+import json
+import math
+import random
+import shutil
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from benchmarks.fixtures import MANIFEST_FILE
+
+WEEKDAY_FACTOR = (1.0, 0.97, 0.95, 0.98, 1.03, 1.10, 1.08)  # Mon..Sun
+HALO_LAGS = {1: 0.5, 2: 0.3, 3: 0.2}  # Share of the halo from TOF spend N days earlier
+DETAIL_DAYS = 30    # Days simulated (and written) per campaign
+CHANGE_DAYS = 90    # Days with budget changes (and changelog entries)
+
+EST = ZoneInfo("America/New_York")
+
+PRODUCTS = ("Lifting Straps", "Wrist Wraps", "Knee Sleeves", "Elbow Sleeves", "Lifting Belts", "Hand Grips", "Figure 8 Straps")
+GOOGLE_TEMPLATES = (
+    ("Shopping | {product} | USA", "SHOPPING"),
+    ("PMax | {product} - tROAS", "PERFORMANCE_MAX"),
+    ("Search | Non-Brand | {product}", "SEARCH"),
+    ("Branded Search - TuffWraps {n}", "SEARCH"),
+)
+META_TEMPLATES = (
+    ("TOF Prospecting - {product}", "OUTCOME_SALES", "tof"),
+    ("TOF Testing - CBO - {product}", "OUTCOME_SALES", "tof"),
+    ("Retargeting - {product} Viewers", "OUTCOME_SALES", "mof"),
+    ("Retention - Past Customers {n}", "OUTCOME_SALES", "bof"),
+)
+ADSET_NAMES = ("Broad", "Lookalike 1%", "Interest - Powerlifting", "Interest - CrossFit", "Catalog - DPA", "Advantage+ Audience")
+ORGANIC_SOURCES = ("Direct", "www.google.com", "auth.govx.com", "duckduckgo.com", "www.bing.com")
+OTHER_SOURCES = ("Klaviyo", "linktree", "shop_app", "chatgpt.com", "refersion")
+BRANDED_QUERIES = ("tuffwraps", "tuff wraps", "tuff wraps uk", "tuff wraps knee sleeves", "tuff wraps discount code", "tuffwraps wrist wraps")
+NONBRANDED_WORDS = ("wrist wraps", "lifting straps", "knee sleeves", "powerlifting", "gym", "elbow sleeves", "lifting belt",
+                    "best", "for deadlift", "for bench", "7mm", "heavy duty", "women", "men", "cheap", "stiff", "review")
+US_STATES = ("CA", "TX", "FL", "NY", "NC", "OH", "PA", "IL", "GA", "WA")
+
+HISTORICAL_FIELDS = {
+    "gross": "Gross Sales", "net": "Net Sales", "sales": "Sales", "nc_sales": "New Customer Sales",
+    "rc_sales": "Returning Customer Sales", "disc": "Discounts", "refunds": "Refunds", "ship": "Shipping", "tax": "Tax",
+    "cogs": "COGS", "spend": "Total Ad Spend", "fb_spend": "Facebook Ad Spend", "g_spend": "Google Ad Spend",
+    "amz_spend": "Amazon Ad Spend", "fulfill": "Fulfillment & Postage", "payment": "Payment Processing",
+    "gp": "Gross Profit", "gm": "Gross Margin %", "contrib_margin": "Contribution Margin",
+    "contrib_margin_pct": "Contribution Margin %", "contrib_after_mkt": "Contribution Margin After Marketing",
+    "contrib_after_mkt_pct": "Contribution Margin After Marketing %", "orders": "Orders",
+    "nc_orders": "New Customer Orders", "rc_orders": "Returning Customer Orders", "mer": "Blended ROAS (MER)",
+    "nc_mer": "New Customer MER", "ncac": "New Customer Acquisition Cost", "aov": "Average Order Value",
+    "sessions": "Sessions", "ad_sessions": "Sessions from Ads", "amz_us_sales": "Amazon US Sales",
+}
+ADS_REPORT_FIELDS = {
+    "c_id": "Campaign ID", "c_name": "Campaign Name", "as_id": "Ad Set ID", "as_name": "Ad Set Name", "lvl": "Level",
+    "spend": "Spend", "plat_sales": "Platform-reported Sales", "plat_orders": "Platform-reported Orders",
+    "clicks": "Clicks", "impr": "Impressions", "ctr": "CTR", "cpc": "CPC", "cpm": "CPM",
+    "plat_roas": "Platform-reported ROAS", "sales": "Sales (Kendall)", "orders": "Orders (Kendall)",
+    "nc_sales": "New Customer Sales", "nc_orders": "New Customer Orders", "roas": "ROAS (Kendall)", "nc_roas": "NC ROAS",
+    "aov": "AOV", "nc_aov": "NC AOV", "cpa": "CPA", "nc_cpa": "NC CPA", "sub_pct": "Subscription %",
+    "nc_sub_pct": "NC Subscription %", "sessions": "Sessions", "bounce": "Bounce Rate", "atc_rate": "Add to Cart %",
+    "co_rate": "Checkout %", "order_rate": "Order %",
+}
+ATTRIBUTION_FIELDS = {
+    "src": "Source", "breakdown": "Campaign/Referrer", "orders": "Orders", "sales": "Sales",
+    "nc_orders": "New Customer Orders", "nc_sales": "New Customer Sales", "rc_orders": "Returning Customer Orders",
+    "rc_sales": "Returning Customer Sales", "nc_pct": "New Customer %", "subs": "Subscriptions",
+    "nc_subs": "New Customer Subscriptions", "sub_pct": "Subscription %", "nc_sub_pct": "NC Subscription %",
+    "roas": "ROAS", "nc_roas": "NC ROAS",
+}
+
+
+@dataclass
+class SyntheticConfig:
+    """Size and shape of a generated data tree."""
+    days: int = 60
+    campaigns: int = 12           # Google + Meta campaigns (about 40% Google)
+    adsets: int = 3               # Ad sets per Meta campaign
+    orders_per_day: int = 100     # Average Shopify store orders per day
+    queries: int = 500            # GSC top queries
+    chat_sessions: int = 5
+    seed: int = 42
+    end: date = field(default_factory=lambda: date.today() - timedelta(days=1))  # Last full day of data
+
+    def scaled(self, scale: int) -> "SyntheticConfig":
+        """This config with scale x the days, campaigns and orders."""
+        return SyntheticConfig(
+            days=self.days * scale, campaigns=self.campaigns * scale, adsets=self.adsets,
+            orders_per_day=self.orders_per_day * scale, queries=self.queries, chat_sessions=self.chat_sessions * scale,
+            seed=self.seed, end=self.end,
+        )
+
+
+@dataclass
+class Campaign:
+    platform: str                 # "google" or "facebook"
+    id: str
+    name: str
+    kind: str                     # Google channel type or Meta funnel stage
+    objective: str
+    base_budget: float
+    true_roas: float              # Kendall-attributed sales per $ spend
+    overclaim: float              # Platform-reported / Kendall-attributed
+    nc_share: float
+    cpm: float
+    ctr: float
+    budget: float = 0.0                           # Current daily budget
+    days: list = field(default_factory=list)      # Daily metrics over the last DETAIL_DAYS
+    adsets: list = field(default_factory=list)    # (adset_id, name, share of campaign)
+
+    @property
+    def is_tof(self) -> bool:
+        return self.kind == "tof"
+
+    @property
+    def label(self) -> str:
+        """Kendall attribution breakdown key."""
+        return f"{self.name} (ID: {self.id})"
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _noise(rng: random.Random, sigma: float = 0.1) -> float:
+    """Multiplicative noise centred on 1."""
+    return math.exp(rng.gauss(0, sigma) - sigma * sigma / 2)
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _div(a: float, b: float) -> float:
+    return a / b if b else 0
+
+
+def _season(day: date) -> float:
+    """Yearly seasonality: New Year's resolution peak, Black Friday/December peak."""
+    doy = day.timetuple().tm_yday
+    return 1 + 0.12 * math.cos(2 * math.pi * (doy - 10) / 365) + (0.25 if (day.month == 11 and day.day >= 24) else 0)
+
+
+def _write(root: Path, relative: str, data) -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=1), encoding="utf-8")
+
+
+def _sum_metrics(days) -> dict:
+    """Key-by-key totals of daily metric dicts."""
+    totals = {}
+    for day in days:
+        for key, value in day.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+def _make_campaigns(config: SyntheticConfig, rng: random.Random) -> list[Campaign]:
+    n_google = max(1, round(config.campaigns * 0.4))
+    n_meta = max(1, config.campaigns - n_google)
+    campaigns = []
+
+    for i in range(n_google):
+        template, channel_type = GOOGLE_TEMPLATES[i % len(GOOGLE_TEMPLATES)]
+        product = PRODUCTS[(i // len(GOOGLE_TEMPLATES)) % len(PRODUCTS)]
+        name = template.format(product=product, n=i + 1)
+        if i >= len(GOOGLE_TEMPLATES) * len(PRODUCTS):
+            name += f" {i + 1}"
+        campaigns.append(Campaign(
+            platform="google", id=str(21000000000 + rng.randrange(10**9)), name=name, kind=channel_type,
+            objective=channel_type, base_budget=math.exp(rng.gauss(math.log(120), 0.6)),
+            true_roas=rng.uniform(1.6, 3.4) if "Brand" not in name else rng.uniform(4, 8),
+            overclaim=rng.uniform(1.6, 2.2), nc_share=rng.uniform(0.6, 0.8),
+            cpm=rng.uniform(8, 16), ctr=rng.uniform(0.006, 0.02),
+        ))
+
+    for i in range(n_meta):
+        template, objective, stage = META_TEMPLATES[i % len(META_TEMPLATES)]
+        product = PRODUCTS[(i // len(META_TEMPLATES)) % len(PRODUCTS)]
+        name = template.format(product=product, n=i + 1)
+        if i >= len(META_TEMPLATES) * len(PRODUCTS):
+            name += f" {i + 1}"
+        roas = {"tof": (1.0, 2.0), "mof": (2.0, 3.5), "bof": (3.0, 5.0)}[stage]
+        campaign = Campaign(
+            platform="facebook", id=str(6500000000000 + rng.randrange(10**12)), name=name, kind=stage,
+            objective=objective, base_budget=math.exp(rng.gauss(math.log(180 if stage == "tof" else 60), 0.5)),
+            true_roas=rng.uniform(*roas), overclaim=rng.uniform(1.4, 2.0),
+            nc_share={"tof": 0.85, "mof": 0.5, "bof": 0.1}[stage] * _noise(rng, 0.05),
+            cpm=rng.uniform(5, 12), ctr=rng.uniform(0.008, 0.015),
+        )
+        shares = [rng.uniform(0.5, 1.5) for _ in range(config.adsets)]
+        campaign.adsets = [
+            (str(int(campaign.id) + 400000000 + k * 1000 + rng.randrange(1000)),
+             f"{ADSET_NAMES[k % len(ADSET_NAMES)]} - {product}" + (f" {k + 1}" if k >= len(ADSET_NAMES) else ""),
+             s / sum(shares))
+            for k, s in enumerate(shares)
+        ]
+        campaigns.append(campaign)
+    return campaigns
+
+
+def _plan_budgets(campaign: Campaign, n_days: int, rng: random.Random) -> list[tuple[int, float, float]]:
+    """Step changes to a campaign's budget over the last CHANGE_DAYS; returns (day, old, new) changes."""
+    budget = campaign.base_budget
+    changes = []
+    d = max(0, n_days - CHANGE_DAYS) + rng.randint(0, 20)
+    while d < n_days:
+        step = rng.choice((-0.3, -0.2, -0.1, 0.1, 0.15, 0.2, 0.25, 0.3))
+        new_budget = max(10.0, budget * (1 + step))
+        changes.append((d, budget, new_budget))
+        budget = new_budget
+        d += rng.randint(10, 30)
+    return changes
+
+
+def _simulate_day(params: Campaign, budget: float, day: date, rng: random.Random) -> dict:
+    """One day of metrics for a campaign (or a whole group of campaigns, with summed budgets)."""
+    spend = budget * WEEKDAY_FACTOR[day.weekday()] * _noise(rng, 0.12)
+    impressions = int(spend / params.cpm * 1000 * _noise(rng, 0.05))
+    clicks = max(1, int(impressions * params.ctr * _noise(rng, 0.1)))
+    # Diminishing returns: ROAS falls as budget rises above the starting budget
+    saturation = (params.base_budget / budget) ** 0.25
+    sales = spend * params.true_roas * saturation * _season(day) * _noise(rng, 0.25)
+    aov = 60 * _noise(rng, 0.08)
+    orders = _poisson(rng, sales / aov)
+    sales = orders * aov
+    nc_orders = min(orders, _poisson(rng, orders * params.nc_share))
+    plat_sales = sales * params.overclaim * _noise(rng, 0.1)
+    return {
+        "spend": spend, "impressions": impressions, "clicks": clicks, "reach": int(impressions * 0.62),
+        "sales": sales, "orders": orders, "nc_orders": nc_orders, "nc_sales": nc_orders * aov * 0.95,
+        "plat_sales": plat_sales, "plat_orders": plat_sales / aov, "sessions": int(clicks * 0.85),
+    }
+
+
+def _group_params(campaigns: list[Campaign]) -> Campaign:
+    """Budget-weighted average of a campaign group, simulated as one campaign before the detail window."""
+    total = sum(c.base_budget for c in campaigns)
+
+    def avg(attr):
+        return sum(getattr(c, attr) * c.base_budget for c in campaigns) / total
+
+    first = campaigns[0]
+    return Campaign(
+        platform=first.platform, id="", name="", kind=first.kind, objective=first.objective, base_budget=total,
+        true_roas=avg("true_roas"), overclaim=avg("overclaim"), nc_share=avg("nc_share"), cpm=avg("cpm"), ctr=avg("ctr"),
+    )
+
+
+class SyntheticData:
+    """The simulated store: campaigns plus store-wide daily totals.
+
+    Campaigns are simulated one by one over the last DETAIL_DAYS (the most any
+    campaign-level file covers); earlier days are simulated per campaign group
+    (Google, Meta TOF, other Meta), so cost grows with days + campaigns rather
+    than days x campaigns.
+    """
+
+    def __init__(self, config: SyntheticConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.dates = [config.end - timedelta(days=config.days - 1 - d) for d in range(config.days)]
+        self.detail_start = max(0, config.days - DETAIL_DAYS)
+        self.campaigns = _make_campaigns(config, self.rng)
+        self.changes = []  # (day index, campaign, old budget, new budget)
+        for campaign in self.campaigns:
+            campaign.budget = campaign.base_budget
+            for d, old, new in _plan_budgets(campaign, config.days, self.rng):
+                self.changes.append((d, campaign, old, new))
+                campaign.budget = new
+        self.changes.sort(key=lambda c: c[0])
+        self.daily = []
+        self._simulate()
+
+    def _budgets(self, campaign: Campaign) -> list[float]:
+        """The campaign's daily budget from detail_start on."""
+        steps = {d: new for d, c, _, new in self.changes if c is campaign}
+        budget, budgets = campaign.base_budget, []
+        for d in range(len(self.dates)):
+            budget = steps.get(d, budget)
+            if d >= self.detail_start:
+                budgets.append(budget)
+        return budgets
+
+    def _group_budgets(self, campaigns: list[Campaign]) -> list[float]:
+        """Summed daily budget of a campaign group for the days before detail_start."""
+        members = set(map(id, campaigns))
+        delta = [0.0] * (self.detail_start + 1)
+        for d, c, old, new in self.changes:
+            if id(c) in members and d < self.detail_start:
+                delta[d] += new - old
+        budget, budgets = sum(c.base_budget for c in campaigns), []
+        for d in range(self.detail_start):
+            budget += delta[d]
+            budgets.append(budget)
+        return budgets
+
+    def _simulate(self) -> None:
+        rng = self.rng
+        groups = {
+            "google": [c for c in self.campaigns if c.platform == "google"],
+            "meta_tof": [c for c in self.campaigns if c.platform == "facebook" and c.is_tof],
+            "meta": [c for c in self.campaigns if c.platform == "facebook" and not c.is_tof],
+        }
+        group_days = {}
+        for group, campaigns in groups.items():
+            days = [{} for _ in self.dates]
+            if campaigns:
+                params = _group_params(campaigns)
+                for d, budget in enumerate(self._group_budgets(campaigns)):
+                    days[d] = _simulate_day(params, budget, self.dates[d], rng)
+            group_days[group] = days
+
+        for campaign in self.campaigns:
+            for d, budget in enumerate(self._budgets(campaign), start=self.detail_start):
+                campaign.days.append(_simulate_day(campaign, budget, self.dates[d], rng))
+        for group, campaigns in groups.items():
+            for d in range(self.detail_start, len(self.dates)):
+                group_days[group][d] = _sum_metrics(c.days[d - self.detail_start] for c in campaigns)
+
+        # Organic demand covers what paid doesn't reach of the target order volume
+        paid_orders = sum(day.get("orders", 0) for days in group_days.values() for day in days) / len(self.dates)
+        organic_base = max(self.config.orders_per_day - paid_orders, self.config.orders_per_day * 0.3)
+
+        tof_spend = [day.get("spend", 0) for day in group_days["meta_tof"]]
+        for d, day in enumerate(self.dates):
+            halo = sum(w * tof_spend[d - lag] for lag, w in HALO_LAGS.items() if d - lag >= 0)
+            weekday = WEEKDAY_FACTOR[day.weekday()]
+            organic_orders = _poisson(rng, (organic_base * weekday * _season(day) + halo * 0.012))
+            klaviyo_orders = _poisson(rng, organic_orders * 0.12)
+            google = group_days["google"][d]
+            meta = _sum_metrics((group_days["meta_tof"][d], group_days["meta"][d]))
+            totals = {
+                "halo": halo,
+                "tof_spend": tof_spend[d],
+                "organic_orders": organic_orders,
+                "organic_sales": organic_orders * 66 * _noise(rng, 0.05),
+                "klaviyo_orders": klaviyo_orders,
+                "klaviyo_sales": klaviyo_orders * 68 * _noise(rng, 0.05),
+                "ad_sessions": google.get("sessions", 0) + meta.get("sessions", 0),
+                "amazon_orders": _poisson(rng, self.config.orders_per_day * 0.3 * weekday + halo * 0.004),
+                "branded_clicks": _poisson(rng, 40 + self.config.orders_per_day * 0.5 + halo * 0.05),
+            }
+            for prefix, metrics in (("google", google), ("meta", meta)):
+                for key in ("spend", "sales", "orders", "nc_orders", "plat_sales", "clicks"):
+                    totals[f"{prefix}_{key}"] = metrics.get(key, 0)
+            self.daily.append(totals)
+
+    def window(self, days: int) -> tuple[int, int]:
+        """Day index range [start, end) of the last N days."""
+        return max(0, len(self.dates) - days), len(self.dates)
+
+    def campaign_totals(self, campaign: Campaign, days: int) -> dict:
+        """A campaign's summed metrics over the last N days (at most DETAIL_DAYS)."""
+        return _sum_metrics(campaign.days[-days:])
+
+
+# =============================================================================
+# FILE WRITERS
+# =============================================================================
+
+def _period(data: SyntheticData, days: int) -> dict:
+    start, end = data.window(days)
+    return {"start": data.dates[start].isoformat(), "end": (data.dates[end - 1] + timedelta(days=1)).isoformat()}
+
+
+def _historical_metrics(data: SyntheticData) -> dict:
+    rng = data.rng
+    rows = []
+    for d, (day, t) in enumerate(zip(data.dates, data.daily)):
+        paid_orders = t["google_orders"] + t["meta_orders"]
+        orders = t["organic_orders"] + t["klaviyo_orders"] + paid_orders
+        sales = t["organic_sales"] + t["klaviyo_sales"] + t["google_sales"] + t["meta_sales"]
+        nc_orders = t["google_nc_orders"] + t["meta_nc_orders"] + round(t["organic_orders"] * 0.55)
+        nc_sales = sales * _div(nc_orders, orders) * 0.95
+        spend = t["google_spend"] + t["meta_spend"]
+        amazon_spend = t["amazon_orders"] * 4.5 * _noise(rng, 0.1)
+        amazon_sales = t["amazon_orders"] * 27 * _noise(rng, 0.05)
+        cogs = sales * 0.27
+        contrib = sales - cogs - orders * 7.2 - sales * 0.03
+        sessions = int(orders / 0.024 * _noise(rng, 0.05))
+        rows.append({
+            "date": day.isoformat(), "ncac": round(_div(spend, nc_orders), 2), "sales": round(sales, 2),
+            "nc_mer": round(_div(nc_sales, spend), 2), "contrib_margin": round(contrib, 2),
+            "contrib_margin_pct": round(_div(contrib, sales) * 100, 2),
+            "contrib_after_mkt": round(contrib - spend, 2),
+            "contrib_after_mkt_pct": round(_div(contrib - spend, sales) * 100, 2),
+            "mer": round(_div(sales, spend), 2), "spend": round(spend, 2), "nc_cv": round(nc_sales, 2),
+            "rc_cv": round(sales - nc_sales, 2), "orders": orders, "nc_orders": nc_orders,
+            "rc_orders": orders - nc_orders, "disc": round(sales * 0.07, 2), "refunds": round(sales * 0.04, 2),
+            "total_spend_div_total_sales": round(_div(spend, sales) * 100, 2), "aov": round(_div(sales, orders), 2),
+            "nc_aov": round(_div(nc_sales, nc_orders), 2),
+            "rc_aov": round(_div(sales - nc_sales, orders - nc_orders), 2), "gm": 73.0,
+            "facebook_spend": round(t["meta_spend"], 2), "google_spend": round(t["google_spend"], 2),
+            "facebook_cta_7d_sales": round(t["meta_plat_sales"], 2),
+            "facebook_cpc": round(_div(t["meta_spend"], t["meta_clicks"]), 2),
+            "sessions": sessions, "checkout_to_purchase_rate": round(rng.uniform(40, 48), 2),
+            "cart_to_checkout_rate": round(rng.uniform(60, 70), 2),
+            "website_conversion_rate": round(_div(orders, sessions) * 100, 2),
+            "cart_conversion_rate": round(rng.uniform(25, 32), 2), "add_to_cart_rate": round(rng.uniform(7, 9), 2),
+            "nc_or": round(nc_sales * 0.22, 2), "facebook_fc": round(t["meta_sales"] * 0.45, 2),
+            "google_fc": round(t["google_sales"] * 0.9, 2), "amz_us_sales": round(amazon_sales, 2),
+            "amazon_na_units": round(t["amazon_orders"] * 1.05), "amazon_na_orders": t["amazon_orders"],
+            "amazon_spend": round(amazon_spend, 2), "amazon_sales": round(amazon_sales * 0.45, 2),
+        })
+    return {
+        "_fields": HISTORICAL_FIELDS, "store_id": 1126, "store_name": "tuffwraps-com.myshopify.com",
+        "period": _period(data, len(data.dates)), "interval": "day", "metrics": rows,
+    }
+
+
+def _report_row(totals: dict) -> dict:
+    """Kendall ads-report metrics from summed daily campaign metrics."""
+    spend, sales, orders = totals.get("spend", 0), totals.get("sales", 0), totals.get("orders", 0)
+    nc_orders, nc_sales = totals.get("nc_orders", 0), totals.get("nc_sales", 0)
+    clicks, impressions = totals.get("clicks", 0), totals.get("impressions", 0)
+    return {
+        "spend": round(spend, 2), "plat_sales": round(totals.get("plat_sales", 0), 2),
+        "cpc": round(_div(spend, clicks), 2), "plat_orders": round(totals.get("plat_orders", 0), 1),
+        "cpm": round(_div(spend, impressions) * 1000, 2), "ctr": round(_div(clicks, impressions), 2),
+        "plat_roas": round(_div(totals.get("plat_sales", 0), spend), 2), "sales": round(sales, 2),
+        "orders": orders, "nc_orders": nc_orders, "nc_sales": round(nc_sales, 2),
+        "attributed_newcust_percent": round(_div(nc_orders, orders), 2), "aov": round(_div(sales, orders), 2),
+        "nc_aov": round(_div(nc_sales, nc_orders), 2), "cpa": round(_div(spend, orders), 2),
+        "nc_cpa": round(_div(spend, nc_orders), 2), "roas": round(_div(sales, spend), 2),
+        "nc_roas": round(_div(nc_sales, spend), 2), "sub_pct": 0, "nc_sub_pct": 0,
+        "sessions": totals.get("sessions", 0),
+    }
+
+
+def _ads_report(data: SyntheticData, platform: str, days: int) -> dict:
+    totals = {c.id: data.campaign_totals(c, days) for c in data.campaigns if c.platform == platform}
+    camps = {}
+    for c in sorted((c for c in data.campaigns if c.platform == platform), key=lambda c: -totals[c.id]["spend"]):
+        row = {"c_id": c.id, "lvl": "campaign", "c_name": c.name, **_report_row(totals[c.id])}
+        if platform == "facebook":
+            row.update({"bounce": 0.74, "atc_rate": 0.08, "co_rate": 0.03, "order_rate": round(_div(row["orders"], row["sessions"]), 2)})
+        else:
+            row["bounce"] = 0
+        camps[c.id] = row
+    return {
+        "_fields": ADS_REPORT_FIELDS, "camps": camps, **_period(data, days), "platform": platform,
+        "attr_model": "last_click_per_channel", "attr_window": 180,
+        "filters_applied": {"min_spend": 0, "sort_by": "spend", "sort_order": "desc", "limit": 50, "level": "campaign"},
+    }
+
+
+def _adsets_report(data: SyntheticData, days: int) -> dict:
+    adsets = []
+    for c in (c for c in data.campaigns if c.platform == "facebook"):
+        totals = data.campaign_totals(c, days)
+        for adset_id, name, share in c.adsets:
+            row = _report_row({k: v * share for k, v in totals.items()})
+            orders = round(row["orders"])
+            adsets.append({
+                "campaign_id": c.id, "adset_id": adset_id, "level": "adset", "campaign_name": c.name,
+                "adset_name": name, "spend": row["spend"], "sales": row["plat_sales"], "cpc": row["cpc"],
+                "purchases": float(round(row["plat_orders"])), "cpm": row["cpm"], "ctr": row["ctr"],
+                "roas": row["plat_roas"], "attributed_sales": row["sales"], "attributed_orders": orders,
+                "attributed_newcust_orders": round(row["nc_orders"]), "attributed_newcust_sales": row["nc_sales"],
+                "attributed_newcust_percent": row["attributed_newcust_percent"], "attributed_aov": row["aov"],
+                "attributed_newcust_aov": row["nc_aov"], "attributed_cpa": row["cpa"],
+                "attributed_newcust_cpa": row["nc_cpa"], "attributed_roas": row["roas"],
+                "attributed_newcust_roas": row["nc_roas"], "attributed_subscriptions_pct": 0,
+                "attributed_newcust_subscriptions_pct": 0, "sessions": round(row["sessions"]),
+                "session_bounce_rate": 0.72, "session_add_to_cart_rate": 0.09, "session_checkout_rate": 0.03,
+                "session_order_rate": round(_div(orders, row["sessions"]), 2),
+            })
+    adsets.sort(key=lambda a: -a["spend"])
+    return {
+        "_fields": ADS_REPORT_FIELDS, "camps": {"adsets": adsets}, **_period(data, days), "platform": "facebook",
+        "attr_model": "last_click_per_channel", "attr_window": 180,
+        "filters_applied": {"min_spend": 0, "sort_by": "spend", "sort_order": "desc", "limit": 100, "level": "adset"},
+    }
+
+
+def _attribution_entry(orders: int, sales: float, nc_orders: int, nc_sales: float, spend: float = None) -> dict:
+    entry = {
+        "orders": orders, "sales": round(sales, 2), "nc_orders": nc_orders, "nc_sales": round(nc_sales, 2),
+        "rc_orders": orders - nc_orders, "rc_sales": round(sales - nc_sales, 2),
+        "nc_pct": round(_div(nc_orders, orders), 2), "subs": 0, "nc_subs": 0, "sub_pct": 0, "nc_sub_pct": 0,
+    }
+    if spend is not None:
+        entry["roas"] = round(_div(sales, spend), 2)
+        entry["nc_roas"] = round(_div(nc_sales, spend), 2)
+    return entry
+
+
+def _attribution(data: SyntheticData, days: int = 30) -> dict:
+    start, end = data.window(days)
+    result = {
+        "_fields": ATTRIBUTION_FIELDS,
+        "filters_applied": {"min_orders": 0, "limit_per_source": 20, "include_breakdowns": True, "sort_by": "orders"},
+    }
+    for source, platform in (("Google Ads", "google"), ("Meta Ads", "facebook")):
+        breakdowns, total = {}, {"orders": 0, "sales": 0, "nc_orders": 0, "nc_sales": 0, "spend": 0}
+        for c in (c for c in data.campaigns if c.platform == platform):
+            t = data.campaign_totals(c, days)
+            breakdowns[c.label] = _attribution_entry(t["orders"], t["sales"], t["nc_orders"], t["nc_sales"], t["spend"])
+            for key in total:
+                total[key] += t[key]
+        breakdowns = dict(sorted(breakdowns.items(), key=lambda kv: -kv[1]["orders"]))
+        result[source] = {"breakdowns": breakdowns, "total": _attribution_entry(**total)}
+
+    window = data.daily[start:end]
+    organic_orders = sum(t["organic_orders"] for t in window)
+    organic_sales = sum(t["organic_sales"] for t in window)
+    shares = [0.55, 0.25, 0.08, 0.07, 0.05]
+    result["Organic"] = {
+        "breakdowns": {
+            name: _attribution_entry(round(organic_orders * s), organic_sales * s, round(organic_orders * s * 0.56), organic_sales * s * 0.54)
+            for name, s in zip(ORGANIC_SOURCES, shares)
+        },
+        "total": _attribution_entry(organic_orders, organic_sales, round(organic_orders * 0.56), organic_sales * 0.54),
+    }
+    klaviyo_orders = sum(t["klaviyo_orders"] for t in window)
+    klaviyo_sales = sum(t["klaviyo_sales"] for t in window)
+    klaviyo = _attribution_entry(klaviyo_orders, klaviyo_sales, round(klaviyo_orders * 0.5), klaviyo_sales * 0.5)
+    result["Klaviyo"] = {"breakdowns": {"Flows": klaviyo}, "total": klaviyo}
+    for source in OTHER_SOURCES[1:]:
+        orders = max(1, round(klaviyo_orders * data.rng.uniform(0.02, 0.1)))
+        entry = _attribution_entry(orders, orders * 62, orders // 2, orders // 2 * 60)
+        result[source] = {"breakdowns": {"(none)": entry}, "total": entry}
+    return result
+
+
+def _campaign_rows(data: SyntheticData, platform: str) -> list[dict]:
+    rows = []
+    for d, day in enumerate(data.dates[data.detail_start:]):
+        for c in (c for c in data.campaigns if c.platform == platform):
+            m = c.days[d]
+            if platform == "google":
+                rows.append({
+                    "campaign_id": int(c.id), "campaign_name": c.name, "campaign_status": "ENABLED",
+                    "channel_type": c.kind, "date": day.isoformat(), "spend": round(m["spend"], 2),
+                    "impressions": m["impressions"], "clicks": m["clicks"],
+                    "conversions": float(round(m["plat_orders"])), "conversion_value": round(m["plat_sales"], 2),
+                    "ctr": _div(m["clicks"], m["impressions"]), "avg_cpc": _div(m["spend"], m["clicks"]),
+                })
+            else:
+                rows.append({
+                    "campaign_id": c.id, "campaign_name": c.name, "objective": c.objective, "date": day.isoformat(),
+                    "spend": round(m["spend"], 2), "impressions": m["impressions"], "clicks": m["clicks"],
+                    "reach": m["reach"], "cpc": round(_div(m["spend"], m["clicks"]), 6),
+                    "cpm": round(_div(m["spend"], m["impressions"]) * 1000, 6),
+                    "ctr": round(_div(m["clicks"], m["impressions"]) * 100, 6),
+                    "purchases": float(round(m["plat_orders"])), "purchase_value": round(m["plat_sales"], 2),
+                    "roas": _div(m["plat_sales"], m["spend"]),
+                })
+    return rows
+
+
+def _gsc(data: SyntheticData) -> dict:
+    rng = data.rng
+    trend = []
+    for day, t in zip(data.dates, data.daily):
+        branded = t["branded_clicks"]
+        non_branded = _poisson(rng, branded * 2.8)
+        trend.append({
+            "date": day.isoformat(), "branded_clicks": branded, "branded_impressions": round(branded * 1.8 * _noise(rng, 0.1)),
+            "non_branded_clicks": non_branded, "non_branded_impressions": round(non_branded * 34 * _noise(rng, 0.1)),
+        })
+
+    start, end = data.window(30)
+    branded_total = sum(r["branded_clicks"] for r in trend[start:end])
+    non_branded_total = sum(r["non_branded_clicks"] for r in trend[start:end])
+
+    queries = []
+    for i in range(data.config.queries):
+        if i < len(BRANDED_QUERIES):
+            query, clicks = BRANDED_QUERIES[i], round(branded_total * 0.4 / (i + 1))
+            position = rng.uniform(1, 3)
+        else:
+            query = " ".join(rng.sample(NONBRANDED_WORDS, rng.randint(2, 4)))
+            clicks = max(0, round(non_branded_total * 0.1 / (i - len(BRANDED_QUERIES) + 1) * _noise(rng, 0.3)))
+            position = rng.uniform(3, 40)
+        impressions = max(clicks, round(clicks / max(rng.uniform(0.002, 0.5), 0.001)))
+        queries.append({"keys": [query], "clicks": clicks, "impressions": impressions, "ctr": _div(clicks, impressions), "position": position})
+    queries.sort(key=lambda q: -q["clicks"])
+
+    def side(is_branded: bool, clicks: int) -> dict:
+        subset = [
+            {"query": q["keys"][0], **{k: q[k] for k in ("clicks", "impressions", "ctr", "position")}}
+            for q in queries if (q["keys"][0] in BRANDED_QUERIES) == is_branded
+        ][:20]
+        return {"clicks": clicks, "impressions": sum(q["impressions"] for q in subset), "queries": subset}
+
+    total = branded_total + non_branded_total
+    return {
+        "gsc/daily_branded_trend.json": trend,
+        "gsc/top_queries.json": queries,
+        "gsc/branded_vs_nonbranded.json": {
+            "branded": side(True, branded_total), "non_branded": side(False, non_branded_total),
+            "total_clicks": total, "branded_percentage": _div(branded_total, total) * 100,
+        },
+    }
+
+
+def _ga4(data: SyntheticData, historical: list[dict]) -> dict:
+    rng = data.rng
+    daily = [
+        {
+            "date": row["date"], "sessions": row["sessions"], "users": round(row["sessions"] * 0.86),
+            "new_users": round(row["sessions"] * 0.68), "conversions": float(row["orders"]),
+            "revenue": round(row["sales"] * 1.05, 2),
+        }
+        for row in historical
+    ]
+    last30 = daily[-30:]
+    sessions = sum(r["sessions"] for r in last30)
+    conversions = sum(r["conversions"] for r in last30)
+    revenue = sum(r["revenue"] for r in last30)
+
+    source_mix = (("google", "organic", 0.25), ("(direct)", "(none)", 0.2), ("google", "cpc", 0.19), ("facebook", "paid", 0.19),
+                  ("Klaviyo", "email", 0.06), ("linktree", "social", 0.02), ("ig", "paid", 0.02), ("bing", "organic", 0.01))
+    sources = []
+    for source, medium, share in source_mix:
+        s = round(sessions * share)
+        sources.append({
+            "source": source, "medium": medium, "sessions": s, "users": round(s * 0.83), "new_users": round(s * 0.75),
+            "conversions": float(round(conversions * share * rng.uniform(0.6, 1.4))), "revenue": round(revenue * share * rng.uniform(0.6, 1.4), 2),
+        })
+    devices = [
+        {"device": device, "sessions": round(sessions * share), "conversions": float(round(conversions * share)), "revenue": round(revenue * share, 2)}
+        for device, share in (("mobile", 0.73), ("desktop", 0.25), ("tablet", 0.02))
+    ]
+    pages = ["/"] + [f"/collections/{p.lower().replace(' ', '-')}" for p in PRODUCTS] + [f"/products/{p.lower().replace(' ', '-')}-{i}" for p in PRODUCTS for i in range(6)]
+    landing = [
+        {"landing_page": page, "sessions": round(sessions * 0.14 / (i + 1)), "conversions": float(round(conversions * 0.24 / (i + 1))),
+         "revenue": round(revenue * 0.28 / (i + 1), 2), "bounce_rate": rng.uniform(0.2, 0.6)}
+        for i, page in enumerate(pages[:50])
+    ]
+    return {
+        "ga4/daily_traffic.json": daily,
+        "ga4/summary_last_30d.json": {
+            "period": _period(data, 30), "total_sessions": sessions, "total_users": round(sessions * 0.86),
+            "total_conversions": conversions, "total_revenue": revenue, "top_sources": sources[:10], "devices": devices,
+        },
+        "ga4/traffic_sources.json": sources,
+        "ga4/device_breakdown.json": devices,
+        "ga4/landing_pages.json": landing,
+    }
+
+
+def _amazon(data: SyntheticData) -> dict:
+    rng = data.rng
+    orders, days = [], {}
+    for day, t in zip(data.dates, data.daily):
+        sales = 0.0
+        for _ in range(t["amazon_orders"]):
+            purchased = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+            order_id = f"11{rng.randrange(10)}-{rng.randrange(10**7):07d}-{rng.randrange(10**7):07d}"
+            amount = round(rng.choice((14.99, 19.99, 21.39, 24.99, 29.99, 34.99)) * rng.choice((1, 1, 1, 2)), 2)
+            sales += amount
+            ship_by = (purchased + timedelta(days=1)).strftime("%Y-%m-%dT07:59:59Z")
+            orders.append({
+                "BuyerInfo": {"BuyerEmail": f"{rng.randrange(16**12):012x}@marketplace.amazon.com"},
+                "AmazonOrderId": order_id, "EarliestShipDate": ship_by, "SalesChannel": "Amazon.com",
+                "OrderStatus": "Shipped", "NumberOfItemsShipped": 1, "OrderType": "StandardOrder",
+                "IsPremiumOrder": False, "IsPrime": rng.random() < 0.6, "FulfillmentChannel": "AFN",
+                "NumberOfItemsUnshipped": 0, "HasRegulatedItems": False, "IsReplacementOrder": "false",
+                "IsSoldByAB": False, "LatestShipDate": ship_by, "ShipServiceLevel": "Expedited", "IsISPU": False,
+                "MarketplaceId": "ATVPDKIKX0DER", "PurchaseDate": purchased.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "ShippingAddress": {"StateOrRegion": rng.choice(US_STATES), "PostalCode": f"{rng.randrange(10**5):05d}", "City": "SPRINGFIELD", "CountryCode": "US"},
+                "IsAccessPointOrder": False, "SellerOrderId": order_id, "PaymentMethod": "Other",
+                "IsBusinessOrder": False, "OrderTotal": {"CurrencyCode": "USD", "Amount": f"{amount:.2f}"},
+                "PaymentMethodDetails": ["Standard"], "IsGlobalExpressEnabled": False,
+                "LastUpdateDate": (purchased + timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "ShipmentServiceLevelCategory": "Expedited",
+            })
+        days[day.isoformat()] = {"sales": round(sales, 2), "orders": t["amazon_orders"], "units": round(t["amazon_orders"] * 1.05)}
+
+    # The orders pull covers the last 30 days; daily_sales.json has the full history
+    start = data.dates[data.window(30)[0]].isoformat()
+    recent = [o for o in orders if o["PurchaseDate"][:10] >= start]
+    return {
+        "amazon/orders_last_30d.json": recent,
+        "amazon/summary_last_30d.json": {
+            "period": _period(data, 30), "total_orders": len(recent),
+            "total_revenue": sum(float(o["OrderTotal"]["Amount"]) for o in recent), "orders": recent,
+        },
+        "amazon/daily_sales.json": {
+            "days": days, "updated_at": datetime.combine(data.config.end + timedelta(days=1), datetime.min.time()).isoformat(),
+            "source": "GET_FLAT_FILE_ALL_ORDERS_DATA_BY_ORDER_DATE_GENERAL",
+        },
+    }
+
+
+SHIPPING_SERVICES = {  # service code -> (carrier code, average cost, share of shipments)
+    "usps_ground_advantage": ("stamps_com", 6.05, 0.86),
+    "ups_ground": ("ups", 8.5, 0.08),
+    "usps_priority_mail": ("stamps_com", 9.6, 0.03),
+    "ups_2nd_day_air": ("ups", 15.9, 0.01),
+    "fedex_international_connect_plus": ("fedex", 46.1, 0.02),
+}
+
+
+def _split(rng: random.Random, total: float, n: int) -> list[float]:
+    """Split an amount into n random positive parts (to the cent) that add up to it."""
+    weights = [rng.uniform(0.5, 1.5) for _ in range(n)]
+    scale = total / sum(weights)
+    parts = [round(w * scale, 2) for w in weights]
+    parts[-1] = round(total - sum(parts[:-1]), 2)
+    return parts
+
+
+def _shopify_orders(data: SyntheticData, last30: list[dict], variants: dict, skus: dict) -> list[dict]:
+    """Paid orders for the last 30 days in the connector's order schema, matching each day's orders and sales."""
+    # Own generator, so adding orders doesn't change any other generated file
+    rng = random.Random(f"{data.config.seed}:shopify-orders")
+    catalog = list(zip(variants, skus))
+    orders = []
+    order_id = 6100000000000
+    customer_id = 8200000000000
+    for row in last30:
+        day = datetime.strptime(row["date"], "%Y-%m-%d")
+        count = row["orders"]
+        if not count:
+            continue
+        totals = _split(rng, row["sales"], count)
+        new_customers = set(rng.sample(range(count), min(row["nc_orders"], count)))
+        for i, total in enumerate(totals):
+            order_id += 1
+            customer_id += 1
+            created = (day + timedelta(seconds=rng.randrange(86400))).replace(tzinfo=EST)
+            tax = round(total * 0.04, 2)
+            shipping = 0.0 if total >= 50 else 4.99
+            items = rng.choices(catalog, k=rng.choice((1, 1, 1, 2, 2, 3)))
+            line_items = [
+                {"variant_id": int(variant_id), "sku": sku, "quantity": rng.choice((1, 1, 1, 2)), "price": "0.00"}
+                for variant_id, sku in items
+            ]
+            merchandise = max(total - tax - shipping, 0)
+            for item, amount in zip(line_items, _split(rng, merchandise, len(line_items))):
+                item["price"] = f"{amount / item['quantity']:.2f}"
+            customer_since = created if i in new_customers else created - timedelta(days=rng.randint(20, 700))
+            orders.append({
+                "id": order_id,
+                "created_at": created.isoformat(),
+                "updated_at": (created + timedelta(minutes=rng.randint(1, 90))).isoformat(),
+                "financial_status": "paid",
+                "total_price": f"{total:.2f}",
+                "total_discounts": f"{total * rng.choice((0, 0, 0.1, 0.15)):.2f}",
+                "total_tax": f"{tax:.2f}",
+                "shipping_lines": [{"price": f"{shipping:.2f}"}],
+                "line_items": line_items,
+                "customer": {"id": customer_id, "created_at": customer_since.isoformat()},
+            })
+    return orders
+
+
+def _shipstation_shipments(data: SyntheticData, orders: list[dict]) -> list[dict]:
+    """ShipStation shipments (API records) for the orders: shipped the next day, none on Sundays."""
+    rng = random.Random(f"{data.config.seed}:shipments")
+    services = list(SHIPPING_SERVICES)
+    shares = [SHIPPING_SERVICES[s][2] for s in services]
+    shipments = []
+    for order in orders:
+        ship_date = datetime.fromisoformat(order["created_at"]).date() + timedelta(days=1)
+        if ship_date.weekday() == 6 or ship_date > data.config.end:
+            continue
+        service = rng.choices(services, weights=shares)[0]
+        carrier, average, _ = SHIPPING_SERVICES[service]
+        shipments.append({
+            "shipmentId": 300000000 + order["id"] % 100000000,
+            "orderId": order["id"],
+            "orderNumber": str(order["id"] % 1000000),
+            "createDate": f"{ship_date.isoformat()}T08:00:00.0000000",
+            "shipDate": ship_date.isoformat(),
+            "shipmentCost": round(average * rng.uniform(0.85, 1.15), 2),
+            "insuranceCost": 0.0,
+            "carrierCode": carrier,
+            "serviceCode": service,
+            "voided": False,
+        })
+    return shipments
+
+
+def _shipping_costs(shipments: list[dict]) -> dict:
+    """ShipStation cost summary, as ShipStationConnector.calculate_shipping_costs builds it."""
+    by_carrier, by_service, daily_costs = {}, {}, {}
+    for ship in shipments:
+        cost = ship["shipmentCost"] + ship["insuranceCost"]
+        for group, key in ((by_carrier, ship["carrierCode"]), (by_service, ship["serviceCode"]), (daily_costs, ship["shipDate"])):
+            entry = group.setdefault(key, {"count": 0, "total_cost": 0})
+            entry["count"] += 1
+            entry["total_cost"] += cost
+    for entry in (*by_carrier.values(), *by_service.values()):
+        entry["avg_cost"] = _div(entry["total_cost"], entry["count"])
+    total_cost = sum(s["total_cost"] for s in by_service.values())
+    return {
+        "total_shipping_cost": total_cost, "shipment_count": len(shipments),
+        "average_cost_per_shipment": _div(total_cost, len(shipments)), "by_carrier": by_carrier, "by_service": by_service,
+        "daily_costs": daily_costs,
+    }
+
+
+def _shopify_and_shipping(data: SyntheticData, historical: list[dict]) -> dict:
+    rng = data.rng
+    last30 = historical[-30:]
+    revenue = sum(r["sales"] for r in last30)
+    orders = sum(r["orders"] for r in last30)
+    nc = sum(r["nc_orders"] for r in last30)
+
+    variants, skus, titles = {}, {}, {}
+    for i, product in enumerate(PRODUCTS):
+        for color in ("Black", "Red", "Blue", "Camo"):
+            cost = round(rng.uniform(1.5, 9), 2)
+            variants[str(40000000000000 + i * 100 + len(variants))] = cost
+            skus[f"{color.upper()}-{product.upper().replace(' ', '-')}"] = cost
+            titles[f"{product} - {color}"] = cost
+
+    order_rows = _shopify_orders(data, last30, variants, skus)
+    shipments = _shipstation_shipments(data, order_rows)
+
+    return {
+        "shopify/metrics_last_30d.json": {
+            "total_revenue": revenue, "total_orders": orders, "total_discounts": revenue * 0.07,
+            "total_shipping": orders * 1.2, "total_tax": revenue * 0.04, "aov": _div(revenue, orders),
+            "new_customers": nc, "returning_customers": orders - nc, "unique_customers": round(orders * 0.93),
+            "daily_stats": {r["date"]: {"orders": r["orders"], "revenue": r["sales"]} for r in reversed(last30)},
+        },
+        "shopify/product_costs.json": {
+            "by_variant_id": variants, "by_sku": skus, "by_product_title": titles, "average_cogs_percent": 27.0,
+        },
+        "shopify/orders_last_30d.json": order_rows,
+        "shipstation/shipments_last_30d.json": shipments,
+        "shipstation/shipping_costs_last_30d.json": _shipping_costs(shipments),
+        "klaviyo/summary_last_30d.json": {
+            "period": _period(data, 30), "campaigns_sent": 0, "flows_active": 33, "total_flows": 46,
+            "total_profiles": 0, "available_metrics": ["Placed Order", "Added to Cart", "Subscribed to List"],
+        },
+    }
+
+
+def _latest_report(data: SyntheticData, attribution: dict, shipping: dict, gsc: dict) -> dict:
+    start, end = data.window(30)
+    window = data.daily[start:end]
+    generated_at = datetime.combine(data.config.end + timedelta(days=1), datetime.min.time()) + timedelta(hours=8)
+    shipping_per_order = shipping["average_cost_per_shipment"]
+    cogs_pct = 27.0
+
+    def channel(name: str, entry: dict, spend: float) -> dict:
+        cam = entry["sales"] * (1 - cogs_pct / 100) - entry["orders"] * shipping_per_order - spend
+        return {
+            "name": name, "orders": entry["orders"], "revenue": entry["sales"], "new_customer_orders": entry["nc_orders"],
+            "new_customer_revenue": entry["nc_sales"], "returning_customer_orders": entry["rc_orders"],
+            "returning_customer_revenue": entry["rc_sales"], "ad_spend": spend,
+            "roas": round(_div(entry["sales"], spend), 2), "nc_roas": round(_div(entry["nc_sales"], spend), 2),
+            "cam": cam, "cam_per_order": _div(cam, entry["orders"]),
+        }
+
+    google_spend = sum(t["google_spend"] for t in window)
+    meta_spend = sum(t["meta_spend"] for t in window)
+    channels = {
+        "google_ads": channel("Google Ads", attribution["Google Ads"]["total"], google_spend),
+        "meta_ads": channel("Meta Ads", attribution["Meta Ads"]["total"], meta_spend),
+        "organic": channel("Organic", attribution["Organic"]["total"], 0),
+        "klaviyo": channel("Klaviyo", attribution["Klaviyo"]["total"], 0),
+    }
+    revenue = sum(c["revenue"] for c in channels.values())
+    orders = sum(c["orders"] for c in channels.values())
+    cam = sum(c["cam"] for c in channels.values())
+    google_platform = sum(t["google_plat_sales"] for t in window)
+    meta_platform = sum(t["meta_plat_sales"] for t in window)
+    kendall_total = channels["google_ads"]["revenue"] + channels["meta_ads"]["revenue"]
+    branded = gsc["gsc/branded_vs_nonbranded.json"]
+    return {
+        "report": {
+            "generated_at": generated_at.isoformat(),
+            "summary": {
+                "total_revenue": revenue, "total_orders": orders, "total_cogs": revenue * cogs_pct / 100,
+                "cogs_source": "actual", "cogs_percent": cogs_pct, "total_shipping": shipping["total_shipping_cost"],
+                "shipping_source": "actual", "shipping_per_order": shipping_per_order,
+                "total_ad_spend": google_spend + meta_spend, "blended_cam": cam, "blended_cam_per_order": _div(cam, orders),
+            },
+            "channels": channels,
+            "platform_vs_kendall": {
+                "google_platform_revenue": google_platform, "google_kendall_revenue": channels["google_ads"]["revenue"],
+                "meta_platform_revenue": meta_platform, "meta_kendall_revenue": channels["meta_ads"]["revenue"],
+                "platform_total": google_platform + meta_platform, "kendall_total": kendall_total,
+                "over_attribution": google_platform + meta_platform - kendall_total,
+                "over_attribution_pct": _div(google_platform + meta_platform - kendall_total, google_platform + meta_platform) * 100,
+            },
+            "branded_search": {
+                "clicks": branded["branded"]["clicks"], "impressions": branded["branded"]["impressions"],
+                "branded_pct": branded["branded_percentage"],
+            },
+        },
+        "recommendations": [f"HEALTHY: CAM per order is ${_div(cam, orders):.2f}. Consider scaling spend 10-15%."],
+        "generated_at": generated_at.isoformat(),
+    }
+
+
+def _stores(data: SyntheticData, report: dict) -> dict:
+    """Changelog (one entry per budget step), AI recommendations and chat history."""
+    rng = data.rng
+    summary = report["report"]["summary"]
+    snapshot = {
+        "cam_per_order": summary["blended_cam_per_order"], "total_orders": summary["total_orders"],
+        "total_ad_spend": summary["total_ad_spend"], "total_cam": summary["blended_cam"],
+    }
+
+    changelog = []
+    for d, campaign, old, new in data.changes:
+        timestamp = datetime.combine(data.dates[d], datetime.min.time()) + timedelta(hours=9, seconds=rng.randrange(28800))
+        increase = new > old
+        change = new - old
+        changelog.append({
+            "id": len(changelog) + 1, "timestamp": timestamp.isoformat(),
+            "action_type": "spend_increase" if increase else "spend_decrease",
+            "description": f"{'Increased' if increase else 'Decreased'} budget {'+' if increase else '-'}${abs(change):.0f}/day ({change / old * 100:+.1f}%)",
+            "channel": "Meta Ads" if campaign.platform == "facebook" else "Google Ads",
+            "campaign": campaign.label, "amount": abs(change), "percent_change": round(change / old * 100, 1),
+            "original_budget": round(old, 2), "notes": "Action Board recommendation.", "metrics_snapshot": snapshot,
+        })
+
+    recommendations = []
+    for i, campaign in enumerate(rng.sample(data.campaigns, min(len(data.campaigns), max(1, len(data.campaigns) // 3)))):
+        created = datetime.combine(data.dates[-1 - (i % min(14, len(data.dates)))], datetime.min.time()) + timedelta(hours=12)
+        scale_up = campaign.true_roas > 2
+        recommendations.append({
+            "id": f"rec_{created:%Y%m%d_%H%M%S}_{i:06d}", "created_at": created.isoformat() + "-05:00",
+            "recommendation_type": "scale" if scale_up else "reduce",
+            "action": f"{'Increase' if scale_up else 'Reduce'} budget on {campaign.name}",
+            "channel": "Meta Ads" if campaign.platform == "facebook" else "Google Ads", "campaign": campaign.name,
+            "campaign_id": campaign.id, "budget_change_amount": round(campaign.budget * 0.15, 2),
+            "budget_change_percent": 15.0 if scale_up else -15.0,
+            "reason": f"Kendall ROAS {campaign.true_roas:.1f}x", "confidence": rng.choice(("high", "medium", "low")),
+            "signals_used": ["Kendall attribution", "Spend trend"],
+            "metrics_at_recommendation": {
+                "cam_per_order": summary["blended_cam_per_order"], "total_spend": summary["total_ad_spend"],
+                "total_revenue": summary["total_revenue"],
+            },
+            "llm_reasoning": "", "status": "pending", "status_updated_at": None, "action_taken": None,
+            "reason_not_followed": None, "metrics_after_7d": None, "metrics_after_14d": None,
+            "outcome": "pending", "outcome_notes": None,
+        })
+
+    sessions = []
+    for i in range(data.config.chat_sessions):
+        campaign = data.campaigns[i % len(data.campaigns)]
+        created = datetime.combine(data.dates[-1 - (i % len(data.dates))], datetime.min.time()) + timedelta(hours=10)
+        question = f"How is {campaign.name} doing this week?"
+        sessions.append({
+            "id": f"{rng.randrange(16**8):08x}-0000-4000-8000-{rng.randrange(16**12):012x}", "title": question[:50] + "...",
+            "created_at": created.isoformat(), "updated_at": (created + timedelta(seconds=10)).isoformat(),
+            "messages": [
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": f"{campaign.name} is running at {campaign.true_roas:.2f}x Kendall ROAS."},
+            ],
+        })
+
+    return {"changelog.json": changelog, "ai_recommendations.json": recommendations, "chat_history.json": {"sessions": sessions}}
+
+
+def _record_count(content) -> int:
+    """Rows/records in a generated file (top-level keys for summary files)."""
+    if isinstance(content, list):
+        return len(content)
+    for key in ("metrics", "sessions", "days"):
+        if isinstance(content.get(key), (list, dict)):
+            return len(content[key])
+    camps = content.get("camps")
+    if isinstance(camps, dict):
+        return len(camps.get("adsets", camps))
+    return len(content)
+
+
+def generate(dest: Path, config: Optional[SyntheticConfig] = None) -> dict:
+    """Write a synthetic connectors/data tree to dest (replacing it). Returns file -> record count."""
+    config = config or SyntheticConfig()
+    data = SyntheticData(config)
+    dest = Path(dest)
+    if dest.exists():
+        shutil.rmtree(dest)
+
+    historical = _historical_metrics(data)
+    attribution = _attribution(data)
+    gsc = _gsc(data)
+    shopping = _shopify_and_shipping(data, historical["metrics"])
+    report = _latest_report(data, attribution, shopping["shipstation/shipping_costs_last_30d.json"], gsc)
+
+    files = {
+        "kendall/historical_metrics.json": historical,
+        "kendall/attribution_by_source.json": attribution,
+        "google_ads/campaigns_last_30d.json": _campaign_rows(data, "google"),
+        "meta_ads/campaigns_last_30d.json": _campaign_rows(data, "facebook"),
+        "kendall/meta_adsets_7d.json": _adsets_report(data, 7),
+        "kendall/meta_adsets_30d.json": _adsets_report(data, 30),
+        "aggregated/latest_report.json": report,
+        **gsc,
+        **_ga4(data, historical["metrics"]),
+        **_amazon(data),
+        **shopping,
+        **_stores(data, report),
+    }
+    for platform in ("google", "facebook"):
+        name = "meta" if platform == "facebook" else "google"
+        files[f"kendall/{name}_ads_report_7d.json"] = _ads_report(data, platform, 7)
+        files[f"kendall/{name}_ads_report_30d.json"] = _ads_report(data, platform, 30)
+        files[f"kendall/{name}_ads_report.json"] = files[f"kendall/{name}_ads_report_30d.json"]
+
+    counts = {}
+    for relative, content in sorted(files.items()):
+        _write(dest, relative, content)
+        counts[relative] = _record_count(content)
+
+    # Same manifest as scaled fixtures, so the benchmark suite can freeze its clock
+    as_of = datetime.combine(config.end + timedelta(days=1), datetime.min.time()) + timedelta(hours=9)
+    manifest = {
+        "synthetic": {**asdict(config), "end": config.end.isoformat()},
+        "as_of": as_of.isoformat(),
+    }
+    (dest / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic connectors/data tree")
+    parser.add_argument("dest", type=Path, help="Output directory (replaced)")
+    parser.add_argument("--days", type=int, default=SyntheticConfig.days)
+    parser.add_argument("--campaigns", type=int, default=SyntheticConfig.campaigns, help="Google + Meta campaigns")
+    parser.add_argument("--adsets", type=int, default=SyntheticConfig.adsets, help="Ad sets per Meta campaign")
+    parser.add_argument("--orders-per-day", type=int, default=SyntheticConfig.orders_per_day)
+    parser.add_argument("--queries", type=int, default=SyntheticConfig.queries, help="GSC top queries")
+    parser.add_argument("--chat-sessions", type=int, default=SyntheticConfig.chat_sessions)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day of data, YYYY-MM-DD (default yesterday)")
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        days=args.days, campaigns=args.campaigns, adsets=args.adsets, orders_per_day=args.orders_per_day,
+        queries=args.queries, chat_sessions=args.chat_sessions, seed=args.seed,
+    )
+    if args.end:
+        config.end = args.end
+    counts = generate(args.dest, config)
+    size = sum(p.stat().st_size for p in args.dest.rglob("*.json"))
+    print(f"Wrote {len(counts)} files to {args.dest} ({size / 1_000_000:.1f} MB), data through {config.end}")
+    for relative, count in counts.items():
+        print(f"  {relative:<45} {count:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ Exposes all data and action endpoints for the Next.js frontend.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -15,7 +16,19 @@ from pathlib import Path
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from routers import metrics, actions, changelog, ai_chat, ai_synthesis
+from routers import metrics, actions, changelog, ai_chat, ai_synthesis, batch
+from services.amazon_refresher import start_amazon_refresher, stop_amazon_refresher, refresh_rollups
+from services.data_loader import add_reload_hook, reload_data, get_reload_status
+from services.http_cache import ConditionalGetMiddleware
+from services.responses import FastJSONResponse, FastJSONRoute, CompressionMiddleware
+from services.request_memo import RequestMemoMiddleware
+from services.perf import PerfMiddleware
+from services.profiling import ProfilingMiddleware
+from services.warmup import warm_up_after_startup, schedule_warm_up, save_hits, get_warmup_status
+
+# In-process data pull scheduler (opt-in; see connectors/scheduler.py)
+SCHEDULER_ENABLED = os.environ.get("ENABLE_SCHEDULER", "").lower() in ("1", "true", "yes")
+_scheduler = None
 
 
 def get_allowed_origins():
@@ -46,13 +59,56 @@ def get_allowed_origins():
     return origins
 
 
+def _reload_after_pull(job_name: str, result) -> None:
+    """Scheduler completion hook: pick up the manifest the pull just published (re-warms via _rewarm)."""
+    reload_data()
+    if job_name == "amazon":
+        refresh_rollups()
+
+
+def _rewarm(changed: list[str]) -> None:
+    """Data reload hook: re-warm the caches the reload evicted."""
+    schedule_warm_up(f"reload:{','.join(changed)}")
+
+
+add_reload_hook(_rewarm)
+
+
+def start_scheduler():
+    """
+    Start the data pull scheduler if ENABLE_SCHEDULER is set.
+
+    Every worker starts one, but only the worker holding the scheduler's
+    runner lock runs jobs (another takes over if it exits). The other
+    workers pick up new data from the published manifest.
+    """
+    global _scheduler
+    if not SCHEDULER_ENABLED:
+        return
+
+    from scheduler import build_default_scheduler
+
+    _scheduler = build_default_scheduler()
+    _scheduler.add_completion_hook(_reload_after_pull)
+    _scheduler.start()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     print("Starting TuffWraps Marketing API...")
     print(f"CORS allowed origins: {get_allowed_origins()}")
+    start_amazon_refresher()
+    start_scheduler()
+    # Preload data and deferred imports in the background once the port is open
+    warmup = asyncio.create_task(warm_up_after_startup())
     yield
     print("Shutting down...")
+    warmup.cancel()
+    save_hits()
+    stop_amazon_refresher()
+    if _scheduler:
+        _scheduler.stop()
 
 
 app = FastAPI(
@@ -60,7 +116,21 @@ app = FastAPI(
     description="Backend API for marketing attribution dashboard",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+app.router.route_class = FastJSONRoute
+
+# Per-request memo: each loader/filter result is computed once per request
+app.add_middleware(RequestMemoMiddleware)
+
+# Admin opt-in profiling (X-Profile-Token); runs the request and its memo under the profiler
+app.add_middleware(ProfilingMiddleware)
+
+# ETag / Last-Modified / 304 for data-backed GET endpoints (inside CORS so 304s get CORS headers)
+app.add_middleware(ConditionalGetMiddleware)
+
+# Brotli/GZip for responses over COMPRESSION_MIN_SIZE bytes
+app.add_middleware(CompressionMiddleware)
 
 # CORS for Next.js frontend - configured for both dev and production
 app.add_middleware(
@@ -69,14 +139,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
+# Per-route latency (outermost, so it covers the whole middleware stack); see /api/metrics/_perf
+app.add_middleware(PerfMiddleware)
+
 # Include routers
 app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
 app.include_router(actions.router, prefix="/api/actions", tags=["Actions"])
 app.include_router(changelog.router, prefix="/api/changelog", tags=["Changelog"])
 app.include_router(ai_chat.router, prefix="/api/ai", tags=["AI Chat"])
 app.include_router(ai_synthesis.router, prefix="/api/synthesis", tags=["AI Synthesis"])
+app.include_router(batch.router, prefix="/api", tags=["Batch"])
 
 
 @app.get("/")
@@ -97,10 +172,21 @@ async def health_check():
             "/api/changelog",
             "/api/ai",
             "/api/synthesis",
-        ]
+            "/api/batch",
+        ],
+        "warmup": get_warmup_status(),
+        "data": get_reload_status(),
     }
 
 
+@app.get("/api/scheduler")
+async def scheduler_status():
+    """Data pull scheduler status, run history and job metrics."""
+    if not _scheduler:
+        return {"enabled": False, "message": "Set ENABLE_SCHEDULER=1 to run data pulls in-process"}
+    return {"enabled": True, **_scheduler.get_status()}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -12,10 +12,12 @@ from services.data_loader import (
     get_latest_report,
     get_decision_signals,
     get_kendall_attribution,
+    DATA_DIR,
 )
 from services.changelog import add_entry, get_recent_entries
+from services.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class ActionItem(BaseModel):
@@ -85,16 +87,13 @@ def calculate_budget_recommendation(current_spend: float, roas: float, action_ty
 def get_campaign_spend(channel: str, campaign_name: str) -> float:
     """Get average daily campaign spend from actual spend data."""
     import json
-    import os
-    from pathlib import Path
 
-    data_dir = Path(__file__).parent.parent.parent / "connectors" / "data"
 
     # Try to get actual spend data from campaign files
     if "meta" in channel.lower():
-        campaign_file = data_dir / "meta_ads" / "campaigns_last_30d.json"
+        campaign_file = DATA_DIR / "meta_ads" / "campaigns_last_30d.json"
     else:
-        campaign_file = data_dir / "google_ads" / "campaigns_last_30d.json"
+        campaign_file = DATA_DIR / "google_ads" / "campaigns_last_30d.json"
 
     try:
         if campaign_file.exists():
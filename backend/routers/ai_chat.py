@@ -8,6 +8,7 @@ Includes chat history persistence for revisiting conversations.
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -22,6 +23,7 @@ from services.data_loader import (
     get_timeframe_summary,
 )
 from services.changelog import get_entries_summary
+from services.rollups import query_rollups
 from services.chat_history import (
     get_all_sessions,
     get_session,
@@ -29,15 +31,13 @@ from services.chat_history import (
     update_session,
     delete_session,
 )
+from services.perf import timed, timed_anthropic_call
+from services.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
-# Try to import anthropic
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# The anthropic SDK is imported on first use (it is most of the app's import time)
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
 
 
 SYSTEM_PROMPT = """You are a marketing analyst assistant for TuffWraps, an e-commerce brand selling fitness accessories.
@@ -75,6 +75,7 @@ WHEN GIVING ADVICE:
 Keep responses concise and focused on what action to take."""
 
 
+@timed
 def get_marketing_context() -> str:
     """Build context string from current marketing data."""
     report = get_latest_report()
@@ -143,6 +144,17 @@ def get_marketing_context() -> str:
         for alert in signals["alerts"]:
             lines.append(f"  - {alert}")
 
+    # Week-over-week and month-over-month from the rollup tables
+    lines.extend(["", "--- Trend (Week-over-Week / Month-over-Month) ---"])
+    for grain, label in (("week", "Week of"), ("month", "Month of")):
+        for row in query_rollups(grain, periods=2) or []:
+            change = row.get("change_pct", {})
+            lines.append(
+                f"{label} {row['period']} ({row['days']}d): Revenue ${row.get('revenue', 0):,.2f} "
+                f"({change.get('revenue', 0):+.1f}%) | Spend ${row.get('spend', 0):,.2f} ({change.get('spend', 0):+.1f}%) | "
+                f"MER {row.get('mer', 0):.2f} | NCAC ${row.get('ncac', 0):.2f}"
+            )
+
     activity = get_entries_summary()
     lines.extend([
         "",
@@ -252,10 +264,14 @@ async def chat(request: ChatRequest):
     else:
         messages = [{"role": m.role, "content": m.content} for m in request.messages]
 
+    import anthropic
+
     try:
         client = anthropic.Anthropic(api_key=api_key)
 
-        response = client.messages.create(
+        response = timed_anthropic_call(
+            "chat",
+            client.messages.create,
             model="claude-sonnet-4-20250514",
             max_tokens=1024,
             system=SYSTEM_PROMPT,
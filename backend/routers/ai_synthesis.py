@@ -41,8 +41,9 @@ from services.recommendations import (
     link_changelog_to_recommendation,
 )
 from services.data_loader import get_spend_outcome_correlation
+from services.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class SynthesisRequest(BaseModel):
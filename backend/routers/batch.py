@@ -0,0 +1,148 @@
+"""
+Batch API endpoint.
+
+Runs several GET sub-queries in one round trip (e.g. a dashboard's whole
+first paint). Sub-queries go through the normal routes, with validation and
+errors, but skip the middleware stack. Each one runs on its own event loop
+in a worker thread: most metrics endpoints are async def handlers doing
+blocking work, so on the request's loop they would run one after another
+and stall every other client meanwhile. Sub-queries share the batch's
+request memo, so common inputs like get_latest_report or
+get_decision_signals are computed once.
+"""
+
+import asyncio
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.responses import Response
+
+from services.request_memo import request_memo
+from services.responses import FastJSONRoute, dumps
+
+router = APIRouter(route_class=FastJSONRoute)
+
+MAX_BATCH_QUERIES = 20
+BATCH_CONCURRENCY = 4
+
+# Response headers passed through to each result (paging info)
+PASSTHROUGH_HEADERS = ("x-total-count", "x-next-cursor")
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+class BatchQuery(BaseModel):
+    """A single GET sub-query."""
+    id: str
+    path: str  # e.g. "/metrics/timeframe/7" (the /api prefix is optional)
+    params: dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    """Request body for a batch of sub-queries."""
+    queries: list[BatchQuery]
+
+
+def _normalize_path(path: str) -> str:
+    """Get the full API path for a sub-query, rejecting ones that can't be batched."""
+    path = "/" + path.lstrip("/")
+    if not path.startswith("/api/"):
+        path = "/api" + path
+    path = path.split("?")[0]
+    if path.startswith("/api/batch"):
+        raise HTTPException(status_code=400, detail="Batch requests can't be nested")
+    return path
+
+
+async def _dispatch(request: Request, path: str, params: dict) -> tuple[int, dict, bytes]:
+    """Run a GET through the app's router (no middleware) and collect the response."""
+    scope = {
+        **request.scope,
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params, doseq=True).encode(),
+        "headers": [(b"accept", b"application/json")],
+    }
+    for key in ("route", "endpoint", "path_params"):
+        scope.pop(key, None)
+
+    status = 500
+    headers = {}
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode().lower()
+                if name in PASSTHROUGH_HEADERS or name == "content-type":
+                    headers[name] = value.decode()
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await request.app.router(scope, receive, send)
+    return status, headers, b"".join(body)
+
+
+async def _run_query(request: Request, path: str, params: dict) -> tuple[int, dict, bytes]:
+    """Run one sub-query in a worker thread (with its own event loop), turning errors into a result."""
+    try:
+        # to_thread copies this context, so the sub-query sees the batch's request memo
+        return await asyncio.to_thread(lambda: asyncio.run(_dispatch(request, path, params)))
+    except StarletteHTTPException as e:
+        # Raised by the router itself (e.g. no matching route)
+        return e.status_code, JSON_HEADERS, dumps({"detail": e.detail})
+    except Exception as e:
+        return 500, JSON_HEADERS, dumps({"detail": f"Batch sub-query failed: {e}"})
+
+
+@router.post("/batch")
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several GET sub-queries and return all results in one response.
+
+    Body:
+        {"queries": [{"id": "signals", "path": "/metrics/signals"},
+                     {"id": "week", "path": "/metrics/timeframe/7", "params": {"fields": "date,sales"}}]}
+
+    Returns:
+        {"results": {"<id>": {"status": 200, "headers": {...}, "body": <endpoint JSON>}}, "elapsed_ms": ...}
+    """
+    if len(batch.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    if len({q.id for q in batch.queries}) != len(batch.queries):
+        raise HTTPException(status_code=400, detail="Query ids must be unique")
+
+    paths = [_normalize_path(q.path) for q in batch.queries]
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(query: BatchQuery, path: str):
+        async with semaphore:
+            return await _run_query(request, path, query.params)
+
+    with request_memo():
+        results = await asyncio.gather(*(run(q, p) for q, p in zip(batch.queries, paths)))
+
+    # Sub-query bodies are already JSON - splice them in rather than re-parsing
+    parts = []
+    for query, (status, headers, body) in zip(batch.queries, results):
+        headers = dict(headers)
+        if headers.pop("content-type", "") != "application/json":
+            body = dumps(body.decode(errors="replace"))
+        parts.append(
+            dumps(query.id) + b':{"status":' + str(status).encode()
+            + b',"headers":' + dumps(headers) + b',"body":' + (body or b"null") + b"}"
+        )
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    content = b'{"results":{' + b",".join(parts) + b'},"elapsed_ms":' + dumps(elapsed_ms) + b"}"
+    return Response(content=content, media_type="application/json")
@@ -18,8 +18,9 @@ from services.changelog import (
     ACTION_TYPES,
 )
 from services.campaign_matcher import search_campaigns, get_all_campaigns
+from services.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class NewEntryRequest(BaseModel):
@@ -4,7 +4,11 @@ Metrics API endpoints.
 Provides access to all marketing metrics and reports.
 """
 
-from fastapi import APIRouter, HTTPException
+import hmac
+import os
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
 from typing import Optional
 
 from services.data_loader import (
@@ -27,10 +31,43 @@ from services.data_loader import (
     get_spend_outcome_correlation,
     get_channel_correlation,
     get_budget_recommendations,
+    get_timeframe_comparisons,
+    get_shared_cache,
+    reload_data,
+    parse_fields,
+    query_rows,
+    query_dataset,
+    query_attribution,
     VALID_TIMEFRAMES,
 )
+from services.amazon_refresher import get_amazon_refresher_status
+from services.rollups import GRAINS, query_rollups, list_rollup_campaigns
+from services import perf, profiling
+from services.responses import FastJSONRoute, FastJSONResponse
+
+router = APIRouter(route_class=FastJSONRoute)
+
+# Row query params shared by the bulk endpoints (see _row_query)
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+FromDate = Query(None, alias="from", pattern=DATE_PATTERN)
+ToDate = Query(None, alias="to", pattern=DATE_PATTERN)
+Limit = Query(None, ge=0)
+
+
+def _row_query(query, *args, **kwargs):
+    """Run a row query, turning a bad cursor into a 400."""
+    try:
+        return query(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-router = APIRouter()
+
+def _paged_response(content, total: int, next_cursor: Optional[str]) -> FastJSONResponse:
+    """Return content with the row count and next page cursor as headers."""
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(content, headers=headers)
 
 
 @router.get("/report")
@@ -55,21 +92,46 @@ async def get_blended():
 
 
 @router.get("/attribution")
-async def get_attribution():
-    """Get full Kendall attribution data."""
+async def get_attribution(fields: Optional[str] = None, limit: Optional[int] = Limit, cursor: Optional[str] = None):
+    """
+    Get Kendall attribution data.
+
+    Query params:
+        fields: Comma-separated metrics to keep in each source's totals/breakdowns
+        limit: Max sources to return (next page cursor in X-Next-Cursor)
+        cursor: X-Next-Cursor value from the previous page
+    """
     data = get_kendall_attribution()
     if not data:
         raise HTTPException(status_code=404, detail="No attribution data available")
-    return data
+    page, total, next_cursor = _row_query(query_attribution, data, parse_fields(fields), limit, cursor)
+    return _paged_response(page, total, next_cursor)
 
 
 @router.get("/historical")
-async def get_historical():
-    """Get historical Kendall metrics."""
+async def get_historical(
+    fields: Optional[str] = None,
+    date_from: Optional[str] = FromDate,
+    date_to: Optional[str] = ToDate,
+    limit: Optional[int] = Limit,
+    cursor: Optional[str] = None,
+):
+    """
+    Get historical Kendall metrics.
+
+    Query params:
+        fields: Comma-separated metric columns to return (e.g. date,sales,spend)
+        from / to: Inclusive date range (YYYY-MM-DD)
+        limit: Max daily rows to return (next page cursor in X-Next-Cursor)
+        cursor: X-Next-Cursor value from the previous page
+    """
     data = get_kendall_historical()
     if not data:
         raise HTTPException(status_code=404, detail="No historical data available")
-    return data
+    rows, total, next_cursor = _row_query(
+        query_dataset, "historical", parse_fields(fields), date_from, date_to, limit, cursor
+    )
+    return _paged_response({**data, "metrics": rows}, total, next_cursor)
 
 
 @router.get("/channels/{channel}")
@@ -109,21 +171,47 @@ async def get_shopify():
 
 
 @router.get("/google-ads")
-async def get_google_ads():
-    """Get Google Ads campaign data."""
+async def get_google_ads(
+    fields: Optional[str] = None,
+    date_from: Optional[str] = FromDate,
+    date_to: Optional[str] = ToDate,
+    limit: Optional[int] = Limit,
+    cursor: Optional[str] = None,
+):
+    """
+    Get Google Ads campaign data (one row per campaign per day).
+
+    Query params: fields, from, to, limit, cursor (as for /historical)
+    """
     data = get_google_ads_campaigns()
     if not data:
         raise HTTPException(status_code=404, detail="No Google Ads data available")
-    return data
+    rows, total, next_cursor = _row_query(
+        query_dataset, "google_ads", parse_fields(fields), date_from, date_to, limit, cursor
+    )
+    return _paged_response(rows, total, next_cursor)
 
 
 @router.get("/meta-ads")
-async def get_meta_ads():
-    """Get Meta Ads campaign data."""
+async def get_meta_ads(
+    fields: Optional[str] = None,
+    date_from: Optional[str] = FromDate,
+    date_to: Optional[str] = ToDate,
+    limit: Optional[int] = Limit,
+    cursor: Optional[str] = None,
+):
+    """
+    Get Meta Ads campaign data (one row per campaign per day).
+
+    Query params: fields, from, to, limit, cursor (as for /historical)
+    """
     data = get_meta_ads_campaigns()
     if not data:
         raise HTTPException(status_code=404, detail="No Meta Ads data available")
-    return data
+    rows, total, next_cursor = _row_query(
+        query_dataset, "meta_ads", parse_fields(fields), date_from, date_to, limit, cursor
+    )
+    return _paged_response(rows, total, next_cursor)
 
 
 @router.get("/summary")
@@ -160,7 +248,14 @@ async def get_summary():
 # ============================================================================
 
 @router.get("/timeframe/{days}")
-async def get_timeframe_metrics(days: int):
+async def get_timeframe_metrics(
+    days: int,
+    fields: Optional[str] = None,
+    date_from: Optional[str] = FromDate,
+    date_to: Optional[str] = ToDate,
+    limit: Optional[int] = Limit,
+    cursor: Optional[str] = None,
+):
     """
     Get metrics for a specific timeframe (1, 2, 3, 7, 14, or 30 days).
 
@@ -171,6 +266,12 @@ async def get_timeframe_metrics(days: int):
     - Problem campaigns (low ROAS, high spend)
     - Winning campaigns (high ROAS)
     - Per-channel breakdown
+
+    Query params (apply to the embedded daily_metrics rows):
+        fields: Comma-separated metric columns to keep (e.g. date,sales,spend)
+        from / to: Inclusive date range (YYYY-MM-DD) within the timeframe
+        limit: Max daily rows (0 = none; next page cursor in X-Next-Cursor)
+        cursor: X-Next-Cursor value from the previous page
     """
     if days not in VALID_TIMEFRAMES:
         raise HTTPException(
@@ -188,7 +289,10 @@ async def get_timeframe_metrics(days: int):
             "message": f"No data available for last {days} days"
         }
 
-    return data
+    daily, total, next_cursor = _row_query(
+        query_rows, data.get("daily_metrics", []), parse_fields(fields), date_from, date_to, limit, cursor
+    )
+    return _paged_response({**data, "daily_metrics": daily}, total, next_cursor)
 
 
 @router.get("/timeframe/{days}/google")
@@ -244,6 +348,40 @@ async def get_available_timeframes():
     }
 
 
+@router.get("/timeframes/compare")
+async def compare_timeframes(fields: Optional[str] = None):
+    """
+    Get current vs previous period totals, averages and % changes for every timeframe.
+
+    Computed in one batch, for views that show all timeframes side by side.
+
+    Query params:
+        fields: Comma-separated Kendall metrics to include (default: all)
+    """
+    comparisons = get_timeframe_comparisons()
+    if not comparisons:
+        raise HTTPException(status_code=404, detail="No historical data available")
+
+    selected = parse_fields(fields)
+    if selected is None:
+        return {"timeframes": comparisons}
+
+    def project(values: dict) -> dict:
+        return {f: values[f] for f in selected if f in values}
+
+    return {
+        "timeframes": {
+            days: {
+                **c,
+                "current": {**c["current"], "totals": project(c["current"]["totals"]), "averages": project(c["current"]["averages"])},
+                "previous": {**c["previous"], "totals": project(c["previous"]["totals"]), "averages": project(c["previous"]["averages"])},
+                "changes": project(c["changes"]),
+            }
+            for days, c in comparisons.items()
+        }
+    }
+
+
 @router.get("/halo-effect")
 async def get_halo_effect(days: int = 30):
     """
@@ -271,6 +409,120 @@ async def get_halo_effect(days: int = 30):
     return data
 
 
+@router.get("/rollups/{grain}")
+async def get_rollup_trend(
+    grain: str,
+    channel: str = "blended",
+    campaign: Optional[str] = None,
+    periods: int = Query(12, ge=1, le=104),
+):
+    """
+    Get week-over-week or month-over-month metrics from the rollup tables.
+
+    Path params:
+        grain: week (Monday start) or month
+
+    Query params:
+        channel: blended, meta, google or amazon; the platform (google/meta) when campaign is set
+        campaign: Campaign name for a per-campaign trend
+        periods: Number of most recent weeks/months (default: 12)
+    """
+    if grain not in GRAINS:
+        raise HTTPException(status_code=400, detail=f"Invalid grain. Valid options: {list(GRAINS)}")
+
+    rows = query_rollups(grain, channel, campaign, periods)
+    if rows is None:
+        detail = f"No rollups for channel {channel!r}"
+        if campaign:
+            detail = f"No rollups for campaign {channel}:{campaign}. Known campaigns: {list_rollup_campaigns()[:20]}"
+        raise HTTPException(status_code=404, detail=detail)
+
+    return {"grain": grain, "channel": channel, "campaign": campaign, "periods": rows}
+
+
+@router.get("/amazon/status")
+async def get_amazon_status():
+    """Get Amazon data freshness and background refresher state."""
+    return get_amazon_refresher_status()
+
+
+@router.get("/_perf")
+async def get_perf_stats(format: str = Query("json", pattern="^(json|prometheus)$")):
+    """
+    Get in-process performance stats: route and function latency, cache hit
+    rates, bytes read from data files, and Anthropic latency/token usage.
+
+    format=prometheus returns Prometheus text exposition format for scraping.
+    """
+    shared_cache = get_shared_cache()
+    extra_caches = {"shared": (shared_cache.hits, shared_cache.misses)} if shared_cache.enabled else {}
+    if format == "prometheus":
+        return PlainTextResponse(perf.prometheus_text(extra_caches), media_type="text/plain; version=0.0.4")
+    return perf.snapshot(extra_caches)
+
+
+def require_profile_admin(request: Request):
+    """Allow only requests carrying the admin profiling token."""
+    if not profiling.PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled (set PROFILE_TOKEN)")
+    if not profiling.is_admin(profiling.request_token(request.scope)):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+
+@router.get("/_profiles", dependencies=[Depends(require_profile_admin)])
+async def list_profiles():
+    """
+    List the slowest profiled requests (see services/profiling.py).
+
+    Profile a request by sending it with X-Profile-Token: <PROFILE_TOKEN>.
+    """
+    return {"keep": profiling.profiles.keep, "profiles": profiling.profiles.list()}
+
+
+@router.get("/_profiles/{profile_id}", dependencies=[Depends(require_profile_admin)])
+async def download_profile(profile_id: str):
+    """Download a profile as collapsed stacks (input for flamegraph.pl / speedscope)."""
+    profile = profiling.profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No kept profile {profile_id}")
+    return PlainTextResponse(
+        profile["collapsed"],
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
+
+
+# Token the pull pipeline sends (X-Reload-Token) to trigger a data reload; unset disables the endpoint
+RELOAD_TOKEN = os.environ.get("RELOAD_TOKEN", "")
+
+
+def require_reload_token(x_reload_token: Optional[str] = Header(None)):
+    """Allow only requests carrying the data reload token."""
+    if not RELOAD_TOKEN:
+        raise HTTPException(status_code=404, detail="Reload endpoint is not enabled (set RELOAD_TOKEN)")
+    # Compared as bytes: compare_digest raises TypeError for non-ASCII str
+    if not x_reload_token or not hmac.compare_digest(x_reload_token.encode(), RELOAD_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Reload token required")
+
+
+@router.post("/_reload", dependencies=[Depends(require_reload_token)])
+def reload_manifest(version: Optional[int] = Body(None, embed=True)):
+    """
+    Load the newly published data manifest now (see connectors/data_manifest.py).
+
+    Called by the pull pipeline after publishing manifest `version`. Only the
+    cached results built from changed sources are evicted, then re-warmed.
+    This reloads the worker that answers; the others pick the manifest up
+    within GENERATION_CHECK_INTERVAL seconds.
+    """
+    status = reload_data()
+    if version is not None and (status["manifest_version"] or 0) < version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Manifest version {version} is not visible here yet (loaded {status['manifest_version']})",
+        )
+    return status
+
+
 # ============================================================================
 # SIGNAL TRIANGULATION (Spend-to-Outcome Correlation)
 # ============================================================================
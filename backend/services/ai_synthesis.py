@@ -14,6 +14,7 @@ Key principles:
 
 import os
 import json
+import importlib.util
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -42,6 +43,7 @@ from services.recommendations import (
     get_pending_recommendations,
 )
 from services.changelog import get_entries_summary
+from services.perf import timed, timed_anthropic_call
 from services.analysis_history import save_analysis as save_to_history
 from services.funnel_impact import (
     build_followup_summary_for_llm,
@@ -54,12 +56,8 @@ from services.funnel_impact import (
 
 EST = ZoneInfo("America/New_York")
 
-# Try to import anthropic
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# The anthropic SDK is imported on first use (it is most of the app's import time)
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
 
 
 SYNTHESIS_SYSTEM_PROMPT = """You are the AI Chief Marketing Officer (ACMO) for TuffWraps, an e-commerce fitness accessories brand.
@@ -236,6 +234,7 @@ For each change made on Monday (or recently) that now has 3 days of data:
 Note: Full recommendations will come on Monday. This is just a health check."""
 
 
+@timed
 def build_synthesis_context(days: int = 30, analysis_type: str = "full") -> str:
     """
     Build comprehensive context for LLM synthesis.
@@ -682,9 +681,13 @@ REMEMBER:
 - 3d/7d are for ACTION, 14d/30d are for VALIDATION"""
 
     try:
+        import anthropic
+
         client = anthropic.Anthropic(api_key=api_key)
 
-        response = client.messages.create(
+        response = timed_anthropic_call(
+            "synthesis",
+            client.messages.create,
             model="claude-sonnet-4-20250514",
             max_tokens=4096,
             system=system_prompt,
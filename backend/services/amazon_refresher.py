@@ -0,0 +1,278 @@
+"""
+Amazon Metrics Refresher.
+
+Keeps Amazon rollups for every dashboard timeframe warm in the background so
+no request ever waits on SP-API.
+
+- A daemon thread started from the FastAPI lifespan pulls the SP-API orders
+  report on a schedule (when credentials are configured) and rebuilds the
+  rollups from amazon/daily_sales.json.
+- Only the worker holding the refresher's runner lock (see
+  connectors/scheduler.py) pulls from SP-API; the others rebuild their
+  rollups from the file it writes, and one of them takes over within a
+  minute if that worker exits.
+- Reads are stale-while-revalidate: cached rollups are always returned
+  immediately, and a stale read just wakes the refresher.
+- Every rollup carries its data age so responses can show freshness.
+- Rate limits (429 / QuotaExceeded) back off exponentially instead of
+  silently falling back on every request.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.data_loader import DATA_DIR, EST, VALID_TIMEFRAMES, load_json, get_date_cutoff
+
+DAILY_SALES_FILE = DATA_DIR / "amazon" / "daily_sales.json"
+
+# Rollups kept warm for every dashboard timeframe
+AMAZON_ROLLUP_DAYS = list(VALID_TIMEFRAMES)
+
+# How often to pull a new report from SP-API (seconds)
+AMAZON_REFRESH_INTERVAL = int(os.environ.get("AMAZON_REFRESH_INTERVAL", 3600))
+
+# Reuse a finished SP-API report for at most this long, so each pull sees new orders (seconds)
+AMAZON_REPORT_MAX_AGE = AMAZON_REFRESH_INTERVAL // 2
+
+# How often workers that don't pull re-read daily_sales.json and retry the runner lock (seconds)
+FOLLOWER_INTERVAL = min(60, AMAZON_REFRESH_INTERVAL)
+
+# Rollups older than this wake the refresher on read (seconds)
+AMAZON_STALE_AFTER = int(os.environ.get("AMAZON_STALE_AFTER", 1800))
+
+# Rate-limit backoff bounds (seconds)
+BACKOFF_MIN = 60
+BACKOFF_MAX = 3600
+
+# Days of history requested from the Reports API on each pull
+PULL_WINDOW_DAYS = max(AMAZON_ROLLUP_DAYS)
+
+_lock = threading.Lock()
+_wake = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+_runner_lock = None  # scheduler.RunnerLock, created when the thread starts
+
+_state = {
+    "daily": {},             # date -> {"sales", "orders", "units"}
+    "rollups": {},           # days -> metrics dict
+    "data_updated_at": None,  # When daily_sales.json was last written (epoch)
+    "rolled_up_at": None,     # When rollups were last rebuilt (epoch)
+    "last_pull_at": None,
+    "last_error": None,
+    "backoff_seconds": 0,
+    "backoff_until": 0,
+}
+
+
+def _sp_api_configured() -> bool:
+    """Check SP-API credentials without importing the connector."""
+    return all(os.getenv(k) for k in (
+        "AMAZON_LWA_CLIENT_ID",
+        "AMAZON_LWA_CLIENT_SECRET",
+        "AMAZON_LWA_REFRESH_TOKEN",
+    ))
+
+
+def _data_updated_at(daily_sales: dict) -> Optional[float]:
+    """Get when the daily sales data was written, from the file or its mtime."""
+    updated_at = daily_sales.get("updated_at")
+    if updated_at:
+        try:
+            return datetime.fromisoformat(updated_at).timestamp()
+        except ValueError:
+            pass
+    try:
+        return DAILY_SALES_FILE.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _compute_rollup(daily: dict, days: int) -> Optional[dict]:
+    """Sum the last N complete days, or None if the data doesn't cover the window."""
+    if not daily:
+        return None
+
+    start_date = get_date_cutoff(days)
+    end_date = (datetime.now(EST) - timedelta(days=1)).strftime("%Y-%m-%d")
+
+    # Only trust the report data when it reaches back to the window start
+    if min(daily) > start_date:
+        return None
+
+    window = [v for d, v in daily.items() if start_date <= d <= end_date]
+    if not window:
+        return None
+
+    total_sales = sum(v.get("sales", 0) for v in window)
+    total_orders = sum(v.get("orders", 0) for v in window)
+
+    return {
+        "sales": round(total_sales, 2),
+        "orders": total_orders,
+        "avg_order_value": round(total_sales / total_orders, 2) if total_orders > 0 else 0,
+    }
+
+
+def refresh_rollups() -> None:
+    """Reload daily_sales.json and rebuild all rollups (local disk only)."""
+    daily_sales = load_json(DAILY_SALES_FILE) or {}
+    daily = daily_sales.get("days", {})
+    rollups = {days: _compute_rollup(daily, days) for days in AMAZON_ROLLUP_DAYS}
+
+    with _lock:
+        _state["daily"] = daily
+        _state["rollups"] = rollups
+        _state["data_updated_at"] = _data_updated_at(daily_sales) if daily else None
+        _state["rolled_up_at"] = time.time()
+
+
+def _pull_report() -> None:
+    """Pull the latest orders report from SP-API into daily_sales.json."""
+    from amazon_seller import AmazonSellerConnector
+
+    connector = AmazonSellerConnector()
+    if not connector.configured:
+        return
+
+    now_est = datetime.now(EST)
+    end_date = (now_est - timedelta(days=1)).strftime("%Y-%m-%d")
+    start_date = (now_est - timedelta(days=PULL_WINDOW_DAYS)).strftime("%Y-%m-%d")
+
+    print(f"[Amazon] Refreshing daily sales {start_date} to {end_date}...")
+    asyncio.run(connector.pull_daily_sales_async(start_date, end_date, max_report_age=AMAZON_REPORT_MAX_AGE))
+    with _lock:
+        _state["last_pull_at"] = time.time()
+
+
+def _refresh_once(pull: bool = True) -> None:
+    """Pull from SP-API (if pull is set and not backing off) and rebuild the rollups."""
+    now = time.time()
+    with _lock:
+        backing_off = now < _state["backoff_until"]
+
+    if pull and _sp_api_configured() and not backing_off:
+        try:
+            _pull_report()
+            with _lock:
+                _state["last_error"] = None
+                _state["backoff_seconds"] = 0
+        except Exception as e:
+            error_str = str(e)
+            print(f"[Amazon] Refresh error: {error_str}")
+            with _lock:
+                _state["last_error"] = error_str
+                if "429" in error_str or "QuotaExceeded" in error_str:
+                    backoff = min(BACKOFF_MAX, max(BACKOFF_MIN, _state["backoff_seconds"] * 2))
+                    _state["backoff_seconds"] = backoff
+                    _state["backoff_until"] = now + backoff
+                else:
+                    backoff = None
+            if backoff:
+                print(f"[Amazon] Rate limited - backing off for {backoff} seconds")
+
+    refresh_rollups()
+
+
+def _run() -> None:
+    """
+    Refresher thread body: refresh, then sleep until the interval or a wake-up.
+
+    Workers that don't hold the runner lock only rebuild rollups from disk,
+    on a shorter interval so they follow the puller's file closely.
+    """
+    while not _stop.is_set():
+        pulling = _runner_lock.acquire()
+        try:
+            _refresh_once(pull=pulling)
+        except Exception as e:
+            print(f"[Amazon] Refresher error: {e}")
+        _wake.wait(timeout=AMAZON_REFRESH_INTERVAL if pulling else FOLLOWER_INTERVAL)
+        _wake.clear()
+    _runner_lock.release()
+
+
+def start_amazon_refresher() -> None:
+    """Start the background refresher thread (called from the app lifespan)."""
+    global _thread, _runner_lock
+    if _thread and _thread.is_alive():
+        return
+
+    from scheduler import LOCK_DIR, RunnerLock  # connectors/, put on the path by data_loader
+
+    if _runner_lock is None:
+        _runner_lock = RunnerLock(LOCK_DIR / "amazon_refresher.lock")
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="amazon-refresher", daemon=True)
+    _thread.start()
+    print(f"[Amazon] Refresher started (interval {AMAZON_REFRESH_INTERVAL}s)")
+
+
+def stop_amazon_refresher() -> None:
+    """Signal the refresher thread to exit."""
+    _stop.set()
+    _wake.set()
+
+
+def get_amazon_rollup(days: int) -> Optional[dict]:
+    """
+    Get Amazon metrics for the last N days with freshness info.
+
+    Always answers from memory (or local disk on first use) and never calls
+    SP-API. Stale rollups are still returned; they just wake the refresher.
+    """
+    with _lock:
+        rolled_up = _state["rolled_up_at"] is not None
+    if not rolled_up:
+        refresh_rollups()
+
+    with _lock:
+        if days in _state["rollups"]:
+            metrics = _state["rollups"][days]
+        else:
+            metrics = _compute_rollup(_state["daily"], days)
+        data_updated_at = _state["data_updated_at"]
+        rolled_up_at = _state["rolled_up_at"]
+
+    if _thread and _thread.is_alive() and time.time() - rolled_up_at > AMAZON_STALE_AFTER:
+        _wake.set()
+
+    if not metrics:
+        return None
+
+    age = int(time.time() - data_updated_at) if data_updated_at else None
+    return {
+        **metrics,
+        "data_age_seconds": age,
+        "data_updated_at": datetime.fromtimestamp(data_updated_at, EST).isoformat() if data_updated_at else None,
+    }
+
+
+def get_amazon_refresher_status() -> dict:
+    """Get refresher state for monitoring."""
+    now = time.time()
+
+    def iso(ts: Optional[float]) -> Optional[str]:
+        return datetime.fromtimestamp(ts, EST).isoformat() if ts else None
+
+    with _lock:
+        state = dict(_state)
+
+    return {
+        "running": bool(_thread and _thread.is_alive()),
+        "pulling": bool(_runner_lock and _runner_lock.held),
+        "sp_api_configured": _sp_api_configured(),
+        "refresh_interval_seconds": AMAZON_REFRESH_INTERVAL,
+        "days_available": len(state["daily"]),
+        "data_updated_at": iso(state["data_updated_at"]),
+        "data_age_seconds": int(now - state["data_updated_at"]) if state["data_updated_at"] else None,
+        "rolled_up_at": iso(state["rolled_up_at"]),
+        "last_pull_at": iso(state["last_pull_at"]),
+        "last_error": state["last_error"],
+        "backoff_remaining_seconds": max(0, int(state["backoff_until"] - now)),
+    }
@@ -7,14 +7,14 @@ This allows users to review past analyses and understand when they were run.
 
 import json
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 from zoneinfo import ZoneInfo
 
+from services.data_loader import DATA_DIR, invalidate_data_version
+
 EST = ZoneInfo("America/New_York")
 
 # Store history in connectors/data directory alongside other data
-DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
 HISTORY_FILE = DATA_DIR / "ai_analysis_history.json"
 
 
@@ -35,6 +35,7 @@ def _save_history(history: list[dict]) -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     with open(HISTORY_FILE, "w") as f:
         json.dump(history, f, indent=2, default=str)
+    invalidate_data_version()
 
 
 def save_analysis(
@@ -5,11 +5,10 @@ Provides autocomplete/fuzzy matching for campaign names across platforms.
 """
 
 import json
-from pathlib import Path
 from difflib import SequenceMatcher
 from typing import Optional
 
-DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
+from services.data_loader import DATA_DIR, load_dataset
 
 
 def get_all_campaigns() -> list[dict]:
@@ -21,8 +20,7 @@ def get_all_campaigns() -> list[dict]:
     meta_file = DATA_DIR / "meta_ads" / "campaigns_last_30d.json"
     if meta_file.exists():
         try:
-            with open(meta_file, "r", encoding="utf-8") as f:
-                meta_data = json.load(f)
+            meta_data = load_dataset(meta_file, columns=["campaign_id", "campaign_name"]) or []
             for row in meta_data:
                 key = ("Meta Ads", row.get("campaign_id"), row.get("campaign_name"))
                 if key not in seen and row.get("campaign_name"):
@@ -39,8 +37,7 @@ def get_all_campaigns() -> list[dict]:
     google_file = DATA_DIR / "google_ads" / "campaigns_last_30d.json"
     if google_file.exists():
         try:
-            with open(google_file, "r", encoding="utf-8") as f:
-                google_data = json.load(f)
+            google_data = load_dataset(google_file, columns=["campaign_id", "campaign_name"]) or []
             for row in google_data:
                 key = ("Google Ads", row.get("campaign_id"), row.get("campaign_name"))
                 if key not in seen and row.get("campaign_name"):
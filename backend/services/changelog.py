@@ -3,11 +3,12 @@ Changelog service for tracking marketing decisions and actions.
 """
 
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
 
-CHANGELOG_FILE = Path(__file__).parent.parent.parent / "connectors" / "data" / "changelog.json"
+from services.data_loader import DATA_DIR, invalidate_data_version
+
+CHANGELOG_FILE = DATA_DIR / "changelog.json"
 
 
 def load_changelog() -> list[dict]:
@@ -24,6 +25,7 @@ def save_changelog(entries: list[dict]):
     CHANGELOG_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(CHANGELOG_FILE, "w", encoding="utf-8") as f:
         json.dump(entries, f, indent=2, default=str)
+    invalidate_data_version()
 
 
 def add_entry(
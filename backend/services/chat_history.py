@@ -3,12 +3,12 @@ Chat history service for persisting AI chat conversations.
 """
 
 import json
-from pathlib import Path
 from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
+from services.data_loader import DATA_DIR
+
 CHAT_HISTORY_FILE = DATA_DIR / "chat_history.json"
 
 
@@ -1,20 +1,28 @@
 """
 Data loading utilities for the TuffWraps API.
 
-Reads JSON files from the connectors/data directory.
+Reads JSON files (or their columnar sidecars) from the connectors/data directory.
 Supports multiple timeframes for analysis (1, 3, 7, 14, 30 days).
-Uses direct Amazon API for real-time Amazon sales data.
+Uses SP-API report data (amazon/daily_sales.json) for Amazon sales.
 """
 
 import json
+import os
 import sys
+import threading
 import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Any, Optional, Callable
 from zoneinfo import ZoneInfo
 
+from services.request_memo import current_memo, per_request
+from services import perf
+
 # EST timezone for consistent date handling
 EST = ZoneInfo("America/New_York")
 
@@ -30,11 +38,70 @@ CACHE_TTL_JSON = 300      # 5 minutes for JSON file loads
 CACHE_TTL_COMPUTED = 600  # 10 minutes for computed summaries
 CACHE_TTL_HEAVY = 900     # 15 minutes for heavy computations
 
+# Cached functions by name, and how often each (name, args) is requested from
+# outside another cached function - the warm-up planner replays the most
+# requested ones (see services/warmup.py)
+_cached_functions: dict[str, Callable] = {}
+_call_counts: Counter = Counter()
+_call_depth: ContextVar[int] = ContextVar("cached_call_depth", default=0)
+_RECORDABLE_TYPES = (str, int, float, bool, type(None))
+
+# Data sources (top-level dirs under DATA_DIR) each cached result was built
+# from, including through the cached functions it called. A data reload
+# evicts only results built from changed sources; "*" means unknown and is
+# always evicted (e.g. results fetched from the shared cache).
+_cache_deps: dict[str, frozenset] = {}
+_collecting_deps: ContextVar[Optional[set]] = ContextVar("cache_deps", default=None)
+UNKNOWN_DEPS = frozenset({"*"})
+
+
+def _record_read(filepath: Path) -> None:
+    """Note that the cached computation in progress read this data file."""
+    deps = _collecting_deps.get()
+    if deps is not None:
+        try:
+            deps.add(filepath.relative_to(DATA_DIR).parts[0])
+        except (ValueError, IndexError):
+            deps.add("*")
+
+
+def _record_call(name: str, args: tuple, kwargs: dict) -> None:
+    """Count a top-level call whose arguments can be replayed from JSON."""
+    if all(isinstance(a, _RECORDABLE_TYPES) for a in (*args, *kwargs.values())):
+        _call_counts[json.dumps([name, list(args), kwargs], sort_keys=True)] += 1
+
+
+def get_call_counts() -> dict[str, int]:
+    """Top-level cached calls since startup, keyed by JSON [name, args, kwargs]."""
+    return dict(_call_counts)
+
+
+def get_cached_function(name: str) -> Optional[Callable]:
+    """Look up a @cached function by name (for replaying recorded calls)."""
+    return _cached_functions.get(name)
+
+
+@contextmanager
+def unrecorded_calls():
+    """Don't count cached calls made in this block (e.g. warm-up replays)."""
+    token = _call_depth.set(_call_depth.get() + 1)
+    try:
+        yield
+    finally:
+        _call_depth.reset(token)
+
 
-def cached(ttl: int = CACHE_TTL_JSON):
+def cached(ttl: int = CACHE_TTL_JSON, shared: bool = False):
     """
     Decorator that caches function results with TTL.
     Cache key is based on function name and arguments.
+
+    Inside a request memo (see services/request_memo.py) each key is looked
+    up once per request.
+
+    With shared=True, misses also go through the cross-worker shared cache
+    (keyed by data version), so heavy results are computed once across all
+    workers and containers.
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -45,18 +112,60 @@ def cached(ttl: int = CACHE_TTL_JSON):
             key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
             cache_key = ":".join(key_parts)
 
-            now = time.time()
-
-            # Check cache
-            if cache_key in _cache:
-                cached_value, cached_time = _cache[cache_key]
-                if now - cached_time < ttl:
-                    return cached_value
-
-            # Call function and cache result
-            result = func(*args, **kwargs)
-            _cache[cache_key] = (result, now)
+            # Swap to a newly published data generation before any cache lookup
+            check_data_generation()
+
+            depth = _call_depth.get()
+            if depth == 0:
+                _record_call(func.__name__, args, kwargs)
+
+            def load():
+                now = time.time()
+
+                # Check cache
+                if cache_key in _cache:
+                    cached_value, cached_time = _cache[cache_key]
+                    if now - cached_time < ttl:
+                        perf.record_cache("local", True)
+                        return cached_value
+                perf.record_cache("local", False)
+
+                # Call function (or fetch from the shared cache) and cache result
+                start = time.perf_counter() if perf.sampled() else None
+                shared_cache = get_shared_cache() if shared else None
+                epoch = _reload_state["epoch"]
+                deps = set()
+                token = _call_depth.set(depth + 1)
+                deps_token = _collecting_deps.set(deps)
+                try:
+                    if shared_cache and shared_cache.enabled:
+                        result = shared_cache.get_or_compute(
+                            f"{get_data_version()}:{cache_key}", ttl, lambda: func(*args, **kwargs)
+                        )
+                    else:
+                        result = func(*args, **kwargs)
+                finally:
+                    _collecting_deps.reset(deps_token)
+                    _call_depth.reset(token)
+                if start is not None:
+                    perf.record_function(f"data_loader.{func.__name__}", time.perf_counter() - start)
+                # A result computed across a data reload may mix old and new data: don't keep it
+                with _reload_lock:
+                    if epoch == _reload_state["epoch"]:
+                        _cache[cache_key] = (result, now)
+                        _cache_deps[cache_key] = frozenset(deps) or UNKNOWN_DEPS
+                return result
+
+            # Within a memoized request, each key is loaded once (even across threads)
+            memo = current_memo()
+            result = memo.get_or_compute(cache_key, load) if memo is not None else load()
+
+            # The calling cached function depends on whatever this result was built from
+            parent_deps = _collecting_deps.get()
+            if parent_deps is not None:
+                parent_deps.update(_cache_deps.get(cache_key, UNKNOWN_DEPS))
             return result
+        _cached_functions[func.__name__] = wrapper
         return wrapper
     return decorator
 
@@ -64,7 +173,13 @@ def cached(ttl: int = CACHE_TTL_JSON):
 def clear_cache():
     """Clear all cached data. Call after daily data pull."""
     global _cache
-    _cache.clear()
+    with _reload_lock:
+        _cache.clear()
+        _cache_deps.clear()
+        _reload_state["epoch"] += 1
+    memo = current_memo()
+    if memo is not None:
+        memo.clear()
     print("[Cache] All caches cleared")
 
 # Add connectors directory to path for Amazon API access
@@ -75,14 +190,231 @@ sys.path.insert(0, str(CONNECTORS_DIR))
 from dotenv import load_dotenv
 load_dotenv(CONNECTORS_DIR / ".env")
 
-# Amazon API cache - 24 hour TTL (data only changes with 8 AM daily pull)
-_amazon_cache: dict = {}
-_amazon_cache_ttl = 86400  # 24 hours in seconds
-_amazon_rate_limited_until = 0  # Timestamp when rate limit expires
+# Columnar (Arrow) sidecars for tabular datasets, when connectors write them
+from columnar import (
+    is_tabular, open_columnar, open_generation, current_generation, generation_path, sidecar_path,
+    table_data, table_rows, date_range_indices, numeric_columns, ARROW_AVAILABLE,
+    DATA_DIR,
+)
+
+# Published data manifest: per-source content hashes from the pull pipeline (see data_manifest.py)
+from data_manifest import MANIFEST_FILE, load_manifest
+
+# How often each worker checks for a newly published data generation or manifest (seconds)
+GENERATION_CHECK_INTERVAL = 5
+
+_generation = {"current": None, "checked_at": 0.0}
+_manifest = {"version": None, "mtime_ns": None, "hashes": {}}
+_manifest_lock = threading.Lock()
+
+# Bumped whenever cached results are evicted; computations started before a bump aren't cached
+_reload_lock = threading.Lock()
+_reload_state = {"epoch": 0, "last": None}
+_reload_hooks: list[Callable[[list[str]], None]] = []
+
+
+def add_reload_hook(hook: Callable[[list[str]], None]) -> None:
+    """Register a callback run with the changed sources after a data reload evicts cached results."""
+    _reload_hooks.append(hook)
+
+
+def _evict(changed: set) -> int:
+    """
+    Drop cached results built from any of the changed sources.
+
+    Everything goes for "*" in changed; results with unknown inputs ("*" in
+    their deps) go on any change.
+    """
+    stale = []
+    for key in _cache:
+        deps = _cache_deps.get(key, UNKNOWN_DEPS)
+        if "*" in changed or "*" in deps or not changed.isdisjoint(deps):
+            stale.append(key)
+    for key in stale:
+        _cache.pop(key, None)
+        _cache_deps.pop(key, None)
+    return len(stale)
+
+
+def _apply_manifest(manifest: dict, mtime_ns: int) -> None:
+    """Swap to a new manifest version: its generation, minus caches built from changed sources."""
+    hashes = {source: entry.get("hash") for source, entry in manifest.get("sources", {}).items()}
+    if _manifest["version"] is None:
+        # First manifest seen: nothing to compare against (only a legacy generation swap)
+        changed = {"*"} if _generation["current"] not in (None, manifest.get("generation")) else set()
+    else:
+        changed = {
+            source for source in set(hashes) | set(_manifest["hashes"])
+            if hashes.get(source) != _manifest["hashes"].get(source)
+        }
+
+    with _reload_lock:
+        _generation["current"] = manifest.get("generation")
+        evicted = _evict(changed) if changed else 0
+        if changed:
+            _reload_state["epoch"] += 1
+        _manifest.update(version=manifest.get("version"), mtime_ns=mtime_ns, hashes=hashes)
+        _reload_state["last"] = {
+            "version": manifest.get("version"),
+            "generation": manifest.get("generation"),
+            "changed": sorted(changed),
+            "evicted": evicted,
+            "reloaded_at": datetime.now(EST).isoformat(),
+        }
+    if not changed:
+        return
+
+    _data_version["checked_at"] = 0.0
+    memo = current_memo()
+    if memo is not None and changed:
+        memo.clear()
+    print(f"[Data] Reloaded data manifest version {manifest.get('version')}: "
+          f"{', '.join(sorted(changed)) or 'no sources'} changed, {evicted} cached results evicted")
+    if not evicted:
+        return
+    for hook in _reload_hooks:
+        try:
+            hook(sorted(changed))
+        except Exception as e:
+            print(f"[Data] Reload hook failed: {e}")
+
+
+def _check_manifest() -> bool:
+    """Apply the published manifest if it changed on disk; False if there is none."""
+    try:
+        mtime_ns = MANIFEST_FILE.stat().st_mtime_ns
+    except OSError:
+        return False
+    with _manifest_lock:
+        if mtime_ns == _manifest["mtime_ns"]:
+            return True
+        manifest = load_manifest()
+        if manifest is None:
+            return False
+        if manifest.get("version") == _manifest["version"]:
+            _manifest["mtime_ns"] = mtime_ns
+        else:
+            _apply_manifest(manifest, mtime_ns)
+    return True
+
+
+def check_data_generation(force: bool = False) -> Optional[int]:
+    """
+    Get the published data generation, swapping to a new one if it changed.
+
+    The pull pipeline publishes a data manifest after each pull (and bumps
+    data/generations/CURRENT). Every worker notices within
+    GENERATION_CHECK_INTERVAL (force=True checks now), maps the new
+    generation's files and evicts only the cached results built from the
+    sources whose hash changed. Without a manifest, a new generation drops
+    all caches.
+    """
+    now = time.time()
+    if not force and now - _generation["checked_at"] < GENERATION_CHECK_INTERVAL:
+        return _generation["current"]
+    _generation["checked_at"] = now
+
+    if _check_manifest():
+        return _generation["current"]
+
+    generation = current_generation()
+    if generation != _generation["current"]:
+        if _generation["current"] is not None:
+            print(f"[Data] Swapping to data generation {generation}")
+            clear_cache()
+        _generation["current"] = generation
+    return generation
+
 
+def reload_data() -> dict:
+    """Check the published manifest now (rather than at the next interval) and report the reload state."""
+    check_data_generation(force=True)
+    return get_reload_status()
+
+
+def get_reload_status() -> dict:
+    """Loaded manifest version and what the last reload evicted, for monitoring."""
+    return {
+        "manifest_version": _manifest["version"],
+        "generation": _generation["current"],
+        "cached_results": len(_cache),
+        "last_reload": _reload_state["last"],
+    }
+
+
+# Data directory path (CONNECTORS_DATA_DIR or connectors/data) comes from columnar, shared with
+# the connectors; other backend modules import DATA_DIR from here
+
+# Shared cross-worker cache for heavy results (SHARED_CACHE=sqlite|redis://...|memory|off)
+from services.shared_cache import SharedCache, create_backend
+from services.period_compare import PeriodIndex
+
+SHARED_CACHE_FILE = DATA_DIR / "cache" / "shared_cache.db"
+_shared_cache: Optional[SharedCache] = None
+
+# Inputs whose changes produce a new data version (dirs under DATA_DIR, plus the changelog)
+DATA_VERSION_SOURCES = [
+    "kendall", "gsc", "google_ads", "meta_ads", "ga4", "klaviyo",
+    "shopify", "shipstation", "amazon", "aggregated",
+    # Stores the backend writes itself (responses read them too)
+    "changelog.json", "ai_recommendations.json", "ai_analysis_history.json",
+    "funnel_impact_tracking.json", "signal_correlations.json", "operational",
+]
+
+_data_version = {"value": None, "modified": 0, "checked_at": 0.0}
+
+
+def get_shared_cache() -> SharedCache:
+    """Get the shared result cache, creating its backend on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SharedCache(create_backend(os.environ.get("SHARED_CACHE", "sqlite"), SHARED_CACHE_FILE))
+    return _shared_cache
+
+
+def get_data_version() -> str:
+    """
+    Get a version string for the current data on disk.
+
+    Uses the published data generation plus the newest mtime and file count
+    of the source data. Rechecked at most every GENERATION_CHECK_INTERVAL.
+    """
+    now = time.time()
+    if _data_version["value"] and now - _data_version["checked_at"] < GENERATION_CHECK_INTERVAL:
+        return _data_version["value"]
+
+    newest = 0
+    count = 0
+    for name in DATA_VERSION_SOURCES:
+        path = DATA_DIR / name
+        try:
+            if path.is_dir():
+                for entry in os.scandir(path):
+                    if entry.is_file():
+                        newest = max(newest, entry.stat().st_mtime_ns)
+                        count += 1
+            elif path.exists():
+                newest = max(newest, path.stat().st_mtime_ns)
+                count += 1
+        except OSError:
+            continue
+
+    _data_version["value"] = f"g{check_data_generation()}-{newest}-{count}"
+    _data_version["modified"] = newest / 1e9
+    _data_version["checked_at"] = now
+    return _data_version["value"]
+
+
+def invalidate_data_version() -> None:
+    """Recompute the data version on next use (call after writing one of the backend's own stores)."""
+    _data_version["checked_at"] = 0.0
+
+
+def get_data_last_modified() -> float:
+    """Get when the source data last changed (epoch seconds)."""
+    get_data_version()
+    return _data_version["modified"]
 
-# Data directory path - relative to backend folder
-DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
 
 # Valid timeframe options
 VALID_TIMEFRAMES = [1, 2, 3, 7, 14, 30]
@@ -105,17 +437,66 @@ def load_json(filepath: Path) -> Optional[dict | list]:
     """Load a JSON file, returning None if not found."""
     try:
         with open(filepath, "r", encoding="utf-8") as f:
+            perf.record_bytes_read(filepath.name, os.fstat(f.fileno()).st_size)
+            _record_read(filepath)
             return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         return None
 
 
+def _record_arrow_read(path: Optional[Path], filepath: Path) -> None:
+    """Count an Arrow file read towards its dataset's bytes read."""
+    try:
+        perf.record_bytes_read(filepath.name, path.stat().st_size)
+    except (AttributeError, OSError):
+        pass
+
+
+def _open_dataset_table(filepath: Path):
+    """
+    Memory-map a tabular dataset's Arrow file: the current generation's, else its sidecar.
+
+    None if neither is usable (COLUMNAR_FORMAT off, no file, or the JSON
+    file is newer).
+    """
+    generation = check_data_generation()
+    if generation is not None:
+        table = open_generation(generation, filepath)
+        if table is not None:
+            _record_arrow_read(generation_path(generation, filepath), filepath)
+            _record_read(filepath)
+            return table
+    table = open_columnar(filepath)
+    if table is not None:
+        _record_arrow_read(sidecar_path(filepath), filepath)
+        _record_read(filepath)
+    return table
+
+
+def load_dataset(filepath: Path, columns: list[str] = None) -> Optional[dict | list]:
+    """
+    Load a connector dataset, preferring its columnar (Arrow) file if fresh.
+
+    Decoding the Arrow file is cheaper than re-parsing the JSON, but the
+    returned rows are Python objects built in this worker; use
+    get_dataset_table() to work on the shared mapped columns instead.
+    columns limits the row fields read from Arrow files; the JSON fallback
+    returns whole rows.
+    """
+    if is_tabular(filepath):
+        table = _open_dataset_table(filepath)
+        if table is not None:
+            return table_data(table, columns)
+    return load_json(filepath)
+
+
 def save_json(filepath: Path, data: dict | list) -> bool:
     """Save data to a JSON file."""
     try:
         filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, default=str)
+        invalidate_data_version()
         return True
     except Exception:
         return False
@@ -142,7 +523,7 @@ def get_kendall_pnl() -> Optional[dict]:
 @cached(ttl=CACHE_TTL_JSON)
 def get_kendall_historical() -> Optional[dict]:
     """Get Kendall historical metrics including first-click attribution."""
-    return load_json(DATA_DIR / "kendall" / "historical_metrics.json")
+    return load_dataset(DATA_DIR / "kendall" / "historical_metrics.json")
 
 
 @cached(ttl=CACHE_TTL_JSON)
@@ -154,7 +535,7 @@ def get_gsc_branded() -> Optional[dict]:
 @cached(ttl=CACHE_TTL_JSON)
 def get_gsc_daily_trend() -> Optional[list]:
     """Get GSC daily branded search trend."""
-    return load_json(DATA_DIR / "gsc" / "daily_branded_trend.json")
+    return load_dataset(DATA_DIR / "gsc" / "daily_branded_trend.json")
 
 
 @cached(ttl=CACHE_TTL_JSON)
@@ -166,13 +547,13 @@ def get_shopify_metrics() -> Optional[dict]:
 @cached(ttl=CACHE_TTL_JSON)
 def get_google_ads_campaigns() -> Optional[list]:
     """Get Google Ads campaign data."""
-    return load_json(DATA_DIR / "google_ads" / "campaigns_last_30d.json")
+    return load_dataset(DATA_DIR / "google_ads" / "campaigns_last_30d.json")
 
 
 @cached(ttl=CACHE_TTL_JSON)
 def get_meta_ads_campaigns() -> Optional[list]:
     """Get Meta Ads campaign data."""
-    return load_json(DATA_DIR / "meta_ads" / "campaigns_last_30d.json")
+    return load_dataset(DATA_DIR / "meta_ads" / "campaigns_last_30d.json")
 
 
 @cached(ttl=CACHE_TTL_JSON)
@@ -184,7 +565,7 @@ def get_ga4_summary() -> Optional[dict]:
 @cached(ttl=CACHE_TTL_JSON)
 def get_ga4_traffic() -> Optional[list]:
     """Get GA4 daily traffic data."""
-    return load_json(DATA_DIR / "ga4" / "daily_traffic.json")
+    return load_dataset(DATA_DIR / "ga4" / "daily_traffic.json")
 
 
 @cached(ttl=CACHE_TTL_JSON)
@@ -193,117 +574,26 @@ def get_klaviyo_summary() -> Optional[dict]:
     return load_json(DATA_DIR / "klaviyo" / "summary_last_30d.json")
 
 
-def _fetch_and_cache_all_amazon_data() -> bool:
-    """
-    Fetch 7 days of Amazon orders and cache metrics for all timeframes.
-    Returns True if successful, False otherwise.
-    """
-    global _amazon_cache, _amazon_rate_limited_until
-
-    now = datetime.now().timestamp()
-
-    # Check if we're rate limited
-    if now < _amazon_rate_limited_until:
-        return False
-
-    try:
-        from amazon_seller import AmazonSellerConnector
-        import pytz
-
-        connector = AmazonSellerConnector()
-        if not connector.configured:
-            print("[Amazon] Connector not configured")
-            return False
-
-        print("[Amazon] Fetching 7 days of orders (single API call)...")
-
-        # Use EST timezone
-        est = pytz.timezone("US/Eastern")
-        now_est = datetime.now(est)
-
-        # Fetch 7 days of orders
-        end_date = (now_est - timedelta(days=1)).strftime("%Y-%m-%d")
-        start_date = (now_est - timedelta(days=7)).strftime("%Y-%m-%d")
-
-        orders = connector.get_orders(start_date, end_date)
-
-        # Parse order dates and amounts
-        order_data = []
-        for order in orders:
-            order_date = order.get("PurchaseDate", "")[:10]  # YYYY-MM-DD
-            order_total = order.get("OrderTotal", {})
-            amount = float(order_total.get("Amount", 0)) if order_total else 0
-            order_data.append({"date": order_date, "amount": amount})
-
-        # Calculate metrics for each timeframe
-        yesterday = (now_est - timedelta(days=1)).strftime("%Y-%m-%d")
-        three_days_ago = (now_est - timedelta(days=3)).strftime("%Y-%m-%d")
-        seven_days_ago = (now_est - timedelta(days=7)).strftime("%Y-%m-%d")
-
-        for days, cutoff_date in [(1, yesterday), (3, three_days_ago), (7, seven_days_ago)]:
-            filtered = [o for o in order_data if o["date"] >= cutoff_date]
-            total_orders = len(filtered)
-            total_sales = sum(o["amount"] for o in filtered)
-
-            metrics = {
-                "sales": round(total_sales, 2),
-                "orders": total_orders,
-                "avg_order_value": round(total_sales / total_orders, 2) if total_orders > 0 else 0,
-            }
-            _amazon_cache[f"amazon_{days}"] = (metrics, now)
-
-        print(f"[Amazon] SUCCESS - Cached all timeframes (7d: {len(order_data)} orders, ${sum(o['amount'] for o in order_data):,.2f})")
-        return True
-
-    except Exception as e:
-        error_str = str(e)
-        print(f"[Amazon] Error: {error_str}")
-        if "429" in error_str or "QuotaExceeded" in error_str:
-            _amazon_rate_limited_until = now + 60
-            print("[Amazon] Rate limited - backing off for 60 seconds")
-        return False
-
-
+@per_request
 def get_amazon_direct(days: int = 1) -> Optional[dict]:
     """
-    Get Amazon sales data directly from Amazon SP-API with caching.
+    Get Amazon sales for the last N complete days from SP-API report data.
 
-    This fetches all timeframes in a single API call for efficiency.
-    Results are cached for 5 minutes to improve page load speed.
+    Served from the background refresher's warm rollups, so SP-API is never
+    called on a request path. Includes data_age_seconds / data_updated_at.
 
     Args:
-        days: Number of days to fetch (1 = yesterday, 3 = 3 days, 7 = last week)
+        days: Number of days to include (1 = yesterday, 3 = 3 days, 7 = last week)
 
     Returns:
-        Dictionary with Amazon metrics or None if API not available
+        Dictionary with Amazon metrics, or None if the stored report data
+        doesn't cover the requested window
     """
-    global _amazon_cache, _amazon_rate_limited_until
-
-    now = datetime.now().timestamp()
-    cache_key = f"amazon_{days}"
-
-    # Check cache first
-    if cache_key in _amazon_cache:
-        cached_data, cached_time = _amazon_cache[cache_key]
-        if now - cached_time < _amazon_cache_ttl:
-            print(f"[Amazon] Cache hit for {days} day(s)")
-            return cached_data
-
-    # Check if we're rate limited
-    if now < _amazon_rate_limited_until:
-        wait_time = int(_amazon_rate_limited_until - now)
-        print(f"[Amazon] Rate limited (retry in {wait_time}s)")
-        return None
-
-    # Fetch and cache all timeframes at once
-    if _fetch_and_cache_all_amazon_data():
-        # Return from newly populated cache
-        if cache_key in _amazon_cache:
-            return _amazon_cache[cache_key][0]
-
-    return None
+    from services.amazon_refresher import get_amazon_rollup
+    return get_amazon_rollup(days)
 
 
+@per_request
 def get_channel_campaigns(channel: str) -> list[dict]:
     """Get campaign breakdown for a specific channel."""
     attribution = get_kendall_attribution()
@@ -389,6 +679,7 @@ def update_shipping_reminder(cost: float = None, kendall_setting: float = None)
     return state
 
 
+@per_request
 def get_shipstation_average() -> Optional[float]:
     """Get the average shipping cost from ShipStation data file."""
     shipping_data = load_json(DATA_DIR / "shipstation" / "shipping_costs_last_30d.json")
@@ -624,6 +915,7 @@ def get_decision_signals() -> dict:
 # TIMEFRAME-BASED METRICS (for short-term analysis: 1, 3, 7, 14, 30 days)
 # ============================================================================
 
+@per_request
 def get_date_cutoff(days: int) -> str:
     """Get the date cutoff string for filtering data (EST timezone)."""
     now_est = datetime.now(EST)
@@ -631,12 +923,239 @@ def get_date_cutoff(days: int) -> str:
     return cutoff.strftime("%Y-%m-%d")
 
 
+@per_request
 def filter_by_date(items: list, days: int, date_field: str = "date") -> list:
     """Filter a list of items by date field within the last N days."""
     cutoff = get_date_cutoff(days)
     return [item for item in items if item.get(date_field, "") >= cutoff]
 
 
+# =============================================================================
+# PERIOD COMPARISONS (current vs previous period over Kendall daily history)
+# =============================================================================
+
+@cached(ttl=CACHE_TTL_JSON)
+def get_period_index() -> Optional[PeriodIndex]:
+    """
+    Get the date-indexed Kendall daily history (built once per data load).
+
+    With an Arrow file available the index sums the memory-mapped columns
+    directly; otherwise it is built from the decoded rows.
+    """
+    table = get_dataset_table("historical")
+    if table is not None:
+        dates, columns, int_fields = numeric_columns(table)
+        if columns:
+            return PeriodIndex.from_columns(
+                dates, columns, int_fields, lambda positions: table_rows(table.take(positions)),
+            )
+    historical = get_kendall_historical()
+    if not historical or not historical.get("metrics"):
+        return None
+    return PeriodIndex(historical["metrics"])
+
+
+@per_request
+def compare_periods(windows: tuple, fields: tuple = None) -> list[dict]:
+    """
+    Compare current vs previous periods for several (window, offset) pairs in one pass.
+
+    See services/period_compare.py for the result shape. Returns [] without
+    historical data.
+    """
+    index = get_period_index()
+    if index is None:
+        return []
+    return index.compare(list(windows), get_date_cutoff, fields)
+
+
+@cached(ttl=CACHE_TTL_COMPUTED)
+def get_timeframe_comparisons() -> dict:
+    """Current vs previous period for every VALID_TIMEFRAMES window, computed in one batch."""
+    comparisons = compare_periods(tuple((days, 0) for days in VALID_TIMEFRAMES))
+    return {c["window"]: c for c in comparisons}
+
+
+# =============================================================================
+# ROW QUERIES (field projection, date range and pagination for bulk endpoints)
+# =============================================================================
+
+# Tabular datasets served by bulk endpoints: name -> (path, key holding the rows)
+ROW_DATASETS = {
+    "historical": (DATA_DIR / "kendall" / "historical_metrics.json", "metrics"),
+    "google_ads": (DATA_DIR / "google_ads" / "campaigns_last_30d.json", None),
+    "meta_ads": (DATA_DIR / "meta_ads" / "campaigns_last_30d.json", None),
+}
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Parse a comma-separated fields parameter into a sorted tuple (None = all fields, also for an empty list)."""
+    if fields is None:
+        return None
+    return tuple(sorted({f.strip() for f in fields.split(",") if f.strip()})) or None
+
+
+def project_rows(rows: list, fields: Optional[tuple]) -> list:
+    """Keep only the given fields in each row."""
+    if fields is None:
+        return rows
+    return [{f: row[f] for f in fields if f in row} for row in rows]
+
+
+def paginate(items: list, limit: Optional[int] = None, cursor: Optional[str] = None) -> tuple[list, Optional[str]]:
+    """
+    Slice a page from a list (or an Arrow table or array).
+
+    The cursor is the opaque value returned as next_cursor by the previous
+    page. Returns (page, next_cursor); next_cursor is None on the last page,
+    and with limit 0 (no rows, just the total) - a cursor there would point
+    at the same offset forever. Raises ValueError for a malformed cursor.
+    """
+    offset = 0
+    if cursor:
+        if not cursor.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+        offset = int(cursor)
+    if limit is None:
+        return items[offset:], None
+
+    end = offset + limit
+    return items[offset:end], (str(end) if limit and end < len(items) else None)
+
+
+@cached(ttl=CACHE_TTL_JSON)
+def get_dataset_table(dataset: str):
+    """
+    Get a bulk dataset as a memory-mapped Arrow table, or None without a usable Arrow file.
+
+    The table's buffers are the mapped file, shared with every other worker
+    reading the same generation; nothing is decoded until rows are taken.
+    """
+    path, _ = ROW_DATASETS[dataset]
+    return _open_dataset_table(path)
+
+
+@cached(ttl=CACHE_TTL_JSON)
+def get_dataset_rows(dataset: str, columns: Optional[tuple] = None) -> list:
+    """
+    Get the rows of a bulk dataset, optionally with only some columns.
+
+    With Arrow files available only the requested columns are decoded;
+    otherwise rows come from the cached JSON load and are projected in
+    memory.
+    """
+    path, rows_key = ROW_DATASETS[dataset]
+    if columns is not None and ARROW_AVAILABLE:
+        data = load_dataset(path, list(columns))
+    else:
+        data = {
+            "historical": get_kendall_historical,
+            "google_ads": get_google_ads_campaigns,
+            "meta_ads": get_meta_ads_campaigns,
+        }[dataset]()
+
+    if not data:
+        return []
+    rows = data.get(rows_key, []) if rows_key else data
+    return project_rows(rows, columns)
+
+
+def query_rows(
+    rows: list,
+    fields: Optional[tuple] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    date_field: str = "date",
+) -> tuple[list, int, Optional[str]]:
+    """
+    Filter rows to a date range (inclusive YYYY-MM-DD bounds), then page and project them.
+
+    Only the returned page is projected, so the work scales with the page.
+    Returns (page, total_matching_rows, next_cursor).
+    """
+    if date_from or date_to:
+        # Compare the date part only, so timestamped rows match inclusively on both bounds
+        rows = [
+            r for r in rows
+            if (not date_from or r.get(date_field, "")[:10] >= date_from)
+            and (not date_to or r.get(date_field, "")[:10] <= date_to)
+        ]
+    page, next_cursor = paginate(rows, limit, cursor)
+    return project_rows(page, fields), len(rows), next_cursor
+
+
+def query_dataset(
+    dataset: str,
+    fields: Optional[tuple] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> tuple[list, int, Optional[str]]:
+    """
+    Query a bulk dataset's rows. Returns (page, total_matching_rows, next_cursor).
+
+    With an Arrow table the date filter and paging run on its mapped columns
+    and only the returned page is decoded; otherwise rows are filtered in
+    memory (query_rows).
+    """
+    table = get_dataset_table(dataset)
+    if table is not None:
+        if date_from or date_to:
+            indices = date_range_indices(table, date_from, date_to)
+            if indices is not None:
+                positions, next_cursor = paginate(indices, limit, cursor)
+                return table_rows(table.take(positions), fields), len(indices), next_cursor
+        else:
+            page, next_cursor = paginate(table, limit, cursor)
+            return table_rows(page, fields), len(table), next_cursor
+
+    columns = None
+    if fields is not None:
+        # The date column is needed for range filtering even if not returned
+        columns = tuple(sorted(set(fields) | {"date"}))
+    rows = get_dataset_rows(dataset, columns)
+    return query_rows(rows, fields, date_from, date_to, limit, cursor)
+
+
+def query_attribution(
+    data: dict,
+    fields: Optional[tuple] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> tuple[dict, int, Optional[str]]:
+    """
+    Page through Kendall attribution sources and project their metrics.
+
+    Sources are paged in file order (Kendall sorts them); fields limits the
+    metric keys in each source's total and breakdowns. Keys starting with
+    "_" and filters_applied are always kept.
+    Returns (data, total_sources, next_cursor).
+    """
+    meta = {k: v for k, v in data.items() if k.startswith("_") or k == "filters_applied"}
+    sources = [k for k in data if k not in meta]
+    page, next_cursor = paginate(sources, limit, cursor)
+
+    def project(metrics: dict) -> dict:
+        if fields is None or not isinstance(metrics, dict):
+            return metrics
+        return {f: metrics[f] for f in fields if f in metrics}
+
+    result = dict(meta)
+    for source in page:
+        entry = data[source]
+        if fields is not None and isinstance(entry, dict):
+            entry = dict(entry)
+            if "total" in entry:
+                entry["total"] = project(entry["total"])
+            if isinstance(entry.get("breakdowns"), dict):
+                entry["breakdowns"] = {name: project(m) for name, m in entry["breakdowns"].items()}
+        result[source] = entry
+    return result, len(sources), next_cursor
+
+
 @cached(ttl=CACHE_TTL_COMPUTED)
 def get_historical_metrics_for_timeframe(days: int = 30) -> dict:
     """Get aggregated metrics from historical data for a specific timeframe."""
@@ -660,13 +1179,17 @@ def get_historical_metrics_for_timeframe(days: int = 30) -> dict:
     total_spend = sum(m.get("spend", 0) for m in filtered)
     total_cam = sum(m.get("contrib_after_mkt", 0) for m in filtered)
 
-    # Amazon metrics - prefer direct API data, fall back to Kendall
+    # Amazon metrics - prefer SP-API report data, fall back to Kendall
     amazon_direct = get_amazon_direct(days)
     amazon_data_source = "api"
+    amazon_data_age = None
+    amazon_data_updated_at = None
 
     if amazon_direct:
         amazon_sales = amazon_direct.get("sales", 0)
         amazon_orders = amazon_direct.get("orders", 0)
+        amazon_data_age = amazon_direct.get("data_age_seconds")
+        amazon_data_updated_at = amazon_direct.get("data_updated_at")
     else:
         # Fall back to Kendall data
         amazon_data_source = "kendall"
@@ -703,12 +1226,16 @@ def get_historical_metrics_for_timeframe(days: int = 30) -> dict:
         "amazon_spend": amazon_spend,
         "amazon_roas": amazon_sales / amazon_spend if amazon_spend > 0 else 0,
         "amazon_data_source": amazon_data_source,
+        "amazon_data_age_seconds": amazon_data_age,
+        "amazon_data_updated_at": amazon_data_updated_at,
         # Meta TOF data for correlation
         "meta_first_click": meta_first_click,
         "meta_spend": meta_spend,
     }
 
 
+@per_request
+@perf.timed
 def get_google_campaigns_for_timeframe(days: int = 30) -> list:
     """Get Google Ads campaigns aggregated for the specified timeframe."""
     campaigns = get_google_ads_campaigns()
@@ -758,6 +1285,8 @@ def get_google_campaigns_for_timeframe(days: int = 30) -> list:
     return result
 
 
+@per_request
+@perf.timed
 def get_meta_campaigns_for_timeframe(days: int = 30) -> list:
     """Get Meta Ads campaigns aggregated for the specified timeframe."""
     campaigns = get_meta_ads_campaigns()
@@ -808,6 +1337,8 @@ def get_meta_campaigns_for_timeframe(days: int = 30) -> list:
     return result
 
 
+@per_request
+@perf.timed
 def get_halo_effect_trend(days: int = 30) -> dict:
     """
     Get daily ad spend vs Amazon sales data for halo effect correlation chart.
@@ -889,7 +1420,14 @@ def get_halo_effect_trend(days: int = 30) -> dict:
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+# Kendall daily fields compared by get_spend_outcome_correlation
+SPEND_OUTCOME_FIELDS = (
+    "spend", "google_spend", "facebook_spend", "amazon_spend", "sales", "orders",
+    "nc_orders", "amz_us_sales", "facebook_fc", "contrib_after_mkt", "mer", "ncac",
+)
+
+
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_spend_outcome_correlation(days: int = 14) -> dict:
     """
     Analyze the correlation between ad spend changes and actual business outcomes.
@@ -907,41 +1445,35 @@ def get_spend_outcome_correlation(days: int = 14) -> dict:
     if len(metrics_list) < days * 2:
         return {"error": f"Need at least {days * 2} days of data for comparison"}
 
-    # Get current period and previous period
-    cutoff_current = get_date_cutoff(days)
-    cutoff_prev = get_date_cutoff(days * 2)
-
-    current_period = [m for m in metrics_list if m.get("date", "") >= cutoff_current]
-    prev_period = [m for m in metrics_list if cutoff_prev <= m.get("date", "") < cutoff_current]
+    # Current period vs previous period, totals for both in one pass
+    comparison = compare_periods(((days, 0),), SPEND_OUTCOME_FIELDS)[0]
+    cutoff_current = comparison["current"]["start"]
+    cutoff_prev = comparison["previous"]["start"]
 
-    if not current_period or not prev_period:
+    if not comparison["current"]["days"] or not comparison["previous"]["days"]:
         return {"error": "Not enough data for comparison period"}
 
-    # Calculate totals for each period
-    def sum_metrics(period: list) -> dict:
-        # Use Kendall's MER and NCAC directly (average of daily values)
-        # This matches what Kendall shows in their UI
-        avg_mer = sum(m.get("mer", 0) for m in period) / len(period) if period else 0
-        avg_ncac = sum(m.get("ncac", 0) for m in period) / len(period) if period else 0
-
+    def period_metrics(period: dict) -> dict:
+        totals = period["totals"]
         return {
-            "ad_spend": sum(m.get("spend", 0) for m in period),
-            "google_spend": sum(m.get("google_spend", 0) for m in period),
-            "meta_spend": sum(m.get("facebook_spend", 0) for m in period),
-            "amazon_spend": sum(m.get("amazon_spend", 0) for m in period),
-            "shopify_revenue": sum(m.get("sales", 0) for m in period),
-            "shopify_orders": sum(m.get("orders", 0) for m in period),
-            "new_customers": sum(m.get("nc_orders", 0) for m in period),
-            "amazon_sales": sum(m.get("amz_us_sales", 0) for m in period),
-            "meta_first_click": sum(m.get("facebook_fc", 0) for m in period),
-            "cam": sum(m.get("contrib_after_mkt", 0) for m in period),
-            # Use Kendall's pre-calculated efficiency metrics
-            "mer": avg_mer,
-            "ncac": avg_ncac,
+            "ad_spend": totals["spend"],
+            "google_spend": totals["google_spend"],
+            "meta_spend": totals["facebook_spend"],
+            "amazon_spend": totals["amazon_spend"],
+            "shopify_revenue": totals["sales"],
+            "shopify_orders": totals["orders"],
+            "new_customers": totals["nc_orders"],
+            "amazon_sales": totals["amz_us_sales"],
+            "meta_first_click": totals["facebook_fc"],
+            "cam": totals["contrib_after_mkt"],
+            # Use Kendall's MER and NCAC directly (average of daily values)
+            # This matches what Kendall shows in their UI
+            "mer": period["averages"]["mer"],
+            "ncac": period["averages"]["ncac"],
         }
 
-    current = sum_metrics(current_period)
-    previous = sum_metrics(prev_period)
+    current = period_metrics(comparison["current"])
+    previous = period_metrics(comparison["previous"])
 
     # Calculate percentage changes
     def pct_change(curr: float, prev: float) -> float:
@@ -1048,7 +1580,7 @@ def get_spend_outcome_correlation(days: int = 14) -> dict:
 
     # Build daily trend data for charts
     daily_trend = []
-    for m in current_period:
+    for m in get_period_index().rows_between(cutoff_current):
         daily_trend.append({
             "date": m.get("date", ""),
             "ad_spend": m.get("spend", 0),
@@ -1115,7 +1647,7 @@ def get_spend_outcome_correlation(days: int = 14) -> dict:
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_channel_correlation(days: int = 14) -> dict:
     """
     Break down spend-to-outcome correlation by channel (Google vs Meta).
@@ -1130,28 +1662,19 @@ def get_channel_correlation(days: int = 14) -> dict:
     if len(metrics_list) < days * 2:
         return {"error": f"Need at least {days * 2} days of data"}
 
-    cutoff_current = get_date_cutoff(days)
-    cutoff_prev = get_date_cutoff(days * 2)
-
-    current_period = [m for m in metrics_list if m.get("date", "") >= cutoff_current]
-    prev_period = [m for m in metrics_list if cutoff_prev <= m.get("date", "") < cutoff_current]
+    comparison = compare_periods(((days, 0),), ("google_spend", "facebook_spend", "sales", "nc_orders"))[0]
+    current, previous = comparison["current"], comparison["previous"]
 
-    if not current_period or not prev_period:
+    if not current["days"] or not previous["days"]:
         return {"error": "Not enough data"}
 
     def analyze_channel(spend_key: str, channel_name: str) -> dict:
-        curr_spend = sum(m.get(spend_key, 0) for m in current_period)
-        prev_spend = sum(m.get(spend_key, 0) for m in prev_period)
-
-        curr_revenue = sum(m.get("sales", 0) for m in current_period)
-        prev_revenue = sum(m.get("sales", 0) for m in prev_period)
+        curr_spend = current["totals"][spend_key]
+        prev_spend = previous["totals"][spend_key]
 
-        curr_nc = sum(m.get("nc_orders", 0) for m in current_period)
-        prev_nc = sum(m.get("nc_orders", 0) for m in prev_period)
-
-        spend_change = ((curr_spend - prev_spend) / prev_spend * 100) if prev_spend > 0 else 0
-        revenue_change = ((curr_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0
-        nc_change = ((curr_nc - prev_nc) / prev_nc * 100) if prev_nc > 0 else 0
+        spend_change = comparison["changes"][spend_key]
+        revenue_change = comparison["changes"]["sales"]
+        nc_change = comparison["changes"]["nc_orders"]
 
         # Correlation score: how well does spend change predict outcome change?
         # If both move same direction and similar magnitude, score is high
@@ -1189,7 +1712,7 @@ def get_channel_correlation(days: int = 14) -> dict:
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_recently_actioned_items(days: int = 7) -> set:
     """Get channels/campaigns that have been actioned recently."""
     from services.changelog import get_recent_entries
@@ -1214,6 +1737,7 @@ def get_recently_actioned_items(days: int = 7) -> set:
     return actioned
 
 
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_budget_recommendations(days: int = 7) -> dict:
     """
     Generate actionable budget recommendations based on triangulation data.
@@ -1471,17 +1995,14 @@ def get_timeframe_summary(days: int = 30) -> dict:
     meta_revenue = sum(c.get("purchase_value", 0) for c in meta_camps)
 
     # Get comparison period (previous N days)
-    prev_historical = get_kendall_historical()
-    prev_metrics = []
-    if prev_historical:
-        all_metrics = prev_historical.get("metrics", [])
-        cutoff_current = get_date_cutoff(days)
-        cutoff_prev = get_date_cutoff(days * 2)
-        prev_metrics = [m for m in all_metrics if cutoff_prev <= m.get("date", "") < cutoff_current]
-
-    prev_sales = sum(m.get("sales", 0) for m in prev_metrics)
-    prev_orders = sum(m.get("orders", 0) for m in prev_metrics)
-    prev_cam = sum(m.get("contrib_after_mkt", 0) for m in prev_metrics)
+    prev_totals = {"sales": 0, "orders": 0, "contrib_after_mkt": 0}
+    comparisons = compare_periods(((days, 0),), tuple(prev_totals))
+    if comparisons:
+        prev_totals = comparisons[0]["previous"]["totals"]
+
+    prev_sales = prev_totals["sales"]
+    prev_orders = prev_totals["orders"]
+    prev_cam = prev_totals["contrib_after_mkt"]
 
     # Calculate changes
     current_sales = historical.get("total_sales", 0)
@@ -1573,6 +2094,8 @@ def get_timeframe_summary(days: int = 30) -> dict:
                 "roas": historical.get("amazon_roas", 0),
                 "meta_first_click": historical.get("meta_first_click", 0),
                 "data_source": historical.get("amazon_data_source", "unknown"),
+                "data_age_seconds": historical.get("amazon_data_age_seconds"),
+                "data_updated_at": historical.get("amazon_data_updated_at"),
             },
         },
         "problem_campaigns": problem_campaigns[:10],
@@ -18,7 +18,6 @@ Timeframe strategy:
 
 import json
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Optional
 from zoneinfo import ZoneInfo
 
@@ -30,12 +29,14 @@ from services.data_loader import (
     get_date_cutoff,
     cached,
     CACHE_TTL_HEAVY,
+    DATA_DIR,
+    invalidate_data_version,
 )
+from services.rollups import get_rollup_buckets
 
 EST = ZoneInfo("America/New_York")
 
 # Store impact tracking data
-DATA_DIR = Path(__file__).parent.parent.parent / "connectors" / "data"
 IMPACT_FILE = DATA_DIR / "funnel_impact_tracking.json"
 
 # Timeframes to track (in days)
@@ -63,6 +64,7 @@ def _save_impact_data(data: dict) -> None:
     data["last_updated"] = datetime.now(EST).isoformat()
     with open(IMPACT_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, default=str)
+    invalidate_data_version()
 
 
 def get_funnel_metrics_for_period(start_date: str, end_date: str) -> dict:
@@ -331,7 +333,7 @@ def get_change_impact_status(change_entry: dict, now: Optional[datetime] = None)
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_all_change_impacts(days: int = 30) -> list[dict]:
     """
     Get impact status for all recent changelog entries.
@@ -597,6 +599,9 @@ CORRELATION_FILE = DATA_DIR / "signal_correlations.json"
 # Lag periods to analyze (in days)
 LAG_PERIODS = [0, 3, 7, 14]  # Same week, 3 days later, 1 week later, 2 weeks later
 
+# Weeks with fewer days of data are left out of the correlation (e.g. the current week)
+MIN_WEEK_DAYS = 4
+
 
 def _load_correlation_data() -> dict:
     """Load correlation learning data from file."""
@@ -618,6 +623,7 @@ def _save_correlation_data(data: dict) -> None:
     data["last_updated"] = datetime.now(EST).isoformat()
     with open(CORRELATION_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, default=str)
+    invalidate_data_version()
 
 
 def calculate_signal_correlation(
@@ -689,108 +695,37 @@ def get_weekly_metrics(days: int = 60) -> list[dict]:
     """
     Get weekly aggregated metrics for correlation analysis.
 
-    Returns a list of weekly buckets with averaged metrics.
+    Returns the weeks (Monday start) beginning in the last `days` days with
+    at least MIN_WEEK_DAYS days of data, read from the weekly rollup tables.
     """
-    historical = get_kendall_historical()
-    if not historical:
-        return []
-
-    metrics_list = historical.get("metrics", [])
-    if not metrics_list:
+    weeks = get_rollup_buckets("week")
+    if not weeks:
         return []
 
-    # Get date range
-    now = datetime.now(EST)
-    cutoff = (now - timedelta(days=days)).strftime("%Y-%m-%d")
-
-    # Filter and sort by date
-    filtered = [
-        m for m in metrics_list
-        if m.get("date", "") >= cutoff
-    ]
-    filtered.sort(key=lambda x: x.get("date", ""))
+    cutoff = get_date_cutoff(days)
+    meta_weeks = get_rollup_buckets("week", "meta") or {}
+    amazon_weeks = get_rollup_buckets("week", "amazon") or {}
 
-    if not filtered:
-        return []
-
-    # Get branded search data
-    gsc_data = get_gsc_daily_trend() or []
-    branded_by_date = {
-        d.get("date", ""): d.get("branded_clicks", 0)
-        for d in gsc_data
-    }
-
-    # Group into weeks
-    weeks = []
-    current_week = []
-    week_start = None
-
-    for m in filtered:
-        date_str = m.get("date", "")
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-        except ValueError:
+    result = []
+    for start in sorted(weeks):
+        week = weeks[start]
+        if start < cutoff or week["days"] < MIN_WEEK_DAYS:
             continue
-
-        if week_start is None:
-            week_start = date
-
-        if (date - week_start).days >= 7:
-            # Process completed week
-            if current_week:
-                weeks.append(_aggregate_week(current_week, branded_by_date))
-            current_week = [m]
-            week_start = date
-        else:
-            current_week.append(m)
-
-    # Add final partial week if has enough data
-    if len(current_week) >= 4:
-        weeks.append(_aggregate_week(current_week, branded_by_date))
-
-    return weeks
-
-
-def _aggregate_week(metrics: list[dict], branded_by_date: dict) -> dict:
-    """Aggregate daily metrics into weekly totals/averages."""
-    if not metrics:
-        return {}
-
-    start_date = metrics[0].get("date", "")
-    end_date = metrics[-1].get("date", "")
-
-    # Sum metrics
-    total_revenue = sum(m.get("sales", 0) for m in metrics)
-    total_orders = sum(m.get("orders", 0) for m in metrics)
-    total_nc_orders = sum(m.get("nc_orders", 0) for m in metrics)
-    total_spend = sum(m.get("spend", 0) for m in metrics)
-    total_meta_spend = sum(m.get("facebook_spend", 0) for m in metrics)
-    total_amazon = sum(m.get("amz_us_sales", 0) for m in metrics)
-
-    # Get branded clicks for dates in this week
-    branded_clicks = sum(
-        branded_by_date.get(m.get("date", ""), 0)
-        for m in metrics
-    )
-
-    # Averages
-    avg_mer = sum(m.get("mer", 0) for m in metrics) / len(metrics)
-    avg_ncac = sum(m.get("ncac", 0) for m in metrics) / len(metrics)
-
-    return {
-        "week_start": start_date,
-        "week_end": end_date,
-        "days": len(metrics),
-        "revenue": round(total_revenue, 2),
-        "orders": total_orders,
-        "new_customers": total_nc_orders,
-        "ad_spend": round(total_spend, 2),
-        "meta_spend": round(total_meta_spend, 2),
-        "amazon_sales": round(total_amazon, 2),
-        "branded_clicks": branded_clicks,
-        "mer": round(avg_mer, 2),
-        "ncac": round(avg_ncac, 2),
-    }
+        result.append({
+            "week_start": week["start"],
+            "week_end": week["end"],
+            "days": week["days"],
+            "revenue": week.get("revenue", 0),
+            "orders": week.get("orders", 0),
+            "new_customers": week.get("new_customers", 0),
+            "ad_spend": week.get("spend", 0),
+            "meta_spend": meta_weeks.get(start, {}).get("spend", 0),
+            "amazon_sales": amazon_weeks.get(start, {}).get("revenue", 0),
+            "branded_clicks": week.get("branded_clicks", 0),
+            "mer": round(week.get("mer_sum", 0) / week["days"], 2),
+            "ncac": round(week.get("ncac_sum", 0) / week["days"], 2),
+        })
+    return result
 
 
 def analyze_signal_predictiveness(days: int = 60) -> dict:
@@ -0,0 +1,112 @@
+"""
+HTTP caching for the TuffWraps API.
+
+GET responses under /api/metrics/ and /api/synthesis/ get an ETag derived
+from the data version and the request (path + query), plus Last-Modified and
+Cache-Control headers. A matching If-None-Match (or an If-Modified-Since at
+or after the data's last change) returns 304 before the endpoint runs, so
+the frontend or a CDN can skip re-downloading unchanged payloads.
+
+The data version also covers the stores the backend writes itself
+(changelog, recommendations, analysis history, impact tracking, reminders),
+and each write invalidates it, so those changes revalidate too. Endpoints
+whose responses depend on more than stored data (live status, hours since a
+change for funnel impact and cooling-off) are excluded.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from services.data_loader import EST, get_data_version, get_data_last_modified
+
+CACHEABLE_PREFIXES = ("/api/metrics/", "/api/synthesis/")
+
+# Responses that change without a data pull
+UNCACHEABLE_PREFIXES = (
+    "/api/metrics/amazon/status",
+    "/api/metrics/_perf",
+    "/api/metrics/_profiles",
+    "/api/metrics/shipping-reminder",
+    "/api/synthesis/status",
+    "/api/synthesis/context",
+    "/api/synthesis/funnel-impact",
+    "/api/synthesis/history",
+    "/api/synthesis/recommendations",
+)
+
+# Browsers keep a copy but revalidate every time; set e.g. "public, max-age=60" behind a CDN
+CACHE_CONTROL = os.environ.get("HTTP_CACHE_CONTROL", "private, no-cache")
+
+
+def is_cacheable(request: Request) -> bool:
+    """Check if a request's response can be cached by data version."""
+    path = request.url.path
+    return (
+        request.method == "GET"
+        and path.startswith(CACHEABLE_PREFIXES)
+        and not path.startswith(UNCACHEABLE_PREFIXES)
+    )
+
+
+def compute_etag(request: Request) -> str:
+    """Build a weak ETag from the data version, today's date (EST) and the request."""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    today = datetime.now(EST).strftime("%Y-%m-%d")  # Date windows roll over at midnight
+    raw = f"{get_data_version()}|{today}|{request.url.path}?{query}"
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    bare = etag.removeprefix("W/")
+    return any(c.removeprefix("W/") == bare for c in candidates)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    """Check an If-Modified-Since header against the data's last change."""
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have 1-second resolution
+    return int(last_modified) <= since
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """Adds ETag / Last-Modified / Cache-Control and answers 304 for unchanged data."""
+
+    async def dispatch(self, request: Request, call_next):
+        if not is_cacheable(request):
+            return await call_next(request)
+
+        etag = compute_etag(request)
+        # Date windows roll over at midnight EST, so that counts as a change too
+        midnight = datetime.now(EST).replace(hour=0, minute=0, second=0, microsecond=0)
+        last_modified = max(get_data_last_modified(), midnight.timestamp())
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+        elif request.headers.get("if-modified-since"):
+            if _not_modified_since(request.headers["if-modified-since"], last_modified):
+                return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
@@ -14,6 +14,7 @@ The key insight: no single attribution source tells the whole truth.
 This service combines all signals into a unified view.
 """
 
+import importlib.util
 import json
 import os
 from pathlib import Path
@@ -22,12 +23,8 @@ from typing import Optional, Literal
 from functools import lru_cache
 import statistics
 
-# Try to import MCP client for Kendall, fall back to file-based data
-try:
-    from mcp import ClientSession
-    MCP_AVAILABLE = True
-except ImportError:
-    MCP_AVAILABLE = False
+# MCP client for Kendall (imported where used), falling back to file-based data
+MCP_AVAILABLE = importlib.util.find_spec("mcp") is not None
 
 from services.data_loader import (
     get_kendall_attribution,
@@ -43,6 +40,7 @@ from services.data_loader import (
     cached,
     EST,
 )
+from services.period_compare import compare_row_windows, pct_change
 
 
 # Weights for the composite score (should sum to 1.0)
@@ -426,7 +424,7 @@ def get_platform_vs_kendall_gap(platform_roas: float, kendall_roas: float) -> di
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_multi_signal_campaign_view(
     platform: Literal["facebook", "google"],
     days: int = 30,
@@ -919,7 +917,7 @@ def _generate_platform_summary(campaigns: list) -> dict:
     }
 
 
-@cached(ttl=CACHE_TTL_HEAVY)
+@cached(ttl=CACHE_TTL_HEAVY, shared=True)
 def get_cross_channel_correlation(days: int = 30) -> dict:
     """
     Calculate correlation between Meta TOF spend and Google Branded Search performance.
@@ -1019,20 +1017,10 @@ def get_cross_channel_correlation(days: int = 30) -> dict:
 
     # Calculate week-over-week trends
     if len(daily_data) >= 14:
-        current_week = daily_data[-7:]
-        previous_week = daily_data[-14:-7]
-
-        current_meta = sum(d["meta_spend"] for d in current_week)
-        previous_meta = sum(d["meta_spend"] for d in previous_week)
-        meta_trend = ((current_meta - previous_meta) / previous_meta * 100) if previous_meta > 0 else 0
-
-        current_branded = sum(d.get("branded_clicks", 0) for d in current_week)
-        previous_branded = sum(d.get("branded_clicks", 0) for d in previous_week)
-        branded_trend = ((current_branded - previous_branded) / previous_branded * 100) if previous_branded > 0 else 0
-
-        current_google_fc = sum(d["google_fc"] for d in current_week)
-        previous_google_fc = sum(d["google_fc"] for d in previous_week)
-        google_trend = ((current_google_fc - previous_google_fc) / previous_google_fc * 100) if previous_google_fc > 0 else 0
+        current_week, previous_week = compare_row_windows(daily_data, ("meta_spend", "branded_clicks", "google_fc"), 7)
+        meta_trend = pct_change(current_week["meta_spend"], previous_week["meta_spend"])
+        branded_trend = pct_change(current_week["branded_clicks"], previous_week["branded_clicks"])
+        google_trend = pct_change(current_week["google_fc"], previous_week["google_fc"])
 
         # Check if trends move together
         if meta_trend < -10 and branded_trend < -10:
@@ -0,0 +1,328 @@
+"""
+Performance instrumentation for the TuffWraps API.
+
+Records, in process:
+- Per-route request latency (PerfMiddleware)
+- Per-function latency for data_loader/service functions (@timed, and every
+  computed miss of a @cached function)
+- Cache hit rates (per-process TTL cache, shared cache)
+- Bytes read from connectors/data
+- Anthropic call latency and token usage
+
+Exposed at /api/metrics/_perf as JSON or Prometheus text format.
+
+PERF_SAMPLE_RATE (0-1, default 1) sets the share of requests and function
+calls that are timed; at 0 every hook returns after one flag check. Counters
+(cache hits, bytes read, Anthropic usage) are always kept - they are single
+integer increments.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Callable, Optional
+
+PERF_SAMPLE_RATE = float(os.environ.get("PERF_SAMPLE_RATE", "1"))
+
+# Latency histogram bucket upper bounds (seconds), Prometheus-style
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        i = 0
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile (upper bound of the bucket it falls in, capped at the max)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class PerfRegistry:
+    """All recorded performance data for this process."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.routes: dict[tuple, Histogram] = {}
+        self.route_status: Counter = Counter()
+        self.functions: dict[str, Histogram] = {}
+        self.cache: Counter = Counter()
+        self.bytes_read: Counter = Counter()
+        self.files_read: Counter = Counter()
+        self.anthropic: dict[str, Histogram] = {}
+        self.anthropic_tokens: Counter = Counter()
+        self.anthropic_errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _histogram(self, table: dict, key) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram())
+        return histogram
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+perf = PerfRegistry()
+
+
+def sampled() -> bool:
+    """Decide whether to time this request/call."""
+    return PERF_SAMPLE_RATE >= 1 or (PERF_SAMPLE_RATE > 0 and random.random() < PERF_SAMPLE_RATE)
+
+
+# =============================================================================
+# RECORDING HOOKS
+# =============================================================================
+
+def record_route(method: str, route: str, status: int, seconds: float) -> None:
+    perf._histogram(perf.routes, (method, route)).observe(seconds)
+    perf.route_status[(method, route, status)] += 1
+
+
+def record_function(name: str, seconds: float) -> None:
+    perf._histogram(perf.functions, name).observe(seconds)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    perf.cache[(cache, "hit" if hit else "miss")] += 1
+
+
+def record_bytes_read(source: str, nbytes: int) -> None:
+    perf.bytes_read[source] += nbytes
+    perf.files_read[source] += 1
+
+
+def record_anthropic(operation: str, seconds: float, usage=None, error: str = None) -> None:
+    perf._histogram(perf.anthropic, operation).observe(seconds)
+    if usage is not None:
+        perf.anthropic_tokens[(operation, "input")] += getattr(usage, "input_tokens", 0) or 0
+        perf.anthropic_tokens[(operation, "output")] += getattr(usage, "output_tokens", 0) or 0
+    if error:
+        perf.anthropic_errors[(operation, error)] += 1
+
+
+def timed(func: Callable = None, *, name: str = None):
+    """Decorator that records a function's latency (when sampled)."""
+    def decorator(fn: Callable) -> Callable:
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not sampled():
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_function(label, time.perf_counter() - start)
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def timed_anthropic_call(operation: str, create: Callable, **kwargs):
+    """Call client.messages.create (or similar) and record latency, tokens and errors."""
+    start = time.perf_counter()
+    try:
+        response = create(**kwargs)
+    except Exception as e:
+        record_anthropic(operation, time.perf_counter() - start, error=type(e).__name__)
+        raise
+    record_anthropic(operation, time.perf_counter() - start, getattr(response, "usage", None))
+    return response
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+def _route_template(scope) -> str:
+    """Get a low-cardinality route label (path with parameters put back as {name})."""
+    if "endpoint" not in scope:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    for name, value in (scope.get("path_params") or {}).items():
+        value = str(value)
+        for i in range(len(segments) - 1, -1, -1):
+            if segments[i] == value:
+                segments[i] = "{" + name + "}"
+                break
+    return "/".join(segments)
+
+
+class PerfMiddleware:
+    """Records request latency per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not sampled():
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            record_route(scope["method"], _route_template(scope), status, time.perf_counter() - start)
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def _hit_rate(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+def snapshot(extra_caches: dict = None) -> dict:
+    """All recorded stats as JSON-ready data. extra_caches adds {name: (hits, misses)}."""
+    caches = {}
+    names = {c for c, _ in perf.cache} | set(extra_caches or {})
+    for cache in sorted(names):
+        hits, misses = (extra_caches or {}).get(cache, (perf.cache[(cache, "hit")], perf.cache[(cache, "miss")]))
+        caches[cache] = {"hits": hits, "misses": misses, "hit_rate": _hit_rate(hits, misses)}
+
+    return {
+        "sample_rate": PERF_SAMPLE_RATE,
+        "uptime_seconds": round(time.time() - perf.started_at, 1),
+        "routes": {
+            f"{method} {route}": {
+                **h.summary(),
+                "status": {str(s): n for (m, r, s), n in perf.route_status.items() if (m, r) == (method, route)},
+            }
+            for (method, route), h in sorted(perf.routes.items(), key=lambda kv: -kv[1].total)
+        },
+        "functions": {
+            name: h.summary()
+            for name, h in sorted(perf.functions.items(), key=lambda kv: -kv[1].total)
+        },
+        "caches": caches,
+        "data_read": {
+            source: {"bytes": perf.bytes_read[source], "files": perf.files_read[source]}
+            for source in sorted(perf.bytes_read)
+        },
+        "anthropic": {
+            operation: {
+                **h.summary(),
+                "input_tokens": perf.anthropic_tokens[(operation, "input")],
+                "output_tokens": perf.anthropic_tokens[(operation, "output")],
+                "errors": {e: n for (o, e), n in perf.anthropic_errors.items() if o == operation},
+            }
+            for operation, h in sorted(perf.anthropic.items())
+        },
+    }
+
+
+def _labels(**labels) -> str:
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _histogram_lines(metric: str, histogram: Histogram, **labels) -> list[str]:
+    lines = []
+    running = 0
+    for bound, n in zip(histogram.buckets, histogram.counts):
+        running += n
+        lines.append(f"{metric}_bucket{_labels(**labels, le=bound)} {running}")
+    lines.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{metric}_sum{_labels(**labels)} {histogram.total}")
+    lines.append(f"{metric}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def prometheus_text(extra_caches: dict = None) -> str:
+    """All recorded stats in Prometheus text exposition format."""
+    lines = [
+        "# HELP tuffwraps_request_duration_seconds API request latency by route.",
+        "# TYPE tuffwraps_request_duration_seconds histogram",
+    ]
+    for (method, route), h in sorted(perf.routes.items()):
+        lines += _histogram_lines("tuffwraps_request_duration_seconds", h, method=method, route=route)
+
+    lines += ["# HELP tuffwraps_requests_total API requests by route and status.", "# TYPE tuffwraps_requests_total counter"]
+    for (method, route, status), n in sorted(perf.route_status.items()):
+        lines.append(f"tuffwraps_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+    lines += ["# HELP tuffwraps_function_duration_seconds Data/service function latency.", "# TYPE tuffwraps_function_duration_seconds histogram"]
+    for name, h in sorted(perf.functions.items()):
+        lines += _histogram_lines("tuffwraps_function_duration_seconds", h, function=name)
+
+    lines += ["# HELP tuffwraps_cache_requests_total Cache lookups by cache and result.", "# TYPE tuffwraps_cache_requests_total counter"]
+    cache_counts = dict(perf.cache)
+    for cache, (hits, misses) in (extra_caches or {}).items():
+        cache_counts[(cache, "hit")], cache_counts[(cache, "miss")] = hits, misses
+    for (cache, result), n in sorted(cache_counts.items()):
+        lines.append(f"tuffwraps_cache_requests_total{_labels(cache=cache, result=result)} {n}")
+
+    lines += ["# HELP tuffwraps_data_read_bytes_total Bytes read from connectors/data.", "# TYPE tuffwraps_data_read_bytes_total counter"]
+    for source, n in sorted(perf.bytes_read.items()):
+        lines.append(f"tuffwraps_data_read_bytes_total{_labels(source=source)} {n}")
+
+    lines += ["# HELP tuffwraps_anthropic_duration_seconds Anthropic API call latency.", "# TYPE tuffwraps_anthropic_duration_seconds histogram"]
+    for operation, h in sorted(perf.anthropic.items()):
+        lines += _histogram_lines("tuffwraps_anthropic_duration_seconds", h, operation=operation)
+
+    lines += ["# HELP tuffwraps_anthropic_tokens_total Anthropic tokens used.", "# TYPE tuffwraps_anthropic_tokens_total counter"]
+    for (operation, kind), n in sorted(perf.anthropic_tokens.items()):
+        lines.append(f"tuffwraps_anthropic_tokens_total{_labels(operation=operation, type=kind)} {n}")
+
+    lines += ["# HELP tuffwraps_anthropic_errors_total Failed Anthropic API calls.", "# TYPE tuffwraps_anthropic_errors_total counter"]
+    for (operation, error), n in sorted(perf.anthropic_errors.items()):
+        lines.append(f"tuffwraps_anthropic_errors_total{_labels(operation=operation, error=error)} {n}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,246 @@
+"""
+Period Comparison Engine
+
+Current-vs-previous period analytics over date-keyed daily rows (Kendall
+historical metrics). The rows are indexed once into a numeric column matrix;
+after that, any number of (window, offset) comparisons are answered together:
+each period is a row mask, and every period's totals come from one
+mask x matrix product.
+
+A (window, offset) pair compares the `window` days ending `offset` days ago
+with the `window` days before that. (7, 0) is "last 7 days vs previous 7".
+
+numpy is used when available (installed with pandas); otherwise the same
+totals come from plain Python sums. An index built with from_columns() over
+a memory-mapped Arrow table (see connectors/columnar.py) sums the table's
+own columns with pyarrow.compute, without building rows.
+"""
+
+from typing import Callable, Iterable, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+def pct_change(current: float, previous: float) -> float:
+    """Percentage change from previous to current (0 when there's no previous value)."""
+    return ((current - previous) / previous * 100) if previous > 0 else 0
+
+
+def window_bounds(window: int, offset: int, cutoff: Callable[[int], str]) -> tuple[tuple, tuple]:
+    """
+    Get the date bounds of a (window, offset) comparison.
+
+    cutoff(n) returns the YYYY-MM-DD date n days ago. Returns
+    ((current_start, current_end), (previous_start, previous_end)); starts
+    are inclusive, ends exclusive, and an end of None is open-ended.
+    """
+    current_start = cutoff(window + offset)
+    current_end = cutoff(offset) if offset else None
+    previous_start = cutoff(window * 2 + offset)
+    return (current_start, current_end), (previous_start, current_start)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class PeriodIndex:
+    """Daily rows indexed by date, with every numeric field as a column."""
+
+    def __init__(self, rows: list[dict], date_field: str = "date"):
+        self.rows = rows
+        self.arrow = None
+        self.dates = [r.get(date_field, "") or "" for r in rows]
+
+        # Numeric fields; ones that only ever hold ints keep int totals
+        fields = set()
+        non_int = set()
+        for row in rows:
+            for key, value in row.items():
+                if _is_number(value):
+                    fields.add(key)
+                    if not isinstance(value, int):
+                        non_int.add(key)
+        self.fields = sorted(fields)
+        self.int_fields = fields - non_int
+        self.column = {f: i for i, f in enumerate(self.fields)}
+
+        # Missing or non-numeric values count as 0 (like m.get(field, 0))
+        columns = [
+            [v if _is_number(v := r.get(f, 0)) else 0 for r in rows]
+            for f in self.fields
+        ]
+        if NUMPY_AVAILABLE:
+            self.date_array = np.array(self.dates, dtype=str)
+            self.matrix = np.array(columns, dtype=np.float64).T.reshape(len(rows), len(self.fields))
+        else:
+            self.columns = columns
+
+    @classmethod
+    def from_columns(
+        cls,
+        dates,
+        columns: dict,
+        int_fields: set,
+        decode_rows: Callable[[list[int]], list[dict]],
+    ) -> "PeriodIndex":
+        """
+        Index Arrow columns in place (see columnar.numeric_columns).
+
+        dates and columns are Arrow arrays (typically a memory-mapped
+        table's own columns); decode_rows(positions) builds the dict rows
+        returned by rows_between().
+        """
+        import pyarrow.compute as pc
+
+        index = cls.__new__(cls)
+        index.rows = None
+        index.arrow = {"pc": pc, "dates": dates, "columns": columns, "decode_rows": decode_rows}
+        index.fields = sorted(columns)
+        index.int_fields = set(int_fields)
+        index.column = {f: i for i, f in enumerate(index.fields)}
+        return index
+
+    def __len__(self) -> int:
+        if self.arrow:
+            return len(self.arrow["dates"])
+        return len(self.rows)
+
+    def _mask(self, start: Optional[str], end: Optional[str]):
+        """Rows with start <= date (< end)."""
+        if self.arrow:
+            pc, dates = self.arrow["pc"], self.arrow["dates"]
+            conditions = []
+            if start is not None:
+                conditions.append(pc.greater_equal(dates, start))
+            if end is not None:
+                conditions.append(pc.less(dates, end))
+            if not conditions:
+                return None
+            return conditions[0] if len(conditions) == 1 else pc.and_(*conditions)
+        if NUMPY_AVAILABLE:
+            mask = np.ones(len(self.rows), dtype=bool)
+            if start is not None:
+                mask &= self.date_array >= start
+            if end is not None:
+                mask &= self.date_array < end
+            return mask
+        return [
+            (start is None or d >= start) and (end is None or d < end)
+            for d in self.dates
+        ]
+
+    def rows_between(self, start: Optional[str], end: Optional[str] = None) -> list[dict]:
+        """Rows with start <= date (< end), in their original order."""
+        if self.arrow:
+            mask = self._mask(start, end)
+            positions = list(range(len(self))) if mask is None else self.arrow["pc"].indices_nonzero(mask).to_pylist()
+            return self.arrow["decode_rows"](positions)
+        return [
+            r for r, d in zip(self.rows, self.dates)
+            if (start is None or d >= start) and (end is None or d < end)
+        ]
+
+    def totals(self, periods: list[tuple], fields: Iterable[str] = None) -> list[tuple[dict, int]]:
+        """
+        Sum fields over several date periods at once.
+
+        periods are (start, end) bounds as from window_bounds. Returns a
+        (totals_by_field, row_count) tuple per period.
+        """
+        fields = list(fields) if fields is not None else self.fields
+        known = [f for f in fields if f in self.column]
+
+        if self.arrow:
+            pc, columns = self.arrow["pc"], self.arrow["columns"]
+            sums, counts = [], []
+            for s, e in periods:
+                mask = self._mask(s, e)
+                selected = {f: columns[f] if mask is None else pc.filter(columns[f], mask) for f in known}
+                sums.append([pc.sum(selected[f]).as_py() or 0 for f in known])
+                counts.append(len(self) if mask is None else pc.sum(mask).as_py() or 0)
+        elif NUMPY_AVAILABLE:
+            masks = np.array([self._mask(s, e) for s, e in periods], dtype=np.float64).reshape(len(periods), len(self.rows))
+            sums = masks @ self.matrix[:, [self.column[f] for f in known]]
+            counts = masks.sum(axis=1).astype(int).tolist()
+            sums = sums.tolist()
+        else:
+            sums, counts = [], []
+            for s, e in periods:
+                mask = self._mask(s, e)
+                sums.append([
+                    sum(v for v, m in zip(self.columns[self.column[f]], mask) if m) for f in known
+                ])
+                counts.append(sum(mask))
+
+        results = []
+        for period_sums, count in zip(sums, counts):
+            totals = {f: 0 for f in fields}
+            for f, value in zip(known, period_sums):
+                totals[f] = int(round(value)) if f in self.int_fields else value
+            results.append((totals, count))
+        return results
+
+    def compare(
+        self,
+        windows: list[tuple[int, int]],
+        cutoff: Callable[[int], str],
+        fields: Iterable[str] = None,
+    ) -> list[dict]:
+        """
+        Compare current vs previous periods for several (window, offset) pairs in one pass.
+
+        Returns one dict per window with the bounds, row counts, totals and
+        per-row averages of each period, and the pct change of each total.
+        """
+        fields = list(fields) if fields is not None else self.fields
+        bounds = [window_bounds(w, o, cutoff) for w, o in windows]
+        periods = [b for pair in bounds for b in pair]
+        totals = self.totals(periods, fields)
+
+        results = []
+        for i, ((window, offset), (current_bounds, previous_bounds)) in enumerate(zip(windows, bounds)):
+            (current, current_days), (previous, previous_days) = totals[2 * i], totals[2 * i + 1]
+            results.append({
+                "window": window,
+                "offset": offset,
+                "current": _period(current_bounds, current, current_days),
+                "previous": _period(previous_bounds, previous, previous_days),
+                "changes": {f: pct_change(current[f], previous[f]) for f in fields},
+            })
+        return results
+
+
+def _period(bounds: tuple, totals: dict, days: int) -> dict:
+    """One side of a comparison."""
+    return {
+        "start": bounds[0],
+        "end": bounds[1],
+        "days": days,
+        "totals": totals,
+        "averages": {f: (v / days if days else 0) for f, v in totals.items()},
+    }
+
+
+def compare_row_windows(rows: list[dict], fields: Iterable[str], window: int) -> tuple[dict, dict]:
+    """
+    Totals for the last `window` rows and the `window` rows before them, in one pass.
+
+    For lists that are already filtered and sorted by date (positional
+    windows rather than calendar ones). Missing fields count as 0.
+    """
+    fields = list(fields)
+    current = {f: 0 for f in fields}
+    previous = {f: 0 for f in fields}
+    start = max(len(rows) - window * 2, 0)
+    for i in range(start, len(rows)):
+        target = current if i >= len(rows) - window else previous
+        row = rows[i]
+        for f in fields:
+            target[f] += row.get(f, 0)
+    return current, previous
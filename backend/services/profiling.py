@@ -0,0 +1,264 @@
+"""
+Opt-in request profiling for the TuffWraps API.
+
+An admin adds an X-Profile-Token header (or a profile=<token> query param)
+matching PROFILE_TOKEN to any API request. That request is then run under a
+deterministic profiler and its time is recorded per call stack, in collapsed
+stack format ("module.func;module.func;... <microseconds>"), ready for
+flamegraph.pl, speedscope or inferno.
+
+The PROFILE_KEEP slowest profiles are kept in memory; the response carries an
+X-Profile-Id header when its profile was kept. List and download them at
+/api/metrics/_profiles (same token required). With no PROFILE_TOKEN set,
+profiling is off and costs one header check per request.
+
+How it works: the profiled request runs on a worker thread with its own
+event loop (like batch sub-queries), so the profiler only has to follow that
+thread and the threadpool workers it starts. Times are self time while on
+CPU or blocked in a call; time spent suspended in an await isn't counted.
+The profiler slows the request it's attached to several-fold, so compare
+stacks against each other rather than against normal response times.
+"""
+
+import asyncio
+import heapq
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers, MutableHeaders
+
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "20"))
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_QUERY_PARAM = "profile"
+
+_active_profile: ContextVar[Optional["StackProfile"]] = ContextVar("active_profile", default=None)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check a profiling token (always False while profiling is off)."""
+    # Compared as bytes: compare_digest raises TypeError for non-ASCII str
+    return bool(PROFILE_TOKEN) and bool(token) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def request_token(scope) -> Optional[str]:
+    """Get the profiling token sent with a request (header, then query param)."""
+    token = Headers(scope=scope).get(PROFILE_HEADER)
+    if token:
+        return token
+    for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+        if key == PROFILE_QUERY_PARAM:
+            return value
+    return None
+
+
+# =============================================================================
+# PROFILER
+# =============================================================================
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+def _builtin_label(func) -> str:
+    module = getattr(func, "__module__", None) or "builtins"
+    return f"{module}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class StackProfile:
+    """Self time per call stack, for the threads running one request."""
+
+    def __init__(self):
+        self.stacks: Counter = Counter()  # "a;b;c" -> seconds
+        self._threads: dict[int, list] = {}  # thread id -> [[label, start, child_time], ...]
+
+    def event(self, frame, event: str, arg) -> None:
+        now = time.perf_counter()
+        stack = self._threads.setdefault(threading.get_ident(), [])
+
+        if event == "call":
+            stack.append([_frame_label(frame), now, 0.0])
+        elif event == "c_call":
+            stack.append([_builtin_label(arg), now, 0.0])
+        elif stack and event in ("return", "c_return", "c_exception"):
+            label, start, child_time = stack[-1]
+            elapsed = now - start
+            self.stacks[";".join(entry[0] for entry in stack)] += elapsed - child_time
+            stack.pop()
+            if stack:
+                stack[-1][2] += elapsed
+
+    def collapsed(self) -> str:
+        """Collapsed stack text, one "stack microseconds" line per stack."""
+        lines = [
+            f"{stack} {round(seconds * 1_000_000)}"
+            for stack, seconds in sorted(self.stacks.items())
+            if seconds > 0
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _profile_hook(frame, event, arg):
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.event(frame, event, arg)
+
+
+_hook_lock = threading.Lock()
+_hook_users = 0
+
+
+def _install_thread_hook() -> None:
+    """Profile threads started from now on (threadpool workers of profiled requests)."""
+    global _hook_users
+    with _hook_lock:
+        _hook_users += 1
+        if _hook_users == 1:
+            threading.setprofile(_profile_hook)
+
+
+def _remove_thread_hook() -> None:
+    global _hook_users
+    with _hook_lock:
+        _hook_users -= 1
+        if _hook_users == 0:
+            threading.setprofile(None)
+
+
+# =============================================================================
+# SLOWEST-PROFILES BUFFER
+# =============================================================================
+
+class ProfileStore:
+    """Keeps the N slowest request profiles."""
+
+    def __init__(self, keep: int = PROFILE_KEEP):
+        self.keep = keep
+        self._heap: list[tuple] = []  # (duration, seq, profile) - fastest first
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> bool:
+        """Add a profile; returns False if it was too fast to keep."""
+        entry = (profile["duration_ms"], next(self._seq), profile)
+        with self._lock:
+            if len(self._heap) < self.keep:
+                heapq.heappush(self._heap, entry)
+                return True
+            if self.keep and entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+                return True
+            return False
+
+    def list(self) -> list[dict]:
+        """Kept profiles, slowest first (without their stacks)."""
+        with self._lock:
+            entries = sorted(self._heap, key=lambda e: e[0], reverse=True)
+        return [{k: v for k, v in p.items() if k != "collapsed"} for _, _, p in entries]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            for _, _, profile in self._heap:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+
+profiles = ProfileStore()
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+def _run_profiled(app, scope, body: bytes, profile: StackProfile) -> list[dict]:
+    """Run the request to completion on this thread's own event loop, collecting what it sends."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    token = _active_profile.set(profile)
+    sys.setprofile(_profile_hook)
+    try:
+        asyncio.run(app(scope, receive, send))
+    finally:
+        sys.setprofile(None)
+        _active_profile.reset(token)
+    return messages
+
+
+class ProfilingMiddleware:
+    """Profiles API requests that carry a valid admin profiling token."""
+
+    def __init__(self, app, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not PROFILE_TOKEN
+            or scope["type"] != "http"
+            or not scope["path"].startswith(self.path_prefix)
+            or scope["path"].startswith("/api/metrics/_profiles")
+            or not is_admin(request_token(scope))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # The request runs on another event loop, so read the body up front
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        profile = StackProfile()
+        _install_thread_hook()
+        start = time.perf_counter()
+        try:
+            messages = await asyncio.to_thread(_run_profiled, self.app, scope, body, profile)
+        finally:
+            _remove_thread_hook()
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        start_message = next((m for m in messages if m["type"] == "http.response.start"), None)
+        record = {
+            "id": uuid.uuid4().hex[:12],
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": "&".join(
+                f"{k}={v}" for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+                if k != PROFILE_QUERY_PARAM
+            ),
+            "status": start_message["status"] if start_message else None,
+            "duration_ms": duration_ms,
+            "created_at": time.time(),
+            "stacks": len(profile.stacks),
+            "collapsed": profile.collapsed(),
+        }
+        kept = profiles.add(record)
+        print(f"[Profile] {record['method']} {record['path']} {duration_ms}ms ({'kept ' + record['id'] if kept else 'not kept'})")
+
+        for message in messages:
+            if message is start_message:
+                headers = MutableHeaders(raw=list(message["headers"]))
+                headers["X-Profile-Ms"] = str(duration_ms)
+                if kept:
+                    headers["X-Profile-Id"] = record["id"]
+                message = {**message, "headers": headers.raw}
+            await send(message)
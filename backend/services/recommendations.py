@@ -7,16 +7,15 @@ the LLM needs to learn from past decisions.
 """
 
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Literal
 from zoneinfo import ZoneInfo
 
-from services.data_loader import get_kendall_historical, get_date_cutoff
+from services.data_loader import DATA_DIR, get_kendall_historical, get_date_cutoff, invalidate_data_version
 
 EST = ZoneInfo("America/New_York")
 
-RECOMMENDATIONS_FILE = Path(__file__).parent.parent.parent / "connectors" / "data" / "ai_recommendations.json"
+RECOMMENDATIONS_FILE = DATA_DIR / "ai_recommendations.json"
 
 
 RecommendationStatus = Literal["pending", "done", "ignored", "partial"]
@@ -37,6 +36,7 @@ def save_recommendations(recommendations: list[dict]):
     RECOMMENDATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(RECOMMENDATIONS_FILE, "w", encoding="utf-8") as f:
         json.dump(recommendations, f, indent=2, default=str)
+    invalidate_data_version()
 
 
 def generate_recommendation_id() -> str:
@@ -0,0 +1,139 @@
+"""
+Request-scoped memoization for the TuffWraps API.
+
+A RequestMemo holds results computed while serving one request. It lives in
+a context variable, so it follows the request into threadpool endpoints and
+batch sub-queries, and is gone when the request ends. RequestMemoMiddleware
+opens one for every API request.
+
+- Cached data_loader functions check it first, so each is computed once per
+  request even when the global TTL cache is cold or being refreshed.
+- @per_request memoizes uncached helpers (date cutoffs, date filters,
+  per-timeframe campaign rollups) the same way.
+
+Concurrent callers of the same key wait for the first caller's result
+instead of computing it again.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+_current_memo: ContextVar[Optional["RequestMemo"]] = ContextVar("request_memo", default=None)
+
+
+class RequestMemo:
+    """Thread-safe memo of results for one request."""
+
+    def __init__(self):
+        self._results: dict[Hashable, Any] = {}
+        self._pending: dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        # Unhashable arguments are keyed by id(); holding them keeps the ids unique
+        self._pinned: list = []
+        self.hits = 0
+        self.misses = 0
+
+    def arg_key(self, value) -> Hashable:
+        """Get a memo key part for an argument (identity for unhashable values)."""
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            pass
+        with self._lock:
+            self._pinned.append(value)
+        return ("id", id(value))
+
+    def clear(self) -> None:
+        """Forget memoized results (after data changed mid-request)."""
+        with self._lock:
+            self._results.clear()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get a memoized result, computing it (once) if needed."""
+        while True:
+            with self._lock:
+                if key in self._results:
+                    self.hits += 1
+                    return self._results[key]
+                event = self._pending.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._pending[key] = event
+                    self.misses += 1
+                    break
+            # Another thread is computing this key - wait for it, then re-check
+            # (if it raised, the key stays missing and this thread computes it)
+            event.wait()
+
+        try:
+            result = compute()
+            with self._lock:
+                self._results[key] = result
+            return result
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+
+def current_memo() -> Optional[RequestMemo]:
+    """Get the active request memo, or None outside a memoized request."""
+    return _current_memo.get()
+
+
+def per_request(func: Callable) -> Callable:
+    """
+    Decorator that memoizes a function for the current request.
+
+    Outside a request memo the function runs normally. List/dict arguments
+    are matched by identity, which suits the cached loader results passed
+    between data_loader helpers.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = _current_memo.get()
+        if memo is None:
+            return func(*args, **kwargs)
+        key = (
+            func.__module__,
+            func.__qualname__,
+            tuple(memo.arg_key(a) for a in args),
+            tuple((k, memo.arg_key(v)) for k, v in sorted(kwargs.items())),
+        )
+        return memo.get_or_compute(key, lambda: func(*args, **kwargs))
+    return wrapper
+
+
+@contextmanager
+def request_memo():
+    """Activate a request memo for the enclosed block (reuses an active one)."""
+    memo = _current_memo.get()
+    if memo is not None:
+        yield memo
+        return
+
+    memo = RequestMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+
+
+class RequestMemoMiddleware:
+    """Opens a request memo for each API request."""
+
+    def __init__(self, app, path_prefix: str = "/api/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        with request_memo():
+            await self.app(scope, receive, send)
@@ -0,0 +1,236 @@
+"""
+Fast JSON responses and compression for the TuffWraps API.
+
+- FastJSONResponse: orjson-backed JSON response (falls back to the stdlib
+  JSONResponse if orjson isn't installed).
+- FastJSONRoute: route class that serializes plain dict/list results straight
+  to FastJSONResponse, skipping FastAPI's jsonable_encoder walk over the whole
+  payload (the dominant cost for large responses like /attribution).
+- CompressionMiddleware: Brotli when the client accepts it and the brotli
+  package is installed, otherwise GZip, for bodies over a size threshold.
+"""
+
+import inspect
+import os
+from functools import wraps
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Responses smaller than this aren't worth compressing (bytes)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Good ratio at gzip-like speed; 11 is far too slow per request
+
+# Streaming content types must not be buffered by compression
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+if ORJSON_AVAILABLE:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj):
+    """Fallback for types orjson doesn't handle natively (sets, Decimal, pydantic models...)."""
+    return jsonable_encoder(obj)
+
+
+def dumps(content) -> bytes:
+    """Serialize content to JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (NaN/Infinity become null)."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _to_response(result):
+    """Wrap a plain endpoint result in a FastJSONResponse."""
+    if isinstance(result, Response):
+        return result
+    return FastJSONResponse(result)
+
+
+def _fast_endpoint(endpoint):
+    """Wrap an endpoint so its result is returned as an already-rendered response."""
+    if getattr(endpoint, "_fast_json", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return _to_response(await endpoint(*args, **kwargs))
+    else:
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return _to_response(endpoint(*args, **kwargs))
+
+    wrapper._fast_json = True
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    APIRoute that skips jsonable_encoder for endpoints without a response model.
+
+    Routes with a response_model (or return annotation) keep FastAPI's normal
+    validation and serialization.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # An unset response_model is a falsy DefaultPlaceholder; FastAPI then infers one from the return annotation
+        no_model = not kwargs.get("response_model")
+        if no_model and inspect.signature(endpoint).return_annotation is inspect.Signature.empty:
+            endpoint = _fast_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class _BrotliResponder:
+    """Compress one response with Brotli (small bodies pass through, large ones stream)."""
+
+    def __init__(self, app, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message = None
+        self.started = False
+        self.buffer = b""
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.start_message = message
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith(UNCOMPRESSED_TYPES)
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            # Hold back the first chunks until we know whether the body clears the threshold
+            self.buffer += body
+            if more_body and len(self.buffer) < self.minimum_size:
+                return
+            self.started = True
+            body, self.buffer = self.buffer, b""
+
+            if not more_body and len(body) < self.minimum_size:
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = "br"
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+            if not more_body:
+                compressed = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        chunk = self.compressor.process(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Get the codings in an Accept-Encoding header with their q-values (1.0 when not given)."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def _quality(codings: dict[str, float], coding: str) -> float:
+    """q-value for a coding: its own entry, else the "*" entry, else not acceptable."""
+    return codings.get(coding, codings.get("*", 0.0))
+
+
+class CompressionMiddleware:
+    """
+    Brotli or GZip response compression, picked from Accept-Encoding.
+
+    Brotli is used when the client gives it a q-value above 0 and at least
+    that of gzip; codings with q=0 are never used.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=GZIP_LEVEL)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codings = parse_accept_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        br, gzip = _quality(codings, "br"), _quality(codings, "gzip")
+        if BROTLI_AVAILABLE and br > 0 and br >= gzip:
+            await _BrotliResponder(self.app, self.minimum_size)(scope, receive, send)
+        elif gzip > 0:
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,279 @@
+"""
+Weekly and Monthly Rollup Tables.
+
+Week-over-week and month-over-month views (funnel correlation, trend
+endpoints, the AI context) read maintained rollups instead of re-aggregating
+daily rows on every call:
+
+- Daily rows per channel (from Kendall history, plus GSC branded clicks) and
+  per campaign (Google / Meta campaign files) are kept in
+  cache/rollups.json, with their weekly (Monday start) and monthly buckets.
+- Updates are incremental: only the daily rows that are new or changed are
+  stored, and only the buckets containing them are re-summed. Older days
+  stay in the table, so campaign history outlives the 30-day campaign files.
+- get_rollups() is @cached on the source files it reads, so the tables are
+  brought up to date on the first read after a data reload.
+
+Buckets hold sums, the number of days with data and the first/last of those
+days; rates (ROAS, average MER/NCAC) are derived when queried.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.data_loader import (
+    DATA_DIR,
+    EST,
+    get_kendall_historical,
+    get_gsc_daily_trend,
+    get_google_ads_campaigns,
+    get_meta_ads_campaigns,
+    cached,
+    CACHE_TTL_HEAVY,
+)
+from services.period_compare import pct_change
+
+ROLLUPS_FILE = DATA_DIR / "cache" / "rollups.json"
+
+GRAINS = ("week", "month")
+
+# Daily rows older than this are dropped (their buckets are kept) and no longer updated
+DAILY_RETENTION_DAYS = 400
+
+# Summed fields per channel: rollup field -> Kendall daily field
+CHANNEL_FIELDS = {
+    "blended": {
+        "revenue": "sales", "orders": "orders", "new_customers": "nc_orders", "spend": "spend",
+        "mer_sum": "mer", "ncac_sum": "ncac",
+    },
+    "meta": {"spend": "facebook_spend", "revenue": "facebook_cta_7d_sales", "first_click": "facebook_fc"},
+    "google": {"spend": "google_spend", "first_click": "google_fc"},
+    "amazon": {"revenue": "amz_us_sales", "spend": "amazon_spend", "orders": "amazon_na_orders", "units": "amazon_na_units"},
+}
+
+# Summed fields per campaign platform: rollup field -> campaign file field
+CAMPAIGN_FIELDS = {
+    "google": {
+        "spend": "spend", "impressions": "impressions", "clicks": "clicks",
+        "conversions": "conversions", "revenue": "conversion_value",
+    },
+    "meta": {
+        "spend": "spend", "impressions": "impressions", "clicks": "clicks",
+        "conversions": "purchases", "revenue": "purchase_value",
+    },
+}
+
+# Averages of daily values, derived from *_sum fields (matches how Kendall's daily rates were averaged before)
+AVERAGED_FIELDS = ("mer", "ncac")
+
+
+def _empty_tables() -> dict:
+    return {
+        "daily": {"channels": {}, "campaigns": {}},
+        "week": {"channels": {}, "campaigns": {}},
+        "month": {"channels": {}, "campaigns": {}},
+        "updated_at": None,
+    }
+
+
+def _load_tables() -> dict:
+    try:
+        with open(ROLLUPS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _empty_tables()
+
+
+def _save_tables(tables: dict) -> None:
+    """Write the tables atomically (workers may save the same update concurrently)."""
+    try:
+        ROLLUPS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ROLLUPS_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(tables, separators=(",", ":")))
+        os.replace(tmp, ROLLUPS_FILE)
+    except OSError as e:
+        print(f"[Rollups] Could not save rollup tables: {e}")
+
+
+# =============================================================================
+# DAILY ROWS FROM SOURCES
+# =============================================================================
+
+def _sum_daily(rows: list, fields: dict, cutoff: str) -> dict[str, dict]:
+    """Sum source rows into one row per date (dates before cutoff are ignored)."""
+    daily = {}
+    for row in rows:
+        date = row.get("date", "")
+        if not date or date < cutoff:
+            continue
+        day = daily.setdefault(date, dict.fromkeys(fields, 0))
+        for field, source_field in fields.items():
+            day[field] += row.get(source_field) or 0
+    return {date: {k: round(v, 4) for k, v in day.items()} for date, day in daily.items()}
+
+
+def _channel_daily(cutoff: str) -> dict[str, dict[str, dict]]:
+    """Daily rows per channel from Kendall history (blended also gets GSC branded clicks)."""
+    historical = get_kendall_historical() or {}
+    metrics = historical.get("metrics", [])
+    channels = {channel: _sum_daily(metrics, fields, cutoff) for channel, fields in CHANNEL_FIELDS.items()}
+
+    branded = {d.get("date", ""): d.get("branded_clicks", 0) for d in get_gsc_daily_trend() or []}
+    for date, day in channels["blended"].items():
+        day["branded_clicks"] = branded.get(date, 0)
+    return channels
+
+
+def _campaign_daily(cutoff: str) -> dict[str, dict[str, dict]]:
+    """Daily rows per campaign, keyed "platform:campaign name"."""
+    sources = {"google": get_google_ads_campaigns() or [], "meta": get_meta_ads_campaigns() or []}
+    campaigns = {}
+    for platform, rows in sources.items():
+        by_name = {}
+        for row in rows:
+            by_name.setdefault(row.get("campaign_name") or row.get("name", "Unknown"), []).append(row)
+        for name, campaign_rows in by_name.items():
+            campaigns[f"{platform}:{name}"] = _sum_daily(campaign_rows, CAMPAIGN_FIELDS[platform], cutoff)
+    return campaigns
+
+
+# =============================================================================
+# INCREMENTAL UPDATE
+# =============================================================================
+
+def bucket_start(date: str, grain: str) -> str:
+    """First day of the week (Monday) or month containing a YYYY-MM-DD date."""
+    if grain == "month":
+        return date[:8] + "01"
+    day = datetime.strptime(date, "%Y-%m-%d")
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+
+def _bucket_dates(start: str, grain: str) -> list[str]:
+    first = datetime.strptime(start, "%Y-%m-%d")
+    if grain == "week":
+        end = first + timedelta(days=7)
+    else:
+        end = (first + timedelta(days=32)).replace(day=1)
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - first).days)]
+
+
+def _sum_bucket(daily: dict[str, dict], dates: list[str]) -> Optional[dict]:
+    rows = [(date, daily[date]) for date in dates if date in daily]
+    if not rows:
+        return None
+    bucket = {"start": rows[0][0], "end": rows[-1][0], "days": len(rows)}
+    for _, row in rows:
+        for field, value in row.items():
+            bucket[field] = bucket.get(field, 0) + value
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in bucket.items()}
+
+
+def update_tables(tables: dict, level: str, source_daily: dict[str, dict[str, dict]]) -> int:
+    """
+    Merge fresh daily rows for one level ("channels" or "campaigns") into the tables.
+
+    Stores the rows that are new or changed and re-sums only the week and
+    month buckets containing them. Returns the number of changed daily rows.
+    """
+    changed_rows = 0
+    for series, rows in source_daily.items():
+        daily = tables["daily"][level].setdefault(series, {})
+        changed = [date for date, row in rows.items() if daily.get(date) != row]
+        if not changed:
+            continue
+        changed_rows += len(changed)
+        for date in changed:
+            daily[date] = rows[date]
+        for grain in GRAINS:
+            buckets = tables[grain][level].setdefault(series, {})
+            for start in {bucket_start(date, grain) for date in changed}:
+                bucket = _sum_bucket(daily, _bucket_dates(start, grain))
+                if bucket:
+                    buckets[start] = bucket
+    return changed_rows
+
+
+def _prune_daily(tables: dict, cutoff: str) -> None:
+    for level in tables["daily"].values():
+        for series, daily in level.items():
+            level[series] = {date: row for date, row in daily.items() if date >= cutoff}
+
+
+@cached(ttl=CACHE_TTL_HEAVY)
+def get_rollups() -> dict:
+    """
+    Get the rollup tables, brought up to date with the current source data.
+
+    Only new or changed days are merged in; the tables are saved when
+    anything changed.
+    """
+    cutoff = (datetime.now(EST) - timedelta(days=DAILY_RETENTION_DAYS)).strftime("%Y-%m-%d")
+    tables = _load_tables()
+
+    changed = update_tables(tables, "channels", _channel_daily(cutoff))
+    changed += update_tables(tables, "campaigns", _campaign_daily(cutoff))
+    if changed:
+        _prune_daily(tables, cutoff)
+        tables["updated_at"] = datetime.now(EST).isoformat()
+        _save_tables(tables)
+        print(f"[Rollups] Merged {changed} new or changed daily rows")
+    return tables
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+def _with_rates(bucket: dict) -> dict:
+    """Bucket sums plus derived rates."""
+    row = {k: v for k, v in bucket.items() if not k.endswith("_sum")}
+    for field in AVERAGED_FIELDS:
+        if f"{field}_sum" in bucket:
+            row[field] = round(bucket[f"{field}_sum"] / bucket["days"], 2)
+    if bucket.get("spend") and "revenue" in bucket:
+        row["roas"] = round(bucket["revenue"] / bucket["spend"], 2)
+    return row
+
+
+def get_rollup_buckets(grain: str, channel: str = "blended", campaign: Optional[str] = None) -> Optional[dict]:
+    """Raw buckets (start -> sums) for a channel, or for a campaign on a platform (channel = google/meta)."""
+    tables = get_rollups()
+    if campaign:
+        return tables[grain]["campaigns"].get(f"{channel}:{campaign}")
+    return tables[grain]["channels"].get(channel)
+
+
+def query_rollups(grain: str, channel: str = "blended", campaign: Optional[str] = None, periods: int = 12) -> Optional[list]:
+    """
+    Get the last N weeks or months for a channel or campaign, oldest first.
+
+    Each period has its sums, derived rates and "change_pct": the change of
+    each metric against the previous period (week-over-week or
+    month-over-month). None if there is no such series.
+    """
+    buckets = get_rollup_buckets(grain, channel, campaign)
+    if buckets is None:
+        return None
+
+    starts = sorted(buckets)[-(periods + 1):]
+    rows = []
+    previous = None
+    for start in starts:
+        row = {"period": start, **_with_rates(buckets[start])}
+        if previous is not None:
+            row["change_pct"] = {
+                field: round(pct_change(value, previous.get(field, 0)), 1)
+                for field, value in row.items()
+                if isinstance(value, (int, float)) and field != "days"
+            }
+        rows.append(row)
+        previous = row
+    return rows[-periods:]
+
+
+def list_rollup_campaigns() -> list[str]:
+    """Campaigns with rollups, as "platform:campaign name"."""
+    return sorted(get_rollups()["week"]["campaigns"])
@@ -0,0 +1,265 @@
+"""
+Shared result cache for the TuffWraps API.
+
+Heavy computed results (correlations, change impacts, multi-signal views,
+budget recommendations) are stored in a cache shared by every worker and
+container, so each result is computed once per data version instead of once
+per process.
+
+Backends (SHARED_CACHE env var):
+- "sqlite" (default): SQLite file on local disk - shared by all workers on a host
+- "redis://...": network store via the redis client - shared across containers
+- "memory": in-process stand-in for the network store (local dev/tests)
+- "off": disabled; only the per-process cache is used
+
+Values are pickled. Keys are prefixed with the data version by the caller,
+so a new data pull never serves results computed from old data.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# How long a worker waits for another worker computing the same key (seconds)
+COMPUTE_WAIT_TIMEOUT = 30
+COMPUTE_POLL_INTERVAL = 0.1
+
+# Marker for "not in cache" (None is a valid cached value)
+MISS = object()
+
+
+class CacheBackend:
+    """Interface for shared cache stores (bytes in, bytes out)."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        """Set only if absent. Returns True if this call set it (used as a compute lock)."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk cache in a SQLite file, safe for concurrent worker processes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            # Opportunistic cleanup of expired rows
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class InMemoryStore:
+    """Local stand-in for a Redis-like network store (get / set with ex / nx / delete / flushdb)."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item and item[1] > time.time():
+                return item[0]
+            self._data.pop(key, None)
+            return None
+
+    def set(self, key: str, value: bytes, ex: int = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            item = self._data.get(key)
+            if nx and item and item[1] > time.time():
+                return None
+            self._data[key] = (value, time.time() + (ex or 10 ** 9))
+            return True
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            return 1 if self._data.pop(key, None) else 0
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            return True
+
+
+class NetworkCacheBackend(CacheBackend):
+    """Cache on a Redis-compatible network store (or InMemoryStore stand-in)."""
+
+    def __init__(self, client, prefix: str = "tuffwraps:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key: str, value: bytes, ttl: int) -> bool:
+        return bool(self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        self.client.flushdb()
+
+
+def create_backend(spec: str, sqlite_path: Path) -> Optional[CacheBackend]:
+    """Create a cache backend from a SHARED_CACHE spec, or None if disabled/unavailable."""
+    spec = (spec or "sqlite").strip()
+
+    if spec.lower() in ("off", "none", "0", "false"):
+        return None
+    if spec.lower() == "memory":
+        return NetworkCacheBackend(InMemoryStore())
+    if spec.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            print("[SharedCache] redis package not installed - shared cache disabled")
+            return None
+        return NetworkCacheBackend(redis.Redis.from_url(spec))
+
+    try:
+        return SQLiteCacheBackend(sqlite_path)
+    except sqlite3.Error as e:
+        print(f"[SharedCache] SQLite cache unavailable ({e}) - shared cache disabled")
+        return None
+
+
+class SharedCache:
+    """Pickling wrapper around a backend, with a compute lock so one worker computes each key."""
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> Any:
+        """Get a cached value, or MISS."""
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"[SharedCache] get failed: {e}")
+            return MISS
+        if raw is None:
+            return MISS
+        try:
+            return pickle.loads(raw)
+        except Exception:
+            return MISS
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        try:
+            self.backend.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+        except Exception as e:
+            print(f"[SharedCache] set failed: {e}")
+
+    def get_or_compute(self, key: str, ttl: int, compute) -> Any:
+        """
+        Get a value from the shared cache, computing it at most once across workers.
+
+        The first worker to miss takes a short-lived lock key and computes;
+        others poll for its result (up to COMPUTE_WAIT_TIMEOUT) before giving
+        up and computing themselves.
+        """
+        value = self.get(key)
+        if value is not MISS:
+            self.hits += 1
+            return value
+
+        lock_key = f"{key}:computing"
+        try:
+            have_lock = self.backend.add(lock_key, b"1", COMPUTE_WAIT_TIMEOUT)
+        except Exception:
+            have_lock = True
+
+        if not have_lock:
+            deadline = time.time() + COMPUTE_WAIT_TIMEOUT
+            while time.time() < deadline:
+                time.sleep(COMPUTE_POLL_INTERVAL)
+                value = self.get(key)
+                if value is not MISS:
+                    self.hits += 1
+                    return value
+
+        self.misses += 1
+        try:
+            value = compute()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            if have_lock:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception:
+                    pass
+
+    def clear(self) -> None:
+        if self.backend:
+            try:
+                self.backend.clear()
+            except Exception as e:
+                print(f"[SharedCache] clear failed: {e}")
@@ -0,0 +1,285 @@
+"""
+Cache warm-up planner.
+
+Heavy optional dependencies (the anthropic SDK, the Amazon connector, MCP)
+are imported on first use so the app binds its port quickly, and after a
+deploy or clear_cache() every heavy view would be computed by its first
+user. Instead, a background thread warms the caches:
+
+- On startup (from the FastAPI lifespan, once the port is open) and after
+  every data reload that evicted cached results (see
+  data_loader.add_reload_hook).
+- The plan is learned: @cached records how often each (function, args) is
+  requested (see data_loader.get_call_counts). Every worker adds its new
+  counts to cache/warmup_hits.json under a file lock; saved counts halve
+  every WARMUP_HITS_HALF_LIFE_HOURS (decayed by age, so the number of
+  workers saving doesn't matter), and a new deploy replays what users asked
+  for most recently. Until there is history, a default plan covers the
+  heavy views the dashboard opens with.
+- Calls run with bounded concurrency, and replays aren't counted as hits.
+
+STARTUP_WARMUP=0 turns it off; STARTUP_WARMUP_DELAY is how long to wait
+after startup; WARMUP_TOP_N and WARMUP_CONCURRENCY size each run.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from services.data_loader import (
+    DATA_DIR, EST, get_call_counts, get_cached_function, unrecorded_calls,
+)
+
+WARMUP_ENABLED = os.environ.get("STARTUP_WARMUP", "1").lower() not in ("0", "false", "no")
+WARMUP_DELAY = float(os.environ.get("STARTUP_WARMUP_DELAY", "0.5"))
+WARMUP_TOP_N = int(os.environ.get("WARMUP_TOP_N", 25))               # Calls replayed per run
+WARMUP_CONCURRENCY = int(os.environ.get("WARMUP_CONCURRENCY", 2))    # Calls in flight at once
+
+HITS_FILE = DATA_DIR / "cache" / "warmup_hits.json"
+HITS_LOCK_FILE = DATA_DIR / "cache" / "warmup_hits.lock"
+HITS_HALF_LIFE_HOURS = float(os.environ.get("WARMUP_HITS_HALF_LIFE_HOURS", 24))
+
+# Imported lazily by the app; warmed here so the first AI request doesn't import them
+DEFERRED_MODULES = ["anthropic"]
+
+# Modules whose @cached functions can be replayed
+CACHED_MODULES = ["services.data_loader", "services.multi_signal", "services.funnel_impact", "services.rollups"]
+
+# (function, args) replayed before there is any hit history: first paint plus the heavy views
+DEFAULT_PLAN = [
+    ("get_latest_report", []),
+    ("get_decision_signals", []),
+    ("get_blended_metrics", []),
+    ("get_timeframe_comparisons", []),
+    ("get_timeframe_summary", [1]),
+    ("get_timeframe_summary", [7]),
+    ("get_timeframe_summary", [30]),
+    ("get_spend_outcome_correlation", [14]),
+    ("get_budget_recommendations", [7]),
+    ("get_all_change_impacts", [30]),
+    ("get_multi_signal_campaign_view", ["facebook", 30]),
+    ("get_multi_signal_campaign_view", ["google", 30]),
+    ("get_cross_channel_correlation", [30]),
+    ("get_rollups", []),
+]
+
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_saved_counts: dict[str, int] = {}  # This process's counts as of the last save
+_rerun = threading.Event()
+
+_state = {
+    "reason": None,
+    "started_at": None,
+    "finished_at": None,
+    "duration_ms": None,
+    "runs": 0,
+    "steps": {},   # call -> ms, or "error: ..."
+}
+
+
+# =============================================================================
+# PLAN
+# =============================================================================
+
+def _load_hits(now: float) -> dict[str, float]:
+    """Saved hit history, decayed to now."""
+    try:
+        saved = json.loads(HITS_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    if "hits" not in saved:  # Written before counts were timestamped
+        return saved
+    age_hours = max(0.0, now - saved.get("as_of", now)) / 3600
+    decay = 0.5 ** (age_hours / HITS_HALF_LIFE_HOURS)
+    return {key: count * decay for key, count in saved["hits"].items()}
+
+
+def _merged_hits(counts: dict[str, int], now: float) -> dict[str, float]:
+    """Saved history plus this process's counts not saved yet."""
+    hits = _load_hits(now)
+    for key, count in counts.items():
+        hits[key] = hits.get(key, 0) + count - _saved_counts.get(key, 0)
+    return hits
+
+
+@contextmanager
+def _hits_lock():
+    """Hold an exclusive lock on the hit history across worker processes (blocking)."""
+    HITS_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(HITS_LOCK_FILE, "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def save_hits() -> None:
+    """Add this process's new counts to the history on disk (under the file lock; drops calls below one hit)."""
+    global _saved_counts
+    counts = get_call_counts()
+    now = time.time()
+    try:
+        with _hits_lock():
+            hits = {key: round(count, 2) for key, count in _merged_hits(counts, now).items() if count >= 1}
+            tmp = HITS_FILE.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"as_of": now, "hits": dict(sorted(hits.items(), key=lambda kv: -kv[1]))}))
+            os.replace(tmp, HITS_FILE)
+        _saved_counts = counts
+    except OSError as e:
+        print(f"[Warmup] Could not save hit counts: {e}")
+
+
+def build_plan(top_n: int = None) -> list[tuple[str, list, dict]]:
+    """The most requested (function, args, kwargs), topped up from DEFAULT_PLAN."""
+    top_n = top_n or WARMUP_TOP_N
+    for module in CACHED_MODULES:
+        importlib.import_module(module)
+
+    plan, seen = [], set()
+
+    def add(name: str, args: list, kwargs: dict) -> None:
+        key = json.dumps([name, args, kwargs], sort_keys=True)
+        if len(plan) < top_n and key not in seen and get_cached_function(name):
+            seen.add(key)
+            plan.append((name, args, kwargs))
+
+    for key, _ in sorted(_merged_hits(get_call_counts(), time.time()).items(), key=lambda kv: -kv[1]):
+        try:
+            name, args, kwargs = json.loads(key)
+        except ValueError:
+            continue
+        add(name, args, kwargs)
+    for name, args in DEFAULT_PLAN:
+        add(name, args, {})
+    return plan
+
+
+# =============================================================================
+# RUN
+# =============================================================================
+
+def _call_label(name: str, args: list, kwargs: dict) -> str:
+    params = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
+    return f"{name}({', '.join(params)})"
+
+
+def _replay(name: str, args: list, kwargs: dict):
+    """Run one planned call (in a pool thread) and return its time in ms or an error."""
+    start = time.perf_counter()
+    try:
+        with unrecorded_calls():
+            get_cached_function(name)(*args, **kwargs)
+        return round((time.perf_counter() - start) * 1000, 1)
+    except Exception as e:
+        return f"error: {e}"
+
+
+def warm_up(reason: str = "startup") -> dict:
+    """Import the deferred modules, refresh Amazon rollups and replay the plan (blocking)."""
+    from services.amazon_refresher import refresh_rollups
+
+    started = time.time()
+    steps = {}
+
+    for module in DEFERRED_MODULES:
+        if importlib.util.find_spec(module) is None:
+            continue
+        start = time.perf_counter()
+        importlib.import_module(module)
+        steps[f"import {module}"] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    refresh_rollups()
+    steps["amazon_rollups"] = round((time.perf_counter() - start) * 1000, 1)
+
+    plan = build_plan()
+    with ThreadPoolExecutor(max_workers=max(1, WARMUP_CONCURRENCY), thread_name_prefix="warmup") as pool:
+        futures = {_call_label(*call): pool.submit(_replay, *call) for call in plan}
+    steps.update({label: future.result() for label, future in futures.items()})
+    save_hits()
+
+    finished = time.time()
+    _state.update({
+        "reason": reason, "started_at": started, "finished_at": finished,
+        "duration_ms": round((finished - started) * 1000, 1), "runs": _state["runs"] + 1, "steps": steps,
+    })
+    print(f"[Warmup] {reason}: {len(plan)} calls in {_state['duration_ms']:.0f}ms")
+    return steps
+
+
+def _run(reason: str) -> None:
+    """Warm-up thread body; runs again if another warm-up was requested meanwhile."""
+    global _thread
+    while True:
+        try:
+            warm_up(reason)
+        except Exception as e:
+            print(f"[Warmup] Failed: {e}")
+        with _lock:
+            if not _rerun.is_set():
+                _thread = None
+                return
+            _rerun.clear()
+            reason = "rerun"
+
+
+def schedule_warm_up(reason: str) -> None:
+    """Warm up in a background thread (or once more after the running warm-up)."""
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+    with _lock:
+        if _thread and _thread.is_alive():
+            _rerun.set()
+            return
+        _thread = threading.Thread(target=_run, args=(reason,), name="warmup", daemon=True)
+        _thread.start()
+
+
+async def warm_up_after_startup() -> None:
+    """Lifespan task: let the server start listening, then warm up in the background."""
+    if not WARMUP_ENABLED:
+        return
+    await asyncio.sleep(WARMUP_DELAY)
+    schedule_warm_up("startup")
+
+
+def get_warmup_status() -> dict:
+    """Last warm-up run and its per-call timings, for monitoring."""
+    def iso(ts):
+        return datetime.fromtimestamp(ts, EST).isoformat() if ts else None
+
+    return {
+        "enabled": WARMUP_ENABLED,
+        "running": bool(_thread and _thread.is_alive()),
+        "reason": _state["reason"],
+        "runs": _state["runs"],
+        "started_at": iso(_state["started_at"]),
+        "finished_at": iso(_state["finished_at"]),
+        "duration_ms": _state["duration_ms"],
+        "steps": _state["steps"],
+    }
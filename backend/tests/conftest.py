@@ -0,0 +1,56 @@
+"""
+Shared test setup.
+
+Points CONNECTORS_DATA_DIR at a small synthetic data tree (see
+benchmarks/synthetic.py) before any service module is imported, and turns
+the shared cross-worker cache off so each test only sees in-process caches.
+
+Run from backend/: python -m pytest tests
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+DATA_DIR = Path(tempfile.mkdtemp(prefix="tuffwraps-test-data-"))
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
+os.environ["CONNECTORS_DATA_DIR"] = str(DATA_DIR)
+os.environ["SHARED_CACHE"] = "off"
+os.environ.setdefault("COLUMNAR_FORMAT", "false")
+
+from benchmarks.synthetic import SyntheticConfig, generate  # noqa: E402
+
+generate(DATA_DIR, SyntheticConfig(days=120, campaigns=6, adsets=2, orders_per_day=20, chat_sessions=2))
+
+
+@pytest.fixture
+def data_dir() -> Path:
+    return DATA_DIR
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    """Start every test with empty result caches and a freshly computed data version."""
+    from services import data_loader
+
+    data_loader.clear_cache()
+    data_loader.invalidate_data_version()
+    yield
+    data_loader.clear_cache()
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
@@ -0,0 +1,99 @@
+"""Amazon refresher: one worker pulls from SP-API, rate limits back off."""
+
+import asyncio
+import time
+
+import pytest
+
+from services import amazon_refresher
+
+import scheduler  # noqa: E402 - connectors/, put on the path by data_loader
+from amazon_seller import AmazonSellerConnector  # noqa: E402
+
+
+@pytest.fixture
+def refresher(tmp_path, monkeypatch):
+    """Refresher with SP-API 'configured', a counted pull and a private lock directory."""
+    pulls = []
+    monkeypatch.setattr(scheduler, "LOCK_DIR", tmp_path)
+    monkeypatch.setattr(amazon_refresher, "_runner_lock", None)
+    monkeypatch.setattr(amazon_refresher, "FOLLOWER_INTERVAL", 0.02)
+    monkeypatch.setattr(amazon_refresher, "_sp_api_configured", lambda: True)
+    monkeypatch.setattr(amazon_refresher, "_pull_report", lambda: pulls.append(time.time()))
+    monkeypatch.setitem(amazon_refresher._state, "backoff_until", 0)
+    monkeypatch.setitem(amazon_refresher._state, "backoff_seconds", 0)
+    yield pulls
+    amazon_refresher.stop_amazon_refresher()
+    if amazon_refresher._thread:
+        amazon_refresher._thread.join(timeout=5)
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_only_the_lock_holder_pulls(refresher, tmp_path):
+    other_worker = scheduler.RunnerLock(tmp_path / "amazon_refresher.lock")
+    assert other_worker.acquire()
+
+    amazon_refresher.start_amazon_refresher()
+    assert _wait_for(lambda: amazon_refresher._state["rolled_up_at"] is not None)
+    time.sleep(0.1)
+    assert refresher == []
+    assert amazon_refresher.get_amazon_refresher_status()["pulling"] is False
+
+    # The pulling worker exits: this one takes over
+    other_worker.release()
+    assert _wait_for(lambda: len(refresher) == 1)
+    assert amazon_refresher.get_amazon_refresher_status()["pulling"] is True
+
+
+def test_rate_limit_backs_off(refresher, monkeypatch):
+    def rate_limited():
+        raise Exception("429 QuotaExceeded")
+
+    monkeypatch.setattr(amazon_refresher, "_pull_report", rate_limited)
+    amazon_refresher._refresh_once()
+    status = amazon_refresher.get_amazon_refresher_status()
+    assert status["last_error"] == "429 QuotaExceeded"
+    assert status["backoff_remaining_seconds"] > 0
+
+    monkeypatch.setattr(amazon_refresher, "_pull_report", lambda: refresher.append(time.time()))
+    amazon_refresher._refresh_once()
+    assert refresher == []
+
+
+def test_finished_report_is_reused_only_within_max_age(monkeypatch):
+    connector = AmazonSellerConnector()
+    key = f"{connector.ORDERS_REPORT_TYPE}:2026-01-01:2026-01-31"
+    finished = time.time() - 1200
+    monkeypatch.setattr(connector, "_load_report_cache", lambda: {key: {
+        "report_id": "old", "requested_at": finished - 60, "completed_at": finished, "document_id": "old-doc",
+    }})
+    monkeypatch.setattr(connector, "_save_report_cache", lambda cache: None)
+    monkeypatch.setattr(connector, "create_report", lambda *args: "new")
+    monkeypatch.setattr(connector, "get_report_status",
+                        lambda report_id: {"processingStatus": "DONE", "reportDocumentId": f"{report_id}-doc"})
+
+    def run(max_age):
+        return asyncio.run(connector.run_report_async(
+            connector.ORDERS_REPORT_TYPE, "2026-01-01", "2026-01-31", max_age=max_age))
+
+    assert run(3600) == "old-doc"
+    assert run(600) == "new-doc"
+
+
+def test_sub_second_report_poll_interval(monkeypatch):
+    import importlib.util
+    import amazon_seller
+
+    monkeypatch.setenv("AMAZON_REPORT_POLL_INTERVAL", "0.5")
+    spec = importlib.util.spec_from_file_location("amazon_seller_fresh", amazon_seller.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.AmazonSellerConnector.REPORT_POLL_INTERVAL == 0.5
@@ -0,0 +1,65 @@
+"""Batch endpoint: sub-queries share one request memo and run concurrently."""
+
+import threading
+import time
+
+from routers import metrics
+from services import request_memo
+
+
+def test_batch_runs_subqueries_with_shared_memo(client, monkeypatch):
+    memos = []
+    original_init = request_memo.RequestMemo.__init__
+
+    def tracking_init(self):
+        original_init(self)
+        memos.append(self)
+
+    monkeypatch.setattr(request_memo.RequestMemo, "__init__", tracking_init)
+
+    queries = [
+        {"id": "signals", "path": "/metrics/signals"},
+        {"id": "summary", "path": "/metrics/summary"},
+        {"id": "week", "path": "/metrics/timeframe/7", "params": {"fields": "date,sales"}},
+        {"id": "missing", "path": "/metrics/no-such-route"},
+    ]
+    response = client.post("/api/batch", json={"queries": queries})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [results[q["id"]]["status"] for q in queries] == [200, 200, 200, 404]
+    assert results["week"]["body"]["daily_metrics"][0].keys() <= {"date", "sales"}
+
+    # One memo for the whole batch, and sub-queries reused each other's results
+    assert len(memos) == 1
+    assert memos[0].hits > 0
+
+
+def test_nested_batch_is_rejected(client):
+    response = client.post("/api/batch", json={"queries": [{"id": "x", "path": "/batch"}]})
+    assert response.status_code == 400
+
+
+def test_blocking_subqueries_run_concurrently_in_worker_threads(client, monkeypatch):
+    spans = []
+
+    def slow_summary(days):
+        # Blocking work inside an async def endpoint, like most metrics routes
+        start = time.perf_counter()
+        time.sleep(0.3)
+        spans.append((start, time.perf_counter(), threading.get_ident()))
+        return {"summary": {}}
+
+    monkeypatch.setattr(metrics, "get_timeframe_summary", slow_summary)
+
+    queries = [{"id": str(days), "path": f"/metrics/timeframe/{days}"} for days in (1, 3, 7, 14)]
+    start = time.perf_counter()
+    response = client.post("/api/batch", json={"queries": queries})
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert all(r["status"] == 200 for r in response.json()["results"].values())
+    assert len(spans) == 4
+    assert max(s for s, _, _ in spans) < min(e for _, e, _ in spans)  # all four ran at once
+    assert len({thread for _, _, thread in spans}) == 4
+    assert elapsed < 0.9
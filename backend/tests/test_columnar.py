@@ -0,0 +1,189 @@
+"""Arrow sidecars and published generations: faithful rows, never stale, read in place."""
+
+import json
+import os
+import time
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from services.data_loader import query_rows  # noqa: E402 - also puts connectors/ on the path
+from services.period_compare import PeriodIndex  # noqa: E402
+
+import columnar  # noqa: E402
+
+ROWS = [
+    {"date": "2026-03-01", "orders": 3, "roas": 2.5, "campaign": "A", "line_items": [{"sku": "X", "quantity": 1}]},
+    {"date": "2026-03-02", "orders": 4, "roas": 3, "campaign": None, "line_items": []},
+    {"date": "2026-03-03", "orders": 5, "roas": 1.0, "campaign": "B", "note": "only here"},
+]
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(columnar, "GENERATIONS_DIR", tmp_path / "generations")
+    monkeypatch.setattr(columnar, "CURRENT_FILE", tmp_path / "generations" / "CURRENT")
+    monkeypatch.setattr(columnar, "COLUMNAR_ENABLED", True)
+    (tmp_path / "kendall").mkdir()
+    return tmp_path
+
+
+def _write_json(path, data) -> None:
+    path.write_text(json.dumps(data))
+    # Sidecars must not look older than the JSON they were written from
+    past = time.time() - 10
+    os.utime(path, (past, past))
+
+
+def test_rows_round_trip_exactly(data_root):
+    path = data_root / "kendall" / "historical_metrics.json"
+    data = {"metrics": ROWS, "period": {"days": 3}}
+    _write_json(path, data)
+    columnar.write_columnar(path, data)
+
+    loaded = columnar.read_columnar(path)
+    assert loaded == data
+    assert [type(r["orders"]) for r in loaded["metrics"]] == [int, int, int]
+    assert [type(r["roas"]) for r in loaded["metrics"]] == [float, int, float]
+    assert "note" not in loaded["metrics"][0]
+    assert loaded["metrics"][1]["campaign"] is None
+
+    assert columnar.read_columnar(path, ["date", "note"])["metrics"] == [
+        {"date": "2026-03-01"}, {"date": "2026-03-02"}, {"date": "2026-03-03", "note": "only here"},
+    ]
+
+
+def test_stream_drops_sidecar_when_a_batch_does_not_fit(data_root, monkeypatch):
+    path = data_root / "shopify" / "orders_last_30d.json"
+    path.parent.mkdir()
+    monkeypatch.setattr(columnar, "BATCH_SIZE", 2)
+
+    rows = [{"id": 1, "total": 1.5}, {"id": 2, "total": 2.5}, {"id": 3, "total": "3.50"}]
+    assert list(columnar.write_columnar_stream(path, iter(rows))) == rows
+    assert not columnar.sidecar_path(path).exists()
+
+
+def test_generation_is_skipped_once_its_json_changes(data_root):
+    path = data_root / "kendall" / "historical_metrics.json"
+    _write_json(path, {"metrics": ROWS})
+    generation = columnar.publish_generation()
+    assert columnar.read_generation(generation, path) == {"metrics": ROWS}
+
+    path.write_text(json.dumps({"metrics": ROWS[:1]}))
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    assert columnar.read_generation(generation, path) is None
+
+
+def test_nothing_is_read_from_arrow_when_disabled(data_root, monkeypatch):
+    path = data_root / "kendall" / "historical_metrics.json"
+    _write_json(path, {"metrics": ROWS})
+    columnar.write_columnar(path, {"metrics": ROWS})
+    generation = columnar.publish_generation()
+
+    monkeypatch.setattr(columnar, "COLUMNAR_ENABLED", False)
+    assert columnar.read_columnar(path) is None
+    assert columnar.read_generation(generation, path) is None
+
+
+DAILY = [
+    {"date": f"2026-02-{d:02d}", "spend": 10 * d, "roas": 2.5 if d % 2 else 3, "orders": d,
+     **({"nc_orders": d // 2} if d % 3 else {})}
+    for d in range(1, 29)
+]
+
+
+def _cutoff(days: int) -> str:
+    return f"2026-02-{29 - days:02d}"
+
+
+def _mapped_index(table):
+    dates, columns, int_fields = columnar.numeric_columns(table)
+    return PeriodIndex.from_columns(
+        dates, columns, int_fields, lambda positions: columnar.table_rows(table.take(positions)),
+    )
+
+
+def test_mapped_table_is_not_copied(data_root):
+    path = data_root / "kendall" / "historical_metrics.json"
+    rows = [{"date": "2026-02-01", "spend": float(i), "orders": i} for i in range(200_000)]
+    _write_json(path, {"metrics": rows})
+    columnar.write_columnar(path, {"metrics": rows})
+
+    before = pa.total_allocated_bytes()
+    table = columnar.open_columnar(path)
+    index = _mapped_index(table)
+    assert index.totals([("2026-01-01", None)], ["orders"])[0] == ({"orders": sum(range(200_000))}, 200_000)
+    assert table.nbytes > 3_000_000
+    assert pa.total_allocated_bytes() - before < table.nbytes // 10
+
+
+def test_period_index_on_mapped_columns_matches_rows(data_root):
+    path = data_root / "kendall" / "historical_metrics.json"
+    _write_json(path, {"metrics": DAILY})
+    columnar.write_columnar(path, {"metrics": DAILY})
+    table = columnar.open_columnar(path)
+    assert table.schema.field("roas").metadata  # ints and floats mixed: stored as JSON text
+
+    mapped, rows = _mapped_index(table), PeriodIndex(DAILY)
+    assert mapped.fields == rows.fields
+    assert mapped.int_fields == rows.int_fields
+    assert len(mapped) == len(rows)
+
+    windows = [(7, 0), (7, 7), (14, 0), (3, 2)]
+    for got, expected in zip(mapped.compare(windows, _cutoff), rows.compare(windows, _cutoff)):
+        assert got["current"]["totals"] == pytest.approx(expected["current"]["totals"])
+        assert got["previous"]["totals"] == pytest.approx(expected["previous"]["totals"])
+        assert got["current"]["days"] == expected["current"]["days"]
+        assert got["changes"] == pytest.approx(expected["changes"])
+    assert mapped.rows_between("2026-02-20", "2026-02-23") == rows.rows_between("2026-02-20", "2026-02-23")
+
+
+def test_date_range_and_paging_on_mapped_columns_match_rows(data_root):
+    path = data_root / "google_ads" / "campaigns_last_30d.json"
+    path.parent.mkdir()
+    rows = [{"date": f"2026-03-0{d}T0{d}:00:00" if d % 2 else f"2026-03-0{d}", "spend": d} for d in range(1, 10)]
+    _write_json(path, rows)
+    columnar.write_columnar(path, rows)
+    table = columnar.open_columnar(path)
+
+    indices = columnar.date_range_indices(table, "2026-03-02", "2026-03-07")
+    expected, total, _ = query_rows(rows, date_from="2026-03-02", date_to="2026-03-07")
+    assert columnar.table_rows(table.take(indices)) == expected
+    assert len(indices) == total
+    assert columnar.table_rows(table[2:4], ["spend"]) == [{"spend": 3}, {"spend": 4}]
+
+
+@pytest.fixture
+def sidecars(data_dir, monkeypatch):
+    """Arrow sidecars for the test data tree's bulk datasets, read with COLUMNAR_FORMAT on."""
+    monkeypatch.setattr(columnar, "COLUMNAR_ENABLED", True)
+    paths = [data_dir / "kendall" / "historical_metrics.json", data_dir / "google_ads" / "campaigns_last_30d.json"]
+    for path in paths:
+        columnar.write_columnar(path, json.loads(path.read_text()))
+    yield
+    for path in paths:
+        columnar.sidecar_path(path).unlink(missing_ok=True)
+
+
+def test_loader_queries_the_mapped_table(sidecars, monkeypatch):
+    from services import data_loader
+
+    queries = [
+        ("historical", ("date", "spend"), None, None, 25, "50"),
+        ("historical", None, "2026-01-01", None, 10, None),
+        ("google_ads", ("campaign_name", "spend"), None, "2099-01-01", None, None),
+    ]
+    assert data_loader.get_dataset_table("historical") is not None
+    assert data_loader.get_period_index().arrow is not None
+    mapped = [data_loader.query_dataset(*q) for q in queries]
+    comparisons = data_loader.compare_periods(((7, 0), (30, 0)))
+
+    monkeypatch.setattr(columnar, "COLUMNAR_ENABLED", False)
+    data_loader.clear_cache()
+    assert data_loader.get_period_index().arrow is None
+    assert mapped == [data_loader.query_dataset(*q) for q in queries]
+    for got, expected in zip(comparisons, data_loader.compare_periods(((7, 0), (30, 0)))):
+        assert got["current"]["totals"] == pytest.approx(expected["current"]["totals"])
+        assert got["previous"]["totals"] == pytest.approx(expected["previous"]["totals"])
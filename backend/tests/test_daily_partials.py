@@ -0,0 +1,85 @@
+"""Daily partials are recomputed only for the days whose source rows changed."""
+
+import json
+import os
+
+import pytest
+
+from services import data_loader  # noqa: F401 - puts connectors/ on the path
+
+from data_aggregator import DataAggregator  # noqa: E402
+
+
+def _order(order_id: int, day: int, price: float, updated: str = "2026-03-10T12:00:00") -> dict:
+    return {
+        "id": order_id,
+        "created_at": f"2026-03-{day:02d}T10:00:00",
+        "updated_at": updated,
+        "total_price": str(price),
+        "line_items": [],
+    }
+
+
+ORDERS = [_order(1, 1, 10), _order(2, 1, 20), _order(3, 2, 30), _order(4, 3, 40)]
+
+
+@pytest.fixture
+def orders_file(tmp_path):
+    path = tmp_path / "orders.json"
+    path.write_text(json.dumps(ORDERS))
+    return path
+
+
+def _run(tmp_path, orders_file) -> tuple[DataAggregator, dict]:
+    """One aggregator run: load partials, update them from the orders file and save."""
+    aggregator = DataAggregator()
+    aggregator.partials_file = tmp_path / "daily_partials.json"
+    aggregator.load_shopify_data(str(orders_file))
+    aggregator.load_partials()
+    updated = aggregator.update_daily_partials()
+    aggregator.save_partials()
+    return aggregator, updated
+
+
+def _rewrite(path, orders) -> None:
+    mtime = path.stat().st_mtime_ns
+    path.write_text(json.dumps(orders))
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_first_run_builds_every_day(tmp_path, orders_file):
+    aggregator, updated = _run(tmp_path, orders_file)
+    assert updated == {"shopify": 3}
+    assert aggregator.partials["days"]["2026-03-01"]["revenue"] == 30
+    assert aggregator.source_date_range() == ("2026-03-01", "2026-03-03")
+
+
+def test_unchanged_file_is_skipped(tmp_path, orders_file):
+    _run(tmp_path, orders_file)
+    aggregator, updated = _run(tmp_path, orders_file)
+    assert updated == {"shopify": 0}
+    assert aggregator.compose_period("2026-03-01", "2026-03-03")["revenue"] == 100
+
+
+def test_updated_order_recomputes_only_its_day(tmp_path, orders_file):
+    _run(tmp_path, orders_file)
+    orders = [dict(o) for o in ORDERS]
+    orders[2] = _order(3, 2, 35, updated="2026-03-11T09:00:00")
+    _rewrite(orders_file, orders)
+
+    aggregator, updated = _run(tmp_path, orders_file)
+    assert updated == {"shopify": 1}
+    assert aggregator.partials["days"]["2026-03-02"]["revenue"] == 35
+    assert aggregator.compose_period("2026-03-01", "2026-03-03")["revenue"] == 105
+
+
+def test_removed_order_and_day_are_dropped(tmp_path, orders_file):
+    _run(tmp_path, orders_file)
+    # Day 1 loses an order (no newer updated_at) and day 3 leaves the window
+    _rewrite(orders_file, [ORDERS[0], ORDERS[2]])
+
+    aggregator, updated = _run(tmp_path, orders_file)
+    assert updated == {"shopify": 1}
+    assert sorted(aggregator.partials["days"]) == ["2026-03-01", "2026-03-02"]
+    assert aggregator.partials["days"]["2026-03-01"]["revenue"] == 10
+    assert aggregator.source_date_range() == ("2026-03-01", "2026-03-02")
@@ -0,0 +1,91 @@
+"""Data reloads evict only the cached results built from changed sources."""
+
+import json
+
+from services import data_loader
+from services.data_loader import DATA_DIR, cached, load_json
+
+import data_manifest  # connectors/, put on the path by data_loader
+
+
+@cached(ttl=3600)
+def gsc_trend_rows() -> int:
+    return len(load_json(DATA_DIR / "gsc" / "daily_branded_trend.json"))
+
+
+@cached(ttl=3600)
+def google_campaign_rows() -> int:
+    return len(load_json(DATA_DIR / "google_ads" / "campaigns_last_30d.json"))
+
+
+@cached(ttl=3600)
+def no_file_reads() -> int:
+    return 1
+
+
+@cached(ttl=3600)
+def gsc_summary() -> dict:
+    return {"rows": gsc_trend_rows()}
+
+
+def _warm() -> None:
+    for func in (gsc_trend_rows, google_campaign_rows, no_file_reads, gsc_summary):
+        func()
+
+
+def _cached_names() -> set:
+    return {key.split(":")[0] for key in data_loader._cache}
+
+
+def test_deps_are_recorded_through_nested_calls():
+    _warm()
+    assert data_loader._cache_deps["gsc_trend_rows"] == {"gsc"}
+    assert data_loader._cache_deps["gsc_summary"] == {"gsc"}
+    assert data_loader._cache_deps["no_file_reads"] == data_loader.UNKNOWN_DEPS
+
+
+def test_evict_changed_source_keeps_unrelated_results():
+    _warm()
+    assert data_loader._evict({"gsc"}) == 3
+    assert _cached_names() == {"google_campaign_rows"}
+
+
+def test_unknown_deps_are_evicted_on_any_change():
+    _warm()
+    data_loader._evict({"klaviyo"})
+    assert _cached_names() == {"gsc_trend_rows", "google_campaign_rows", "gsc_summary"}
+
+
+def test_wildcard_change_evicts_everything():
+    _warm()
+    assert data_loader._evict({"*"}) == 4
+    assert not data_loader._cache
+
+
+def test_new_manifest_evicts_changed_sources(data_dir):
+    data_manifest.publish_manifest(notify=False)
+    data_loader.check_data_generation(force=True)
+    _warm()
+
+    trend_file = data_dir / "gsc" / "daily_branded_trend.json"
+    original = trend_file.read_text()
+    try:
+        trend_file.write_text(json.dumps(json.loads(original)[1:]))
+        manifest = data_manifest.publish_manifest(notify=False)
+        assert manifest["changed"] == ["gsc"]
+
+        data_loader.check_data_generation(force=True)
+        assert _cached_names() == {"google_campaign_rows"}
+        assert data_loader.get_reload_status()["manifest_version"] == manifest["version"]
+    finally:
+        trend_file.write_text(original)
+        data_manifest.publish_manifest(notify=False)
+
+
+def test_reload_endpoint_rejects_bad_tokens(client, monkeypatch):
+    from routers import metrics
+
+    monkeypatch.setattr(metrics, "RELOAD_TOKEN", "s3cret")
+    assert client.post("/api/metrics/_reload", headers={"X-Reload-Token": b"\xe9"}).status_code == 403
+    assert client.post("/api/metrics/_reload", headers={"X-Reload-Token": "wrong"}).status_code == 403
+    assert client.post("/api/metrics/_reload", headers={"X-Reload-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,30 @@
+"""Conditional GET: ETags follow every store that responses are built from."""
+
+from services import recommendations
+
+
+def _revalidate(client, path: str):
+    first = client.get(path)
+    assert first.status_code == 200
+    return client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+
+
+def test_unchanged_data_returns_304(client):
+    assert _revalidate(client, "/api/metrics/summary").status_code == 304
+
+
+def test_new_recommendation_changes_etag(client):
+    first = client.get("/api/metrics/summary")
+    assert first.status_code == 200
+
+    recommendations.add_recommendation("scale", "Raise Meta TOF budget 10%", channel="Meta Ads")
+
+    again = client.get("/api/metrics/summary", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 200
+    assert again.headers["ETag"] != first.headers["ETag"]
+
+
+def test_time_dependent_routes_are_not_cached(client):
+    for path in ("/api/synthesis/funnel-impact/cooling-off", "/api/synthesis/funnel-impact", "/api/synthesis/context"):
+        response = client.get(path)
+        assert "ETag" not in response.headers
@@ -0,0 +1,29 @@
+"""Profiling token checks never fail a request."""
+
+import pytest
+
+from services import profiling
+
+
+@pytest.fixture
+def profile_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    return "s3cret"
+
+
+def test_is_admin_compares_non_ascii_tokens(profile_token):
+    assert profiling.is_admin(profile_token)
+    assert not profiling.is_admin("€")
+    assert not profiling.is_admin("\xe9")
+    assert not profiling.is_admin(None)
+
+
+def test_non_ascii_tokens_are_not_admin(client, profile_token):
+    assert client.get("/api/metrics/summary", params={"profile": "€"}).status_code == 200
+    response = client.get("/api/metrics/summary", headers={"X-Profile-Token": b"\xe9"})
+    assert response.status_code == 200
+    assert "X-Profile-Ms" not in response.headers
+
+    response = client.get("/api/metrics/summary", headers={"X-Profile-Token": profile_token})
+    assert response.status_code == 200
+    assert "X-Profile-Ms" in response.headers
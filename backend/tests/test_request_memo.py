@@ -0,0 +1,61 @@
+"""Request memo: each result is computed once per request, even across threads."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.request_memo import RequestMemo, current_memo, per_request, request_memo
+
+calls = []
+
+
+@per_request
+def cutoff(days: int) -> str:
+    calls.append(days)
+    return f"cutoff-{days}"
+
+
+def test_concurrent_callers_share_one_computation():
+    memo = RequestMemo()
+    computed = []
+
+    def compute():
+        computed.append(1)
+        time.sleep(0.05)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: memo.get_or_compute("key", compute), range(8)))
+
+    assert results == [42] * 8
+    assert computed == [1]
+    assert (memo.hits, memo.misses) == (7, 1)
+
+
+def test_failed_computation_is_retried():
+    memo = RequestMemo()
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        memo.get_or_compute("key", fail)
+    except ValueError:
+        pass
+    assert memo.get_or_compute("key", lambda: "ok") == "ok"
+
+
+def test_per_request_memoizes_only_inside_a_request():
+    calls.clear()
+    cutoff(7)
+    cutoff(7)
+    assert calls == [7, 7]
+
+    calls.clear()
+    with request_memo() as memo:
+        assert cutoff(7) == cutoff(7) == "cutoff-7"
+        cutoff(30)
+        with request_memo() as nested:
+            assert nested is memo
+            cutoff(30)
+    assert calls == [7, 30]
+    assert current_memo() is None
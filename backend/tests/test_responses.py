@@ -0,0 +1,43 @@
+"""Compression negotiation from Accept-Encoding."""
+
+import pytest
+from fastapi import FastAPI
+
+from services.responses import CompressionMiddleware, parse_accept_encoding
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+    assert parse_accept_encoding(" BR ; Q=0.8 ,identity;q=bad") == {"br": 0.8, "identity": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.fixture
+def compressed_client():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+    @app.get("/big")
+    async def big():
+        return {"rows": list(range(500))}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br", "br"),
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0.5, gzip;q=0.9", "gzip"),
+    ("gzip;q=0.5, br;q=0.5", "br"),
+    ("*", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("identity", None),
+])
+def test_negotiates_coding(compressed_client, accept_encoding, expected):
+    pytest.importorskip("brotli")
+    response = compressed_client.get("/big", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == expected
@@ -0,0 +1,56 @@
+"""Rollup tables merge new daily rows into only the buckets they belong to."""
+
+from services import rollups
+from services.rollups import bucket_start, update_tables
+
+
+def _days(first: int, last: int, spend: float = 10.0) -> dict[str, dict]:
+    return {f"2026-03-{d:02d}": {"spend": spend, "orders": 2} for d in range(first, last + 1)}
+
+
+def test_bucket_start():
+    assert bucket_start("2026-03-01", "week") == "2026-02-23"
+    assert bucket_start("2026-03-04", "week") == "2026-03-02"
+    assert bucket_start("2026-03-04", "month") == "2026-03-01"
+
+
+def test_daily_rows_are_summed_into_weeks_and_months():
+    tables = rollups._empty_tables()
+    assert update_tables(tables, "channels", {"meta": _days(1, 10)}) == 10
+
+    weeks = tables["week"]["channels"]["meta"]
+    assert sorted(weeks) == ["2026-02-23", "2026-03-02", "2026-03-09"]
+    assert weeks["2026-02-23"] == {"start": "2026-03-01", "end": "2026-03-01", "days": 1, "spend": 10.0, "orders": 2}
+    assert weeks["2026-03-02"] == {"start": "2026-03-02", "end": "2026-03-08", "days": 7, "spend": 70.0, "orders": 14}
+    assert tables["month"]["channels"]["meta"]["2026-03-01"]["spend"] == 100.0
+
+
+def test_only_buckets_with_changed_rows_are_resummed():
+    tables = rollups._empty_tables()
+    update_tables(tables, "channels", {"meta": _days(1, 10)})
+    assert update_tables(tables, "channels", {"meta": _days(1, 10)}) == 0
+
+    # Tamper with an untouched week: a later merge must leave it alone
+    tables["week"]["channels"]["meta"]["2026-02-23"]["spend"] = -1
+
+    rows = _days(1, 10)
+    rows["2026-03-10"] = {"spend": 25.0, "orders": 3}
+    rows["2026-03-11"] = {"spend": 5.0, "orders": 1}
+    assert update_tables(tables, "channels", {"meta": rows}) == 2
+
+    weeks = tables["week"]["channels"]["meta"]
+    assert weeks["2026-02-23"]["spend"] == -1
+    assert weeks["2026-03-09"] == {"start": "2026-03-09", "end": "2026-03-11", "days": 3, "spend": 40.0, "orders": 6}
+    assert tables["month"]["channels"]["meta"]["2026-03-01"]["spend"] == 120.0
+
+
+def test_averaged_fields_come_from_daily_sums():
+    tables = rollups._empty_tables()
+    update_tables(tables, "channels", {
+        "blended": {"2026-03-02": {"mer_sum": 2.0, "revenue": 300.0, "spend": 100.0},
+                    "2026-03-03": {"mer_sum": 4.0, "revenue": 300.0, "spend": 200.0}},
+    })
+    row = rollups._with_rates(tables["week"]["channels"]["blended"]["2026-03-02"])
+    assert row["mer"] == 3.0
+    assert row["roas"] == 2.0
+    assert "mer_sum" not in row
@@ -0,0 +1,41 @@
+"""Row filtering, paging and field projection for the bulk row endpoints."""
+
+from services.data_loader import parse_fields, query_rows
+
+ROWS = [
+    {"date": "2026-03-01T23:00:00", "spend": 1},
+    {"date": "2026-03-02T08:00:00", "spend": 2},
+    {"date": "2026-03-03", "spend": 3},
+]
+
+
+def test_date_bounds_are_inclusive_for_timestamps():
+    page, total, _ = query_rows(ROWS, date_from="2026-03-01", date_to="2026-03-02")
+    assert [r["spend"] for r in page] == [1, 2]
+    assert total == 2
+
+
+def test_empty_fields_means_all_fields():
+    assert parse_fields("") is None
+    assert parse_fields(" , ") is None
+    assert parse_fields("spend, date,spend") == ("date", "spend")
+
+    page, _, _ = query_rows(ROWS, fields=parse_fields(""), limit=1)
+    assert page == [ROWS[0]]
+
+
+def test_paging_projects_only_the_page():
+    page, total, cursor = query_rows(ROWS, fields=("spend",), limit=2)
+    assert page == [{"spend": 1}, {"spend": 2}]
+    assert (total, cursor) == (3, "2")
+
+
+
+def test_zero_limit_returns_the_total_without_a_cursor(client):
+    assert query_rows(ROWS, limit=0, cursor="1") == ([], 3, None)
+
+    response = client.get("/api/metrics/historical", params={"limit": 0})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    response = client.get("/api/metrics/historical", params={"limit": 1})
+    assert response.headers.get("X-Next-Cursor") == "1"
@@ -0,0 +1,97 @@
+"""orders_last_30d.json keeps one order shape across bulk exports and REST merges."""
+
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from services import data_loader  # noqa: F401 - puts connectors/ on the path
+
+from shopify import ShopifyConnector  # noqa: E402
+
+TZ = ZoneInfo("America/New_York")
+
+BULK_RECORD = {
+    "legacyResourceId": "1001",
+    "createdAt": "2026-03-01T15:00:00Z",
+    "updatedAt": "2026-03-01T15:05:00Z",
+    "displayFinancialStatus": "PAID",
+    "totalPriceSet": {"shopMoney": {"amount": "54.00"}},
+    "totalDiscountsSet": {"shopMoney": {"amount": "0.00"}},
+    "totalTaxSet": {"shopMoney": {"amount": "4.00"}},
+    "customer": {"legacyResourceId": "77", "createdAt": "2025-01-01T00:00:00Z"},
+    "_children": [
+        {"sku": "WRAP-1", "quantity": 2, "variant": {"legacyResourceId": "555"},
+         "originalUnitPriceSet": {"shopMoney": {"amount": "25.00"}}},
+        {"originalPriceSet": {"shopMoney": {"amount": "5.00"}}},
+    ],
+}
+
+
+def _rest_order(order_id: int, created_at: str, status: str = "paid") -> dict:
+    return {
+        "id": order_id,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "financial_status": status,
+        "total_price": "30.00",
+        "total_discounts": "0.00",
+        "total_tax": "2.00",
+        "source_name": "web",
+        "tags": "wholesale",
+        "shipping_lines": [{"price": "3.00", "title": "Ground", "code": "GRD"}],
+        "line_items": [{"variant_id": 556, "sku": "WRAP-2", "quantity": 1, "price": "25.00", "title": "Wrap"}],
+        "customer": {"id": 78, "created_at": "2025-06-01T00:00:00-04:00", "email": "a@example.com"},
+    }
+
+
+def _shape(value):
+    """Nested key structure of an order."""
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_shape(v) for v in value[:1]]
+    return None
+
+
+@pytest.fixture
+def connector(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHOPIFY_BULK_EXPORT", "true")
+    connector = ShopifyConnector()
+    connector.data_dir = tmp_path
+    return connector
+
+
+def test_reduced_rest_order_has_the_bulk_shape(connector):
+    bulk = connector._bulk_order_to_rest(BULK_RECORD, TZ)
+    rest = connector._reduce_rest_order(_rest_order(1002, "2026-03-01T10:00:00-05:00"))
+    assert _shape(rest) == _shape(bulk)
+
+
+def _write_bulk_file(connector, now: datetime) -> None:
+    created = (now - timedelta(days=2)).astimezone(TZ)
+    record = {**BULK_RECORD, "createdAt": created.isoformat(), "updatedAt": created.isoformat()}
+    (connector.data_dir / "orders_last_30d.json").write_text(json.dumps([connector._bulk_order_to_rest(record, TZ)]))
+    connector._save_sync_state(now, full=True)
+
+
+def test_recent_orders_are_merged_in_the_bulk_shape(connector, monkeypatch):
+    now = datetime.now()
+    _write_bulk_file(connector, now)
+    created = (now - timedelta(days=1)).astimezone(TZ).isoformat()
+    monkeypatch.setattr(connector, "iter_all_orders", lambda **kwargs: iter([_rest_order(1002, created)]))
+
+    connector.pull_recent_orders()
+
+    orders = json.loads((connector.data_dir / "orders_last_30d.json").read_text())
+    assert [o["id"] for o in orders] == [1001, 1002]
+    assert _shape(orders[0]) == _shape(orders[1])
+    assert "source_name" not in orders[1]
+
+
+def test_switching_order_shape_forces_a_full_pull(connector, monkeypatch):
+    _write_bulk_file(connector, datetime.now())
+    connector.use_bulk = False
+    monkeypatch.setattr(connector, "pull_last_30_days", lambda: "full pull")
+    assert connector.pull_recent_orders() == "full pull"
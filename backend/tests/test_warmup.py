@@ -0,0 +1,70 @@
+"""Warm-up hit history shared by several workers."""
+
+import json
+import multiprocessing
+import time
+
+import pytest
+
+from services import warmup
+
+KEY = json.dumps(["get_timeframe_summary", [7], {}], sort_keys=True)
+
+
+@pytest.fixture
+def hits_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(warmup, "HITS_FILE", tmp_path / "warmup_hits.json")
+    monkeypatch.setattr(warmup, "HITS_LOCK_FILE", tmp_path / "warmup_hits.lock")
+    monkeypatch.setattr(warmup, "_saved_counts", {})
+    return tmp_path / "warmup_hits.json"
+
+
+def _save_as_worker(counts: dict, monkeypatch) -> None:
+    """save_hits() as a fresh worker that has seen `counts` since startup."""
+    monkeypatch.setattr(warmup, "_saved_counts", {})
+    monkeypatch.setattr(warmup, "get_call_counts", lambda: dict(counts))
+    warmup.save_hits()
+
+
+def test_workers_add_counts_without_decaying_each_other(hits_file, monkeypatch):
+    for _ in range(4):
+        _save_as_worker({KEY: 10}, monkeypatch)
+    assert warmup._load_hits(time.time())[KEY] == pytest.approx(40, rel=1e-3)
+
+
+def test_repeated_saves_only_add_new_counts(hits_file, monkeypatch):
+    counts = {KEY: 5}
+    monkeypatch.setattr(warmup, "get_call_counts", lambda: dict(counts))
+    warmup.save_hits()
+    counts[KEY] = 8
+    warmup.save_hits()
+    assert warmup._load_hits(time.time())[KEY] == pytest.approx(8, rel=1e-3)
+
+
+def test_history_halves_per_half_life(hits_file, monkeypatch):
+    _save_as_worker({KEY: 16}, monkeypatch)
+    later = time.time() + warmup.HITS_HALF_LIFE_HOURS * 3600
+    assert warmup._load_hits(later)[KEY] == pytest.approx(8, rel=1e-3)
+
+
+def _worker_saves(hits_file: str, lock_file: str, n: int) -> None:
+    from pathlib import Path
+
+    warmup.HITS_FILE, warmup.HITS_LOCK_FILE = Path(hits_file), Path(lock_file)
+    warmup.HITS_HALF_LIFE_HOURS = 1e9  # No decay while the workers race
+    for i in range(1, n + 1):
+        warmup.get_call_counts = lambda i=i: {KEY: i}
+        warmup.save_hits()
+
+
+def test_concurrent_workers_do_not_lose_counts(hits_file):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_worker_saves, args=(str(hits_file), str(warmup.HITS_LOCK_FILE), 20))
+        for _ in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert json.loads(hits_file.read_text())["hits"][KEY] == pytest.approx(80)
@@ -10,29 +10,46 @@ Pulls data from Amazon SP-API:
 Requires Amazon SP-API credentials (separate from AWS credentials).
 """
 
+import asyncio
+import codecs
+import csv
 import hashlib
 import hmac
 import json
 import os
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator
 from urllib.parse import urlencode
 
 import requests
 from dotenv import load_dotenv
 
+from columnar import DATA_DIR
+
 load_dotenv()
 
 
 class AmazonSellerConnector:
     """Connector for Amazon Selling Partner API."""
 
-    # Amazon SP-API endpoints (US marketplace)
-    LWA_TOKEN_URL = "https://api.amazon.com/auth/o2/token"
-    SP_API_BASE = "https://sellingpartnerapi-na.amazon.com"
+    # Amazon SP-API endpoints (US marketplace); overridable to point at a stand-in for load tests
+    LWA_TOKEN_URL = os.getenv("AMAZON_LWA_TOKEN_URL", "https://api.amazon.com/auth/o2/token")
+    SP_API_BASE = os.getenv("AMAZON_SP_API_BASE", "https://sellingpartnerapi-na.amazon.com")
 
     MARKETPLACE_ID = "ATVPDKIKX0DER"  # US marketplace
 
+    # Reports API
+    REPORTS_API = "/reports/2021-06-30"
+    ORDERS_REPORT_TYPE = "GET_FLAT_FILE_ALL_ORDERS_DATA_BY_ORDER_DATE_GENERAL"
+    REPORT_POLL_INTERVAL = float(os.getenv("AMAZON_REPORT_POLL_INTERVAL", 30))  # Seconds between status checks
+    REPORT_TIMEOUT = 1800         # Give up on a report after 30 minutes
+    REPORT_CACHE_TTL = 1800       # Reuse a finished report for the same range for 30 minutes
+
+    # Order statuses that never become revenue
+    EXCLUDED_ORDER_STATUSES = {"Cancelled"}
+
     def __init__(self):
         # LWA (Login with Amazon) credentials
         self.lwa_client_id = os.getenv("AMAZON_LWA_CLIENT_ID")
@@ -43,7 +60,7 @@ class AmazonSellerConnector:
         self.sp_api_role_arn = os.getenv("AMAZON_SP_API_ROLE_ARN")
 
         self.access_token = None
-        self.data_dir = Path(__file__).parent / "data" / "amazon"
+        self.data_dir = DATA_DIR / "amazon"
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
         # Validate credentials
@@ -76,7 +93,8 @@ class AmazonSellerConnector:
         data = response.json()
         self.access_token = data["access_token"]
 
-    def _api_request(self, endpoint: str, method: str = "GET", params: dict = None) -> dict:
+    def _api_request(self, endpoint: str, method: str = "GET", params: dict = None,
+                     json_body: dict = None) -> dict:
         """Make API request to SP-API."""
         if not self.configured:
             raise Exception("Amazon SP-API not configured. Check credentials in .env")
@@ -90,15 +108,15 @@ class AmazonSellerConnector:
         if params:
             url = f"{url}?{urlencode(params)}"
 
-        response = requests.request(method, url, headers=headers)
+        response = requests.request(method, url, headers=headers, json=json_body)
 
         if response.status_code == 401:
             # Token expired, refresh and retry
             self._refresh_access_token()
             headers["x-amz-access-token"] = self.access_token
-            response = requests.request(method, url, headers=headers)
+            response = requests.request(method, url, headers=headers, json=json_body)
 
-        if response.status_code != 200:
+        if response.status_code not in (200, 202):
             raise Exception(f"Amazon API Error: {response.status_code} - {response.text}")
 
         return response.json()
@@ -160,7 +178,7 @@ class AmazonSellerConnector:
 
         return all_orders
 
-    def get_sales_by_date(self, start_date: str, end_date: str) -> list:
+    def get_sales_by_date(self, start_date: str, end_date: str) -> dict:
         """
         Get sales and traffic data by date using Reports API.
 
@@ -169,40 +187,219 @@ class AmazonSellerConnector:
         - Revenue
         - Sessions (traffic)
         """
-        # Request a GET_SALES_AND_TRAFFIC_REPORT
-        report_params = {
-            "reportType": "GET_SALES_AND_TRAFFIC_REPORT",
+        document_id = asyncio.run(self.run_report_async(
+            "GET_SALES_AND_TRAFFIC_REPORT",
+            start_date,
+            end_date,
+            report_options={"dateGranularity": "DAY", "asinGranularity": "PARENT"},
+        ))
+        return json.loads("\n".join(self.stream_report_document(document_id)))
+
+    # =========================================================================
+    # REPORTS PIPELINE - create, poll without blocking, stream the document
+    # =========================================================================
+
+    def create_report(self, report_type: str, start_date: str, end_date: str,
+                      report_options: dict = None) -> str:
+        """Request a new report and return its reportId."""
+        body = {
+            "reportType": report_type,
             "marketplaceIds": [self.MARKETPLACE_ID],
             "dataStartTime": f"{start_date}T00:00:00Z",
             "dataEndTime": f"{end_date}T23:59:59Z",
         }
+        if report_options:
+            body["reportOptions"] = report_options
 
-        # Create report request
-        create_response = self._api_request(
-            "/reports/2021-06-30/reports",
-            method="POST",
-            params=report_params,
-        )
+        response = self._api_request(f"{self.REPORTS_API}/reports", method="POST", json_body=body)
+        return response["reportId"]
+
+    def get_report_status(self, report_id: str) -> dict:
+        """Get the processing status of a report (single call, never waits)."""
+        return self._api_request(f"{self.REPORTS_API}/reports/{report_id}")
+
+    def stream_report_document(self, document_id: str) -> Iterator[str]:
+        """
+        Download a report document and yield it line by line.
 
-        report_id = create_response.get("reportId")
-
-        # Poll for report completion (simplified - in production use async)
-        import time
-        for _ in range(30):  # Max 5 minutes
-            status = self._api_request(f"/reports/2021-06-30/reports/{report_id}")
-            if status.get("processingStatus") == "DONE":
-                # Get the report document
-                doc_id = status.get("reportDocumentId")
-                doc = self._api_request(f"/reports/2021-06-30/documents/{doc_id}")
-                # Download and parse report
-                report_url = doc.get("url")
-                report_data = requests.get(report_url).json()
-                return report_data
-            elif status.get("processingStatus") == "FATAL":
+        The document is streamed and GZIP-decompressed incrementally, so large
+        reports never have to fit in memory.
+        """
+        doc = self._api_request(f"{self.REPORTS_API}/documents/{document_id}")
+        gzipped = doc.get("compressionAlgorithm") == "GZIP"
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        # Incremental, so a multibyte character split across chunks is decoded whole
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        with requests.get(doc["url"], stream=True, timeout=60) as response:
+            response.raise_for_status()
+            buffer = ""
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if decompressor:
+                    chunk = decompressor.decompress(chunk)
+                buffer += decoder.decode(chunk)
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    yield line.rstrip("\r")
+            tail = decompressor.flush() if decompressor else b""
+            buffer += decoder.decode(tail, final=True)
+            if buffer:
+                yield buffer.rstrip("\r")
+
+    def _load_report_cache(self) -> dict:
+        """Load the report bookkeeping file (pending and finished reports)."""
+        try:
+            with open(self.data_dir / "reports_cache.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_report_cache(self, cache: dict):
+        """Persist the report bookkeeping file."""
+        with open(self.data_dir / "reports_cache.json", "w") as f:
+            json.dump(cache, f, indent=2)
+
+    async def run_report_async(self, report_type: str, start_date: str, end_date: str,
+                               report_options: dict = None,
+                               poll_interval: float = None, timeout: int = None,
+                               max_age: float = None) -> str:
+        """
+        Make sure a report exists for the range and return its document ID.
+
+        Reuses a finished report for the same range when it is less than
+        max_age seconds old (default REPORT_CACHE_TTL), resumes polling a report that a previous run already requested, and
+        only creates a new report otherwise. Polling uses asyncio.sleep and
+        runs the HTTP calls in a thread, so the event loop is never blocked.
+        """
+        poll_interval = poll_interval or self.REPORT_POLL_INTERVAL
+        timeout = timeout or self.REPORT_TIMEOUT
+        max_age = self.REPORT_CACHE_TTL if max_age is None else max_age
+        key = f"{report_type}:{start_date}:{end_date}"
+
+        cache = self._load_report_cache()
+        entry = cache.get(key)
+        now = datetime.now().timestamp()
+
+        if entry and entry.get("document_id") and now - entry.get("completed_at", 0) < max_age:
+            print(f"[Amazon] Reusing report {entry['report_id']} for {start_date} to {end_date}")
+            return entry["document_id"]
+
+        if not entry or entry.get("document_id") or now - entry.get("requested_at", 0) > timeout:
+            report_id = await asyncio.to_thread(
+                self.create_report, report_type, start_date, end_date, report_options
+            )
+            entry = {"report_id": report_id, "requested_at": now}
+            cache[key] = entry
+            self._save_report_cache(cache)
+            print(f"[Amazon] Requested report {report_id} ({report_type})")
+        else:
+            print(f"[Amazon] Resuming poll for report {entry['report_id']}")
+
+        deadline = entry["requested_at"] + timeout
+        while datetime.now().timestamp() < deadline:
+            status = await asyncio.to_thread(self.get_report_status, entry["report_id"])
+            processing = status.get("processingStatus")
+
+            if processing == "DONE":
+                entry["document_id"] = status["reportDocumentId"]
+                entry["completed_at"] = datetime.now().timestamp()
+                cache = self._load_report_cache()
+                cache[key] = entry
+                self._save_report_cache(cache)
+                return entry["document_id"]
+
+            if processing in ("FATAL", "CANCELLED"):
+                cache = self._load_report_cache()
+                cache.pop(key, None)
+                self._save_report_cache(cache)
                 raise Exception(f"Report generation failed: {status}")
-            time.sleep(10)
 
-        raise Exception("Report generation timed out")
+            await asyncio.sleep(poll_interval)
+
+        raise Exception(f"Report {entry['report_id']} timed out after {timeout}s")
+
+    def aggregate_orders_report(self, lines: Iterator[str]) -> dict:
+        """
+        Aggregate a flat-file orders report into daily sales.
+
+        The report has one row per order item. Totals match the Orders API
+        OrderTotal (item + shipping + tax + gift wrap, less promotions).
+        Returns {date: {"sales", "orders", "units"}}.
+        """
+        add_fields = ["item-price", "item-tax", "shipping-price", "shipping-tax",
+                      "gift-wrap-price", "gift-wrap-tax"]
+        subtract_fields = ["item-promotion-discount", "ship-promotion-discount"]
+
+        def amount(row: dict, field: str) -> float:
+            try:
+                return float(row.get(field) or 0)
+            except ValueError:
+                return 0.0
+
+        daily = {}
+        order_ids = {}  # date -> set of distinct order IDs (a report lists one row per item)
+
+        for row in csv.DictReader(lines, delimiter="\t"):
+            if row.get("order-status") in self.EXCLUDED_ORDER_STATUSES:
+                continue
+            date = (row.get("purchase-date") or "")[:10]
+            if not date:
+                continue
+
+            day = daily.setdefault(date, {"sales": 0.0, "orders": 0, "units": 0})
+            day["sales"] += sum(amount(row, f) for f in add_fields) - sum(amount(row, f) for f in subtract_fields)
+            day["units"] += int(amount(row, "quantity"))
+            order_ids.setdefault(date, set()).add(row.get("amazon-order-id"))
+
+        for date, ids in order_ids.items():
+            daily[date]["orders"] = len(ids)
+            daily[date]["sales"] = round(daily[date]["sales"], 2)
+
+        return daily
+
+    def save_daily_sales(self, daily: dict, report_id: str = None) -> dict:
+        """Merge newly reported days into daily_sales.json and return the file contents."""
+        filepath = self.data_dir / "daily_sales.json"
+        try:
+            with open(filepath) as f:
+                existing = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            existing = {"days": {}}
+
+        existing["days"].update(daily)
+        existing["days"] = dict(sorted(existing["days"].items()))
+        existing["updated_at"] = datetime.now().isoformat()
+        existing["source"] = self.ORDERS_REPORT_TYPE
+        if report_id:
+            existing["report_id"] = report_id
+
+        self.save_data(existing, "daily_sales.json")
+        return existing
+
+    async def pull_daily_sales_async(self, start_date: str, end_date: str,
+                                     poll_interval: float = None, max_report_age: float = None) -> dict:
+        """
+        Pull daily Amazon sales for a date range via the Reports API.
+
+        Schedules the orders report, polls without blocking, streams and
+        aggregates the document, and persists the result to daily_sales.json.
+        A finished report younger than max_report_age seconds is reused.
+        """
+        document_id = await self.run_report_async(
+            self.ORDERS_REPORT_TYPE, start_date, end_date,
+            poll_interval=poll_interval, max_age=max_report_age,
+        )
+        daily = await asyncio.to_thread(
+            lambda: self.aggregate_orders_report(self.stream_report_document(document_id))
+        )
+        report_id = self._load_report_cache().get(
+            f"{self.ORDERS_REPORT_TYPE}:{start_date}:{end_date}", {}
+        ).get("report_id")
+        return self.save_daily_sales(daily, report_id=report_id)
+
+    def pull_daily_sales(self, start_date: str, end_date: str) -> dict:
+        """Synchronous wrapper around pull_daily_sales_async for scripts."""
+        return asyncio.run(self.pull_daily_sales_async(start_date, end_date))
 
     def get_orders_for_timeframe(self, days: int) -> dict:
         """
@@ -310,6 +507,11 @@ class AmazonSellerConnector:
         print(f"Pulling Amazon data from {start_date} to {end_date}...")
 
         try:
+            # Daily sales via the Reports API (no page cap, used by the backend)
+            print("  Fetching daily sales report...")
+            daily_sales = self.pull_daily_sales(start_date, end_date)
+            print(f"  Daily sales stored for {len(daily_sales['days'])} days")
+
             # Get orders
             print("  Fetching orders...")
             orders = self.get_orders(start_date, end_date)
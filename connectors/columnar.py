@@ -0,0 +1,534 @@
+"""
+Columnar Storage for Tabular Connector Outputs
+
+Connectors always write pretty-printed JSON. When COLUMNAR_FORMAT=true (and
+pyarrow is installed) the tabular datasets below also get an Arrow IPC file
+next to the JSON (same name, .arrow suffix). The backend memory-maps the
+Arrow file instead of re-parsing the JSON: open_columnar() and
+open_generation() return tables whose buffers are the mapped file pages,
+which the OS shares between every worker mapping the same file. Column
+selection, date filtering, paging (table_rows, date_range_indices) and
+period sums (numeric_columns) run on those buffers; only rows handed back
+to callers as dicts are decoded per worker.
+
+Rows read back exactly as they were written: columns holding one scalar
+type are stored natively (nulls in them marked as missing keys where rows
+lacked the key), and nested or mixed-type columns are stored as JSON text.
+
+The JSON file stays the source of truth: an Arrow file older than its JSON
+file is ignored, and nothing is read from Arrow files while the format is
+disabled, so a pull that skips them never serves stale rows.
+
+Data generations: after each pull, publish_generation() snapshots every
+tabular dataset into data/generations/<N>/ and then atomically points
+data/generations/CURRENT at N. Backend workers (one per uvicorn process)
+read the same snapshot, and a CURRENT change tells every worker to swap to
+the new generation.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pc = None
+    ARROW_AVAILABLE = False
+
+DATA_DIR = Path(os.environ.get("CONNECTORS_DATA_DIR") or Path(__file__).parent / "data")
+
+COLUMNAR_ENABLED = os.getenv("COLUMNAR_FORMAT", "false").lower() in ("1", "true", "yes")
+
+# Tabular datasets: path relative to data/ -> key holding the rows (None = file is the row list)
+TABULAR_DATASETS = {
+    "kendall/historical_metrics.json": "metrics",
+    "google_ads/campaigns_last_30d.json": None,
+    "meta_ads/campaigns_last_30d.json": None,
+    "gsc/daily_branded_trend.json": None,
+    "ga4/daily_traffic.json": None,
+    "shipstation/shipments_last_30d.json": None,
+    "shopify/orders_last_30d.json": None,
+}
+
+# Rows per record batch when streaming
+BATCH_SIZE = 5000
+
+# Published data generations
+GENERATIONS_DIR = DATA_DIR / "generations"
+CURRENT_FILE = GENERATIONS_DIR / "CURRENT"
+GENERATIONS_KEEP = 3
+
+
+def _dataset_key(json_path: Path) -> Optional[str]:
+    """Get the TABULAR_DATASETS key for a JSON path, or None if it isn't tabular."""
+    try:
+        return Path(json_path).resolve().relative_to(DATA_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def sidecar_path(json_path: Path) -> Path:
+    """Get the Arrow file path for a JSON dataset."""
+    return Path(json_path).with_suffix(".arrow")
+
+
+def is_tabular(json_path: Path) -> bool:
+    """Check if a JSON file is one of the tabular datasets."""
+    return _dataset_key(json_path) in TABULAR_DATASETS
+
+
+# Schema metadata marking files written with the column encoding below (older files are ignored)
+FORMAT_KEY = b"tuff_format"
+FORMAT_VERSION = b"2"
+
+# Field metadata: values are JSON text (nested or mixed-type columns; null = key missing)
+JSON_FIELD = b"json"
+# Field metadata: nulls in this column are keys missing from the row, not JSON nulls
+ABSENT_FIELD = b"absent"
+
+_MISSING = object()
+
+
+def _scalar_type(value_type: type):
+    return {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string()}.get(value_type)
+
+
+def _infer_schema(rows: list[dict]):
+    """
+    Explicit schema for a row list.
+
+    A column whose values are all one scalar type keeps that type (ints stay
+    int64 even if another column has floats). Columns that mix types, hold
+    nested values, or have both explicit nulls and missing keys are stored
+    as JSON text.
+    """
+    types = {}
+    present = {}
+    for row in rows:
+        for key, value in row.items():
+            types.setdefault(key, set()).add(type(value))
+            present[key] = present.get(key, 0) + 1
+
+    fields = []
+    for key, key_types in types.items():
+        missing = present[key] < len(rows)
+        value_types = key_types - {type(None)}
+        arrow_type = _scalar_type(next(iter(value_types))) if len(value_types) == 1 else None
+        if arrow_type is None or (missing and type(None) in key_types):
+            fields.append(pa.field(key, pa.string(), metadata={JSON_FIELD: b"1"}))
+        else:
+            fields.append(pa.field(key, arrow_type, metadata={ABSENT_FIELD: b"1"} if missing else None))
+    return pa.schema(fields, metadata={FORMAT_KEY: FORMAT_VERSION})
+
+
+def _field_flag(f, flag: bytes) -> bool:
+    return bool(f.metadata and flag in f.metadata)
+
+
+def _fits_schema(rows: list[dict], schema) -> bool:
+    """Check that rows encode under an existing schema without changing any value."""
+    own = _infer_schema(rows)
+    for f in own:
+        if f.name not in schema.names:
+            return False
+        target = schema.field(f.name)
+        if _field_flag(target, JSON_FIELD):
+            continue
+        if f.type != target.type or _field_flag(f, JSON_FIELD):
+            return False
+        if _field_flag(f, ABSENT_FIELD) and not _field_flag(target, ABSENT_FIELD):
+            return False
+    return all(
+        _field_flag(f, ABSENT_FIELD) or _field_flag(f, JSON_FIELD)
+        for f in schema if f.name not in own.names
+    )
+
+
+def _rows_to_table(rows: list[dict], schema):
+    """Encode rows under an explicit schema."""
+    arrays = []
+    for f in schema:
+        key = f.name
+        if _field_flag(f, JSON_FIELD):
+            values = [json.dumps(row[key], default=str) if key in row else None for row in rows]
+        else:
+            values = [row.get(key) for row in rows]
+        arrays.append(pa.array(values, type=f.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _table_to_rows(table) -> list[dict]:
+    """Decode rows written by _rows_to_table (missing keys are left out)."""
+    names = table.column_names
+    columns = []
+    sparse = False
+    for f, column in zip(table.schema, table.columns):
+        values = column.to_pylist()
+        if _field_flag(f, JSON_FIELD):
+            values = [_MISSING if v is None else json.loads(v) for v in values]
+            sparse = True
+        elif _field_flag(f, ABSENT_FIELD):
+            values = [_MISSING if v is None else v for v in values]
+            sparse = True
+        columns.append(values)
+
+    if not columns:
+        return [{} for _ in range(table.num_rows)]
+    if not sparse:
+        return [dict(zip(names, values)) for values in zip(*columns)]
+    return [
+        {k: v for k, v in zip(names, values) if v is not _MISSING}
+        for values in zip(*columns)
+    ]
+
+
+def _write_arrow(path: Path, data: dict | list, rows_key: Optional[str]) -> None:
+    """Write a dataset to an Arrow IPC file (via a temp file + rename)."""
+    rows = data.get(rows_key, []) if rows_key else data
+
+    metadata = {FORMAT_KEY: FORMAT_VERSION}
+    if rows_key:
+        metadata[b"rows_key"] = rows_key.encode()
+        metadata[b"wrapper"] = json.dumps({k: v for k, v in data.items() if k != rows_key}, default=str).encode()
+
+    tmp_path = path.with_suffix(".arrow.part")
+    try:
+        schema = _infer_schema(rows).with_metadata(metadata)
+        table = _rows_to_table(rows, schema)
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=BATCH_SIZE)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    tmp_path.replace(path)
+
+
+def write_columnar(json_path: Path, data: dict | list) -> Optional[Path]:
+    """
+    Write the Arrow sidecar for a tabular dataset (no-op if disabled or not tabular).
+
+    Returns the sidecar path, or None if nothing was written.
+    """
+    key = _dataset_key(json_path)
+    if not COLUMNAR_ENABLED or not ARROW_AVAILABLE or key not in TABULAR_DATASETS:
+        return None
+
+    path = sidecar_path(json_path)
+    try:
+        _write_arrow(path, data, TABULAR_DATASETS[key])
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        print(f"  Columnar write skipped for {key}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+
+    return path
+
+
+def write_columnar_stream(json_path: Path, rows: Iterator[dict]) -> Iterator[dict]:
+    """
+    Write the Arrow sidecar for a row stream as rows pass through (pass-through generator).
+
+    The schema comes from the first batch; if a later batch doesn't fit it
+    exactly (new keys, other value types, missing keys in a column that had
+    none), the sidecar is dropped and the JSON file alone is used.
+    """
+    key = _dataset_key(json_path)
+    if not COLUMNAR_ENABLED or not ARROW_AVAILABLE or key not in TABULAR_DATASETS:
+        yield from rows
+        return
+
+    path = sidecar_path(json_path)
+    tmp_path = path.with_suffix(".arrow.part")
+    sink = None
+    writer = None
+    schema = None
+    failed = False
+    batch = []
+
+    def flush():
+        nonlocal sink, writer, schema, failed
+        if failed or not batch:
+            return
+        try:
+            if writer is None:
+                schema = _infer_schema(batch)
+                sink = pa.OSFile(str(tmp_path), "wb")
+                writer = pa.ipc.new_file(sink, schema)
+            elif not _fits_schema(batch, schema):
+                raise ValueError("rows don't fit the first batch's schema")
+            writer.write_table(_rows_to_table(batch, schema))
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            print(f"  Columnar write skipped for {key}: {e}")
+            failed = True
+
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                flush()
+                batch = []
+            yield row
+        flush()
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+
+    if failed or writer is None:
+        tmp_path.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+    else:
+        tmp_path.replace(path)
+
+
+def _open_arrow(path: Path):
+    """
+    Memory-map an Arrow IPC file as a table (None if written in an older format).
+
+    Nothing is copied: the table's buffers point into the mapping, which
+    stays open for as long as the table (or any slice of it) is referenced.
+    """
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if (table.schema.metadata or {}).get(FORMAT_KEY) != FORMAT_VERSION:
+        return None
+    return table
+
+
+def table_rows(table, columns: list[str] = None) -> list[dict]:
+    """Decode a table's rows into dicts, optionally with only the given columns."""
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return _table_to_rows(table)
+
+
+def table_data(table, columns: list[str] = None) -> dict | list:
+    """Decode a whole table back into the JSON shape of its dataset."""
+    rows = table_rows(table, columns)
+    metadata = table.schema.metadata or {}
+    if b"rows_key" in metadata:
+        data = json.loads(metadata[b"wrapper"])
+        data[metadata[b"rows_key"].decode()] = rows
+        return data
+    return rows
+
+
+def _date_strings(table, date_field: str):
+    """A table's date column as Arrow strings (missing dates as ""), or None if it has none."""
+    if date_field not in table.column_names:
+        return None
+    f = table.schema.field(date_field)
+    column = table.column(date_field)
+    if _field_flag(f, JSON_FIELD):
+        values = [json.loads(v) if v is not None else None for v in column.to_pylist()]
+        return pa.chunked_array([pa.array([v if isinstance(v, str) else "" for v in values], type=pa.string())])
+    if not pa.types.is_string(f.type):
+        return None
+    return pc.fill_null(column, "") if column.null_count else column
+
+
+def date_range_indices(table, date_from: Optional[str], date_to: Optional[str], date_field: str = "date"):
+    """
+    Positions of the rows whose date part (YYYY-MM-DD) is within inclusive bounds.
+
+    Matches data_loader.query_rows on decoded rows. Returns None if the table
+    has no string date column to filter on.
+    """
+    dates = _date_strings(table, date_field)
+    if dates is None:
+        return None
+    days = pc.utf8_slice_codeunits(dates, 0, 10)
+    conditions = []
+    if date_from:
+        conditions.append(pc.greater_equal(days, date_from))
+    if date_to:
+        conditions.append(pc.less_equal(days, date_to))
+    if not conditions:
+        return pa.array(range(len(table)), type=pa.uint64())
+    mask = conditions[0] if len(conditions) == 1 else pc.and_(*conditions)
+    return pc.indices_nonzero(mask)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def numeric_columns(table, date_field: str = "date") -> tuple:
+    """
+    Dates and numeric columns of a table, for period_compare.PeriodIndex.from_columns.
+
+    Returns (dates, {field: values}, int_fields). Native int and float
+    columns are the table's own (mapped) arrays; only JSON-text columns that
+    mix ints and floats are decoded, with non-numbers counted as 0.
+    """
+    dates = _date_strings(table, date_field)
+    if dates is None:
+        dates = pa.chunked_array([pa.array([""] * len(table), type=pa.string())])
+
+    columns = {}
+    int_fields = set()
+    for f in table.schema:
+        if f.name == date_field:
+            continue
+        if _field_flag(f, JSON_FIELD):
+            values = [json.loads(v) if v is not None else None for v in table.column(f.name).to_pylist()]
+            numbers = [v for v in values if _is_number(v)]
+            if not numbers:
+                continue
+            is_int = all(isinstance(v, int) for v in numbers)
+            columns[f.name] = pa.chunked_array([pa.array(
+                [v if _is_number(v) else 0 for v in values], type=pa.int64() if is_int else pa.float64(),
+            )])
+        elif pa.types.is_integer(f.type) or pa.types.is_floating(f.type):
+            columns[f.name] = table.column(f.name)
+            is_int = pa.types.is_integer(f.type)
+        else:
+            continue
+        if is_int:
+            int_fields.add(f.name)
+    return dates, columns, int_fields
+
+
+def _is_fresh(path: Path, json_path: Path) -> bool:
+    """Check that an Arrow file exists and is at least as new as its JSON file."""
+    try:
+        return path.stat().st_mtime >= Path(json_path).stat().st_mtime
+    except OSError:
+        return False
+
+
+def open_columnar(json_path: Path):
+    """
+    Memory-map a tabular dataset's Arrow sidecar as a table.
+
+    None if the format is disabled or there is no fresh sidecar to read.
+    """
+    if not COLUMNAR_ENABLED or not ARROW_AVAILABLE:
+        return None
+
+    path = sidecar_path(json_path)
+    if not _is_fresh(path, json_path):
+        return None
+    return _open_arrow(path)
+
+
+def read_columnar(json_path: Path, columns: list[str] = None) -> Optional[dict | list]:
+    """
+    Read a tabular dataset from its Arrow sidecar.
+
+    Returns data in the same shape as the JSON file (optionally with only the
+    given row columns), or None if open_columnar() finds nothing to read.
+    """
+    table = open_columnar(json_path)
+    return table_data(table, columns) if table is not None else None
+
+
+# =============================================================================
+# DATA GENERATIONS
+# =============================================================================
+
+def current_generation() -> Optional[int]:
+    """Get the currently published data generation, or None if none is published."""
+    try:
+        return int(CURRENT_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def generation_path(generation: int, json_path: Path) -> Optional[Path]:
+    """Get a dataset's Arrow file within a published generation."""
+    key = _dataset_key(json_path)
+    if key not in TABULAR_DATASETS:
+        return None
+    return GENERATIONS_DIR / str(generation) / Path(key).with_suffix(".arrow")
+
+
+def open_generation(generation: int, json_path: Path):
+    """
+    Memory-map a dataset from a published generation as a table.
+
+    Same rules as open_columnar(): None if the format is disabled, the
+    dataset isn't in the generation, or its JSON file was rewritten after
+    the generation was published.
+    """
+    if not COLUMNAR_ENABLED or not ARROW_AVAILABLE:
+        return None
+
+    path = generation_path(generation, json_path)
+    if path is None or not _is_fresh(path, json_path):
+        return None
+    return _open_arrow(path)
+
+
+def read_generation(generation: int, json_path: Path, columns: list[str] = None) -> Optional[dict | list]:
+    """Read a dataset from a published generation in its JSON shape (see open_generation)."""
+    table = open_generation(generation, json_path)
+    return table_data(table, columns) if table is not None else None
+
+
+def publish_generation() -> Optional[int]:
+    """
+    Snapshot all tabular datasets into a new generation and make it current.
+
+    Fresh sidecars are hard-linked (they are only ever replaced by rename, so
+    the snapshot can't change underneath a reader); other datasets are
+    converted from JSON. CURRENT is swapped last, with an atomic rename.
+    """
+    if not COLUMNAR_ENABLED or not ARROW_AVAILABLE:
+        return None
+
+    GENERATIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+    # mkdir is atomic, so concurrent publishers get distinct numbers
+    generation = (current_generation() or 0) + 1
+    while True:
+        gen_dir = GENERATIONS_DIR / str(generation)
+        try:
+            gen_dir.mkdir()
+            break
+        except FileExistsError:
+            generation += 1
+
+    published = 0
+    for key, rows_key in TABULAR_DATASETS.items():
+        json_path = DATA_DIR / key
+        if not json_path.exists():
+            continue
+
+        target = gen_dir / Path(key).with_suffix(".arrow")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        sidecar = sidecar_path(json_path)
+
+        try:
+            if _is_fresh(sidecar, json_path):
+                try:
+                    os.link(sidecar, target)
+                except OSError:
+                    shutil.copy2(sidecar, target)
+            else:
+                with open(json_path) as f:
+                    _write_arrow(target, json.load(f), rows_key)
+            published += 1
+        except (pa.ArrowException, TypeError, ValueError, json.JSONDecodeError) as e:
+            print(f"  Generation {generation}: skipped {key}: {e}")
+
+    tmp_current = CURRENT_FILE.with_suffix(".part")
+    tmp_current.write_text(str(generation))
+    tmp_current.replace(CURRENT_FILE)
+    print(f"Published data generation {generation} ({published} datasets)")
+
+    # Old generations stay readable for workers still mapping them
+    generations = sorted(int(p.name) for p in GENERATIONS_DIR.iterdir() if p.is_dir() and p.name.isdigit())
+    for old in generations[:-GENERATIONS_KEEP]:
+        shutil.rmtree(GENERATIONS_DIR / str(old), ignore_errors=True)
+
+    return generation
@@ -0,0 +1,226 @@
+"""
+Product Cost Table for TuffWraps COGS Calculation
+
+Compiles product_costs.json into a compact, integer-keyed lookup (sorted
+variant IDs with a parallel cost array) once per file version, then costs a
+flattened line-item table in one vectorized pass.
+
+Lookup order per line item matches the original per-item logic, and is
+implemented once in CostTable.resolve():
+1. Variant ID cost
+2. SKU cost
+3. Line price x average COGS %
+
+numpy is used when available (installed with pandas); otherwise the same
+results come from plain dict lookups.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# Compiled tables by file path -> (version, CostTable)
+_table_cache: dict[str, tuple[str, "CostTable"]] = {}
+
+
+def _to_variant_id(value) -> int:
+    """Convert a variant ID to an int key, or -1 if it can't be one."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return -1
+
+
+@dataclass
+class LineItems:
+    """Line items from many orders flattened into parallel columns."""
+    order_count: int = 0
+    order_index: list = field(default_factory=list)
+    variant_id: list = field(default_factory=list)
+    sku: list = field(default_factory=list)
+    quantity: list = field(default_factory=list)
+    price: list = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.order_index)
+
+
+def flatten_line_items(orders: list[dict]) -> LineItems:
+    """Flatten order line items into a column table (one row per line item)."""
+    items = LineItems(order_count=len(orders))
+
+    # Bound appends keep the per-item cost of this loop low
+    add_order = items.order_index.append
+    add_variant = items.variant_id.append
+    add_sku = items.sku.append
+    add_quantity = items.quantity.append
+    add_price = items.price.append
+
+    for i, order in enumerate(orders):
+        for item in order.get("line_items", []):
+            variant_id = item.get("variant_id")
+            add_order(i)
+            add_variant(variant_id if type(variant_id) is int else _to_variant_id(variant_id))
+            add_sku(item.get("sku") or "")
+            add_quantity(int(item.get("quantity", 1)))
+            add_price(float(item.get("price", 0) or 0))
+
+    return items
+
+
+class CostTable:
+    """Integer-keyed product cost lookup built from product_costs.json data."""
+
+    def __init__(self, product_costs: dict, version: str = None):
+        self.product_costs = product_costs
+        self.version = version
+        self.fallback_percent = product_costs.get("average_cogs_percent", 35) / 100
+        self.sku_costs = {
+            sku: float(cost) for sku, cost in product_costs.get("by_sku", {}).items()
+            if sku and cost is not None
+        }
+
+        pairs = sorted(
+            (int(var_id), float(cost))
+            for var_id, cost in product_costs.get("by_variant_id", {}).items()
+            if var_id.isdigit() and cost is not None
+        )
+        self.variant_costs = dict(pairs)
+
+        if NUMPY_AVAILABLE:
+            self.variant_id_array = np.array([p[0] for p in pairs], dtype=np.int64)
+            self.variant_cost_array = np.array([p[1] for p in pairs], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.variant_costs)
+
+    def cost_order(self, order: dict) -> tuple[float, bool]:
+        """Cost a single order (for streaming passes). Returns (cogs, has_actual_cost)."""
+        line_costs, has_actual = self.resolve(flatten_line_items([order]), vectorized=False)
+        return float(sum(line_costs)), any(has_actual)
+
+    def cost_line_items(self, items: LineItems) -> tuple[list, list]:
+        """
+        Cost every line item.
+
+        Returns (line_costs, has_actual) - total cost per line item (cost x qty)
+        and whether it came from an actual variant/SKU cost.
+        """
+        return self.resolve(items)
+
+    def resolve(self, items: LineItems, vectorized: bool = NUMPY_AVAILABLE):
+        """
+        Resolve line item costs: variant ID cost, then SKU cost, then line price x average COGS %.
+
+        With vectorized=True (numpy arrays in and out) the variant lookup is a
+        searchsorted over the compiled IDs; only variant misses are looked up
+        by SKU either way.
+        """
+        # 1. Variant ID cost
+        if vectorized:
+            variant_ids = np.array(items.variant_id, dtype=np.int64)
+            unit_cost = np.zeros(len(items), dtype=np.float64)
+            has_actual = np.zeros(len(items), dtype=bool)
+            if len(self.variant_id_array):
+                pos = np.searchsorted(self.variant_id_array, variant_ids)
+                pos = np.minimum(pos, len(self.variant_id_array) - 1)
+                matched = (self.variant_id_array[pos] == variant_ids) & (variant_ids >= 0)
+                unit_cost[matched] = self.variant_cost_array[pos[matched]]
+                has_actual |= matched
+            misses = np.flatnonzero(~has_actual).tolist()
+        else:
+            found = [self.variant_costs.get(var_id) for var_id in items.variant_id]
+            has_actual = [cost is not None for cost in found]
+            unit_cost = [cost or 0.0 for cost in found]
+            misses = [i for i, actual in enumerate(has_actual) if not actual]
+
+        # 2. SKU cost
+        if misses and self.sku_costs:
+            sku_costs = self.sku_costs
+            skus = items.sku
+            for i in misses:
+                cost = sku_costs.get(skus[i])
+                if cost is not None:
+                    unit_cost[i] = cost
+                    has_actual[i] = True
+
+        # 3. Line price x average COGS %
+        if vectorized:
+            quantity = np.array(items.quantity, dtype=np.float64)
+            price = np.array(items.price, dtype=np.float64)
+            line_costs = np.where(has_actual, unit_cost * quantity, price * quantity * self.fallback_percent)
+        else:
+            line_costs = [
+                cost * qty if actual else price * qty * self.fallback_percent
+                for cost, actual, qty, price in zip(unit_cost, has_actual, items.quantity, items.price)
+            ]
+        return line_costs, has_actual
+
+    def cost_orders(self, orders: list[dict]) -> dict:
+        """
+        Cost a list of orders.
+
+        Returns total COGS, per-order COGS, which orders had at least one
+        actual cost, and line item counts by cost source.
+        """
+        items = flatten_line_items(orders)
+        line_costs, has_actual = self.cost_line_items(items)
+
+        if NUMPY_AVAILABLE:
+            order_index = np.array(items.order_index, dtype=np.int64)
+            order_cogs = np.bincount(order_index, weights=line_costs, minlength=items.order_count)
+            order_actual = np.bincount(order_index, weights=has_actual, minlength=items.order_count) > 0
+            items_with_cost = int(has_actual.sum())
+            total_cogs = float(order_cogs.sum())
+            order_cogs = order_cogs.tolist()
+            order_actual = order_actual.tolist()
+        else:
+            order_cogs = [0.0] * items.order_count
+            order_actual = [False] * items.order_count
+            for i, cost, actual in zip(items.order_index, line_costs, has_actual):
+                order_cogs[i] += cost
+                order_actual[i] = order_actual[i] or actual
+            items_with_cost = sum(has_actual)
+            total_cogs = sum(order_cogs)
+
+        return {
+            "total_cogs": total_cogs,
+            "order_cogs": order_cogs,
+            "order_has_actual_cost": order_actual,
+            "items_with_cost": items_with_cost,
+            "items_estimated": len(items) - items_with_cost,
+        }
+
+
+def load_cost_table(path: Path) -> Optional[CostTable]:
+    """
+    Load the cost table for a product_costs.json file.
+
+    The file is only read and compiled when its version (mtime + size)
+    changes; otherwise the cached table is returned.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    version = f"{stat.st_mtime_ns}:{stat.st_size}"
+    cached = _table_cache.get(str(path))
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with open(path) as f:
+        table = CostTable(json.load(f), version)
+    _table_cache[str(path)] = (version, table)
+    return table
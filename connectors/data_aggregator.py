@@ -10,8 +10,16 @@ This module:
 2. Uses Kendall attribution for de-duplicated channel revenue
 3. Calculates blended and per-channel CAM
 4. Generates the decision framework outputs
+
+Per-day partial aggregates (revenue, COGS, shipping, spend by channel) are
+kept in aggregated/daily_partials.json. Sources whose file hasn't changed
+since the last run are skipped; for changed ones only the days with new or
+updated rows are recomputed (Shopify by its orders' updated_at cursor), and
+days a source no longer covers are dropped. Rolling-window totals are
+composed from the partials instead of re-walking every order.
 """
 
+import hashlib
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -21,6 +29,8 @@ from typing import Optional
 
 from dotenv import load_dotenv
 
+from cost_table import CostTable, load_cost_table
+
 load_dotenv()
 
 
@@ -105,6 +115,17 @@ class DataAggregator:
     # Default shipping cost per order if not tracked
     DEFAULT_SHIPPING_COST_PER_ORDER = 6.50
 
+    # Fields each source owns in a daily partial
+    PARTIAL_FIELDS = {
+        "shopify": ["revenue", "orders", "cogs", "cogs_items_actual", "cogs_items_estimated"],
+        "google_ads": ["google_spend", "google_platform_revenue"],
+        "meta_ads": ["meta_spend", "meta_platform_revenue"],
+        "shipstation": ["shipping_cost", "shipments"],
+    }
+
+    # Rolling windows included in each report
+    ROLLING_WINDOWS = [7, 14, 30]
+
     def __init__(self):
         self.data_dir = Path(__file__).parent / "data"
         self.output_dir = self.data_dir / "aggregated"
@@ -123,6 +144,7 @@ class DataAggregator:
         self.shipping_costs = {}
         self.actual_cogs = None  # Will be calculated from orders if available
         self.actual_shipping = None  # Will be loaded from ShipStation
+        self.cost_table = None  # Compiled product cost lookup
 
         # Configuration (fallbacks if real data not available)
         self.cogs_percent = float(os.getenv("COGS_PERCENT", self.DEFAULT_COGS_PERCENT))
@@ -132,6 +154,13 @@ class DataAggregator:
         self.using_actual_cogs = False
         self.using_actual_shipping = False
 
+        # Incremental per-day aggregates
+        self.partials_file = self.output_dir / "daily_partials.json"
+        self.partials = {"fingerprints": {}, "sources": {}, "days": {}}
+        self.partials_loaded = False
+        self.source_files = {}  # source -> file its rows were loaded from (for change detection)
+        self.product_costs_version = None
+
     def load_shopify_data(self, filepath: str = None):
         """Load Shopify order data from file or pull fresh."""
         default_path = self.data_dir / "shopify" / "orders_last_30d.json"
@@ -146,6 +175,7 @@ class DataAggregator:
         if path and path.exists():
             with open(path) as f:
                 self.shopify_data = json.load(f)
+            self.source_files["shopify"] = path
             print(f"Loaded {len(self.shopify_data)} Shopify orders from {path}")
         else:
             print("No Shopify data file found.")
@@ -165,6 +195,7 @@ class DataAggregator:
         if path and path.exists():
             with open(path) as f:
                 self.google_ads_data = json.load(f)
+            self.source_files["google_ads"] = path
             print(f"Loaded {len(self.google_ads_data)} Google Ads records from {path}")
         else:
             print("No Google Ads data found. Run google_ads.py to pull data.")
@@ -184,6 +215,7 @@ class DataAggregator:
         if path and path.exists():
             with open(path) as f:
                 self.meta_ads_data = json.load(f)
+            self.source_files["meta_ads"] = path
             print(f"Loaded {len(self.meta_ads_data)} Meta Ads records from {path}")
         else:
             print("No Meta Ads data found. Run meta_ads.py to pull data.")
@@ -239,8 +271,10 @@ class DataAggregator:
             path = None
 
         if path and path.exists():
-            with open(path) as f:
-                self.product_costs = json.load(f)
+            # Compiled lookup is cached per file version, so unchanged costs aren't re-read
+            self.cost_table = load_cost_table(path)
+            self.product_costs = self.cost_table.product_costs
+            self.product_costs_version = self.cost_table.version
 
             # Update COGS percent from actual data
             actual_percent = self.product_costs.get("average_cogs_percent", 0)
@@ -268,6 +302,7 @@ class DataAggregator:
         if path and path.exists():
             with open(path) as f:
                 self.shipping_costs = json.load(f)
+            self.source_files["shipstation"] = path
 
             # Update shipping cost per order from actual data
             actual_cost = self.shipping_costs.get("average_cost_per_shipment", 0)
@@ -282,39 +317,19 @@ class DataAggregator:
             print(f"No ShipStation data. Using estimated shipping: ${self.shipping_cost_per_order:.2f}/order")
             print("  Run: python connectors/shipstation.py to pull actual costs")
 
+    def _cogs_for_orders(self, orders: list[dict]) -> tuple[float, int, int]:
+        """Calculate COGS for a list of orders. Returns (cogs, items_with_cost, items_estimated)."""
+        if self.cost_table is None:
+            self.cost_table = CostTable(self.product_costs, self.product_costs_version)
+        costed = self.cost_table.cost_orders(orders)
+        return costed["total_cogs"], costed["items_with_cost"], costed["items_estimated"]
+
     def calculate_actual_cogs_from_orders(self) -> float:
         """Calculate actual COGS from order line items using product costs."""
         if not self.shopify_data or not self.product_costs:
             return 0
 
-        by_variant = self.product_costs.get("by_variant_id", {})
-        by_sku = self.product_costs.get("by_sku", {})
-        fallback_percent = self.product_costs.get("average_cogs_percent", 35) / 100
-
-        total_cogs = 0
-        items_with_cost = 0
-        items_estimated = 0
-
-        for order in self.shopify_data:
-            for item in order.get("line_items", []):
-                quantity = int(item.get("quantity", 1))
-                variant_id = str(item.get("variant_id", ""))
-                sku = item.get("sku", "")
-                line_price = float(item.get("price", 0) or 0)
-
-                cost = None
-                if variant_id and variant_id in by_variant:
-                    cost = by_variant[variant_id]
-                    items_with_cost += 1
-                elif sku and sku in by_sku:
-                    cost = by_sku[sku]
-                    items_with_cost += 1
-                else:
-                    # Fallback to percentage
-                    cost = line_price * fallback_percent
-                    items_estimated += 1
-
-                total_cogs += cost * quantity
+        total_cogs, items_with_cost, items_estimated = self._cogs_for_orders(self.shopify_data)
 
         if items_with_cost > 0:
             self.using_actual_cogs = True
@@ -322,6 +337,266 @@ class DataAggregator:
 
         return total_cogs
 
+    # =========================================================================
+    # INCREMENTAL DAILY PARTIALS
+    # =========================================================================
+
+    def load_partials(self):
+        """Load stored per-day partial aggregates."""
+        if self.partials_file.exists():
+            try:
+                with open(self.partials_file) as f:
+                    self.partials = json.load(f)
+            except json.JSONDecodeError:
+                print("Daily partials file is corrupt - rebuilding from source data")
+        self.partials.setdefault("fingerprints", {})
+        self.partials.setdefault("sources", {})
+        self.partials.setdefault("days", {})
+        self.partials_loaded = True
+
+    def save_partials(self):
+        """Persist per-day partial aggregates."""
+        self.partials["days"] = dict(sorted(self.partials["days"].items()))
+        self.partials["updated_at"] = datetime.now().isoformat()
+        with open(self.partials_file, "w") as f:
+            json.dump(self.partials, f, indent=2)
+
+    @staticmethod
+    def _fingerprint(value) -> str:
+        """Stable hash of a day's source rows."""
+        return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def _updated_at(order: dict) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(order["updated_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _source_signature(self, source: str) -> Optional[str]:
+        """Size and mtime of a source's file (plus the cost table version for Shopify); None if not from a file."""
+        path = self.source_files.get(source)
+        if path is None:
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        if source == "shopify":
+            signature += f":{self.product_costs_version}"
+        return signature
+
+    def _group_source_by_day(self, source: str) -> dict:
+        """
+        Group one loaded source's rows by date.
+
+        Returns {date: (rows, compute_fn)} where compute_fn builds that
+        source's partial fields for the day.
+        """
+        if source == "shopify":
+            orders_by_day = {}
+            for order in self.shopify_data:
+                date = (order.get("created_at") or "")[:10]
+                if date:
+                    orders_by_day.setdefault(date, []).append(order)
+
+            def shopify_day(orders):
+                cogs, actual, estimated = (
+                    self._cogs_for_orders(orders) if self.product_costs else (0, 0, 0)
+                )
+                return {
+                    "revenue": sum(float(o.get("total_price", 0) or 0) for o in orders),
+                    "orders": len(orders),
+                    "cogs": cogs,
+                    "cogs_items_actual": actual,
+                    "cogs_items_estimated": estimated,
+                }
+
+            return {
+                date: (orders, lambda orders=orders: shopify_day(orders))
+                for date, orders in orders_by_day.items()
+            }
+
+        if source in ("google_ads", "meta_ads"):
+            rows = self.google_ads_data if source == "google_ads" else self.meta_ads_data
+            spend_key, revenue_key = self.PARTIAL_FIELDS[source]
+            value_field = "conversion_value" if source == "google_ads" else "purchase_value"
+            rows_by_day = {}
+            for row in rows:
+                if row.get("date"):
+                    rows_by_day.setdefault(row["date"], []).append(row)
+
+            return {
+                date: (
+                    day_rows,
+                    lambda day_rows=day_rows: {
+                        spend_key: sum(r.get("spend", 0) for r in day_rows),
+                        revenue_key: sum(r.get(value_field, 0) for r in day_rows),
+                    },
+                )
+                for date, day_rows in rows_by_day.items()
+            }
+
+        daily_costs = self.shipping_costs.get("daily_costs", {}) if self.shipping_costs else {}
+        return {
+            date: (
+                costs,
+                lambda costs=costs: {
+                    "shipping_cost": costs.get("total_cost", 0),
+                    "shipments": costs.get("count", 0),
+                },
+            )
+            for date, costs in daily_costs.items()
+        }
+
+    def _loaded_sources(self) -> list[str]:
+        """Sources with data loaded for this run."""
+        loaded = {
+            "shopify": self.shopify_data,
+            "google_ads": self.google_ads_data,
+            "meta_ads": self.meta_ads_data,
+            "shipstation": self.shipping_costs.get("daily_costs") if self.shipping_costs else None,
+        }
+        return [source for source, data in loaded.items() if data]
+
+    def _dirty_shopify_days(self, by_day: dict, state: dict) -> tuple[set, Optional[str]]:
+        """
+        Days whose orders changed since the last run, keyed off the orders' updated_at cursor.
+
+        A day is dirty if any of its orders was updated after the cursor or
+        its order count changed (orders removed). Everything is dirty on the
+        first run or when product costs changed. Returns (days, new cursor).
+        """
+        cursor = state.get("cursor")
+        cursor_time = datetime.fromisoformat(cursor) if cursor else None
+        newest = cursor_time
+        dirty = set()
+        for date, (orders, _) in by_day.items():
+            counts_match = self.partials["fingerprints"].get("shopify", {}).get(date) == len(orders)
+            for order in orders:
+                updated = self._updated_at(order)
+                if updated is None:
+                    continue
+                if newest is None or updated > newest:
+                    newest = updated
+                if cursor_time is None or updated > cursor_time:
+                    dirty.add(date)
+            if not counts_match:
+                dirty.add(date)
+
+        if cursor_time is None or state.get("costs_version") != self.product_costs_version:
+            dirty = set(by_day)
+        return dirty, newest.isoformat() if newest else None
+
+    def _drop_source_days(self, source: str, dates: set) -> None:
+        """Remove a source's fields (and its fingerprints) for days no longer in its data."""
+        days = self.partials["days"]
+        source_prints = self.partials["fingerprints"].get(source, {})
+        for date in dates:
+            source_prints.pop(date, None)
+            day = days.get(date)
+            if day is None:
+                continue
+            for f in self.PARTIAL_FIELDS[source]:
+                day.pop(f, None)
+            if not day:
+                del days[date]
+
+    def update_daily_partials(self) -> dict:
+        """
+        Recompute partials only for days whose source data changed.
+
+        Sources whose file is unchanged since the last run (size, mtime and,
+        for Shopify, the cost table version) are skipped without touching
+        their rows. For changed sources, Shopify days are found from the
+        orders' updated_at cursor and ad/shipping days by row fingerprint.
+        Days a source no longer has (e.g. fell out of its 30-day window) are
+        dropped from the partials.
+
+        Returns {source: number_of_days_recomputed}.
+        """
+        if not self.partials_loaded:
+            self.load_partials()
+
+        fingerprints = self.partials["fingerprints"]
+        sources_state = self.partials["sources"]
+        days = self.partials["days"]
+        updated = {}
+
+        for source in self._loaded_sources():
+            state = sources_state.setdefault(source, {})
+            signature = self._source_signature(source)
+            if signature is not None and state.get("signature") == signature:
+                updated[source] = 0
+                continue
+
+            by_day = self._group_source_by_day(source)
+            source_prints = fingerprints.setdefault(source, {})
+            self._drop_source_days(source, set(source_prints) - set(by_day))
+
+            if source == "shopify":
+                dirty, state["cursor"] = self._dirty_shopify_days(by_day, state)
+                state["costs_version"] = self.product_costs_version
+                for date in dirty:
+                    days.setdefault(date, {}).update(by_day[date][1]())
+                    source_prints[date] = len(by_day[date][0])
+                count = len(dirty)
+            else:
+                count = 0
+                for date, (rows, compute) in by_day.items():
+                    fingerprint = self._fingerprint(rows)
+                    if source_prints.get(date) == fingerprint and date in days:
+                        continue
+                    days.setdefault(date, {}).update(compute())
+                    source_prints[date] = fingerprint
+                    count += 1
+
+            state["signature"] = signature
+            state["first"], state["last"] = (min(by_day), max(by_day)) if by_day else (None, None)
+            updated[source] = count
+
+        return updated
+
+    def source_date_range(self) -> tuple[Optional[str], Optional[str]]:
+        """Get the date range covered by the currently loaded source data."""
+        sources_state = self.partials.get("sources", {})
+        ranges = [sources_state.get(source, {}) for source in self._loaded_sources()]
+        firsts = [r["first"] for r in ranges if r.get("first")]
+        lasts = [r["last"] for r in ranges if r.get("last")]
+        if not firsts:
+            return None, None
+        return min(firsts), max(lasts)
+
+    def compose_period(self, start_date: str, end_date: str) -> dict:
+        """Sum daily partials for an inclusive date range."""
+        fields = [f for source_fields in self.PARTIAL_FIELDS.values() for f in source_fields]
+        totals = {f: 0 for f in fields}
+        day_count = 0
+
+        for date, day in self.partials["days"].items():
+            if start_date <= date <= end_date:
+                day_count += 1
+                for f in fields:
+                    totals[f] += day.get(f, 0)
+
+        totals["ad_spend"] = totals["google_spend"] + totals["meta_spend"]
+        totals["cam"] = totals["revenue"] - totals["cogs"] - totals["shipping_cost"] - totals["ad_spend"]
+        totals["cam_per_order"] = totals["cam"] / totals["orders"] if totals["orders"] > 0 else 0
+        totals["start"] = start_date
+        totals["end"] = end_date
+        totals["days"] = day_count
+        return totals
+
+    def compose_window(self, days: int, end_date: str = None) -> dict:
+        """Sum daily partials for the last N days ending at end_date (default: latest day)."""
+        if not end_date:
+            if not self.partials["days"]:
+                return self.compose_period("", "")
+            end_date = max(self.partials["days"])
+        start_date = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        return self.compose_period(start_date, end_date)
+
     def parse_kendall_attribution(self) -> AttributionSummary:
         """Parse Kendall attribution data into structured format."""
         summary = AttributionSummary(
@@ -359,10 +634,14 @@ class DataAggregator:
 
         return summary
 
-    def get_total_ad_spend(self) -> dict:
-        """Calculate total ad spend from platform data."""
-        google_spend = sum(row.get("spend", 0) for row in self.google_ads_data)
-        meta_spend = sum(row.get("spend", 0) for row in self.meta_ads_data)
+    def get_total_ad_spend(self, period: dict = None) -> dict:
+        """Calculate total ad spend from daily partials, or platform data if not built."""
+        if period:
+            google_spend = period["google_spend"]
+            meta_spend = period["meta_spend"]
+        else:
+            google_spend = sum(row.get("spend", 0) for row in self.google_ads_data)
+            meta_spend = sum(row.get("spend", 0) for row in self.meta_ads_data)
 
         return {
             "google": google_spend,
@@ -389,8 +668,13 @@ class DataAggregator:
         # Parse Kendall data
         attribution = self.parse_kendall_attribution()
 
+        # Compose source totals from daily partials (only changed days are recomputed)
+        self.update_daily_partials()
+        period_start, period_end = self.source_date_range()
+        period = self.compose_period(period_start, period_end) if period_start else None
+
         # Get ad spend
-        spend = self.get_total_ad_spend()
+        spend = self.get_total_ad_spend(period)
 
         # Calculate CAM for paid channels
         google_channel = attribution.channels.get("Google Ads", ChannelMetrics(name="Google Ads"))
@@ -409,8 +693,10 @@ class DataAggregator:
         total_orders = attribution.total_orders
 
         # Use actual COGS from order line items if available
-        if self.shopify_data and self.product_costs:
-            total_cogs = self.calculate_actual_cogs_from_orders()
+        if self.shopify_data and self.product_costs and period:
+            total_cogs = period["cogs"]
+            if period["cogs_items_actual"] > 0:
+                self.using_actual_cogs = True
             cogs_source = "actual"
         else:
             total_cogs = total_revenue * self.cogs_percent
@@ -430,8 +716,12 @@ class DataAggregator:
         blended_cam_per_order = blended_cam / total_orders if total_orders > 0 else 0
 
         # Platform over-attribution analysis
-        google_platform_revenue = sum(row.get("conversion_value", 0) for row in self.google_ads_data)
-        meta_platform_revenue = sum(row.get("purchase_value", 0) for row in self.meta_ads_data)
+        if period:
+            google_platform_revenue = period["google_platform_revenue"]
+            meta_platform_revenue = period["meta_platform_revenue"]
+        else:
+            google_platform_revenue = sum(row.get("conversion_value", 0) for row in self.google_ads_data)
+            meta_platform_revenue = sum(row.get("purchase_value", 0) for row in self.meta_ads_data)
         platform_total = google_platform_revenue + meta_platform_revenue
         kendall_paid_total = google_channel.revenue + meta_channel.revenue
 
@@ -474,6 +764,9 @@ class DataAggregator:
                 "impressions": self.gsc_data.get("branded", {}).get("impressions", 0),
                 "branded_pct": self.gsc_data.get("branded_percentage", 0),
             },
+            "rolling_windows": {
+                f"{days}d": self.compose_window(days) for days in self.ROLLING_WINDOWS
+            } if self.partials["days"] else {},
         }
 
         return report
@@ -628,20 +921,40 @@ class DataAggregator:
         print("\n" + "=" * 70)
 
     def save_report(self, report: dict, recommendations: list[str]):
-        """Save report data to files."""
+        """Save report data to files.
+
+        A timestamped snapshot is only written when the report content changed
+        since latest_report.json, so frequent scheduled runs don't pile up copies.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        latest_filepath = self.output_dir / "latest_report.json"
+
+        def content(r: dict) -> dict:
+            return {k: v for k, v in r.items() if k != "generated_at"}
+
+        unchanged = False
+        if latest_filepath.exists():
+            try:
+                with open(latest_filepath) as f:
+                    previous = json.load(f)
+                unchanged = (
+                    content(previous.get("report", {})) == content(report)
+                    and previous.get("recommendations") == recommendations
+                )
+            except json.JSONDecodeError:
+                pass
 
         # Save full report
         report_filepath = self.output_dir / f"cam_report_{timestamp}.json"
-        with open(report_filepath, "w") as f:
-            json.dump({
-                "report": report,
-                "recommendations": recommendations,
-                "generated_at": datetime.now().isoformat(),
-            }, f, indent=2)
+        if not unchanged:
+            with open(report_filepath, "w") as f:
+                json.dump({
+                    "report": report,
+                    "recommendations": recommendations,
+                    "generated_at": datetime.now().isoformat(),
+                }, f, indent=2)
 
         # Save latest (for dashboards)
-        latest_filepath = self.output_dir / "latest_report.json"
         with open(latest_filepath, "w") as f:
             json.dump({
                 "report": report,
@@ -650,7 +963,10 @@ class DataAggregator:
             }, f, indent=2)
 
         print(f"\nReports saved to:")
-        print(f"  - {report_filepath}")
+        if unchanged:
+            print("  - (no changes since last report - snapshot skipped)")
+        else:
+            print(f"  - {report_filepath}")
         print(f"  - {latest_filepath}")
 
     def run(self):
@@ -673,6 +989,13 @@ class DataAggregator:
             print("Run kendall.py first to pull attribution data.")
             return None
 
+        print("\nUpdating daily partials...")
+        self.load_partials()
+        updated = self.update_daily_partials()
+        for source, count in updated.items():
+            print(f"  {source}: {count} day(s) recomputed")
+        self.save_partials()
+
         print("\nGenerating CAM report...")
         report = self.generate_cam_report()
 
@@ -694,6 +1017,10 @@ def main():
     aggregator = DataAggregator()
     aggregator.run()
 
+    # Let backend workers reload the new report
+    from data_manifest import publish_manifest
+    publish_manifest()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+"""
+Data Manifest for the Backend
+
+After each pull, publish_manifest() writes data/manifest.json describing
+every source directory: a content hash, row counts and the files behind
+them, plus the published data generation (see columnar.py). The version
+only goes up when some source's hash changed, and the manifest lists which
+sources did.
+
+Backend workers watch the manifest and, on a new version, swap to its
+generation and drop only the cached results built from the changed
+sources. The pull pipeline can also notify a backend directly: set
+BACKEND_RELOAD_URL (e.g. https://api.example.com/api/metrics/_reload) and
+RELOAD_TOKEN.
+
+File hashes are reused while a file's size and mtime are unchanged, so
+republishing an unchanged tree only stats the files.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from columnar import DATA_DIR, TABULAR_DATASETS, current_generation
+
+MANIFEST_FILE = DATA_DIR / "manifest.json"
+
+# Source directories under data/ written by the pull pipeline
+MANIFEST_SOURCES = [
+    "kendall", "gsc", "google_ads", "meta_ads", "ga4", "klaviyo",
+    "shopify", "shipstation", "amazon", "aggregated",
+]
+
+# Bookkeeping files that change on every pull without changing the data
+IGNORED_FILES = {"amazon/reports_cache.json", "shopify/orders_sync.json"}
+
+BACKEND_RELOAD_URL = os.getenv("BACKEND_RELOAD_URL", "")
+RELOAD_TOKEN = os.getenv("RELOAD_TOKEN", "")
+
+
+def load_manifest() -> Optional[dict]:
+    """Get the published manifest, or None if there isn't one."""
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _row_count(key: str, path: Path) -> Optional[int]:
+    """Rows in a JSON dataset: its row list, or top-level entries for other files."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    rows_key = TABULAR_DATASETS.get(key)
+    if rows_key and isinstance(data, dict):
+        data = data.get(rows_key, [])
+    return len(data) if isinstance(data, (list, dict)) else None
+
+
+def _describe_source(source: str, previous: dict) -> Optional[dict]:
+    """Hash and row counts for one source directory (None if it has no files)."""
+    source_dir = DATA_DIR / source
+    if not source_dir.is_dir():
+        return None
+
+    files = {}
+    for path in sorted(source_dir.glob("*.json")):
+        key = f"{source}/{path.name}"
+        if key in IGNORED_FILES:
+            continue
+        stat = path.stat()
+        old = previous.get(key)
+        if old and old["bytes"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+            files[key] = old
+        else:
+            files[key] = {
+                "sha256": _file_hash(path), "rows": _row_count(key, path),
+                "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            }
+    if not files:
+        return None
+
+    digest = hashlib.sha256()
+    for key, entry in files.items():
+        digest.update(f"{key}:{entry['sha256']}\n".encode())
+    return {
+        "hash": digest.hexdigest()[:16],
+        "rows": sum(entry["rows"] or 0 for entry in files.values()),
+        "files": files,
+    }
+
+
+def publish_manifest(notify: bool = True) -> dict:
+    """
+    Describe the data tree and publish it as a new manifest version if anything changed.
+
+    Returns the current manifest; its "changed" lists the sources that
+    differ from the previous version.
+    """
+    previous = load_manifest() or {}
+    previous_files = {
+        key: entry for source in previous.get("sources", {}).values() for key, entry in source.get("files", {}).items()
+    }
+
+    sources = {}
+    for source in MANIFEST_SOURCES:
+        described = _describe_source(source, previous_files)
+        if described:
+            sources[source] = described
+
+    old_sources = previous.get("sources", {})
+    changed = sorted(
+        s for s in set(sources) | set(old_sources)
+        if sources.get(s, {}).get("hash") != old_sources.get(s, {}).get("hash")
+    )
+    generation = current_generation()
+    if previous and not changed and previous.get("generation") == generation:
+        print(f"Data manifest unchanged (version {previous['version']})")
+        return previous
+
+    manifest = {
+        "version": previous.get("version", 0) + 1,
+        "published_at": datetime.now().isoformat(),
+        "generation": generation,
+        "changed": changed,
+        "sources": sources,
+    }
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_FILE.with_suffix(".part")
+    tmp.write_text(json.dumps(manifest, indent=1))
+    tmp.replace(MANIFEST_FILE)
+    print(f"Published data manifest version {manifest['version']} (changed: {', '.join(changed) or 'generation only'})")
+
+    if notify:
+        notify_backend(manifest)
+    return manifest
+
+
+def notify_backend(manifest: dict) -> bool:
+    """Tell the backend (BACKEND_RELOAD_URL) to reload now instead of at its next manifest check."""
+    if not BACKEND_RELOAD_URL:
+        return False
+
+    import requests
+
+    try:
+        response = requests.post(
+            BACKEND_RELOAD_URL,
+            json={"version": manifest["version"]},
+            headers={"X-Reload-Token": RELOAD_TOKEN},
+            timeout=30,
+        )
+        response.raise_for_status()
+        print(f"Backend reloaded: {response.json()}")
+        return True
+    except Exception as e:
+        print(f"Backend reload notification failed (workers still pick up the manifest): {e}")
+        return False
+
+
+if __name__ == "__main__":
+    publish_manifest()
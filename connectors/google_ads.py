@@ -11,6 +11,8 @@ import json
 
 from dotenv import load_dotenv
 
+from columnar import write_columnar
+
 load_dotenv()
 
 
@@ -158,6 +160,7 @@ class GoogleAdsConnector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
 
         print(f"Saved {len(data)} records to {filepath}")
         return filepath
@@ -18,6 +18,8 @@ from pathlib import Path
 import requests
 from dotenv import load_dotenv
 
+from columnar import write_columnar
+
 load_dotenv()
 
 
@@ -224,6 +226,7 @@ class GA4Connector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
         print(f"Saved to {filepath}")
         return filepath
 
@@ -17,6 +17,8 @@ from pathlib import Path
 import requests
 from dotenv import load_dotenv
 
+from columnar import write_columnar
+
 load_dotenv()
 
 
@@ -259,6 +261,7 @@ class GoogleSearchConsoleConnector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
         print(f"Saved to {filepath}")
         return filepath
 
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import requests
 
+from columnar import write_columnar
+
 
 class KendallConnector:
     """Connector for Kendall.ai Attribution via MCP."""
@@ -171,6 +173,7 @@ class KendallConnector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
         print(f"Saved to {filepath}")
         return filepath
 
@@ -12,6 +12,8 @@ import json
 from dotenv import load_dotenv
 import requests
 
+from columnar import write_columnar
+
 load_dotenv()
 
 
@@ -189,6 +191,7 @@ class MetaAdsConnector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
 
         print(f"Saved {len(data)} records to {filepath}")
         return filepath
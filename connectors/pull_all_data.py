@@ -37,11 +37,26 @@ def pull_shopify():
         return {"error": str(e)}
 
 
+def pull_shopify_recent():
+    """Pull Shopify orders changed since the last pull (full pull once a day)."""
+    print("\n" + "=" * 60)
+    print("SHOPIFY (INCREMENTAL)")
+    print("=" * 60)
+    try:
+        from shopify import ShopifyConnector
+        connector = ShopifyConnector()
+        return connector.pull_recent_orders()
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"error": str(e)}
+
+
 def pull_shopify_costs():
     """Pull Shopify product costs (COGS).
 
-    NOTE: This is expensive (fetches all products/inventory items).
-    Only run manually when product costs change, not daily.
+    Uses a single bulk export (products, variants, inventory costs), which is
+    cheap enough to run daily. With SHOPIFY_BULK_EXPORT=false this falls back
+    to REST paging over all products/inventory items, which is expensive.
     Kendall.ai has cost data via get_profit_loss_report.
     """
     print("\n" + "=" * 60)
@@ -255,6 +270,12 @@ def main():
         else:
             print(f"  {source}: No data")
 
+    # Publish a data generation (no-op unless COLUMNAR_FORMAT=true) and the manifest backend workers reload from
+    from columnar import publish_generation
+    from data_manifest import publish_manifest
+    publish_generation()
+    publish_manifest()
+
     print(f"\nCompleted: {datetime.now().isoformat()}")
     print("\nNext step: Run data_aggregator.py to calculate CAM")
     print("=" * 70)
@@ -0,0 +1,537 @@
+"""
+In-Process Scheduler for TuffWraps Marketing Attribution
+
+Replaces daily_pull.bat / setup_daily_schedule.ps1 with a Python scheduler
+that runs inside the Linux container (or standalone):
+
+- Cron-like triggers per source (e.g. Shopify every 15 min, Meta hourly, GSC daily)
+- One runner per host: a process-lifetime lock elects the scheduler that
+  runs the schedule, so N uvicorn workers don't run every job N times
+- File-based job locks so only one worker/container runs a job at a time
+- Persistent run history and per-job metrics
+- Completion hooks (the backend uses these to hot-reload its caches)
+- Publishes a new data generation after each successful pull (see columnar.py)
+
+Schedules are in US/Eastern time and can be overridden per job with
+SCHEDULE_<JOB> environment variables, e.g. SCHEDULE_SHOPIFY="*/30 * * * *".
+Set a schedule to "off" to disable a job.
+
+Usage:
+    python scheduler.py              # Run the scheduler in the foreground
+    python scheduler.py --run shopify  # Run one job now and exit
+    python scheduler.py --status     # Print job status
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Add connectors directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+EST = ZoneInfo("America/New_York")
+
+SCHEDULER_DIR = Path(__file__).parent / "data" / "scheduler"
+HISTORY_FILE = SCHEDULER_DIR / "history.json"
+LOCK_DIR = SCHEDULER_DIR / "locks"
+
+# Keep this many runs in history.json
+HISTORY_LIMIT = 500
+
+# A lock older than this is assumed to belong to a crashed process (seconds)
+LOCK_STALE_AFTER = 2 * 3600
+
+
+# =============================================================================
+# CRON TRIGGERS
+# =============================================================================
+
+class CronTrigger:
+    """
+    Minimal 5-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports "*", "*/n", "a-b", "a-b/n" and comma lists. Day-of-week is 0-6
+    with 0 = Sunday (7 is also accepted as Sunday).
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(part, low, high)
+            for part, (low, high) in zip(parts, self.FIELD_RANGES)
+        )
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(part: str, low: int, high: int) -> set[int]:
+        values = set()
+        for item in part.split(","):
+            step = 1
+            if "/" in item:
+                item, step_str = item.split("/", 1)
+                step = int(step_str)
+
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start_str, end_str = item.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+
+            if high == 6:
+                # Allow 7 for Sunday in day-of-week
+                values.update(v % 7 for v in range(start, end + 1, step))
+            else:
+                values.update(range(start, end + 1, step))
+
+        if not values or min(values) < low or max(values) > high:
+            raise ValueError(f"Cron field out of range: {part!r}")
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        weekday = (dt.weekday() + 1) % 7  # Python Monday=0 -> cron Sunday=0
+        day_ok = dt.day in self.days
+        weekday_ok = weekday in self.weekdays
+        # Standard cron: if both are restricted, either one matching is enough
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        """Get the first matching minute strictly after dt."""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366)
+
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+# =============================================================================
+# JOB LOCKS
+# =============================================================================
+
+class JobLock:
+    """
+    Cross-process lock backed by an exclusively-created lock file.
+
+    Works across uvicorn workers and containers sharing the data volume.
+    Locks older than LOCK_STALE_AFTER are treated as abandoned.
+    """
+
+    def __init__(self, name: str):
+        self.path = LOCK_DIR / f"{name}.lock"
+
+    def acquire(self) -> bool:
+        LOCK_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - self.path.stat().st_mtime
+            except FileNotFoundError:
+                return self.acquire()
+            if age < LOCK_STALE_AFTER:
+                return False
+            print(f"[Scheduler] Removing stale lock {self.path.name} ({age:.0f}s old)")
+            self.path.unlink(missing_ok=True)
+            return self.acquire()
+
+        with os.fdopen(fd, "w") as f:
+            json.dump({"pid": os.getpid(), "acquired_at": datetime.now(EST).isoformat()}, f)
+        return True
+
+    def release(self):
+        self.path.unlink(missing_ok=True)
+
+
+class RunnerLock:
+    """
+    OS file lock held for the life of the process by the scheduler that runs jobs.
+
+    Every uvicorn worker starts a scheduler; only the one holding this lock
+    runs the schedule. The kernel releases the lock if that process dies, and
+    the other schedulers retry on each tick, so one of them takes over.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or LOCK_DIR / "runner.lock"
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock without blocking (True if this process holds it)."""
+        if self._file is not None:
+            return True
+        LOCK_DIR.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps({"pid": os.getpid(), "acquired_at": datetime.now(EST).isoformat()}))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+# =============================================================================
+# JOBS
+# =============================================================================
+
+@dataclass
+class Job:
+    """A scheduled job."""
+    name: str
+    schedule: str
+    func: Callable[[], object]
+    description: str = ""
+    # Jobs to run after this one succeeds (e.g. the CAM aggregator)
+    then: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.trigger = CronTrigger(self.schedule)
+
+
+def _run_aggregator():
+    from data_aggregator import DataAggregator
+    return DataAggregator().run()
+
+
+def _pull(name: str) -> Callable[[], object]:
+    """Look up a pull_* function from pull_all_data lazily."""
+    def run():
+        import pull_all_data
+        return getattr(pull_all_data, f"pull_{name}")()
+    return run
+
+
+# Default per-source schedules (US/Eastern)
+DEFAULT_JOBS = [
+    ("shopify", "*/15 * * * *", _pull("shopify_recent"), "Shopify orders updated since the last pull", ["aggregator"]),
+    ("shopify_costs", "0 7 * * *", _pull("shopify_costs"), "Shopify product costs (COGS)", ["aggregator"]),
+    ("meta_ads", "0 * * * *", _pull("meta_ads"), "Meta Ads spend and conversions", ["aggregator"]),
+    ("google_ads", "5 * * * *", _pull("google_ads"), "Google Ads spend and conversions", ["aggregator"]),
+    ("tiktok_ads", "10 * * * *", _pull("tiktok_ads"), "TikTok Ads spend and conversions", []),
+    ("kendall", "0 8 * * *", _pull("kendall"), "Kendall.ai attribution", ["aggregator"]),
+    ("shipstation", "15 8 * * *", _pull("shipstation"), "ShipStation shipping costs", ["aggregator"]),
+    ("gsc", "20 8 * * *", _pull("gsc"), "Google Search Console branded search", ["aggregator"]),
+    ("amazon", "25 8 * * *", _pull("amazon"), "Amazon Seller Central sales", []),
+    ("klaviyo", "30 8 * * *", _pull("klaviyo"), "Klaviyo email performance", []),
+    ("ga4", "35 8 * * *", _pull("ga4"), "GA4 traffic", []),
+    ("aggregator", "45 8 * * *", _run_aggregator, "CAM report (also runs after source pulls)", []),
+]
+
+
+def _result_status(result) -> tuple[str, Optional[str]]:
+    """Map a pull_* return value to (status, error)."""
+    if isinstance(result, dict) and result.get("error"):
+        if result["error"] == "Not configured":
+            return "skipped", result["error"]
+        return "failed", str(result["error"])
+    return "success", None
+
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+class Scheduler:
+    """Runs jobs on their cron schedules in a background thread."""
+
+    def __init__(self, jobs: list[Job] = None, runner_lock: RunnerLock = None):
+        self.jobs: dict[str, Job] = {}
+        # With a runner lock, only the scheduler holding it runs the schedule
+        self.runner_lock = runner_lock
+        self.next_run: dict[str, datetime] = {}
+        self.completion_hooks: list[Callable[[str, object], None]] = []
+
+        self._queue: list[str] = []
+        self._running: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        for job in jobs or []:
+            self.add_job(job)
+
+    def add_job(self, job: Job):
+        self.jobs[job.name] = job
+        self.next_run[job.name] = job.trigger.next_after(datetime.now(EST))
+
+    def add_completion_hook(self, hook: Callable[[str, object], None]):
+        """Register a callback run with (job_name, result) after each successful job."""
+        self.completion_hooks.append(hook)
+
+    # -- history ---------------------------------------------------------------
+
+    def _load_history(self) -> list[dict]:
+        try:
+            with open(HISTORY_FILE) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _record_run(self, entry: dict):
+        with self._lock:
+            history = self._load_history()
+            history.append(entry)
+            SCHEDULER_DIR.mkdir(parents=True, exist_ok=True)
+            with open(HISTORY_FILE, "w") as f:
+                json.dump(history[-HISTORY_LIMIT:], f, indent=2)
+
+    # -- execution -------------------------------------------------------------
+
+    def run_job(self, name: str) -> dict:
+        """Run a job now (respecting its lock) and record the outcome."""
+        job = self.jobs[name]
+        lock = JobLock(name)
+        started = datetime.now(EST)
+
+        if not lock.acquire():
+            print(f"[Scheduler] {name} is already running elsewhere - skipping")
+            entry = {"job": name, "started_at": started.isoformat(), "status": "locked"}
+            self._record_run(entry)
+            return entry
+
+        print(f"[Scheduler] Running {name}...")
+        t0 = time.perf_counter()
+        result = None
+        try:
+            result = job.func()
+            status, error = _result_status(result)
+        except Exception as e:
+            status, error = "failed", str(e)
+            traceback.print_exc()
+        finally:
+            lock.release()
+
+        duration = time.perf_counter() - t0
+        entry = {
+            "job": name,
+            "started_at": started.isoformat(),
+            "finished_at": datetime.now(EST).isoformat(),
+            "duration_seconds": round(duration, 2),
+            "status": status,
+            "error": error,
+        }
+        self._record_run(entry)
+        print(f"[Scheduler] {name} {status} in {duration:.1f}s")
+
+        if status == "success":
+            for follow_up in job.then:
+                self.enqueue(follow_up)
+            for hook in self.completion_hooks:
+                try:
+                    hook(name, result)
+                except Exception as e:
+                    print(f"[Scheduler] Completion hook failed for {name}: {e}")
+
+        return entry
+
+    def enqueue(self, name: str):
+        """Queue a job to run as soon as the worker is free (deduplicated)."""
+        with self._lock:
+            if name in self.jobs and name not in self._queue and name != self._running:
+                self._queue.append(name)
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = datetime.now(EST)
+            if self.runner_lock and not self.runner_lock.acquire():
+                # Another process runs the schedule; keep next runs current for a takeover
+                for name, job in self.jobs.items():
+                    if self.next_run[name] <= now:
+                        self.next_run[name] = job.trigger.next_after(now)
+                self._wake.wait(timeout=60.0)
+                self._wake.clear()
+                continue
+
+            for name, job in self.jobs.items():
+                if self.next_run[name] <= now:
+                    self.enqueue(name)
+                    self.next_run[name] = job.trigger.next_after(now)
+
+            with self._lock:
+                name = self._queue.pop(0) if self._queue else None
+                self._running = name
+
+            if name:
+                self.run_job(name)
+                with self._lock:
+                    self._running = None
+                continue
+
+            next_due = min(self.next_run.values(), default=now + timedelta(minutes=1))
+            self._wake.wait(timeout=max(1.0, min(60.0, (next_due - now).total_seconds())))
+            self._wake.clear()
+
+        if self.runner_lock:
+            self.runner_lock.release()
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+        print(f"[Scheduler] Started with {len(self.jobs)} jobs")
+
+    def stop(self):
+        """Signal the scheduler thread to exit after the current job."""
+        self._stop.set()
+        self._wake.set()
+
+    # -- status ----------------------------------------------------------------
+
+    def get_status(self) -> dict:
+        """Get schedules, next runs and per-job metrics from run history."""
+        history = self._load_history()
+        jobs = {}
+
+        for name, job in self.jobs.items():
+            runs = [r for r in history if r.get("job") == name]
+            finished = [r for r in runs if r.get("duration_seconds") is not None]
+            successes = [r for r in runs if r.get("status") == "success"]
+            failures = [r for r in runs if r.get("status") == "failed"]
+
+            jobs[name] = {
+                "description": job.description,
+                "schedule": job.schedule,
+                "next_run": self.next_run[name].isoformat(),
+                "runs": len(runs),
+                "successes": len(successes),
+                "failures": len(failures),
+                "last_status": runs[-1]["status"] if runs else None,
+                "last_success": successes[-1]["finished_at"] if successes else None,
+                "last_error": failures[-1].get("error") if failures else None,
+                "last_duration_seconds": finished[-1]["duration_seconds"] if finished else None,
+                "avg_duration_seconds": round(
+                    sum(r["duration_seconds"] for r in finished) / len(finished), 2
+                ) if finished else None,
+            }
+
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "runner": self.runner_lock.held if self.runner_lock else True,
+            "current_job": self._running,
+            "queued": list(self._queue),
+            "jobs": jobs,
+            "recent_runs": history[-20:],
+        }
+
+
+def _publish_generation(job_name: str, result) -> None:
+    """Completion hook: publish the new data as a generation, and its manifest, for backend workers."""
+    from columnar import publish_generation
+    from data_manifest import publish_manifest
+    publish_generation()
+    publish_manifest()
+
+
+def build_default_scheduler() -> Scheduler:
+    """Create a scheduler with the default jobs and any SCHEDULE_<JOB> overrides."""
+    jobs = []
+    for name, schedule, func, description, then in DEFAULT_JOBS:
+        schedule = os.environ.get(f"SCHEDULE_{name.upper()}", schedule)
+        if schedule.strip().lower() == "off":
+            continue
+        jobs.append(Job(name=name, schedule=schedule, func=func, description=description, then=then))
+
+    scheduler = Scheduler(jobs, runner_lock=RunnerLock())
+    # Runs before hooks added by callers (e.g. the backend's cache reload)
+    scheduler.add_completion_hook(_publish_generation)
+    return scheduler
+
+
+def main():
+    """Run the scheduler, a single job, or print status."""
+    parser = argparse.ArgumentParser(description="TuffWraps data pull scheduler")
+    parser.add_argument("--run", metavar="JOB", help="Run a single job now and exit")
+    parser.add_argument("--status", action="store_true", help="Print job status and exit")
+    args = parser.parse_args()
+
+    scheduler = build_default_scheduler()
+
+    if args.status:
+        print(json.dumps(scheduler.get_status(), indent=2))
+        return
+
+    if args.run:
+        if args.run not in scheduler.jobs:
+            print(f"Unknown job: {args.run}. Jobs: {', '.join(scheduler.jobs)}")
+            sys.exit(1)
+        scheduler.run_job(args.run)
+        return
+
+    print("=" * 60)
+    print("TUFFWRAPS SCHEDULER")
+    print("=" * 60)
+    for name, job in scheduler.jobs.items():
+        print(f"  {name:<12} {job.schedule:<15} next: {scheduler.next_run[name]:%Y-%m-%d %H:%M}")
+
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
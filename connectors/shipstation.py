@@ -14,6 +14,8 @@ import base64
 from dotenv import load_dotenv
 import requests
 
+from columnar import write_columnar
+
 load_dotenv()
 
 
@@ -201,6 +203,7 @@ class ShipStationConnector:
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
         print(f"Saved to {filepath}")
         return filepath
 
@@ -2,17 +2,32 @@
 Shopify Connector for TuffWraps Marketing Attribution
 
 Pulls orders, customers, and product data for CAM calculation.
+
+Large exports (orders, product/variant/inventory costs) use GraphQL bulk
+operations by default: one job is submitted, polled until complete, and its
+JSONL result is streamed to disk and read back record by record, instead of
+paging the REST API 250 rows at a time. Set SHOPIFY_BULK_EXPORT=false to use
+REST paging.
+
+Bulk-exported orders carry only the fields used downstream (see
+_bulk_order_to_rest). Orders merged in later by REST are reduced to the same
+fields, so orders_last_30d.json always has one shape.
 """
 
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo
 import json
 import time
 
 from dotenv import load_dotenv
 import requests
 
+from columnar import write_columnar, write_columnar_stream
+from cost_table import CostTable, load_cost_table
+
 load_dotenv()
 
 
@@ -21,6 +36,72 @@ class ShopifyConnector:
 
     API_VERSION = "2024-01"
 
+    # Bulk operation polling (seconds)
+    BULK_POLL_INTERVAL = 5
+    BULK_TIMEOUT = 3600
+    BULK_DOWNLOAD_CHUNK = 1024 * 1024
+
+    # Incremental order sync: cursor file, overlap for clock skew, and a daily full resync
+    SYNC_FILE = "orders_sync.json"
+    SYNC_OVERLAP = timedelta(minutes=5)
+    FULL_RESYNC_AFTER = timedelta(hours=24)
+
+    BULK_ORDERS_QUERY = """
+    {
+      orders(query: "%s") {
+        edges {
+          node {
+            id
+            legacyResourceId
+            createdAt
+            updatedAt
+            displayFinancialStatus
+            totalPriceSet { shopMoney { amount } }
+            totalDiscountsSet { shopMoney { amount } }
+            totalTaxSet { shopMoney { amount } }
+            customer { legacyResourceId createdAt }
+            shippingLines {
+              edges { node { originalPriceSet { shopMoney { amount } } } }
+            }
+            lineItems {
+              edges {
+                node {
+                  sku
+                  quantity
+                  variant { legacyResourceId }
+                  originalUnitPriceSet { shopMoney { amount } }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+    """
+
+    BULK_PRODUCT_COSTS_QUERY = """
+    {
+      products {
+        edges {
+          node {
+            id
+            title
+            variants {
+              edges {
+                node {
+                  legacyResourceId
+                  sku
+                  price
+                  inventoryItem { unitCost { amount } }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+    """
+
     def __init__(self):
         self.access_token = os.getenv("SHOPIFY_ACCESS_TOKEN")
         self.store_url = os.getenv("SHOPIFY_STORE_URL", "tuffwraps-com.myshopify.com")
@@ -34,6 +115,9 @@ class ShopifyConnector:
         self.data_dir = Path(__file__).parent / "data" / "shopify"
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
+        self.use_bulk = os.getenv("SHOPIFY_BULK_EXPORT", "true").lower() not in ("0", "false", "no")
+        self._shop_timezone = None
+
     def _check_credentials(self):
         """Verify credentials are present."""
         if not self.access_token:
@@ -70,7 +154,8 @@ class ShopifyConnector:
 
     def get_orders(self, limit: int = 250, since_id: int = None,
                    created_at_min: str = None, created_at_max: str = None,
-                   status: str = "any", financial_status: str = None) -> list[dict]:
+                   status: str = "any", financial_status: str = None,
+                   updated_at_min: str = None) -> list[dict]:
         """
         Get orders with pagination support.
 
@@ -81,6 +166,7 @@ class ShopifyConnector:
             created_at_max: ISO 8601 datetime
             status: any, open, closed, cancelled
             financial_status: paid, pending, refunded, etc.
+            updated_at_min: Only orders changed since this ISO 8601 datetime
         """
         params = {"limit": min(limit, 250), "status": status}
 
@@ -90,26 +176,30 @@ class ShopifyConnector:
             params["created_at_min"] = created_at_min
         if created_at_max:
             params["created_at_max"] = created_at_max
+        if updated_at_min:
+            params["updated_at_min"] = updated_at_min
         if financial_status:
             params["financial_status"] = financial_status
 
         data = self._make_request("orders.json", params)
         return data.get("orders", [])
 
-    def get_all_orders(self, created_at_min: str = None, created_at_max: str = None,
-                       financial_status: str = "paid", max_orders: int = None) -> list[dict]:
+    def iter_all_orders(self, created_at_min: str = None, created_at_max: str = None,
+                        financial_status: str = "paid", max_orders: int = None,
+                        updated_at_min: str = None) -> Iterator[dict]:
         """
-        Get all orders with automatic pagination.
+        Yield all orders with automatic pagination, one page in memory at a time.
 
         Args:
             created_at_min: Start date (ISO 8601)
             created_at_max: End date (ISO 8601)
-            financial_status: Filter by payment status
+            financial_status: Filter by payment status (None = any)
             max_orders: Maximum orders to fetch (None = all)
+            updated_at_min: Only orders changed since this datetime (ISO 8601)
         """
         self._check_credentials()
 
-        all_orders = []
+        total = 0
         since_id = None
         page = 0
 
@@ -118,6 +208,8 @@ class ShopifyConnector:
             print(f"  From: {created_at_min}")
         if created_at_max:
             print(f"  To: {created_at_max}")
+        if updated_at_min:
+            print(f"  Updated since: {updated_at_min}")
 
         while True:
             page += 1
@@ -127,27 +219,278 @@ class ShopifyConnector:
                 created_at_min=created_at_min,
                 created_at_max=created_at_max,
                 financial_status=financial_status,
+                updated_at_min=updated_at_min,
             )
 
             if not orders:
                 break
 
-            all_orders.extend(orders)
+            if max_orders and total + len(orders) >= max_orders:
+                orders = orders[:max_orders - total]
+                total += len(orders)
+                print(f"  Page {page}: {len(orders)} orders (total: {total})")
+                yield from orders
+                break
+
+            total += len(orders)
             since_id = orders[-1]["id"]
 
-            print(f"  Page {page}: {len(orders)} orders (total: {len(all_orders)})")
-
-            if max_orders and len(all_orders) >= max_orders:
-                all_orders = all_orders[:max_orders]
-                break
+            print(f"  Page {page}: {len(orders)} orders (total: {total})")
+            yield from orders
 
             if len(orders) < 250:
                 break
 
             time.sleep(0.5)  # Be nice to the API
 
-        print(f"  Done! Total orders: {len(all_orders)}")
-        return all_orders
+        print(f"  Done! Total orders: {total}")
+
+    def get_all_orders(self, created_at_min: str = None, created_at_max: str = None,
+                       financial_status: str = "paid", max_orders: int = None) -> list[dict]:
+        """
+        Get all orders with automatic pagination.
+
+        Args:
+            created_at_min: Start date (ISO 8601)
+            created_at_max: End date (ISO 8601)
+            financial_status: Filter by payment status
+            max_orders: Maximum orders to fetch (None = all)
+        """
+        return list(self.iter_all_orders(created_at_min, created_at_max, financial_status, max_orders))
+
+    # =========================================================================
+    # GRAPHQL BULK OPERATIONS
+    # =========================================================================
+
+    def _graphql(self, query: str, variables: dict = None) -> dict:
+        """Make authenticated GraphQL request to Shopify Admin API."""
+        url = f"{self.base_url}/graphql.json"
+        response = requests.post(url, headers=self.headers, json={"query": query, "variables": variables or {}})
+
+        if response.status_code == 429:  # Rate limited
+            retry_after = int(response.headers.get("Retry-After", 2))
+            print(f"Rate limited. Waiting {retry_after} seconds...")
+            time.sleep(retry_after)
+            return self._graphql(query, variables)
+
+        if response.status_code != 200:
+            raise Exception(f"Shopify API Error ({response.status_code}): {response.text}")
+
+        data = response.json()
+        if data.get("errors"):
+            raise Exception(f"Shopify GraphQL Error: {data['errors']}")
+
+        return data.get("data", {})
+
+    def get_shop_timezone(self) -> ZoneInfo:
+        """Get the shop's timezone (bulk exports return UTC timestamps)."""
+        if self._shop_timezone is None:
+            data = self._graphql("{ shop { ianaTimezone } }")
+            self._shop_timezone = ZoneInfo(data["shop"]["ianaTimezone"])
+        return self._shop_timezone
+
+    def run_bulk_operation(self, query: str, filename: str) -> Path:
+        """
+        Run a bulk query and stream its JSONL result to data/shopify/<filename>.
+
+        Submits one job, polls until it finishes, then downloads the result in
+        chunks so the export is never held in memory.
+        """
+        self._check_credentials()
+
+        mutation = """
+        mutation($query: String!) {
+          bulkOperationRunQuery(query: $query) {
+            bulkOperation { id status }
+            userErrors { field message }
+          }
+        }
+        """
+        result = self._graphql(mutation, {"query": query})["bulkOperationRunQuery"]
+        if result.get("userErrors"):
+            raise Exception(f"Shopify bulk operation error: {result['userErrors']}")
+
+        operation_id = result["bulkOperation"]["id"]
+        print(f"  Bulk operation submitted: {operation_id}")
+
+        status_query = """
+        query($id: ID!) {
+          node(id: $id) {
+            ... on BulkOperation { id status errorCode objectCount url }
+          }
+        }
+        """
+        started = time.time()
+        while True:
+            operation = self._graphql(status_query, {"id": operation_id})["node"]
+            status = operation["status"]
+
+            if status == "COMPLETED":
+                break
+            if status in ("FAILED", "CANCELED", "EXPIRED"):
+                raise Exception(f"Shopify bulk operation {status}: {operation.get('errorCode')}")
+            if time.time() - started > self.BULK_TIMEOUT:
+                raise Exception(f"Shopify bulk operation timed out after {self.BULK_TIMEOUT}s")
+
+            print(f"  Bulk operation {status.lower()} ({operation.get('objectCount', 0)} objects)...")
+            time.sleep(self.BULK_POLL_INTERVAL)
+
+        filepath = self.data_dir / filename
+        tmp_path = filepath.with_suffix(filepath.suffix + ".part")
+
+        # No url means the query matched nothing
+        if not operation.get("url"):
+            tmp_path.write_text("")
+        else:
+            with requests.get(operation["url"], stream=True) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=self.BULK_DOWNLOAD_CHUNK):
+                        f.write(chunk)
+
+        tmp_path.replace(filepath)
+        print(f"  Bulk export done: {operation.get('objectCount', 0)} objects -> {filepath}")
+        return filepath
+
+    @staticmethod
+    def iter_bulk_records(filepath: Path) -> Iterator[dict]:
+        """
+        Read a bulk JSONL file one top-level record at a time.
+
+        Nested connection rows (with __parentId) follow their parent in the
+        file; they are collected under the parent's "_children" list.
+        """
+        current = None
+        with open(filepath) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if "__parentId" in row:
+                    if current is not None and row["__parentId"] == current["id"]:
+                        current["_children"].append(row)
+                    continue
+                if current is not None:
+                    yield current
+                row["_children"] = []
+                current = row
+        if current is not None:
+            yield current
+
+    @staticmethod
+    def _money(value: dict) -> str:
+        """Extract a shopMoney amount from a MoneyBag."""
+        return ((value or {}).get("shopMoney") or {}).get("amount", "0")
+
+    def _bulk_order_to_rest(self, record: dict, tz: ZoneInfo) -> dict:
+        """Convert a bulk order record to the REST order fields used downstream."""
+        def local_time(value: str) -> str:
+            if not value:
+                return value
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(tz).isoformat()
+
+        line_items = []
+        shipping_lines = []
+        for child in record["_children"]:
+            if "quantity" in child:
+                variant = child.get("variant") or {}
+                line_items.append({
+                    "variant_id": int(variant["legacyResourceId"]) if variant.get("legacyResourceId") else None,
+                    "sku": child.get("sku") or "",
+                    "quantity": child.get("quantity", 1),
+                    "price": self._money(child.get("originalUnitPriceSet")),
+                })
+            else:
+                shipping_lines.append({"price": self._money(child.get("originalPriceSet"))})
+
+        customer = record.get("customer")
+        return {
+            "id": int(record["legacyResourceId"]),
+            "created_at": local_time(record.get("createdAt")),
+            "updated_at": local_time(record.get("updatedAt")),
+            "financial_status": (record.get("displayFinancialStatus") or "").lower(),
+            "total_price": self._money(record.get("totalPriceSet")),
+            "total_discounts": self._money(record.get("totalDiscountsSet")),
+            "total_tax": self._money(record.get("totalTaxSet")),
+            "shipping_lines": shipping_lines,
+            "line_items": line_items,
+            "customer": {
+                "id": int(customer["legacyResourceId"]),
+                "created_at": local_time(customer.get("createdAt")),
+            } if customer else None,
+        }
+
+    @staticmethod
+    def _reduce_rest_order(order: dict) -> dict:
+        """Reduce a REST order to the fields a bulk-exported order has (see _bulk_order_to_rest)."""
+        customer = order.get("customer")
+        return {
+            "id": order["id"],
+            "created_at": order.get("created_at"),
+            "updated_at": order.get("updated_at"),
+            "financial_status": order.get("financial_status") or "",
+            "total_price": order.get("total_price", "0"),
+            "total_discounts": order.get("total_discounts", "0"),
+            "total_tax": order.get("total_tax", "0"),
+            "shipping_lines": [{"price": line.get("price", "0")} for line in order.get("shipping_lines", [])],
+            "line_items": [
+                {
+                    "variant_id": item.get("variant_id"),
+                    "sku": item.get("sku") or "",
+                    "quantity": item.get("quantity", 1),
+                    "price": item.get("price", "0"),
+                }
+                for item in order.get("line_items", [])
+            ],
+            "customer": {
+                "id": customer["id"],
+                "created_at": customer.get("created_at"),
+            } if customer else None,
+        }
+
+    def bulk_export_orders(self, created_at_min: str = None, created_at_max: str = None,
+                           financial_status: str = "paid", filename: str = "orders_bulk.jsonl") -> Path:
+        """Export orders matching the filters to a JSONL file via a bulk operation."""
+        filters = []
+        if created_at_min:
+            filters.append(f"created_at:>='{created_at_min}'")
+        if created_at_max:
+            filters.append(f"created_at:<='{created_at_max}'")
+        if financial_status:
+            filters.append(f"financial_status:{financial_status}")
+
+        print("Exporting orders (bulk operation)...")
+        if created_at_min:
+            print(f"  From: {created_at_min}")
+        if created_at_max:
+            print(f"  To: {created_at_max}")
+
+        query = self.BULK_ORDERS_QUERY % " ".join(filters).replace('"', '\\"')
+        return self.run_bulk_operation(query, filename)
+
+    def iter_bulk_orders(self, filepath: Path) -> Iterator[dict]:
+        """Stream orders from a bulk export in REST order shape."""
+        tz = self.get_shop_timezone()
+        for record in self.iter_bulk_records(filepath):
+            yield self._bulk_order_to_rest(record, tz)
+
+    def save_json_stream(self, items: Iterator[dict], filename: str) -> Iterator[dict]:
+        """Write items to a JSON array file as they pass through (pass-through generator)."""
+        filepath = self.data_dir / filename
+        tmp_path = filepath.with_suffix(filepath.suffix + ".part")
+        count = 0
+
+        with open(tmp_path, "w") as f:
+            f.write("[")
+            for item in items:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(item, default=str))
+                count += 1
+                yield item
+            f.write("\n]\n")
+
+        tmp_path.replace(filepath)
+        print(f"Saved {count} records to {filepath}")
 
     def get_customers_count(self) -> int:
         """Get total customer count."""
@@ -200,36 +543,19 @@ class ShopifyConnector:
                 time.sleep(0.5)
         return all_items
 
-    def get_product_costs(self) -> dict:
-        """
-        Get cost (COGS) for all products.
-        Returns dict mapping variant_id -> cost and sku -> cost.
-        """
-        self._check_credentials()
-        print("Fetching product costs from Shopify...")
-
+    def _iter_rest_product_costs(self) -> Iterator[dict]:
+        """Yield products with variant costs using REST paging."""
         # Get all products with variants
         products = self.get_all_products()
         print(f"  Found {len(products)} products")
 
         # Collect inventory item IDs from variants
-        inventory_item_ids = []
-        variant_to_inventory = {}  # variant_id -> inventory_item_id
-        variant_info = {}  # variant_id -> {sku, product_title, variant_title}
-
-        for product in products:
-            for variant in product.get("variants", []):
-                inv_id = variant.get("inventory_item_id")
-                var_id = variant.get("id")
-                if inv_id and var_id:
-                    inventory_item_ids.append(inv_id)
-                    variant_to_inventory[var_id] = inv_id
-                    variant_info[var_id] = {
-                        "sku": variant.get("sku", ""),
-                        "product_title": product.get("title", ""),
-                        "variant_title": variant.get("title", ""),
-                        "price": float(variant.get("price", 0) or 0),
-                    }
+        inventory_item_ids = [
+            variant["inventory_item_id"]
+            for product in products
+            for variant in product.get("variants", [])
+            if variant.get("inventory_item_id") and variant.get("id")
+        ]
 
         print(f"  Found {len(inventory_item_ids)} inventory items")
 
@@ -247,6 +573,50 @@ class ShopifyConnector:
                 except (ValueError, TypeError):
                     pass
 
+        for product in products:
+            yield {
+                "title": product.get("title", ""),
+                "variants": [
+                    {
+                        "id": variant.get("id"),
+                        "sku": variant.get("sku", ""),
+                        "price": variant.get("price"),
+                        "cost": inv_id_to_cost.get(variant.get("inventory_item_id")),
+                    }
+                    for variant in product.get("variants", [])
+                ],
+            }
+
+    def _iter_bulk_product_costs(self) -> Iterator[dict]:
+        """Yield products with variant costs from a bulk export."""
+        filepath = self.run_bulk_operation(self.BULK_PRODUCT_COSTS_QUERY, "products_bulk.jsonl")
+
+        for record in self.iter_bulk_records(filepath):
+            variants = []
+            for child in record["_children"]:
+                unit_cost = ((child.get("inventoryItem") or {}).get("unitCost") or {}).get("amount")
+                try:
+                    cost = float(unit_cost) if unit_cost is not None else None
+                except (ValueError, TypeError):
+                    cost = None
+                variants.append({
+                    "id": int(child["legacyResourceId"]),
+                    "sku": child.get("sku") or "",
+                    "price": child.get("price"),
+                    "cost": cost,
+                })
+            yield {"title": record.get("title", ""), "variants": variants}
+
+    def get_product_costs(self) -> dict:
+        """
+        Get cost (COGS) for all products.
+        Returns dict mapping variant_id -> cost and sku -> cost.
+        """
+        self._check_credentials()
+        print("Fetching product costs from Shopify...")
+
+        products = self._iter_bulk_product_costs() if self.use_bulk else self._iter_rest_product_costs()
+
         # Build final mappings
         costs = {
             "by_variant_id": {},
@@ -260,18 +630,17 @@ class ShopifyConnector:
         cost_count = 0
 
         for product in products:
-            product_title = product.get("title", "")
+            product_title = product["title"]
             product_costs = []
             product_prices = []
 
-            for variant in product.get("variants", []):
-                var_id = variant.get("id")
-                sku = variant.get("sku", "")
-                price = float(variant.get("price", 0) or 0)
-                inv_id = variant_to_inventory.get(var_id)
+            for variant in product["variants"]:
+                var_id = variant["id"]
+                sku = variant["sku"]
+                price = float(variant["price"] or 0)
+                cost = variant["cost"]
 
-                if inv_id and inv_id in inv_id_to_cost:
-                    cost = inv_id_to_cost[inv_id]
+                if var_id and cost is not None:
                     costs["by_variant_id"][str(var_id)] = cost
                     if sku:
                         costs["by_sku"][sku] = cost
@@ -302,139 +671,99 @@ class ShopifyConnector:
         Calculate actual COGS for orders using product cost data.
         Returns total COGS and per-order breakdown.
         """
-        if not product_costs:
-            # Try to load from file
-            costs_file = self.data_dir / "product_costs.json"
-            if costs_file.exists():
-                with open(costs_file) as f:
-                    product_costs = json.load(f)
-            else:
+        if product_costs:
+            table = CostTable(product_costs)
+        else:
+            # Compiled once per product_costs.json version
+            table = load_cost_table(self.data_dir / "product_costs.json")
+            if table is None:
                 print("Warning: No product costs data. Run get_product_costs() first.")
                 return {"total_cogs": 0, "orders_with_cogs": 0}
 
-        by_variant = product_costs.get("by_variant_id", {})
-        by_sku = product_costs.get("by_sku", {})
-        fallback_percent = product_costs.get("average_cogs_percent", 35) / 100
-
-        total_cogs = 0
-        orders_with_cogs = 0
-        orders_estimated = 0
-
-        for order in orders:
-            order_cogs = 0
-            has_actual_cost = False
-
-            for item in order.get("line_items", []):
-                quantity = int(item.get("quantity", 1))
-                variant_id = str(item.get("variant_id", ""))
-                sku = item.get("sku", "")
-                line_price = float(item.get("price", 0) or 0)
-
-                # Try to find actual cost
-                cost = None
-                if variant_id and variant_id in by_variant:
-                    cost = by_variant[variant_id]
-                    has_actual_cost = True
-                elif sku and sku in by_sku:
-                    cost = by_sku[sku]
-                    has_actual_cost = True
-
-                if cost is not None:
-                    order_cogs += cost * quantity
-                else:
-                    # Fallback to average COGS %
-                    order_cogs += line_price * quantity * fallback_percent
-
-            total_cogs += order_cogs
-
-            if has_actual_cost:
-                orders_with_cogs += 1
-            else:
-                orders_estimated += 1
+        costed = table.cost_orders(orders)
+        orders_with_cogs = sum(costed["order_has_actual_cost"])
 
         return {
-            "total_cogs": total_cogs,
+            "total_cogs": costed["total_cogs"],
             "orders_with_actual_cogs": orders_with_cogs,
-            "orders_with_estimated_cogs": orders_estimated,
-            "cogs_per_order": total_cogs / len(orders) if orders else 0,
+            "orders_with_estimated_cogs": len(orders) - orders_with_cogs,
+            "cogs_per_order": costed["total_cogs"] / len(orders) if orders else 0,
         }
 
-    def calculate_order_metrics(self, orders: list[dict], date_range_start: datetime = None) -> dict:
-        """Calculate metrics from orders.
+    def calculate_order_metrics(self, orders: Iterable[dict], date_range_start: datetime = None,
+                                cost_table: CostTable = None) -> dict:
+        """Calculate metrics (and COGS, if a cost table is given) in one pass over orders.
 
         Args:
-            orders: List of order dicts from Shopify API
+            orders: Order dicts from Shopify API (any iterable - consumed once, so a
+                    generator streaming from disk or the API works)
             date_range_start: Start of date range for determining new vs returning customers.
                              Customers created before this date are considered returning.
+            cost_table: Compiled product costs. When given, COGS totals and per-day COGS
+                        are included.
+
+        Memory is bounded by days and unique customers, not by order count.
         """
         total_revenue = 0
-        total_orders = len(orders)
+        total_orders = 0
         total_discounts = 0
         total_shipping = 0
         total_tax = 0
+        total_cogs = 0
+        orders_with_actual_cogs = 0
         new_customers = 0
         returning_customers = 0
 
-        daily_stats = {}
+        # Compact per-day accumulators: date -> [orders, revenue, cogs]
+        daily = {}
 
-        # Track unique customers to avoid double-counting
-        seen_customers = {}  # customer_id -> {created_at, order_count_in_period}
+        # Customers are classified on first sight, so only their IDs are kept
+        seen_customers = set()
 
         for order in orders:
+            total_orders += 1
             revenue = float(order.get("total_price", 0) or 0)
-            discounts = float(order.get("total_discounts", 0) or 0)
-            tax = float(order.get("total_tax", 0) or 0)
+            total_revenue += revenue
+            total_discounts += float(order.get("total_discounts", 0) or 0)
+            total_tax += float(order.get("total_tax", 0) or 0)
 
-            shipping = sum(
-                float(line.get("price", 0) or 0)
-                for line in order.get("shipping_lines", [])
-            )
+            for line in order.get("shipping_lines", []):
+                total_shipping += float(line.get("price", 0) or 0)
 
-            total_revenue += revenue
-            total_discounts += discounts
-            total_shipping += shipping
-            total_tax += tax
+            order_cogs = 0
+            if cost_table is not None:
+                order_cogs, has_actual = cost_table.cost_order(order)
+                total_cogs += order_cogs
+                if has_actual:
+                    orders_with_actual_cogs += 1
 
             # Daily tracking
-            date = order.get("created_at", "")[:10]
+            date = (order.get("created_at") or "")[:10]
             if date:
-                if date not in daily_stats:
-                    daily_stats[date] = {"orders": 0, "revenue": 0}
-                daily_stats[date]["orders"] += 1
-                daily_stats[date]["revenue"] += revenue
+                day = daily.get(date)
+                if day is None:
+                    day = daily[date] = [0, 0.0, 0.0]
+                day[0] += 1
+                day[1] += revenue
+                day[2] += order_cogs
 
             # Customer tracking - use customer ID and created_at to determine new vs returning
             customer = order.get("customer")
             if customer:
                 customer_id = customer.get("id")
                 if customer_id and customer_id not in seen_customers:
-                    customer_created = customer.get("created_at", "")
-                    seen_customers[customer_id] = customer_created
-
-        # Now classify customers as new vs returning based on when they were created
-        # If customer account was created within the date range, they're new
-        # If created before the date range, they're returning
-        for customer_id, customer_created in seen_customers.items():
-            if customer_created and date_range_start:
-                try:
-                    # Parse customer created_at (format: "2026-01-17T02:18:02-05:00")
-                    created_dt = datetime.fromisoformat(customer_created.replace('Z', '+00:00'))
-                    # Make date_range_start timezone-aware if needed for comparison
-                    if created_dt.tzinfo and date_range_start.tzinfo is None:
-                        created_dt = created_dt.replace(tzinfo=None)
-
-                    if created_dt >= date_range_start:
+                    seen_customers.add(customer_id)
+                    if self._is_new_customer(customer.get("created_at", ""), date_range_start):
                         new_customers += 1
                     else:
                         returning_customers += 1
-                except (ValueError, TypeError):
-                    # If we can't parse the date, count as new
-                    new_customers += 1
-            else:
-                # No date info, count as new
-                new_customers += 1
 
-        return {
+        if cost_table is not None:
+            daily_stats = {d: {"orders": v[0], "revenue": v[1], "cogs": v[2]} for d, v in daily.items()}
+        else:
+            daily_stats = {d: {"orders": v[0], "revenue": v[1]} for d, v in daily.items()}
+
+        metrics = {
             "total_revenue": total_revenue,
             "total_orders": total_orders,
             "total_discounts": total_discounts,
@@ -447,30 +776,82 @@ class ShopifyConnector:
             "daily_stats": daily_stats,
         }
 
+        if cost_table is not None:
+            metrics.update({
+                "total_cogs": total_cogs,
+                "orders_with_actual_cogs": orders_with_actual_cogs,
+                "orders_with_estimated_cogs": total_orders - orders_with_actual_cogs,
+                "cogs_per_order": total_cogs / total_orders if total_orders > 0 else 0,
+            })
+
+        return metrics
+
+    @staticmethod
+    def _is_new_customer(customer_created: str, date_range_start: datetime = None) -> bool:
+        """
+        Classify a customer as new vs returning based on when they were created.
+
+        If the customer account was created within the date range, they're new.
+        If created before the date range, they're returning.
+        """
+        if not customer_created or not date_range_start:
+            # No date info, count as new
+            return True
+        try:
+            # Parse customer created_at (format: "2026-01-17T02:18:02-05:00")
+            created_dt = datetime.fromisoformat(customer_created.replace('Z', '+00:00'))
+            # Make date_range_start timezone-aware if needed for comparison
+            if created_dt.tzinfo and date_range_start.tzinfo is None:
+                created_dt = created_dt.replace(tzinfo=None)
+
+            return created_dt >= date_range_start
+        except (ValueError, TypeError):
+            # If we can't parse the date, count as new
+            return True
+
     def save_data(self, data: list | dict, filename: str):
         """Save data to JSON file."""
         filepath = self.data_dir / filename
         with open(filepath, "w") as f:
             json.dump(data, f, indent=2, default=str)
+        write_columnar(filepath, data)
         print(f"Saved to {filepath}")
         return filepath
 
-    def pull_last_30_days(self) -> dict:
-        """Pull and analyze last 30 days of orders."""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-
-        orders = self.get_all_orders(
-            created_at_min=start_date.isoformat(),
-            created_at_max=end_date.isoformat(),
-            financial_status="paid",
-        )
-
-        self.save_data(orders, "orders_last_30d.json")
-
-        metrics = self.calculate_order_metrics(orders, date_range_start=start_date)
+    def _save_orders_and_metrics(self, orders: Iterable[dict], start_date: datetime) -> dict:
+        """Save the 30-day orders file (JSON + sidecar) and its metrics in one pass over orders."""
+        orders = self.save_json_stream(orders, "orders_last_30d.json")
+        orders = write_columnar_stream(self.data_dir / "orders_last_30d.json", orders)
+        cost_table = load_cost_table(self.data_dir / "product_costs.json")
+        metrics = self.calculate_order_metrics(orders, date_range_start=start_date, cost_table=cost_table)
         self.save_data(metrics, "metrics_last_30d.json")
+        return metrics
 
+    def _load_sync_state(self) -> dict:
+        try:
+            with open(self.data_dir / self.SYNC_FILE) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @property
+    def orders_format(self) -> str:
+        """Shape of the orders written to orders_last_30d.json: "bulk" (reduced) or "rest"."""
+        return "bulk" if self.use_bulk else "rest"
+
+    def _save_sync_state(self, pulled_at: datetime, full: bool):
+        state = self._load_sync_state()
+        pulled_at = pulled_at.astimezone()  # Shopify reads the cursor as ISO 8601 with an offset
+        state["updated_at_min"] = (pulled_at - self.SYNC_OVERLAP).isoformat()
+        state["last_pull_at"] = pulled_at.isoformat()
+        if full:
+            state["last_full_pull_at"] = pulled_at.isoformat()
+            state["orders_format"] = self.orders_format
+        with open(self.data_dir / self.SYNC_FILE, "w") as f:
+            json.dump(state, f, indent=2)
+
+    @staticmethod
+    def _print_metrics(metrics: dict):
         print("\n" + "=" * 50)
         print("SHOPIFY METRICS - LAST 30 DAYS")
         print("=" * 50)
@@ -482,6 +863,85 @@ class ShopifyConnector:
         print(f"  Returning:      {metrics['returning_customers']:,}")
         print("=" * 50)
 
+    def pull_last_30_days(self) -> dict:
+        """Pull and analyze last 30 days of orders."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+
+        if self.use_bulk:
+            jsonl_path = self.bulk_export_orders(
+                created_at_min=start_date.isoformat(),
+                created_at_max=end_date.isoformat(),
+                financial_status="paid",
+                filename="orders_last_30d.jsonl",
+            )
+            orders = self.iter_bulk_orders(jsonl_path)
+        else:
+            orders = self.iter_all_orders(
+                created_at_min=start_date.isoformat(),
+                created_at_max=end_date.isoformat(),
+                financial_status="paid",
+            )
+
+        # One fused pass: save orders, metrics and COGS as the stream goes by
+        metrics = self._save_orders_and_metrics(orders, start_date)
+        self._save_sync_state(end_date, full=True)
+        self._print_metrics(metrics)
+        return metrics
+
+    def pull_recent_orders(self) -> dict:
+        """
+        Update the last 30 days of orders with only the orders changed since the last pull.
+
+        Orders updated since the saved cursor (updated_at_min) are fetched with
+        REST paging - a handful per run, instead of re-exporting the month -
+        and merged into orders_last_30d.json by ID: paid orders are upserted,
+        orders no longer paid (refunded, voided) are removed, and orders
+        created before the window are dropped. With bulk export on, merged
+        orders are reduced to the bulk order fields. Falls back to a full pull
+        when there is no cursor, the last full pull is older than
+        FULL_RESYNC_AFTER, or the file was written in the other order shape.
+        """
+        state = self._load_sync_state()
+        orders_file = self.data_dir / "orders_last_30d.json"
+        last_full = state.get("last_full_pull_at")
+        if (
+            not state.get("updated_at_min") or not last_full or not orders_file.exists()
+            or state.get("orders_format") != self.orders_format
+            or datetime.now().astimezone() - datetime.fromisoformat(last_full) > self.FULL_RESYNC_AFTER
+        ):
+            print("No recent full pull in this order shape - pulling the last 30 days")
+            return self.pull_last_30_days()
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+        window_start = start_date.strftime("%Y-%m-%d")
+
+        with open(orders_file) as f:
+            orders = {order["id"]: order for order in json.load(f)}
+
+        updated = 0
+        for order in self.iter_all_orders(updated_at_min=state["updated_at_min"], financial_status=None):
+            updated += 1
+            if order.get("financial_status") == "paid":
+                orders[order["id"]] = self._reduce_rest_order(order) if self.use_bulk else order
+            else:
+                orders.pop(order["id"], None)
+        print(f"Merged {updated} updated orders")
+
+        in_window = sorted(
+            (o for o in orders.values() if (o.get("created_at") or "")[:10] >= window_start),
+            key=lambda o: o.get("created_at") or "",
+        )
+        if not updated and len(in_window) == len(orders):
+            # Nothing changed - keep the files (and the published data version) as they are
+            self._save_sync_state(end_date, full=False)
+            with open(self.data_dir / "metrics_last_30d.json") as f:
+                return json.load(f)
+
+        metrics = self._save_orders_and_metrics(in_window, start_date)
+        self._save_sync_state(end_date, full=False)
+        self._print_metrics(metrics)
         return metrics
 
 
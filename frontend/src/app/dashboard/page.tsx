@@ -50,17 +50,22 @@ export default function Dashboard() {
       setLoading(true);
       setError(null);
 
-      const [reportData, signalsData, yesterday, threeDays, sevenDays] = await Promise.all([
-        api.getReport(),
-        api.getSignals(),
-        api.getTimeframeSummary(1),
-        api.getTimeframeSummary(3),
-        api.getTimeframeSummary(7),
+      // One round trip; the backend computes shared inputs once for all five
+      const data = await api.batch([
+        { id: 'report', path: '/metrics/report' },
+        { id: 'signals', path: '/metrics/signals' },
+        { id: 'yesterday', path: '/metrics/timeframe/1' },
+        { id: 'threeDays', path: '/metrics/timeframe/3' },
+        { id: 'sevenDays', path: '/metrics/timeframe/7' },
       ]);
 
-      setReport(reportData);
-      setSignals(signalsData);
-      setTimeframeData({ yesterday, threeDays, sevenDays });
+      setReport(data.report);
+      setSignals(data.signals);
+      setTimeframeData({
+        yesterday: data.yesterday as TimeframeSummary,
+        threeDays: data.threeDays as TimeframeSummary,
+        sevenDays: data.sevenDays as TimeframeSummary,
+      });
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load data');
     } finally {
@@ -335,9 +335,44 @@ export interface RecommendationsResponse {
   period_days: number;
 }
 
+export interface BatchQuery {
+  id: string;
+  path: string;
+  params?: Record<string, string | number | boolean>;
+}
+
+export interface BatchResult {
+  status: number;
+  headers: Record<string, string>;
+  body: any;
+}
+
+/**
+ * Run several GET queries in one request and return their bodies by id.
+ * Throws if any sub-query failed, like Promise.all over separate calls.
+ */
+async function fetchBatch(queries: BatchQuery[]): Promise<Record<string, any>> {
+  const { results } = await fetchApi<{ results: Record<string, BatchResult>; elapsed_ms: number }>('/batch', {
+    method: 'POST',
+    body: JSON.stringify({ queries }),
+  });
+
+  const bodies: Record<string, any> = {};
+  for (const [id, result] of Object.entries(results)) {
+    if (result.status >= 400) {
+      throw new Error(result.body?.detail || `API error: ${result.status} (${id})`);
+    }
+    bodies[id] = result.body;
+  }
+  return bodies;
+}
+
 // API Functions
 
 export const api = {
+  // Batch (several GETs in one round trip)
+  batch: fetchBatch,
+
   // Metrics
   getSummary: () => fetchApi<Summary>('/metrics/summary'),
   getSignals: () => fetchApi<any>('/metrics/signals'),